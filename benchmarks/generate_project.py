@@ -0,0 +1,163 @@
+"""Generates synthetic bpytest projects used to benchmark the framework overhead.
+
+A generated project looks like:
+
+    <root>/
+        pyproject.toml
+        tests/
+            pkg_000/
+                conftest.py             # fixture chain pkg_000_l0_f0 <- ... <- pkg_000_l0_fN
+                sub_1/                  # only with --conftest-depth > 1
+                    conftest.py         # fixture chain pkg_000_l1_f0 <- ... <- pkg_000_l1_fN
+                    bench_00000_test.py
+                    ...
+
+Every test requests the deepest fixture of the chain defined in its closest
+conftest.py. The chain of a nested conftest.py starts from the last fixture of
+its parent, so each test resolves ``fixture_depth * conftest_depth`` function
+fixtures, plus a session and a module scoped fixture.
+"""
+
+import argparse
+import textwrap
+from pathlib import Path
+
+PYPROJECT = """\
+[tool.bpytest]
+norecursedirs = []
+"""
+
+
+def _conftest_source(prefix: str, fixture_depth: int, parent: str = "") -> str:
+    """Source of a conftest.py defining a chain of fixture_depth fixtures,
+    the first fixture of the chain depends on the parent fixture if given"""
+
+    lines = [
+        "import bpytest",
+        "",
+        "",
+        "@bpytest.fixture(scope='session')",
+        f"def {prefix}_session():",
+        "    return {}",
+        "",
+        "",
+        "@bpytest.fixture(scope='module')",
+        f"def {prefix}_module({prefix}_session):",
+        "    yield []",
+        "",
+        "",
+        "@bpytest.fixture",
+        f"def {prefix}_f0({parent or prefix + '_module'}):",
+        "    return 0",
+        "",
+    ]
+    for depth in range(1, fixture_depth):
+        lines += [
+            "",
+            "@bpytest.fixture",
+            f"def {prefix}_f{depth}({prefix}_f{depth - 1}):",
+            f"    yield {prefix}_f{depth - 1} + 1",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def _test_file_source(first_index: int, count: int, fixture: str) -> str:
+    """Source of a test file with count tests requesting the given fixture"""
+
+    lines = ["import bpy", ""]
+    for index in range(first_index, first_index + count):
+        lines += [
+            "",
+            f"def test_bench_{index:06d}({fixture}):",
+            f'    """Synthetic test {index}"""',
+            "    bpy.ops.mesh.primitive_cube_add()",
+            f"    assert {fixture} >= 0",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def generate_project(
+    root: Path,
+    tests: int = 1000,
+    tests_per_file: int = 20,
+    conftests: int = 10,
+    conftest_depth: int = 1,
+    fixture_depth: int = 5,
+) -> Path:
+    """Generate a synthetic project and return its root directory
+
+    Args:
+        root (Path): Directory where the project is generated, it is created if needed
+        tests (int): Total number of tests
+        tests_per_file (int): Number of tests in each test file
+        conftests (int): Number of top level packages, each one has its own conftest.py
+        conftest_depth (int): Number of nested directories with a conftest.py in each package
+        fixture_depth (int): Length of the fixture dependency chain in each conftest.py
+    """
+
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "pyproject.toml").write_text(PYPROJECT, encoding="utf-8")
+
+    fixture_depth = max(fixture_depth, 1)
+    conftest_depth = max(conftest_depth, 1)
+    conftests = max(conftests, 1)
+
+    # Create the packages, each test file is placed in the deepest directory
+    leaf_fixtures: list[tuple[Path, str]] = []
+    for package_index in range(conftests):
+        directory = root / "tests" / f"pkg_{package_index:03d}"
+        parent = ""
+        for level in range(conftest_depth):
+            if level:
+                directory = directory / f"sub_{level}"
+            directory.mkdir(parents=True, exist_ok=True)
+            prefix = f"pkg_{package_index:03d}_l{level}"
+            (directory / "conftest.py").write_text(
+                _conftest_source(prefix, fixture_depth, parent),
+                encoding="utf-8",
+            )
+            parent = f"{prefix}_f{fixture_depth - 1}"
+        # Last fixture of the deepest conftest.py
+        leaf_fixtures.append((directory, parent))
+
+    # Distribute the test files over the packages
+    file_index = 0
+    for first_index in range(0, tests, tests_per_file):
+        directory, fixture = leaf_fixtures[file_index % len(leaf_fixtures)]
+        count = min(tests_per_file, tests - first_index)
+        (directory / f"bench_{file_index:05d}_test.py").write_text(
+            _test_file_source(first_index, count, fixture), encoding="utf-8"
+        )
+        file_index += 1
+
+    return root
+
+
+def main() -> None:
+    """Command line entry point"""
+
+    parser = argparse.ArgumentParser(
+        description=textwrap.dedent(generate_project.__doc__ or "").strip()
+    )
+    parser.add_argument("root", help="Directory of the generated project")
+    parser.add_argument("--tests", type=int, default=1000)
+    parser.add_argument("--tests-per-file", type=int, default=20)
+    parser.add_argument("--conftests", type=int, default=10)
+    parser.add_argument("--conftest-depth", type=int, default=1)
+    parser.add_argument("--fixture-depth", type=int, default=5)
+    args = parser.parse_args()
+
+    generate_project(
+        Path(args.root),
+        tests=args.tests,
+        tests_per_file=args.tests_per_file,
+        conftests=args.conftests,
+        conftest_depth=args.conftest_depth,
+        fixture_depth=args.fixture_depth,
+    )
+
+
+if __name__ == "__main__":
+    main()
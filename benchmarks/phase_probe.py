@@ -0,0 +1,98 @@
+"""Blender side script measuring each phase of a bpytest session.
+
+It is executed by the (stub) blender executable in the same way as
+src/bpytest/blender_module/main.py and runs the real test session
+(collection, conftest registration, and TestManager.execute with its capture,
+addon diffing, skip evaluation and event reporting). The phases are the ones
+recorded by the session in its metrics (see bpytest_metrics), the fixture
+setups and teardowns summed over every fixture. It prints a single
+``[bpytest-bench]`` json line with the time spent in each phase and the peak
+resident memory of the process.
+"""
+
+import time
+
+_PROCESS_START = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import json
+import resource
+import sys
+from pathlib import Path
+
+BENCH_PREFIX = "[bpytest-bench]"
+BLENDER_MODULE_PATH = (
+    Path(__file__).resolve().parent.parent / "src" / "bpytest" / "blender_module"
+)
+
+
+def _peak_rss_kb() -> int:
+    """Peak resident memory of this process in KB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class _Phases:
+    """Accumulates the duration and the peak memory of each phase"""
+
+    def __init__(self):
+        self.data: dict[str, dict[str, float]] = {}
+        self._last = _PROCESS_START
+
+    def add(self, name: str, seconds: float):
+        """Add time to a phase"""
+        phase = self.data.setdefault(name, {"seconds": 0.0, "peak_rss_kb": 0})
+        phase["seconds"] += seconds
+        phase["peak_rss_kb"] = _peak_rss_kb()
+
+    def lap(self, name: str):
+        """Add the time elapsed since the previous lap to a phase"""
+        now = time.perf_counter()
+        self.add(name, now - self._last)
+        self._last = now
+
+
+def main() -> None:
+    """Run the test session and report its phases"""
+
+    phases = _Phases()
+
+    sys.path.append((BLENDER_MODULE_PATH.parent / "common").as_posix())
+    sys.path.append(BLENDER_MODULE_PATH.as_posix())
+    from bpytest_config import BpyTestConfig
+    from bpytest_metrics import metrics
+    from bpytrace import tracer
+
+    from bpytest.session import Session
+
+    phases.lap("import")
+
+    data_json = next(arg[7:] for arg in sys.argv if arg.startswith("config="))
+    config = BpyTestConfig()
+    config.deserialize(data_json)
+    # Like the test sessions without --startup-trace or --trace-file
+    tracer.disable()
+    phases.lap("config")
+
+    metrics.reset()
+    Session(config).execute("benchmark")
+    phases.lap("session")
+
+    # The peak memory of the phases of the session is the one at its end,
+    # the fixture phases ("fixture_setup:<name>") are summed over the fixtures
+    for name, (seconds, _) in metrics.timings.items():
+        phases.add(name.partition(":")[0], seconds)
+
+    print(
+        BENCH_PREFIX
+        + json.dumps(
+            {
+                "tests": metrics.counters.get("tests", 0),
+                "phases": phases.data,
+                "peak_rss_kb": _peak_rss_kb(),
+            }
+        )
+    )
+    sys.stdout.flush()
+
+
+main()
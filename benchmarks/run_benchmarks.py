@@ -0,0 +1,259 @@
+"""Measures the bpytest framework overhead on synthetic projects.
+
+Runs without Blender: the blender side of bpytest is executed by the stub
+blender executable from tests/fixtures/stub_blender, against a minimal stub
+``bpy`` module, so the numbers only contain bpytest's own cost (collection,
+conftest import, fixture resolution, reset, reporting, ...).
+
+For every project size two measurements are taken:
+
+- phases: benchmarks/phase_probe.py runs the test session of the blender
+  module and reports the time of each phase recorded by its metrics, and the
+  peak resident memory.
+- end to end: the bpytest command line is executed against the stub blender,
+  measuring the wall time and the peak resident memory of the whole process tree.
+
+Example:
+
+    python benchmarks/run_benchmarks.py --tests 1000 10000 --json bench.json
+    python benchmarks/run_benchmarks.py --tests 1000 10000 --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from generate_project import generate_project
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+STUB_BLENDER_EXE = ROOT_PATH / "tests" / "fixtures" / "stub_blender" / "blender"
+PHASE_PROBE_PATH = Path(__file__).resolve().parent / "phase_probe.py"
+BENCH_PREFIX = "[bpytest-bench]"
+
+
+def _wait_with_rusage(process: subprocess.Popen[bytes]) -> tuple[int, int]:
+    """Wait for the process and return its exit code and peak resident memory in KB"""
+
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, rusage.ru_maxrss
+
+
+def _run_phases(project: Path) -> dict[str, Any]:
+    """Run the phase probe inside the stub blender"""
+
+    sys.path.append((ROOT_PATH / "src" / "bpytest" / "common").as_posix())
+    from bpytest_config import BpyTestConfig
+
+    config = BpyTestConfig()
+    config.pythonpath = project
+    config.collector_string = project.as_posix()
+
+    process = subprocess.Popen(
+        [
+            STUB_BLENDER_EXE.as_posix(),
+            "--background",
+            "--factory-startup",
+            "--python",
+            PHASE_PROBE_PATH.as_posix(),
+            "--",
+            f"config={config.serialize()}",
+        ],
+        cwd=project,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    stdout, _ = process.communicate()
+    for line in stdout.decode("utf-8", errors="replace").splitlines():
+        if line.startswith(BENCH_PREFIX):
+            return json.loads(line[len(BENCH_PREFIX) :])
+
+    raise RuntimeError(
+        "Phase probe did not report any result:\n"
+        + stdout.decode("utf-8", errors="replace")[-4000:]
+    )
+
+
+def _run_end_to_end(project: Path) -> dict[str, Any]:
+    """Run the bpytest command line against the stub blender"""
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [(ROOT_PATH / "src").as_posix(), env.get("PYTHONPATH", "")]
+    )
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "from bpytest.main import main; main()",
+            f"--blender-exe={STUB_BLENDER_EXE.as_posix()}",
+        ],
+        cwd=project,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return_code, peak_rss_kb = _wait_with_rusage(process)
+    if return_code != 0:
+        raise RuntimeError(
+            f"bpytest exited with code {return_code} on the project {project}"
+        )
+
+    return {
+        "seconds": time.perf_counter() - start,
+        "peak_rss_kb": peak_rss_kb,
+        "return_code": return_code,
+    }
+
+
+def run_benchmark(size: int, args: argparse.Namespace) -> dict[str, Any]:
+    """Generate a project with the given number of tests and benchmark it"""
+
+    with tempfile.TemporaryDirectory(prefix="bpytest_bench_") as temp_dir:
+        project = generate_project(
+            Path(temp_dir),
+            tests=size,
+            tests_per_file=args.tests_per_file,
+            conftests=args.conftests,
+            conftest_depth=args.conftest_depth,
+            fixture_depth=args.fixture_depth,
+        )
+        phases = _run_phases(project)
+        end_to_end = _run_end_to_end(project) if not args.phases_only else {}
+
+    return {
+        "tests": size,
+        "phases": phases["phases"],
+        "peak_rss_kb": phases["peak_rss_kb"],
+        "end_to_end": end_to_end,
+    }
+
+
+def _print_result(result: dict[str, Any]) -> None:
+    """Print the result of a single benchmark as a table"""
+
+    tests = result["tests"]
+    print(f"\n{tests} tests")
+    print(f"{'phase':<18}{'total (s)':>12}{'per test (us)':>16}{'peak rss (MB)':>16}")
+    for name, phase in result["phases"].items():
+        print(
+            f"{name:<18}{phase['seconds']:>12.3f}"
+            f"{phase['seconds'] / tests * 1e6:>16.1f}"
+            f"{phase['peak_rss_kb'] / 1024:>16.1f}"
+        )
+    end_to_end = result["end_to_end"]
+    if end_to_end:
+        print(
+            f"{'end to end':<18}{end_to_end['seconds']:>12.3f}"
+            f"{end_to_end['seconds'] / tests * 1e6:>16.1f}"
+            f"{end_to_end['peak_rss_kb'] / 1024:>16.1f}"
+        )
+
+
+def _min_baseline_value(name: str) -> float:
+    """Minimum baseline value for a measure to be compared, shorter
+    phases are too noisy to be compared reliably"""
+    return 0.0 if name == "peak rss" else 0.05
+
+
+def _compare(
+    results: list[dict[str, Any]], baseline_path: Path, max_regression: float
+) -> list[str]:
+    """Compare the results with a baseline file and return the regressions found"""
+
+    baseline = {
+        item["tests"]: item
+        for item in json.loads(baseline_path.read_text(encoding="utf-8"))
+    }
+
+    regressions: list[str] = []
+    for result in results:
+        base = baseline.get(result["tests"])
+        if base is None:
+            continue
+
+        pairs = [
+            (f"{name} time", phase["seconds"], base["phases"].get(name, {}).get("seconds"))
+            for name, phase in result["phases"].items()
+        ]
+        pairs.append(("peak rss", result["peak_rss_kb"], base["peak_rss_kb"]))
+        if result["end_to_end"] and base.get("end_to_end"):
+            pairs.append(
+                (
+                    "end to end time",
+                    result["end_to_end"]["seconds"],
+                    base["end_to_end"]["seconds"],
+                )
+            )
+
+        for name, value, base_value in pairs:
+            if not base_value or base_value < _min_baseline_value(name):
+                continue
+            if value > base_value * max_regression:
+                regressions.append(
+                    f"{result['tests']} tests: {name} {value:.3f} > "
+                    f"{base_value:.3f} * {max_regression}"
+                )
+
+    return regressions
+
+
+def main() -> None:
+    """Command line entry point"""
+
+    parser = argparse.ArgumentParser(description="bpytest overhead benchmarks")
+    parser.add_argument(
+        "--tests",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="Number of tests of each generated project",
+    )
+    parser.add_argument("--tests-per-file", type=int, default=20)
+    parser.add_argument("--conftests", type=int, default=10)
+    parser.add_argument("--conftest-depth", type=int, default=1)
+    parser.add_argument("--fixture-depth", type=int, default=5)
+    parser.add_argument(
+        "--phases-only",
+        action="store_true",
+        help="Skip the end to end measure of the bpytest command line",
+    )
+    parser.add_argument("--json", help="Write the results to a json file")
+    parser.add_argument(
+        "--compare", help="Compare the results with a json file from a previous run"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=1.25,
+        help="Ratio over the baseline considered a regression (with --compare)",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for size in args.tests:
+        result = run_benchmark(size, args)
+        _print_result(result)
+        results.append(result)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.compare:
+        regressions = _compare(results, Path(args.compare), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,67 @@
-__all__ = ["fixture", "fixture_manager", "tmp_path", "wrap_session"]
+__all__ = [
+    "assert_arrays_close",
+    "assert_geometry_matches",
+    "assert_image_matches",
+    "assert_scene_matches",
+    "blend_file",
+    "blend_library_cache",
+    "BlendFileLoader",
+    "BlendLibraryCache",
+    "fixture",
+    "fixture_manager",
+    "GeometryMatcher",
+    "ImageMatcher",
+    "mark",
+    "read_attribute",
+    "read_geometry",
+    "SceneMatcher",
+    "snapshot_scene",
+    "tmp_path",
+    "tmp_path_factory",
+    "TempPathFactory",
+    "wrap_session",
+]
+
+import importlib
+from typing import Any
 
 from .fixtures import fixture, fixture_manager
+from .mark import mark
 from .session import wrap_session
-from .tmpdir import tmp_path
+from .tmpdir import TempPathFactory, tmp_path, tmp_path_factory
+
+# Modules of the blend file, geometry, image and snapshot helpers, imported
+# the first time one of their names is used or one of their fixtures is
+# requested, so the test sessions that do not use them do not import them
+_LAZY_NAMES = {
+    "BlendFileLoader": "blendfile",
+    "BlendLibraryCache": "blendfile",
+    "blend_file": "blendfile",
+    "blend_library_cache": "blendfile",
+    "GeometryMatcher": "geometry",
+    "assert_arrays_close": "geometry",
+    "assert_geometry_matches": "geometry",
+    "read_attribute": "geometry",
+    "read_geometry": "geometry",
+    "ImageMatcher": "image",
+    "assert_image_matches": "image",
+    "SceneMatcher": "snapshot",
+    "assert_scene_matches": "snapshot",
+    "snapshot_scene": "snapshot",
+}
+_LAZY_FIXTURES = {
+    "blendfile": ("blend_file", "blend_library_cache"),
+    "geometry": ("assert_geometry_matches",),
+    "image": ("assert_image_matches",),
+    "snapshot": ("assert_scene_matches",),
+}
+
+for _module_name, _names in _LAZY_FIXTURES.items():
+    fixture_manager.register_lazy_fixtures(f"{__name__}.{_module_name}", _names)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{_LAZY_NAMES[name]}")
+    return getattr(module, name)
@@ -0,0 +1,222 @@
+"""Loading of data-blocks from asset .blend files, instead of opening them.
+
+Only the requested data-blocks (and the data-blocks they use) are loaded
+into the test session with bpy.data.libraries.load, appended or linked, so
+the session reset by the runner is kept. The first time data-blocks are
+loaded from an asset file they are written to a small partial .blend file,
+with bpy.data.libraries.write, and the next loads of the session read that
+file: a large asset file is read from disk once per Blender session, and
+every test still gets a fresh copy of the appended data. Any subset of the
+data-blocks of a partial file is read from it.
+
+Relative asset paths are relative to the directory of the test file.
+
+Example:
+
+    def test_tower(blend_file):
+        tower = blend_file.append("assets/city.blend", objects=["Tower"])["objects"][0]
+        assert len(tower.data.vertices) == 1024
+"""
+
+import inspect
+from pathlib import Path
+from typing import Any, Sequence
+
+from .fixtures import FixtureRequest, fixture
+from .tmpdir import TempPathFactory
+
+# Collections of the loaded data-blocks linked to the scene
+_SCENE_COLLECTIONS = {"objects": "objects", "collections": "children"}
+
+
+def _load_library(
+    filepath: Path, data_blocks: dict[str, list[str]], link: bool
+) -> dict[str, list[Any]]:
+    """Load data-blocks of a .blend file by name, for each bpy.data collection"""
+    import bpy
+
+    missing = []
+    with bpy.data.libraries.load(filepath.as_posix(), link=link) as (
+        data_from,
+        data_to,
+    ):
+        for attr, names in data_blocks.items():
+            available = set(getattr(data_from, attr, ()))
+            missing += [f"{attr}[{name!r}]" for name in names if name not in available]
+        if not missing:
+            for attr, names in data_blocks.items():
+                setattr(data_to, attr, list(names))
+
+    if missing:
+        raise KeyError(f"{filepath.name} has no {', '.join(missing)}")
+    return {attr: list(getattr(data_to, attr)) for attr in data_blocks}
+
+
+class BlendLibraryCache:
+    """Partial .blend files with the data-blocks loaded from the asset files,
+    written the first time they are loaded, see blend_file"""
+
+    def __init__(self, directory: Path):
+        self._directory = directory
+        # Partial files of each asset file (path, modification time and size),
+        # with the name of each data-block in the partial file, by collection
+        # and requested name
+        self._files: dict[
+            tuple[str, int, int], list[tuple[Path, dict[str, dict[str, str]]]]
+        ] = {}
+        self._partial_count = 0
+        # Number of loads read from the asset files
+        self.misses = 0
+
+    def _find_partial(
+        self, key: tuple[str, int, int], data_blocks: dict[str, list[str]]
+    ) -> tuple[Path, dict[str, list[str]]] | None:
+        """Partial file of an asset with every requested data-block, and their
+        names in the partial file, None if no partial file has them all"""
+
+        for partial_path, names in self._files.get(key, []):
+            if all(
+                name in names.get(attr, {})
+                for attr, requested in data_blocks.items()
+                for name in requested
+            ):
+                return partial_path, {
+                    attr: [names[attr][name] for name in requested]
+                    for attr, requested in data_blocks.items()
+                }
+        return None
+
+    def load(
+        self, filepath: Path, data_blocks: dict[str, list[str]], link: bool
+    ) -> dict[str, list[Any]]:
+        """Load data-blocks of an asset file, from a partial file if they were
+        already loaded by the session. A request for data-blocks that are not
+        all in the same partial file (e.g. the data-blocks of two previous
+        loads) reads the asset file again"""
+        import bpy
+
+        stat = filepath.stat()
+        key = (filepath.as_posix(), stat.st_mtime_ns, stat.st_size)
+        partial = self._find_partial(key, data_blocks)
+        if partial is not None:
+            return _load_library(*partial, link)
+
+        self.misses += 1
+        # Data-blocks of the session, the data-blocks appended to write the
+        # partial file of a link, with their dependencies, are removed
+        existing = set(bpy.data.user_map()) if link else set()
+        loaded = _load_library(filepath, data_blocks, link=False)
+        partial_path = self._directory / f"{self._partial_count}-{filepath.name}"
+        self._partial_count += 1
+        bpy.data.libraries.write(
+            partial_path.as_posix(),
+            {data_block for ids in loaded.values() for data_block in ids},
+            path_remap="ABSOLUTE",
+        )
+        # Appended data-blocks are renamed if their names are already used
+        names = {
+            attr: {
+                name: data_block.name
+                for name, data_block in zip(data_blocks[attr], ids)
+            }
+            for attr, ids in loaded.items()
+        }
+        self._files.setdefault(key, []).append((partial_path, names))
+        if not link:
+            return loaded
+
+        bpy.data.batch_remove(
+            [
+                data_block
+                for data_block in bpy.data.user_map()
+                if data_block not in existing
+            ]
+        )
+        partial = self._find_partial(key, data_blocks)
+        assert partial is not None
+        return _load_library(*partial, link=True)
+
+
+class BlendFileLoader:
+    """Appends or links data-blocks of asset .blend files, see blend_file"""
+
+    def __init__(self, base_dir: Path, cache: BlendLibraryCache):
+        self._base_dir = base_dir
+        self._cache = cache
+
+    def append(
+        self,
+        filepath: str | Path,
+        link_to_scene: bool = True,
+        **data_blocks: Sequence[str],
+    ) -> dict[str, list[Any]]:
+        """Append a copy of data-blocks of a .blend file to the test session
+
+        Args:
+            filepath (str | Path): Asset file, relative to the test file directory
+            link_to_scene (bool): Link the loaded objects and collections to
+                the scene collection
+            data_blocks (Sequence[str]): Names of the data-blocks of each
+                bpy.data collection, e.g. objects=["Tower"], materials=["Brick"]
+
+        Returns:
+            dict[str, list[Any]]: Loaded data-blocks of each collection, in the
+                order of the names
+        """
+        return self._load(filepath, False, link_to_scene, data_blocks)
+
+    def link(
+        self,
+        filepath: str | Path,
+        link_to_scene: bool = True,
+        **data_blocks: Sequence[str],
+    ) -> dict[str, list[Any]]:
+        """Link data-blocks of a .blend file to the test session, as read
+        only library data. The library of the linked data-blocks is the
+        partial file of the session (see append for the arguments)"""
+        return self._load(filepath, True, link_to_scene, data_blocks)
+
+    def _load(
+        self,
+        filepath: str | Path,
+        link: bool,
+        link_to_scene: bool,
+        data_blocks: dict[str, Sequence[str]],
+    ) -> dict[str, list[Any]]:
+        import bpy
+
+        if not data_blocks:
+            raise ValueError("No data-blocks requested, e.g. objects=['Cube']")
+        path = self._base_dir / filepath
+        if not path.is_file():
+            raise FileNotFoundError(f"Blend file {path} does not exist")
+
+        loaded = self._cache.load(
+            path.absolute(),
+            {attr: list(names) for attr, names in data_blocks.items()},
+            link,
+        )
+
+        if link_to_scene:
+            scene_collection = bpy.context.scene.collection
+            for attr, target in _SCENE_COLLECTIONS.items():
+                for data_block in loaded.get(attr, []):
+                    getattr(scene_collection, target).link(data_block)
+        return loaded
+
+
+@fixture(scope="session")
+def blend_library_cache(tmp_path_factory: TempPathFactory) -> BlendLibraryCache:
+    """Session fixture with the partial .blend files of the loaded assets."""
+    return BlendLibraryCache(tmp_path_factory.mktemp("blend_libraries"))
+
+
+@fixture
+def blend_file(
+    blend_library_cache: BlendLibraryCache, request: FixtureRequest
+) -> BlendFileLoader:
+    """Fixture appending or linking data-blocks of asset .blend files,
+    relative to the directory of the test file."""
+
+    base_dir = Path(inspect.getfile(request.func)).parent
+    return BlendFileLoader(base_dir, blend_library_cache)
@@ -0,0 +1,138 @@
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from bpyprint import set_output_stream
+
+
+class OutputCapture:
+    """Captures the output of each test into a spool file.
+
+    The process file descriptors 1 and 2 are redirected to the spool file
+    while a test runs, so the output written by Python (sys.stdout/sys.stderr),
+    by Blender itself and by C extensions is captured. The output of a test
+    is read back when it ends, at most max_bytes (head and tail) of it, and
+    the spool file is truncated to be reused by the next test, so the
+    output neither travels through the pipe to the main process nor
+    accumulates on disk or in memory.
+
+    bpyprint and bpyevent keep writing to the original stdout while the
+    capture is active.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max(max_bytes, 0)
+        self._saved_fds: tuple[int, int] | None = None
+        self._spool: io.BufferedRandom | None = None
+        self._spool_path: Path | None = None
+        self._output_stream: io.TextIOWrapper | None = None
+        self._active = False
+
+    def start_session(self):
+        """Prepare the spool file and keep a copy of the original stdout/stderr"""
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self._saved_fds = (os.dup(1), os.dup(2))
+
+        # Keep the order of the output written by python and by the fds
+        for stream in (sys.stdout, sys.stderr):
+            if isinstance(stream, io.TextIOWrapper):
+                stream.reconfigure(line_buffering=True)
+
+        fd, path = tempfile.mkstemp(prefix="bpytest_capture_", suffix=".log")
+        self._spool_path = Path(path)
+        self._spool = os.fdopen(fd, "w+b")
+
+        self._output_stream = io.TextIOWrapper(
+            io.FileIO(self._saved_fds[0], "w", closefd=False),
+            encoding=sys.stdout.encoding or "utf-8",
+            errors="replace",
+            line_buffering=True,
+        )
+        set_output_stream(self._output_stream)
+
+    def start(self):
+        """Start capturing the output of a test"""
+
+        if self._spool is None or self._active:
+            return
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(self._spool.fileno(), 1)
+        os.dup2(self._spool.fileno(), 2)
+        self._active = True
+
+    def stop(self) -> str:
+        """Stop capturing and return the captured output of the test"""
+
+        if self._spool is None or self._saved_fds is None or not self._active:
+            return ""
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(self._saved_fds[0], 1)
+        os.dup2(self._saved_fds[1], 2)
+        self._active = False
+
+        output = self._read_spool()
+        self._spool.seek(0)
+        self._spool.truncate()
+        return output
+
+    def take_output(self) -> str:
+        """Return the output left in the spool file and truncate it, e.g. the
+        output of a forked test process that crashed while capturing"""
+
+        if self._spool is None or self._active:
+            return ""
+
+        output = self._read_spool()
+        self._spool.seek(0)
+        self._spool.truncate()
+        return output
+
+    def _read_spool(self) -> str:
+        """Read the spool file, keeping only the head and the tail
+        of the output if it is larger than max_bytes"""
+
+        assert self._spool is not None
+
+        size = os.fstat(self._spool.fileno()).st_size
+        self._spool.seek(0)
+        if size <= self._max_bytes:
+            data = self._spool.read(size)
+        else:
+            half = self._max_bytes // 2
+            head = self._spool.read(half)
+            self._spool.seek(size - half)
+            tail = self._spool.read(half)
+            data = (
+                head
+                + f"\n... {size - 2 * half} bytes of output truncated ...\n".encode()
+                + tail
+            )
+        return data.decode("utf-8", errors="replace")
+
+    def end_session(self):
+        """Restore the original stdout/stderr and remove the spool file"""
+
+        self.stop()
+        set_output_stream(None)
+
+        if self._output_stream is not None:
+            self._output_stream.close()
+            self._output_stream = None
+        if self._saved_fds is not None:
+            for fd in self._saved_fds:
+                os.close(fd)
+            self._saved_fds = None
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        if self._spool_path is not None:
+            self._spool_path.unlink(missing_ok=True)
+            self._spool_path = None
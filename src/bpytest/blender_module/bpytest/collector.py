@@ -1,49 +1,21 @@
-import fnmatch
 from pathlib import Path
 
-from .entity import CollectorString, TestFile
-from .print_helper import bpyprint, print_selected_functions
-
-IGNORE_DIRS: list[str] = [
-    "__pycache__",
-    ".git/*",
-    ".vscode/*",
-    ".idea/*",
-    ".pytest_cache/*",
-    "venv/*",
-    "build/*",
-    "dist/*",
-    ".venv/*",
-]
-
-
-def collect_conftest_files(path: Path, norecursedirs: list[str]) -> list[Path]:
-    """Collect all conftest.py files in the given path."""
-    conftest_files = []
-
-    for file_path in path.glob("**/conftest.py"):
-        file_name = file_path.name
+from bpytest_index import (
+    IGNORE_DIRS,
+    TestSelector,
+    find_test_files,
+    read_mark_names,
+)
 
-        # Check if the file path matches any pattern in norecursedirs
-        skip_file = False
-        for pattern in norecursedirs:
-            if fnmatch.fnmatch(
-                file_path.relative_to(Path.cwd()).as_posix(), pattern
-            ):
-                skip_file = True
-                break
-
-        if skip_file:
-            continue
-
-        if not file_path.is_file():
-            continue
-        if not file_name.endswith(".py"):
-            continue
+from .entity import CollectorString, TestFile, TestUnit
+from .lane import HOST_LANE, LaneSelector
+from .print_helper import bpyprint, print_selected_functions
 
-        conftest_files.append(file_path)
 
-    return conftest_files
+def _nodeid_files(nodeids: list[str]) -> list[Path]:
+    """Absolute path of the files of the node ids, in order of first use"""
+    paths = dict.fromkeys(nodeid.partition("::")[0] for nodeid in nodeids)
+    return list(dict.fromkeys(Path(path).absolute() for path in paths))
 
 
 class Collector:
@@ -57,14 +29,30 @@ class Collector:
         collector_string: CollectorString,
         norecursedirs: list[str],
         keyword: str = "",
+        markexpr: str = "",
+        lane: str = "",
+        lane_selector: LaneSelector | None = None,
+        nodeids: list[str] | None = None,
+        skipped_nodeids: list[str] | None = None,
     ):
 
         self._collector_string = collector_string
-        norecursedirs.extend(IGNORE_DIRS)
-
-        if self._collector_string.path.is_file():
+        # A new list, the collector can run many times in the same session
+        norecursedirs = norecursedirs + IGNORE_DIRS
+
+        self.test_files = []
+        # Tests skipped by the command line, counted as selected
+        skipped_nodeids = skipped_nodeids or []
+        if nodeids is not None:
+            # The test plan names the files, there is no directory to walk
+            self.test_files = [
+                TestFile(path)
+                for path in _nodeid_files(nodeids + skipped_nodeids)
+                if path.is_file()
+            ]
+        elif self._collector_string.path.is_file():
             self.test_files.append(TestFile(self._collector_string.path))
-        if self._collector_string.path.is_dir():
+        elif self._collector_string.path.is_dir():
             self.test_files = [
                 TestFile(path)
                 for path in self.get_py_files_recursive(
@@ -75,16 +63,93 @@ class Collector:
         for test_file in self.test_files:
             test_file.select_by_collector_string(self._collector_string)
 
-        if keyword:
-            bpyprint(f"Selecting test units by keyword: {keyword}")
+        selector = TestSelector(keyword, markexpr)
+        if selector.active:
+            if keyword:
+                bpyprint(f"Selecting test units by keyword: {keyword}")
+            if markexpr:
+                bpyprint(f"Selecting test units by marks: {markexpr}")
             for test_file in self.test_files:
-                test_file.select_by_keyword(keyword)
+                test_file.select_by_selector(
+                    selector, read_mark_names(test_file.filepath)
+                )
+
+        if lane_selector is not None:
+            self._select_by_lane(lane, lane_selector)
+
+        skipped_units = 0
+        if nodeids is not None:
+            self._select_by_nodeids(nodeids)
+            skipped_units = len(self._find_units(skipped_nodeids))
 
+        selected_units = self.get_total_test_units(selected_only=True) + skipped_units
         print_selected_functions(
             self.get_total_test_units(),
-            self.get_total_test_units()
-            - self.get_total_test_units(selected_only=True),
-            self.get_total_test_units(selected_only=True),
+            self.get_total_test_units() - selected_units,
+            selected_units,
+            skipped_units,
+        )
+
+    def _select_by_lane(self, lane: str, lane_selector: LaneSelector) -> None:
+        """Deselect the test units that run in another lane"""
+
+        other_lane_units = 0
+        for test_file in self.test_files:
+            for unit in test_file.test_units:
+                if not unit.selected:
+                    continue
+                if lane_selector.runs_on_host(unit) != (lane == HOST_LANE):
+                    unit.selected = False
+                    other_lane_units += 1
+
+        bpyprint(f"Lane {lane}: {other_lane_units} test units run in another lane")
+
+    def _find_units(self, nodeids: list[str]) -> dict[TestUnit, int]:
+        """Test units of the node ids, with their position in the node ids.
+        A node id without a test name refers to every test unit of the file."""
+
+        test_files = {
+            test_file.filepath.absolute(): test_file for test_file in self.test_files
+        }
+        units_by_name: dict[tuple[Path, str], list[TestUnit]] = {}
+        for filepath, test_file in test_files.items():
+            for unit in test_file.test_units:
+                units_by_name.setdefault((filepath, unit.function_name), []).append(
+                    unit
+                )
+
+        order: dict[TestUnit, int] = {}
+        filepaths: dict[str, Path] = {}
+        for nodeid in nodeids:
+            path, _, function_name = nodeid.partition("::")
+            if path not in filepaths:
+                filepaths[path] = Path(path).absolute()
+            test_file = test_files.get(filepaths[path])
+            if test_file is None:
+                continue
+            if function_name:
+                units = units_by_name.get((filepaths[path], function_name), [])
+            else:
+                units = test_file.test_units
+            for unit in units:
+                order.setdefault(unit, len(order))
+        return order
+
+    def _select_by_nodeids(self, nodeids: list[str]) -> None:
+        """Keep selected only the test units of the node ids, in the order of
+        the node ids. Test files run in the order of their first test unit."""
+
+        order = self._find_units(nodeids)
+        for test_file in self.test_files:
+            for unit in test_file.test_units:
+                unit.selected = unit.selected and unit in order
+            test_file.test_units.sort(key=lambda unit: order.get(unit, len(order)))
+
+        self.test_files.sort(
+            key=lambda test_file: min(
+                (order.get(unit, len(order)) for unit in test_file.test_units),
+                default=len(order),
+            )
         )
 
     def get_total_test_units(self, selected_only: bool = False) -> int:
@@ -104,31 +169,4 @@ class Collector:
         self, path: Path, norecursedirs: list[str]
     ) -> list[Path]:
         """Collect all python files in the given path."""
-
-        py_files = []
-
-        for file_path in path.glob("**/*.py"):
-            file_name = file_path.name
-
-            # Check if the file path matches any pattern in norecursedirs
-            skip_file = False
-            for pattern in norecursedirs:
-                if fnmatch.fnmatch(
-                    file_path.relative_to(path).as_posix(), pattern
-                ):
-                    skip_file = True
-                    break
-
-            if skip_file:
-                continue
-
-            if not "_test.py" in file_name or "test_" in file_name:
-                continue
-            if not file_path.is_file():
-                continue
-            if not file_name.endswith(".py"):
-                continue
-
-            py_files.append(file_path)
-
-        return py_files
+        return find_test_files(path, norecursedirs)
@@ -2,6 +2,14 @@ from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
+from bpytest_index import (
+    TestSelector,
+    display_path,
+    find_test_functions,
+    make_nodeid,
+)
+from bpytest_skip import OUTCOME_SKIPPED, OUTCOME_XFAILED, OUTCOME_XPASSED
+
 from .print_helper import BColors, bpyprint
 
 
@@ -32,18 +40,32 @@ class CollectorString:
 @dataclass
 class SessionInfo:
 
-    id: int
+    id: str
+    lane: str = "blender"
 
 class TestUnit:
 
     function_name: str
+    # Test identifier, with the file path relative to the current directory
+    nodeid: str
     success: bool
+    # passed, failed, skipped, xfailed or xpassed, see bpytest_skip
+    outcome: str
     test_filepath: Path
     result_lines: list[str]
     collector_string: CollectorString
     selected: bool
 
-    def __init__(self, test_filepath: Path, function_name: str):
+    def __init__(
+        self, test_filepath: Path, function_name: str, file_nodeid: str = ""
+    ):
+        """
+        Args:
+            test_filepath (Path): Path of the test file
+            function_name (str): Name of the test function
+            file_nodeid (str): Node id of the test file, computed once for
+                all the units of the file, from the file path if empty
+        """
 
         self.result_lines = []
         self.test_filepath = test_filepath
@@ -51,16 +73,33 @@ class TestUnit:
         self.collector_string = CollectorString(
             f"{self.test_filepath}::{self.function_name}"
         )
+        # Read for every selection and result, computed once
+        self.nodeid = (
+            f"{file_nodeid}::{self.function_name}"
+            if file_nodeid
+            else make_nodeid(self.test_filepath, self.function_name)
+        )
 
         self.selected = False
         self.success = False
+        self.outcome = ""
 
     def print_log(self):
-        for line in self.result_lines:
-            bpyprint(line)
+        for result in self.result_lines:
+            for line in result.splitlines():
+                bpyprint(line)
 
     def __repr__(self) -> str:
 
+        labels = {
+            OUTCOME_SKIPPED: "SKIPPED",
+            OUTCOME_XFAILED: "XFAIL",
+            OUTCOME_XPASSED: "XPASS",
+        }
+        if self.outcome in labels:
+            reason = f" ({self.result_lines[0]})" if self.result_lines else ""
+            return f'"{self.test_filepath}" {self.function_name} {BColors.WARNING.value} [{labels[self.outcome]}]{BColors.ENDC.value}{reason}'
+
         color = BColors.OKGREEN.value if self.success else BColors.FAIL.value
         return f'"{self.test_filepath}" {self.function_name} {color} {"[PASSED]" if self.success else "[FAILED]"}{BColors.ENDC.value}'
 
@@ -80,32 +119,28 @@ class TestFile:
         """# TODO: The test unit collection method should be by
         importlib.util"""
 
-        test_units = []
-
-        with open(self.filepath, "r", encoding="utf-8") as file:
-            lines = file.readlines()
-            for line in lines:
-                if not "def test_" in line:
-                    continue
-
-                function_name = line.split("def ")[1].split("(")[0]
-                test_units.append(TestUnit(self.filepath, function_name))
-
-        return test_units
+        file_nodeid = display_path(self.filepath)
+        return [
+            TestUnit(self.filepath, function_name, file_nodeid)
+            for function_name in find_test_functions(self.filepath)
+        ]
 
     def select_by_collector_string(
         self, filter_collector_string: CollectorString
     ) -> None:
         """Selects test units by collector string"""
 
+        # One stat of the collector string for every unit of the file
+        is_file = filter_collector_string.path.is_file()
+        is_dir = not is_file and filter_collector_string.path.is_dir()
         for unit in self.test_units:
-            if filter_collector_string.path.is_file():
+            if is_file:
                 if (
                     not filter_collector_string.path
                     == unit.collector_string.path
                 ):
                     continue
-            if filter_collector_string.path.is_dir():
+            if is_dir:
                 if not unit.collector_string.path.is_relative_to(
                     filter_collector_string.path
                 ):
@@ -119,9 +154,16 @@ class TestFile:
 
             unit.selected = True
 
-    def select_by_keyword(self, keyword: str) -> None:
-        """Selects test units by keyword"""
+    def select_by_selector(
+        self, selector: TestSelector, marks: dict[str, list[str]]
+    ) -> None:
+        """Deselects the test units not matching the -k and -m expressions
+
+        Args:
+            selector (TestSelector): Compiled selection expressions
+            marks (dict[str, list[str]]): Mark names of each test function
+        """
 
         for unit in self.test_units:
-            if not keyword in unit.function_name:
+            if not selector.matches(unit.nodeid, marks.get(unit.function_name, [])):
                 unit.selected = False
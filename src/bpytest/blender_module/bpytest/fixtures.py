@@ -1,6 +1,7 @@
 # fixtures.py
 
 import functools
+import importlib
 import inspect
 from dataclasses import dataclass, field
 from enum import Enum, auto
@@ -8,6 +9,8 @@ from pathlib import Path
 from typing import Any, Callable, Generator
 
 from bpytest_config import BpyTestConfig
+from bpytest_metrics import metrics
+from bpytrace import tracer
 
 from .entity import SessionInfo
 
@@ -43,23 +46,29 @@ def call_fixture_func(
     if inspect.isgeneratorfunction(fixturefunc):
 
         generator = fixturefunc(**kwargs)
+        phase = f"fixture_setup:{request.fixturename}"
         try:
-            fixture_result = next(generator)
+            with tracer.span(phase), metrics.timer(phase):
+                fixture_result = next(generator)
         except StopIteration:
             raise ValueError(
                 f"{request.fixturename} did not yield a value"
             ) from None
         finalizer = functools.partial(
-            _teardown_yield_fixture, fixturefunc, generator
+            _teardown_yield_fixture, fixturefunc, generator, request.fixturename
         )
     else:
-        fixture_result = fixturefunc(**kwargs)
+        phase = f"fixture_setup:{request.fixturename}"
+        with tracer.span(phase), metrics.timer(phase):
+            fixture_result = fixturefunc(**kwargs)
 
     return fixture_result, finalizer
 
 
 def _teardown_yield_fixture(
-    fixturefunc: FixtureFunction, it: Generator[FixtureValue, None, None]
+    fixturefunc: FixtureFunction,
+    it: Generator[FixtureValue, None, None],
+    fixturename: str,
 ) -> None:
     """Execute the teardown of a fixture function by advancing the iterator
     after the yield and ensure the iteration ends (if not it means there is
@@ -67,8 +76,10 @@ def _teardown_yield_fixture(
 
     # Note: Based on pytest's implementation
     """
+    phase = f"fixture_teardown:{fixturename}"
     try:
-        next(it)
+        with tracer.span(phase), metrics.timer(phase):
+            next(it)
     except StopIteration:
         pass
     else:
@@ -90,7 +101,7 @@ def inspect_func_for_fixtures(
         # when creating the wrapped fixture
         if arg_name == "request":
             continue
-        if not arg_name in fixture_manager.fixtures:
+        if not fixture_manager.has_fixture(arg_name):
             continue
 
         fixture_request = FixtureRequest(
@@ -178,13 +189,31 @@ class FixtureManager:
 
     def __init__(self):
         self.fixtures = {}
+        # Modules defining a fixture, imported the first time it is requested
+        self._lazy_fixtures: dict[str, str] = {}
+
+    def register_lazy_fixtures(self, module_name: str, names: tuple[str, ...]):
+        """Register the fixtures of a module that is imported the first time
+        one of them is requested, instead of when the session starts."""
+
+        for name in names:
+            self._lazy_fixtures[name] = module_name
+
+    def has_fixture(self, name: str) -> bool:
+        """If a fixture is registered, importing the module of a lazy
+        fixture the first time."""
+
+        if name not in self.fixtures and name in self._lazy_fixtures:
+            importlib.import_module(self._lazy_fixtures.pop(name))
+        return name in self.fixtures
 
     def register_fixture(self, fixture: Fixture):
-        """Register a fixture function."""
+        """Register a fixture function. A fixture registered again by
+        the same module (e.g. a reloaded conftest file) is replaced."""
 
-        for i in self.fixtures:
-            if i == fixture.name:
-                return
+        registered = self.fixtures.get(fixture.name)
+        if registered is not None and registered.module_path != fixture.module_path:
+            return
         self.fixtures[fixture.name] = fixture
 
     def _create_wrapped_fixture(
@@ -193,11 +222,9 @@ class FixtureManager:
         """Create a fixture function with request argument injected."""
         original_params = inspect.signature(original_func).parameters
         if "request" in original_params:
-            # If the original function doesn't have a 'request' parameter, add it dynamically
-            def wrapper(*args: Any, **kwargs: Any):
-                return original_func(*args, **kwargs, request=request)
-
-            return wrapper
+            # Inject the request argument, a partial keeps generator
+            # fixtures (with a teardown) detectable by call_fixture_func
+            return functools.partial(original_func, request=request)
         else:
             return original_func
 
@@ -215,7 +242,7 @@ class FixtureManager:
             tuple[FixtureValue, FixtureTeardown | None]: The fixture function and the teardown function.
         """
 
-        if name not in self.fixtures:
+        if not self.has_fixture(name):
             raise ValueError(f"Fixture '{name}' not registered.")
 
         fixture: Fixture = self.fixtures[name]
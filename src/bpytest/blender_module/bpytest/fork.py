@@ -0,0 +1,104 @@
+"""Process isolation of the tests by forking the prepared test session.
+
+The test session process is started, enables the addons of every test and
+imports the conftest files once, then forks a child process for each test
+(or each test file). The child runs the tests and sends their results back
+through a pipe, so the changes of the tests to the Blender state (and their
+crashes) never reach the session process, without starting Blender or
+resetting it to the factory settings for each test.
+
+Only available on Linux, where Blender can be forked safely.
+"""
+
+import json
+import os
+import signal
+import sys
+import traceback
+from typing import Any, Callable, Iterator, NoReturn
+
+# Values of the isolate setting
+ISOLATE_NONE = "none"
+ISOLATE_FORK = "fork"
+ISOLATE_FORK_MODULE = "fork-module"
+
+SendResult = Callable[[dict[str, Any]], None]
+
+
+def fork_supported() -> bool:
+    """If the tests can run in forked processes on this platform"""
+    return sys.platform.startswith("linux") and hasattr(os, "fork")
+
+
+def _run_child(target: Callable[[SendResult], None], write_fd: int) -> NoReturn:
+    """Run the target in the forked process and exit, without running the
+    exit handlers of the session process"""
+
+    exit_code = 0
+    try:
+        with os.fdopen(write_fd, "w", encoding="utf-8") as results:
+
+            def send(result: dict[str, Any]) -> None:
+                results.write(json.dumps(result) + "\n")
+                results.flush()
+
+            target(send)
+    except BaseException:  # pylint: disable=broad-exception-caught
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)  # pylint: disable=protected-access
+
+
+class ForkedProcess:
+    """Child process forked from the test session, running target with a
+    function sending json results to the session process
+
+    Args:
+        target (Callable[[SendResult], None]): Function run by the child process
+    """
+
+    def __init__(self, target: Callable[[SendResult], None]):
+        # Buffered output would be written by both processes
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        read_fd, write_fd = os.pipe()
+        self._pid = os.fork()
+        if self._pid == 0:
+            os.close(read_fd)
+            _run_child(target, write_fd)
+
+        os.close(write_fd)
+        self._read_fd = read_fd
+
+    def results(self) -> Iterator[dict[str, Any]]:
+        """Results sent by the child process, as they arrive, until it exits"""
+
+        with os.fdopen(self._read_fd, "r", encoding="utf-8") as results:
+            for line in results:
+                if line.strip():
+                    yield json.loads(line)
+
+    def wait(self) -> str:
+        """Wait for the child process to exit
+
+        Returns:
+            str: How the process ended abnormally, e.g. "was killed by signal
+                SIGSEGV", empty if it exited successfully
+        """
+
+        _, status = os.waitpid(self._pid, 0)
+        if os.WIFSIGNALED(status):
+            signal_number = os.WTERMSIG(status)
+            try:
+                name = signal.Signals(signal_number).name
+            except ValueError:
+                name = str(signal_number)
+            return f"was killed by signal {name}"
+        exit_code = os.waitstatus_to_exitcode(status)
+        return f"exited with code {exit_code}" if exit_code else ""
@@ -0,0 +1,208 @@
+"""Geometry comparison of meshes, curves and point clouds.
+
+Attribute data is read in bulk with foreach_get into NumPy arrays and
+compared with allclose style tolerances (see bpytest_compare). Golden
+geometry is stored as compressed .npz snapshots, one array per attribute,
+in the "golden" directory next to the test file, written (or replaced) when
+the session runs with --update-golden.
+
+Example:
+
+    def test_subdivide(assert_geometry_matches):
+        bpy.ops.mesh.subdivide()
+        assert_geometry_matches(bpy.context.object.data, "subdivided", ["position"])
+"""
+
+import inspect
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+from bpytest_compare import compare_arrays
+
+from .fixtures import FixtureRequest, fixture
+from .image import GOLDEN_DIR
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# foreach_get key, number of components and NumPy type of every attribute data type
+ATTRIBUTE_TYPES: dict[str, tuple[str, int, str]] = {
+    "FLOAT": ("value", 1, "float32"),
+    "INT": ("value", 1, "int32"),
+    "INT8": ("value", 1, "int8"),
+    "BOOLEAN": ("value", 1, "bool"),
+    "FLOAT2": ("vector", 2, "float32"),
+    "INT32_2D": ("value", 2, "int32"),
+    "FLOAT_VECTOR": ("vector", 3, "float32"),
+    "FLOAT_COLOR": ("color", 4, "float32"),
+    "BYTE_COLOR": ("color", 4, "float32"),
+    "QUATERNION": ("value", 4, "float32"),
+    "FLOAT4X4": ("value", 16, "float32"),
+}
+
+# Mesh data read as an attribute, not stored in the generic attributes
+VERTEX_NORMAL = "normal"
+
+
+def _read_collection(
+    collection: Any, key: str, components: int, dtype: str
+) -> "np.ndarray":
+    """Property of every item of a bpy collection, with a single foreach_get"""
+    import numpy as np
+
+    array = np.empty(len(collection) * components, dtype=dtype)
+    collection.foreach_get(key, array)
+    return array.reshape(len(collection), components) if components > 1 else array
+
+
+def read_attribute(data: Any, name: str) -> "np.ndarray":
+    """Values of an attribute of a mesh, curves or point cloud data-block,
+    one row per element of the attribute domain
+
+    Args:
+        data (Any): bpy.types.Mesh, bpy.types.Curves or bpy.types.PointCloud
+        name (str): Attribute name (e.g. "position", "UVMap", "radius"), or
+            "normal" for the vertex normals of a mesh
+    """
+
+    if name == VERTEX_NORMAL and name not in data.attributes:
+        # Blender 4.1+ exposes the normals as mesh.vertex_normals
+        normals = getattr(data, "vertex_normals", None)
+        if normals is not None:
+            return _read_collection(normals, "vector", 3, "float32")
+        return _read_collection(data.vertices, "normal", 3, "float32")
+
+    attribute = data.attributes.get(name)
+    if attribute is None:
+        raise KeyError(f"{data.name} has no attribute {name!r}")
+    if attribute.data_type not in ATTRIBUTE_TYPES:
+        raise TypeError(
+            f"Attribute {name!r} of type {attribute.data_type} can not be compared"
+        )
+
+    key, components, dtype = ATTRIBUTE_TYPES[attribute.data_type]
+    return _read_collection(attribute.data, key, components, dtype)
+
+
+def read_geometry(data: Any, names: Sequence[str] | None = None) -> "dict[str, np.ndarray]":
+    """Values of the attributes of a data-block, by name. By default every
+    attribute with a supported type, except the internal ones (starting with '.')"""
+
+    if names is None:
+        names = [
+            attribute.name
+            for attribute in data.attributes
+            if not attribute.name.startswith(".")
+            and attribute.data_type in ATTRIBUTE_TYPES
+        ]
+    return {name: read_attribute(data, name) for name in names}
+
+
+def assert_arrays_close(
+    actual: "np.ndarray",
+    expected: "np.ndarray",
+    rtol: float = 1e-5,
+    atol: float = 1e-6,
+    ignore_order: bool = False,
+    max_report: int = 10,
+    name: str = "array",
+) -> None:
+    """Assert that two arrays are equal within the tolerances, reporting
+    the first max_report mismatching elements (see compare_arrays)"""
+
+    if actual.shape != expected.shape:
+        raise AssertionError(
+            f"{name} has the shape {actual.shape}, expected {expected.shape}"
+        )
+    comparison = compare_arrays(
+        actual, expected, rtol, atol, ignore_order, max_report
+    )
+    if not comparison.matches:
+        raise AssertionError(f"{name} differs: {comparison}")
+
+
+class GeometryMatcher:
+    """Compares geometry with the golden snapshots of a test, see assert_geometry_matches"""
+
+    def __init__(self, golden_dir: Path, update_golden: bool):
+        self._golden_dir = golden_dir
+        self._update_golden = update_golden
+
+    def __call__(
+        self,
+        data: Any,
+        golden_name: str,
+        names: Sequence[str] | None = None,
+        rtol: float = 1e-5,
+        atol: float = 1e-6,
+        ignore_order: bool = False,
+        max_report: int = 10,
+    ) -> None:
+        """Assert that the attributes of a data-block match its golden snapshot
+
+        Args:
+            data (Any): bpy.types.Mesh, bpy.types.Curves, bpy.types.PointCloud,
+                or a dictionary of arrays by attribute name
+            golden_name (str): Name of the snapshot, stored as <golden_name>.npz
+            names (Sequence[str] | None): Compared attributes, by default every
+                attribute of the snapshot (or of the data when it is written)
+            rtol (float): Relative tolerance
+            atol (float): Absolute tolerance
+            ignore_order (bool): Sort the elements of every attribute before
+                comparing them, for operators without a stable element order
+            max_report (int): Number of mismatching elements reported by attribute
+        """
+        import numpy as np
+
+        golden_path = self._golden_dir / f"{golden_name}.npz"
+
+        if self._update_golden:
+            arrays = data if isinstance(data, dict) else read_geometry(data, names)
+            golden_path.parent.mkdir(parents=True, exist_ok=True)
+            # False positive: the arrays are keyword arguments, pyright also
+            # checks them against the allow_pickle parameter
+            np.savez_compressed(golden_path, **arrays)  # type: ignore[arg-type]
+            return
+
+        if not golden_path.is_file():
+            raise AssertionError(
+                f"Golden geometry {golden_path} does not exist, "
+                "run with --update-golden to create it"
+            )
+
+        with np.load(golden_path) as snapshot:
+            expected = {name: snapshot[name] for name in names or snapshot.files}
+
+        failures = []
+        for name, expected_array in expected.items():
+            try:
+                actual_array = (
+                    np.asarray(data[name])
+                    if isinstance(data, dict)
+                    else read_attribute(data, name)
+                )
+                assert_arrays_close(
+                    actual_array,
+                    expected_array,
+                    rtol,
+                    atol,
+                    ignore_order,
+                    max_report,
+                    name=f"Attribute {name!r}",
+                )
+            except (AssertionError, KeyError) as error:
+                failures.append(str(error).strip("'\""))
+
+        if failures:
+            raise AssertionError(
+                f"Geometry does not match {golden_path.name}:\n" + "\n".join(failures)
+            )
+
+
+@fixture
+def assert_geometry_matches(request: FixtureRequest) -> GeometryMatcher:
+    """Fixture comparing geometry with the golden snapshots of the test,
+    stored in the golden directory next to the test file."""
+
+    golden_dir = Path(inspect.getfile(request.func)).parent / GOLDEN_DIR
+    return GeometryMatcher(golden_dir, request.config.update_golden)
@@ -0,0 +1,208 @@
+"""Golden image comparison of renders and baked textures.
+
+Pixels are read in bulk with Image.pixels.foreach_get into float32 NumPy
+arrays and compared with vectorized operations (see bpytest_compare).
+Golden images are stored in a "golden" directory next to the test file,
+and written (or replaced) when the session runs with --update-golden.
+
+The pixels of the "Render Result" image can not be read, a render is saved
+to a file with save_render and the file is compared.
+
+Example:
+
+    def test_render(assert_image_matches, tmp_path):
+        bpy.ops.render.render()
+        render_path = tmp_path / "render.png"
+        bpy.data.images["Render Result"].save_render(render_path.as_posix())
+        assert_image_matches(render_path, "render.png")
+"""
+
+import inspect
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+from bpytest_compare import compare_images, difference_heatmap
+
+from .fixtures import FixtureRequest, fixture
+from .tmpdir import TempPathFactory
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Directory of the golden images, next to the test file
+GOLDEN_DIR = "golden"
+
+# Blender file format of the golden images, by file extension
+FILE_FORMATS = {
+    ".png": "PNG",
+    ".exr": "OPEN_EXR",
+    ".tif": "TIFF",
+    ".tiff": "TIFF",
+}
+
+
+def image_to_array(image: Any) -> "np.ndarray":
+    """Pixels of a bpy.types.Image as a (height, width, channels) float32 array,
+    the first row is the bottom of the image"""
+    import numpy as np
+
+    width, height = image.size
+    pixels = np.empty(width * height * image.channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(height, width, image.channels)
+
+
+def load_image_array(filepath: Path) -> "np.ndarray":
+    """Read an image file (any format supported by Blender) into an array"""
+    import bpy
+
+    image = bpy.data.images.load(filepath.as_posix(), check_existing=False)
+    try:
+        return image_to_array(image)
+    finally:
+        bpy.data.images.remove(image)
+
+
+def save_image_array(array: "np.ndarray", filepath: Path) -> None:
+    """Write a (height, width, channels) array to an image file, the
+    format is given by the file extension"""
+    import bpy
+    import numpy as np
+
+    file_format = FILE_FORMATS.get(filepath.suffix.lower())
+    if file_format is None:
+        raise ValueError(
+            f"Unsupported image extension {filepath.suffix!r}, "
+            f"use one of {', '.join(FILE_FORMATS)}"
+        )
+
+    height, width, channels = array.shape
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[..., : min(channels, 3)] = array[..., : min(channels, 3)]
+    if channels == 1:
+        rgba[..., 1:3] = array[..., :1]
+    if channels == 4:
+        rgba[..., 3] = array[..., 3]
+
+    image = bpy.data.images.new(
+        filepath.stem,
+        width,
+        height,
+        alpha=True,
+        float_buffer=file_format == "OPEN_EXR",
+    )
+    try:
+        image.pixels.foreach_set(rgba.ravel())
+        image.filepath_raw = filepath.as_posix()
+        image.file_format = file_format
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        image.save()
+    finally:
+        bpy.data.images.remove(image)
+
+
+def _as_array(image: Any) -> "np.ndarray":
+    """Array of a bpy image, an image file path or an array"""
+    import numpy as np
+
+    if isinstance(image, np.ndarray):
+        return image if image.ndim == 3 else image[..., np.newaxis]
+    if isinstance(image, (str, Path)):
+        return load_image_array(Path(image))
+    return image_to_array(image)
+
+
+class ImageMatcher:
+    """Compares images with the golden images of a test, see assert_image_matches"""
+
+    def __init__(
+        self,
+        golden_dir: Path,
+        test_name: str,
+        tmp_path_factory: TempPathFactory,
+        update_golden: bool,
+    ):
+        self._golden_dir = golden_dir
+        self._test_name = test_name
+        self._tmp_path_factory = tmp_path_factory
+        self._update_golden = update_golden
+
+    def __call__(
+        self,
+        image: Any,
+        golden_name: str,
+        tolerance: float | Sequence[float] = 1 / 255,
+        max_mismatch_fraction: float = 0.0,
+        min_psnr: float | None = None,
+        min_ssim: float | None = None,
+    ) -> None:
+        """Assert that an image matches its golden image
+
+        Args:
+            image (Any): bpy.types.Image, image file path or (height, width,
+                channels) array with values in [0, 1]
+            golden_name (str): File name of the golden image, its extension
+                is the stored format (.png, .exr, .tif)
+            tolerance (float | Sequence[float]): Maximum absolute difference of
+                a channel, for all the channels or one per channel
+            max_mismatch_fraction (float): Fraction of the pixels allowed to
+                differ more than the tolerance
+            min_psnr (float | None): Minimum peak signal to noise ratio, in dB
+            min_ssim (float | None): Minimum structural similarity (perceptual
+                threshold), 1.0 for identical images
+        """
+
+        actual = _as_array(image)
+        golden_path = self._golden_dir / golden_name
+
+        if self._update_golden:
+            save_image_array(actual, golden_path)
+            return
+
+        if not golden_path.is_file():
+            raise AssertionError(
+                f"Golden image {golden_path} does not exist, "
+                "run with --update-golden to create it"
+            )
+
+        expected = load_image_array(golden_path)
+        # Golden files are stored with 4 channels
+        if expected.shape[2] != actual.shape[2]:
+            expected = expected[..., : actual.shape[2]]
+
+        if expected.shape != actual.shape:
+            raise AssertionError(
+                f"Image {golden_name} has the shape {actual.shape}, "
+                f"the golden image has {expected.shape}"
+            )
+
+        comparison = compare_images(actual, expected, tolerance)
+        failures = comparison.failures(max_mismatch_fraction, min_psnr, min_ssim)
+        if not failures:
+            return
+
+        diff_dir = self._tmp_path_factory.mktemp(self._test_name)
+        stem = Path(golden_name).stem
+        save_image_array(actual, diff_dir / f"{stem}-actual.png")
+        save_image_array(expected, diff_dir / f"{stem}-expected.png")
+        save_image_array(
+            difference_heatmap(actual, expected), diff_dir / f"{stem}-diff.png"
+        )
+        raise AssertionError(
+            f"Image {golden_name} does not match its golden image ({comparison}):\n"
+            + "\n".join(f"  {failure}" for failure in failures)
+            + f"\nActual, expected and difference images written to {diff_dir}"
+        )
+
+
+@fixture
+def assert_image_matches(
+    tmp_path_factory: TempPathFactory, request: FixtureRequest
+) -> ImageMatcher:
+    """Fixture comparing images with the golden images of the test,
+    stored in the golden directory next to the test file."""
+
+    golden_dir = Path(inspect.getfile(request.func)).parent / GOLDEN_DIR
+    return ImageMatcher(
+        golden_dir, request.name, tmp_path_factory, request.config.update_golden
+    )
@@ -0,0 +1,130 @@
+"""Selects the process (lane) where each test runs.
+
+With the host_lane option, the tests that do not need bpy run in the host
+python interpreter (host lane) while the remaining tests run in Blender
+(blender lane). A test needs bpy if its module or a conftest file imports
+it, or if its fixture closure includes a framework fixture reading or writing
+Blender data (e.g. blend_file). Both lanes collect the same tests and use the
+same LaneSelector, each one keeping only the tests of its own lane.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from bpytest_config import BpyTestConfig
+from bpytest_version import BLENDER_MARK
+
+from .entity import TestUnit
+
+if TYPE_CHECKING:
+    from bpytest_ast import StaticFixture, StaticMark
+
+BLENDER_LANE = "blender"
+HOST_LANE = "host"
+
+# Mark forcing a test to run in the host lane
+NO_BPY_MARK = "no_bpy"
+
+# Framework fixtures using bpy, the tests requesting them (directly or through
+# other fixtures) run in Blender
+BLENDER_FIXTURES = frozenset(
+    (
+        "assert_image_matches",
+        "assert_scene_matches",
+        "blend_file",
+        "blend_library_cache",
+    )
+)
+
+
+class LaneSelector:
+    """Decides if a test unit can run in the host python interpreter"""
+
+    def __init__(self, config: BpyTestConfig):
+        # Imported only when the host lane is used
+        from bpytest_ast import ImportGraph
+
+        self._root = Path(config.pythonpath).absolute()
+        self._import_graph = ImportGraph(
+            [self._root] + [Path(path) for path in config.include]
+        )
+        self._marks: dict[Path, dict[str, list["StaticMark"]]] = {}
+        self._fixture_names: dict[Path, dict[str, list[str]]] = {}
+        self._definitions: dict[Path, dict[str, "StaticFixture"]] = {}
+
+    def conftest_requires_blender(self, conftest_file: Path) -> bool:
+        """Check if the conftest file can only be imported inside Blender"""
+        return self._import_graph.requires_blender(conftest_file)
+
+    def _conftest_files(self, test_filepath: Path) -> list[Path]:
+        """conftest.py files applying to a test file, from its directory up to the root"""
+
+        conftest_files = []
+        directory = test_filepath.absolute().parent
+        while True:
+            conftest_file = directory / "conftest.py"
+            if conftest_file.is_file():
+                conftest_files.append(conftest_file)
+            if directory == self._root or directory == directory.parent:
+                break
+            directory = directory.parent
+        return conftest_files
+
+    def _read_static_info(self, filepath: Path) -> None:
+        """Read the marks and requested fixtures of the tests of a file once"""
+
+        from bpytest_index import read_static_info
+
+        if filepath not in self._marks:
+            self._marks[filepath], self._fixture_names[filepath] = read_static_info(
+                filepath
+            )
+
+    def _marks_of(self, test_unit: TestUnit) -> list["StaticMark"]:
+        """Marks of the test unit, including its module marks"""
+
+        self._read_static_info(test_unit.test_filepath)
+        return self._marks[test_unit.test_filepath].get(test_unit.function_name, [])
+
+    def _fixture_definitions(self, filepath: Path) -> dict[str, "StaticFixture"]:
+        """Fixtures defined in a file, empty if it can not be parsed"""
+
+        from bpytest_order import read_fixture_definitions
+
+        if filepath not in self._definitions:
+            self._definitions[filepath] = read_fixture_definitions([filepath])
+        return self._definitions[filepath]
+
+    def requires_blender_fixtures(self, test_unit: TestUnit) -> bool:
+        """Check if the fixture closure of the test unit includes a framework
+        fixture using bpy"""
+
+        from bpytest_order import fixture_closure
+
+        filepath = test_unit.test_filepath
+        self._read_static_info(filepath)
+        definitions: dict[str, "StaticFixture"] = {}
+        # Fixtures of the nearest conftest file, then of the test file, win
+        for conftest_file in reversed(self._conftest_files(filepath)):
+            definitions.update(self._fixture_definitions(conftest_file))
+        definitions.update(self._fixture_definitions(filepath))
+        names = self._fixture_names[filepath].get(test_unit.function_name, [])
+        return not BLENDER_FIXTURES.isdisjoint(fixture_closure(names, definitions))
+
+    def runs_on_host(self, test_unit: TestUnit) -> bool:
+        """Check if the test unit runs in the host lane"""
+
+        if any(
+            self.conftest_requires_blender(conftest_file)
+            for conftest_file in self._conftest_files(test_unit.test_filepath)
+        ):
+            return False
+        marks = [mark.name for mark in self._marks_of(test_unit)]
+        # Tests of some Blender versions run with those versions
+        if BLENDER_MARK in marks:
+            return False
+        if self.requires_blender_fixtures(test_unit):
+            return False
+        if NO_BPY_MARK in marks:
+            return True
+        return not self._import_graph.requires_blender(test_unit.test_filepath)
@@ -1,23 +1,90 @@
 import importlib.util
+import os
+import platform
+import sys
 import time
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
 
-from bpytest_config import BpyTestConfig
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
 
-from .collector import Collector, collect_conftest_files
-from .entity import CollectorString, SessionInfo, TestUnit
+from bpyprint import bpyevent
+from bpytest_addons import AddonState, read_directory_marks, required_addons
+from bpytest_ast import StaticMark, extract_marks
+from bpytest_config import BpyTestConfig
+from bpytest_coverage import LineCollector
+from bpytest_index import IGNORE_DIRS, find_conftest_files
+from bpytest_metrics import metrics
+from bpytest_render import uses_render_profile
+from bpytest_skip import (
+    OUTCOME_FAILED,
+    OUTCOME_PASSED,
+    OUTCOME_SKIPPED,
+    OUTCOME_XFAILED,
+    OUTCOME_XPASSED,
+    ConditionEvaluator,
+    UndecidedCondition,
+    apply_xfail,
+    expected_failure,
+    skip_reason,
+)
+from bpytrace import tracer
+
+from .collector import Collector
+from .entity import CollectorString, SessionInfo, TestFile, TestUnit
 from .fixtures import Scope, fixture_manager
+from .fork import (
+    ISOLATE_FORK,
+    ISOLATE_FORK_MODULE,
+    ISOLATE_NONE,
+    ForkedProcess,
+    SendResult,
+    fork_supported,
+)
+from .lane import HOST_LANE, LaneSelector
 from .print_helper import BColors, bpyprint, print_failed, print_header
-from .runner import TestRunner
+from .render import RenderProfile
+from .runner import TestRunner, apply_addons
 from .types import ExitCode
 
+if TYPE_CHECKING:
+    from .capture import OutputCapture
+
+T = TypeVar("T")
+
+
+def _read_marks(filepath: Path) -> dict[str, list[StaticMark]]:
+    """Marks of the test functions of a file, empty if it can not be parsed"""
+
+    try:
+        return extract_marks(filepath)
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return {}
+
+
+def _condition_error(test_unit: TestUnit, error: Exception) -> dict[str, Any]:
+    """Failed result of a test unit whose skipif or xfail condition can not
+    be evaluated"""
+    return {
+        "nodeid": test_unit.nodeid,
+        "success": False,
+        "outcome": OUTCOME_FAILED,
+        "duration": 0.0,
+        "setup_duration": 0.0,
+        "result_lines": [f"Error evaluating the condition of a mark: {error!r}"],
+    }
+
 
 class TestManager:
-    """Manages the complete test session"""
+    """Manages the complete test session
+
+    Results are reported as events as soon as each test finishes, only the
+    failed tests are kept until the end of the session to print their logs.
+    """
 
     _collector_string: CollectorString
     _collector: Collector
-    _finished_tests_list: list[TestUnit]
+    _failed_tests_list: list[TestUnit]
 
     _failed: int
     _success: int
@@ -29,12 +96,30 @@ class TestManager:
         bpytest_config: BpyTestConfig,
         session_info: SessionInfo,
         collector: Collector,
+        lane_selector: LaneSelector | None = None,
     ):
 
-        self._finished_tests_list = []
+        self._failed_tests_list = []
+        self._failed = 0
+        self._success = 0
+        # Tests by outcome, e.g. skipped or xfailed
+        self._outcomes: dict[str, int] = {}
         self._collector = collector
         self._bpytest_config = bpytest_config
         self._session_info = session_info
+        self._lane_selector = lane_selector
+        self._instance_id = ""
+        # Addons marks of the conftest files, by directory
+        self._directory_marks: dict[Path, list[StaticMark]] = {}
+        # Lines executed by the session, with the cov setting
+        self._coverage: LineCollector | None = None
+        # Render settings overridden for the tests, with the render setting
+        self._render_profile: RenderProfile | None = None
+        self._first_test = True
+        # Conditions of the skipif and xfail marks, evaluated once per session
+        self._conditions: ConditionEvaluator | None = None
+        # Conditions using the globals of a test module, by test file
+        self._module_conditions: dict[Path, ConditionEvaluator] = {}
 
     @property
     def bpytest_config(self) -> BpyTestConfig:
@@ -55,21 +140,16 @@ class TestManager:
     def _compute_result(self):
         """Computes the result of the test session"""
 
-        self._failed = 0
-        self._success = 0
-
-        for test in self._finished_tests_list:
-            if not test.success:
-                self._failed += 1
-            if test.success:
-                self._success += 1
-
-        for test in self._finished_tests_list:
-            if not test.success:
-                bpyprint(test)
+        for test in self._failed_tests_list:
+            bpyprint(test)
 
         print_color = BColors.FAIL if self._failed else BColors.OKGREEN
-        center_text = f"Failed: {self._failed} Success: {self._success} in {self._total_time:.2f} seconds"
+        outcomes = "".join(
+            f" {outcome.capitalize()}: {count}"
+            for outcome, count in self._outcomes.items()
+            if outcome not in (OUTCOME_PASSED, OUTCOME_FAILED)
+        )
+        center_text = f"Failed: {self._failed} Success: {self._success}{outcomes} in {self._total_time:.2f} seconds"
 
         print_header(center_text, print_color)
 
@@ -84,10 +164,20 @@ class TestManager:
     def _register_conftest_files(self):
         """Registers the fixtures from conftest files"""
 
-        conftest_files = collect_conftest_files(
-            self.bpytest_config.pythonpath, self.bpytest_config.norecursedirs
+        conftest_files = find_conftest_files(
+            Path(self.bpytest_config.pythonpath),
+            self.bpytest_config.norecursedirs + IGNORE_DIRS,
         )
+        self._directory_marks = read_directory_marks(conftest_files)
         for file in conftest_files:
+            # conftest files that need bpy can not be imported in the host lane,
+            # the tests depending on them run in the blender lane
+            if (
+                self._session_info.lane == HOST_LANE
+                and self._lane_selector is not None
+                and self._lane_selector.conftest_requires_blender(file)
+            ):
+                continue
             spec = importlib.util.spec_from_file_location(file.stem, file)
             test_file = importlib.util.module_from_spec(spec)  # type:ignore
             spec.loader.exec_module(test_file)  # type:ignore
@@ -98,53 +188,466 @@ class TestManager:
             if fixture.scope == Scope.SESSION:
                 if fixture.session_teardown is not None:
                     fixture.session_teardown()
+                # Created again if the process runs another session (watch mode)
+                fixture.is_session_value_stored = False
+                fixture.session_value = None
+                fixture.session_teardown = None
 
     def _finalize_module_fixtures(self, test_file: Path):
 
         for fixture in fixture_manager.fixtures.values():
             if fixture.scope == Scope.MODULE:
-                for module in fixture.module_values.values():
+                for module in list(fixture.module_values.values()):
                     if module.module == test_file:
                         if module.module_teardown is not None:
                             module.module_teardown()
+                        del fixture.module_values[module.module]
 
     def _run_tests(self, collector: Collector):
         """Runs the tests in the collector"""
 
         self._start_time()
-        self._register_conftest_files()
+        # Started before the conftest files, that usually import the package
+        if self._bpytest_config.cov:
+            self._coverage = LineCollector(self._bpytest_config.cov)
+            self._coverage.start()
+
+        try:
+            self._run_session(collector)
+        finally:
+            if self._coverage is not None:
+                self._coverage.stop()
+                self._send_coverage(self._coverage)
+                self._coverage = None
 
-        for test_file in collector.test_files:
-            for test_unit in test_file.test_units:
+        self._end_time()
 
-                if not test_unit.selected:
-                    continue
+    def _run_session(self, collector: Collector):
+        """Registers the conftest files and runs the tests in the collector"""
 
-                test_process = TestRunner(
-                    test_unit=test_unit,
-                    bpytest_config=self._bpytest_config,
-                    session_info=self._session_info,
+        with tracer.span("conftest"), metrics.timer("conftest"):
+            self._register_conftest_files()
+
+        capture: "OutputCapture | None" = None
+        if not self._bpytest_config.nocapture:
+            from .capture import OutputCapture
+
+            capture = OutputCapture(self._bpytest_config.capture_max_bytes)
+            capture.start_session()
+
+        # Tests running in the host lane do not render
+        if self._bpytest_config.render and self._session_info.lane != HOST_LANE:
+            self._render_profile = RenderProfile(self._bpytest_config.render)
+            self._render_profile.register()
+
+        try:
+            self._run_test_files(collector, capture)
+        finally:
+            if capture is not None:
+                capture.end_session()
+            if self._render_profile is not None:
+                self._render_profile.unregister()
+                self._send_render_profile()
+                self._render_profile = None
+            self._send_startup_trace()
+
+        self._finalize_session_fixtures()
+
+    def _condition_evaluator(self) -> ConditionEvaluator:
+        """Evaluator of the skipif and xfail conditions of the session, with
+        bpy in the blender lane"""
+
+        if self._conditions is None:
+            namespace = {"os": os, "sys": sys, "platform": platform}
+            if self._session_info.lane != HOST_LANE:
+                import bpy
+
+                namespace["bpy"] = bpy
+            self._conditions = ConditionEvaluator(namespace)
+        return self._conditions
+
+    def _module_evaluator(self, filepath: Path) -> ConditionEvaluator:
+        """Evaluator of the conditions using the globals of a test module,
+        imported once per session for its conditions"""
+
+        if filepath not in self._module_conditions:
+            if str(self._bpytest_config.pythonpath) not in sys.path:
+                sys.path.append(str(self._bpytest_config.pythonpath))
+            spec = importlib.util.spec_from_file_location(filepath.stem, filepath)
+            module = importlib.util.module_from_spec(spec)  # type:ignore
+            spec.loader.exec_module(module)  # type:ignore
+            session_namespace = self._condition_evaluator().namespace
+            self._module_conditions[filepath] = ConditionEvaluator(
+                {**session_namespace, **vars(module)}
+            )
+        return self._module_conditions[filepath]
+
+    def _evaluate_marks(
+        self,
+        test_unit: TestUnit,
+        evaluate: Callable[[ConditionEvaluator], T],
+    ) -> T:
+        """Evaluate the marks of a test unit with the names of the session,
+        or with the globals of its module if the session can not decide a
+        condition, like pytest
+
+        Raises:
+            Exception: Raised by the import of the module or by a condition
+        """
+
+        try:
+            return evaluate(self._condition_evaluator())
+        except UndecidedCondition:
+            return evaluate(self._module_evaluator(test_unit.test_filepath))
+
+    def _skipped_result(
+        self, test_unit: TestUnit, file_marks: dict[str, list[StaticMark]]
+    ) -> dict[str, Any] | None:
+        """Result of a skipped test unit, without resetting the session (nor
+        importing its module, unless a condition uses its globals), None if
+        the test unit runs"""
+
+        marks = file_marks.get(test_unit.function_name, [])
+        try:
+            reason = self._evaluate_marks(
+                test_unit, lambda evaluator: skip_reason(marks, evaluator)
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return _condition_error(test_unit, exc)
+        if reason is None:
+            return None
+        return {
+            "nodeid": test_unit.nodeid,
+            "success": True,
+            "outcome": OUTCOME_SKIPPED,
+            "duration": 0.0,
+            "setup_duration": 0.0,
+            "result_lines": [reason],
+        }
+
+    def _send_coverage(self, coverage: LineCollector):
+        """Sends the lines executed by the session to the main process"""
+
+        bpyevent(
+            "coverage",
+            instance_id=self._instance_id,
+            data=coverage.data().to_dict(),
+        )
+
+    def _send_render_profile(self):
+        """Sends the render time of the tests and the render time saved by the
+        render profile to the main process"""
+
+        assert self._render_profile is not None
+        stats = self._render_profile.pop_stats()
+        if stats["renders"]:
+            bpyevent("render_profile", instance_id=self._instance_id, **stats)
+
+    def _send_metrics(self):
+        """Sends the metrics of the process to the main process, with the
+        metrics setting"""
+
+        if self._bpytest_config.metrics:
+            bpyevent("metrics", instance_id=self._instance_id, data=metrics.to_dict())
+
+    def _send_startup_trace(self):
+        """Sends the recorded spans to the main process: once for the startup
+        trace, after each test and at the end for the session trace"""
+
+        if tracer.enabled:
+            bpyevent(
+                "startup_trace",
+                instance_id=self._instance_id,
+                spans=[span.to_dict() for span in tracer.pop_spans()],
+            )
+
+    def _run_test_files(
+        self, collector: Collector, capture: "OutputCapture | None"
+    ):
+        """Runs the selected test units of every test file"""
+
+        # Blender was started with --factory-startup, with fast_start
+        # the factory reset before the first test is skipped
+        factory_reset = not self._bpytest_config.fast_start
+        addon_state = AddonState()
+        isolate = self._isolate_mode()
+        if isolate != ISOLATE_NONE:
+            # Addons of every test are enabled once, in the forked session
+            if self._session_info.lane != HOST_LANE:
+                apply_addons(addon_state, list(self._bpytest_config.enable_addons))
+
+        for test_file in collector.test_files:
+            test_units = [
+                test_unit for test_unit in test_file.test_units if test_unit.selected
+            ]
+            file_marks = _read_marks(test_file.filepath) if test_units else {}
+
+            # Skipped tests are reported before their module is imported
+            runnable_units = []
+            for test_unit in test_units:
+                skipped = self._skipped_result(test_unit, file_marks)
+                if skipped is None:
+                    runnable_units.append(test_unit)
+                else:
+                    self._report_result(test_unit, skipped)
+            test_units = runnable_units
+
+            if isolate == ISOLATE_FORK_MODULE and test_units:
+                self._run_forked(
+                    test_file, test_units, file_marks, capture, addon_state
                 )
+                continue
 
-                result = test_process.execute()
-                test_unit.success = result
+            for test_unit in test_units:
+                if isolate == ISOLATE_FORK:
+                    self._run_forked(
+                        test_file, [test_unit], file_marks, capture, addon_state
+                    )
+                    continue
 
-                bpyprint(test_unit)
-                self._finished_tests_list.append(test_unit)
+                # The startup trace is sent after the first test
+                with self._first_test_span():
+                    result = self._execute_test_unit(
+                        test_file,
+                        test_unit,
+                        file_marks,
+                        capture,
+                        factory_reset,
+                        addon_state,
+                    )
+                factory_reset = True
+                self._send_startup_trace()
+                self._report_result(test_unit, result)
 
             self._finalize_module_fixtures(test_file.filepath)
 
-        self._finalize_session_fixtures()
-        self._end_time()
+    def _first_test_span(self) -> AbstractContextManager[None]:
+        """Span of the first test of the session in the trace, no span for
+        the next tests"""
+
+        if not self._first_test:
+            return nullcontext()
+        self._first_test = False
+        return tracer.span("first_test")
+
+    def _isolate_mode(self) -> str:
+        """Process isolation of the tests, the tests run in the session
+        process if forking is not supported"""
+
+        isolate = self._bpytest_config.isolate or ISOLATE_NONE
+        if isolate not in (ISOLATE_NONE, ISOLATE_FORK, ISOLATE_FORK_MODULE):
+            bpyprint(f"Unknown isolate mode {isolate!r}, the tests are not isolated")
+            return ISOLATE_NONE
+        if isolate != ISOLATE_NONE and not fork_supported():
+            bpyprint(
+                f"isolate={isolate} is only supported on Linux, "
+                "the tests are not isolated"
+            )
+            return ISOLATE_NONE
+        return isolate
+
+    def _execute_test_unit(
+        self,
+        test_file: TestFile,
+        test_unit: TestUnit,
+        file_marks: dict[str, list[StaticMark]],
+        capture: "OutputCapture | None",
+        factory_reset: bool,
+        addon_state: AddonState,
+    ) -> dict[str, Any]:
+        """Runs a test unit and returns its result"""
+
+        marks = file_marks.get(test_unit.function_name, [])
+        try:
+            xfail = self._evaluate_marks(
+                test_unit, lambda evaluator: expected_failure(marks, evaluator)
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return _condition_error(test_unit, exc)
+        if xfail is not None and not xfail.run:
+            return {
+                "nodeid": test_unit.nodeid,
+                "success": True,
+                "outcome": OUTCOME_XFAILED,
+                "duration": 0.0,
+                "setup_duration": 0.0,
+                "result_lines": [xfail.reason] if xfail.reason else [],
+            }
+
+        if self._render_profile is not None:
+            self._render_profile.active = uses_render_profile(
+                test_file.filepath, marks, self._directory_marks
+            )
+        test_process = TestRunner(
+            test_unit=test_unit,
+            bpytest_config=self._bpytest_config,
+            session_info=self._session_info,
+            capture=capture,
+            factory_reset=factory_reset,
+            addons=required_addons(
+                test_file.filepath,
+                marks,
+                self._directory_marks,
+                self._bpytest_config.enable_addons,
+            ),
+            addon_state=addon_state,
+            render_profile=self._render_profile,
+        )
+
+        bpyevent("test_start", instance_id=self._instance_id, nodeid=test_unit.nodeid)
+        test_start_time = time.time()
+        with tracer.span(test_unit.nodeid):
+            success = test_process.execute()
+        outcome = OUTCOME_PASSED if success else OUTCOME_FAILED
+        result_lines = test_unit.result_lines
+        if xfail is not None:
+            outcome, success, result_lines = apply_xfail(xfail, success, result_lines)
+        return {
+            "nodeid": test_unit.nodeid,
+            "success": success,
+            "outcome": outcome,
+            "duration": time.time() - test_start_time,
+            "setup_duration": test_process.setup_duration,
+            "result_lines": result_lines,
+        }
+
+    def _run_forked(
+        self,
+        test_file: TestFile,
+        test_units: list[TestUnit],
+        file_marks: dict[str, list[StaticMark]],
+        capture: "OutputCapture | None",
+        addon_state: AddonState,
+    ):
+        """Runs test units of a file in a child process forked from the
+        session, a crash of the child process fails its remaining tests"""
+
+        def run_child(send: SendResult):
+            # Metrics and spans recorded by the session before the fork are
+            # sent by it
+            metrics.reset()
+            tracer.fork(f"{self._instance_id} (forked)")
+            # The forked session is already prepared for the first test
+            for index, test_unit in enumerate(test_units):
+                result = self._execute_test_unit(
+                    test_file,
+                    test_unit,
+                    file_marks,
+                    capture,
+                    index > 0,
+                    addon_state,
+                )
+                send(result)
+            self._finalize_module_fixtures(test_file.filepath)
+            self._finalize_session_fixtures()
+            if self._coverage is not None:
+                self._send_coverage(self._coverage)
+            if self._render_profile is not None:
+                self._send_render_profile()
+            self._send_metrics()
+            self._send_startup_trace()
+
+        start_time = time.time()
+        with self._first_test_span():
+            process = ForkedProcess(run_child)
+            units_by_nodeid = {unit.nodeid: unit for unit in test_units}
+            reported = set()
+            for result in process.results():
+                test_unit = units_by_nodeid[result["nodeid"]]
+                self._report_result(test_unit, result)
+                reported.add(test_unit.nodeid)
+            status = process.wait()
+        self._send_startup_trace()
+
+        missing = [unit for unit in test_units if unit.nodeid not in reported]
+        if not missing:
+            return
+        result_lines = [
+            f"The test process {status or 'exited'} before the end of the test"
+        ]
+        output = capture.take_output() if capture is not None else ""
+        if output.strip():
+            result_lines += [
+                "----------------------------- Captured output -----------------------------",
+                output.rstrip(),
+            ]
+        for test_unit in missing:
+            self._report_result(
+                test_unit,
+                {
+                    "nodeid": test_unit.nodeid,
+                    "success": False,
+                    "outcome": OUTCOME_FAILED,
+                    "duration": time.time() - start_time,
+                    "setup_duration": 0.0,
+                    "result_lines": result_lines,
+                },
+            )
+
+    def _report_result(self, test_unit: TestUnit, result: dict[str, Any]):
+        """Prints the result of a test unit and sends it to the main process"""
+
+        test_unit.success = result["success"]
+        test_unit.outcome = result["outcome"]
+        test_unit.result_lines = result["result_lines"]
+
+        with metrics.timer("reporting"):
+            bpyprint(test_unit)
+            bpyevent(
+                "test_result",
+                instance_id=self._instance_id,
+                lane=self._session_info.lane,
+                nodeid=test_unit.nodeid,
+                success=test_unit.success,
+                outcome=test_unit.outcome,
+                duration=result["duration"],
+                setup_duration=result["setup_duration"],
+                longrepr="\n".join(test_unit.result_lines),
+            )
+        metrics.count("tests")
+        self._outcomes[test_unit.outcome] = self._outcomes.get(test_unit.outcome, 0) + 1
+        if test_unit.success:
+            # Skipped and xfailed tests are only counted by outcome
+            if test_unit.outcome in (OUTCOME_PASSED, OUTCOME_XPASSED):
+                self._success += 1
+        else:
+            metrics.count("failed_tests")
+            self._failed += 1
+            self._failed_tests_list.append(test_unit)
 
     def execute(self, instance_id : str) -> ExitCode:
         """Executes the test session"""
 
+        self._instance_id = instance_id
         print_header(f"[{instance_id}] Test session starts")
+        # Tests of the session, for the progress of the command line
+        bpyevent(
+            "instance_start",
+            instance_id=instance_id,
+            lane=self._session_info.lane,
+            nodeids=[
+                test_unit.nodeid
+                for test_file in self._collector.test_files
+                for test_unit in test_file.test_units
+                if test_unit.selected
+            ],
+        )
         self._run_tests(self._collector)
 
-        print_failed(self._finished_tests_list)
+        print_failed(self._failed_tests_list)
         self._compute_result()
+        bpyevent(
+            "instance_result",
+            instance_id=instance_id,
+            lane=self._session_info.lane,
+            passed=self._success,
+            failed=self._failed,
+            outcomes=self._outcomes,
+            duration=self._total_time,
+        )
+        self._send_metrics()
+        # Spans of the end of the session, with the session trace
+        self._send_startup_trace()
 
         if self._failed:
             return 1
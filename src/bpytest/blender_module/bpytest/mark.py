@@ -0,0 +1,84 @@
+"""Marks to attach metadata to test functions, inspired by pytest marks.
+
+Example:
+
+    @bpytest.mark.no_bpy
+    def test_parser():
+        ...
+
+    # Marks every test of the module
+    bpytestmark = [bpytest.mark.no_bpy]
+
+Marks are also read statically from the test files source by the
+collector (see bpytest_ast), so they can be used before the module is imported.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+# Name of the attribute storing the marks of a test function
+MARKS_ATTRIBUTE = "bpytestmark"
+
+
+@dataclass
+class Mark:
+    """A mark with its arguments"""
+
+    name: str
+    args: tuple[Any, ...] = ()
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+class MarkDecorator:
+    """Decorator applying a mark to a test function.
+
+    Calling the decorator with arguments returns a new decorator with the
+    arguments stored in the mark, calling it with a single function applies it.
+    """
+
+    def __init__(self, mark: Mark):
+        self.mark = mark
+
+    @property
+    def name(self) -> str:
+        """Name of the mark"""
+        return self.mark.name
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            func: Callable[..., Any] = args[0]
+            marks = list(getattr(func, MARKS_ATTRIBUTE, []))
+            marks.append(self.mark)
+            setattr(func, MARKS_ATTRIBUTE, marks)
+            return func
+
+        return MarkDecorator(
+            Mark(
+                self.mark.name,
+                args=self.mark.args + args,
+                kwargs={**self.mark.kwargs, **kwargs},
+            )
+        )
+
+
+class MarkGenerator:
+    """Factory of mark decorators, `bpytest.mark.name` creates a `name` mark"""
+
+    def __getattr__(self, name: str) -> MarkDecorator:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return MarkDecorator(Mark(name))
+
+
+def get_marks(obj: Any) -> list[Mark]:
+    """Get the marks applied to a function or module"""
+
+    marks = getattr(obj, MARKS_ATTRIBUTE, [])
+    if not isinstance(marks, (list, tuple)):
+        marks = [marks]
+    return [
+        item.mark if isinstance(item, MarkDecorator) else item for item in marks
+    ]
+
+
+mark = MarkGenerator()
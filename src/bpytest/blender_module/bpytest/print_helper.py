@@ -57,12 +57,18 @@ def print_selected_functions(
     total_collected_tests: int,
     total_deselected_tests: int,
     total_selected_tests: int,
+    total_skipped_tests: int = 0,
 ):
 
+    skipped = (
+        f" / {str(total_skipped_tests)} skipped by the command line"
+        if total_skipped_tests
+        else ""
+    )
     bpyprint(
         (
             f"{BColors.BRIGHT.value}collected {str(total_collected_tests)} items / "
             f"{str(total_deselected_tests)} deselected / "
-            f"{str(total_selected_tests)} selected \n {BColors.ENDC.value}"
+            f"{str(total_selected_tests)} selected{skipped} \n {BColors.ENDC.value}"
         )
     )
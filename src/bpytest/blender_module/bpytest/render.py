@@ -0,0 +1,107 @@
+"""Render profile of the test session, see bpytest_render.
+
+The profile is applied to the scenes by the runner after each reset and by
+a load_post handler after a .blend file is loaded. The renders of the tests
+are timed with the render_pre and render_post handlers, to report the render
+time saved by the profile at the end of the session.
+"""
+
+import time
+from typing import Any, Callable
+
+from bpytest_metrics import metrics
+from bpytest_render import apply_render_profile
+
+
+class RenderProfile:
+    """Render settings overridden for the tests of the session
+
+    Args:
+        settings (dict[str, Any]): Settings of the render profile, the render
+            setting of the config
+    """
+
+    def __init__(self, settings: dict[str, Any]):
+        self._settings = settings
+        # If the current test renders with the profile, see uses_render_profile
+        self.active = False
+        # Estimated render cost ratio of each scene with the profile applied
+        self._ratios: dict[str, float] = {}
+        self._handlers: list[tuple[list[Callable[..., None]], Callable[..., None]]] = []
+        self._render_start: float | None = None
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def apply(self):
+        """Apply the profile to every scene of the Blender session"""
+        import bpy
+
+        for scene in bpy.data.scenes:
+            ratio = apply_render_profile(scene, self._settings)
+            # Applied twice if the reset also ran the load_post handler
+            self._ratios[scene.name] = self._ratios.get(scene.name, 1.0) * ratio
+
+    def register(self):
+        """Add the handlers applying the profile to the loaded files and
+        timing the renders, kept by the resets of the session"""
+        import bpy
+
+        handlers = bpy.app.handlers
+        persistent = getattr(handlers, "persistent", lambda func: func)
+
+        @persistent
+        def load_post(*_args: Any):
+            self._ratios = {}
+            if self.active:
+                self.apply()
+
+        @persistent
+        def render_pre(*_args: Any):
+            self._render_start = time.perf_counter()
+
+        @persistent
+        def render_post(scene: Any, *_args: Any):
+            self._rendered(scene)
+
+        for handler_list, handler in (
+            (handlers.load_post, load_post),
+            (handlers.render_pre, render_pre),
+            (handlers.render_post, render_post),
+        ):
+            handler_list.append(handler)
+            self._handlers.append((handler_list, handler))
+
+    def unregister(self):
+        """Remove the handlers of the profile"""
+
+        for handler_list, handler in self._handlers:
+            if handler in handler_list:
+                handler_list.remove(handler)
+        self._handlers = []
+
+    def _rendered(self, scene: Any):
+        """Record a rendered frame"""
+
+        if self._render_start is None:
+            return
+        seconds = time.perf_counter() - self._render_start
+        self._render_start = None
+        metrics.add_time("render", seconds)
+        self.renders += 1
+        self.render_seconds += seconds
+        if self.active:
+            self.saved_seconds += seconds * (self._ratios.get(scene.name, 1.0) - 1.0)
+
+    def pop_stats(self) -> dict[str, Any]:
+        """Renders recorded since the last call, e.g. by a forked test process"""
+
+        stats = {
+            "renders": self.renders,
+            "render_seconds": self.render_seconds,
+            "saved_seconds": self.saved_seconds,
+        }
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.saved_seconds = 0.0
+        return stats
@@ -1,17 +1,26 @@
 import importlib.util
 import sys
+import time
 import traceback
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-import bpy
+from bpytest_addons import AddonState
 from bpytest_config import BpyTestConfig
+from bpytest_metrics import metrics
+from bpytrace import tracer
 
 from .entity import SessionInfo, TestUnit
 from .exception import InvalidFixtureName
 from .fixtures import execute_finalize_request, inspect_func_for_fixtures
+from .lane import HOST_LANE
 from .print_helper import bpyprint
 
+if TYPE_CHECKING:
+    from .capture import OutputCapture
+    from .render import RenderProfile
+
 
 @dataclass
 class ExecutionResult:
@@ -19,6 +28,8 @@ class ExecutionResult:
 
     success: bool = False
     result_lines: list[str] = field(default_factory=list)
+    # Seconds spent creating the fixture values of the test
+    setup_duration: float = 0.0
 
 
 def execute(
@@ -38,7 +49,9 @@ def execute(
     test_file = importlib.util.module_from_spec(spec)  # type:ignore
 
     try:
-        spec.loader.exec_module(test_file)  # type:ignore
+        metrics.count("module_imports")
+        with metrics.timer("module_import"):
+            spec.loader.exec_module(test_file)  # type:ignore
     except ModuleNotFoundError:
         return ExecutionResult(
             False, [f"ModuleNotFoundError: {module_filepath}"]
@@ -47,12 +60,16 @@ def execute(
     obj = getattr(test_file, function_name)
 
     if hasattr(obj, "__call__"):
+        setup_start = time.perf_counter()
+        setup_duration: float | None = None
         try:
             fixture_requests, args_to_pass = inspect_func_for_fixtures(
                 obj, session_info, config
             )
+            setup_duration = time.perf_counter() - setup_start
             try:
-                result = obj(*args_to_pass)
+                with metrics.timer("test_body"):
+                    result = obj(*args_to_pass)
             except TypeError as e:
                 bpyprint(str(e))
                 raise InvalidFixtureName(function_name) from e
@@ -65,18 +82,99 @@ def execute(
                 raise Exception(  # pylint: disable=broad-exception-raised
                     "Test failed, returned False"
                 )
-            return ExecutionResult(True)
+            return ExecutionResult(True, setup_duration=setup_duration)
         except:  # pylint: disable=bare-except
-            return ExecutionResult(False, [traceback.format_exc()])
+            return ExecutionResult(
+                False,
+                [traceback.format_exc()],
+                setup_duration=(
+                    setup_duration
+                    if setup_duration is not None
+                    else time.perf_counter() - setup_start
+                ),
+            )
 
     return ExecutionResult(True)
 
 
 def _enable_module_list(enable_addons: list[str]):
     """Enables the specified modules in the blender environment"""
+    import bpy
 
     for module in enable_addons:
         bpy.ops.preferences.addon_enable(module=module)
+        metrics.count("addon_enables")
+
+
+def _disable_module_list(disable_addons: list[str]):
+    """Disables the specified modules in the blender environment"""
+    import bpy
+
+    for module in disable_addons:
+        bpy.ops.preferences.addon_disable(module=module)
+
+
+def _read_properties(struct: Any) -> dict[str, Any]:
+    """Values of the editable properties of a bpy struct, e.g. the preferences
+    of an addon, and of its nested property groups"""
+    import bpy
+
+    values: dict[str, Any] = {}
+    for prop in struct.bl_rna.properties:
+        if prop.identifier == "rna_type" or prop.type == "COLLECTION":
+            continue
+        value = getattr(struct, prop.identifier)
+        if prop.type == "POINTER":
+            if value is not None and not isinstance(value, bpy.types.ID):
+                values[prop.identifier] = _read_properties(value)
+        elif not prop.is_readonly:
+            values[prop.identifier] = tuple(value) if prop.is_array else value
+    return values
+
+
+def _write_properties(struct: Any, values: dict[str, Any]):
+    """Restore the property values read by _read_properties"""
+
+    for name, value in values.items():
+        if isinstance(value, dict):
+            _write_properties(getattr(struct, name), value)
+        else:
+            setattr(struct, name, value)
+
+
+def _addon_preferences(addon: str) -> Any:
+    """Preferences of an enabled addon, None if it has no preferences"""
+    import bpy
+
+    entry = bpy.context.preferences.addons.get(addon)
+    return None if entry is None else entry.preferences
+
+
+def apply_addons(addon_state: AddonState, addons: list[str]):
+    """Enables the addons of the list and disables the other addons enabled
+    in the blender environment, only the difference with addon_state"""
+
+    disable_addons, enable_addons = addon_state.difference(addons)
+    _disable_module_list(disable_addons)
+    _enable_module_list(enable_addons)
+    # Recorded once Blender has the addons, if enabling fails the next test
+    # still diffs against the addons enabled before
+    addon_state.update(addons)
+    for addon in enable_addons:
+        preferences = _addon_preferences(addon)
+        if preferences is not None:
+            addon_state.preferences[addon] = _read_properties(preferences)
+
+
+def _restore_addon_preferences(addon_state: AddonState):
+    """Restores the preferences of the enabled addons to their values when
+    they were enabled, the resets keeping the addons keep their preferences"""
+
+    for addon, values in addon_state.preferences.items():
+        preferences = _addon_preferences(addon)
+        if preferences is not None:
+            _write_properties(preferences, values)
+
 
 class TestRunner:
     """Test process execution. The execution
@@ -86,8 +184,16 @@ class TestRunner:
     returned as a boolean.
 
     :param test_unit: Test unit to be executed
-    :param pythonpath: Path python cwd
-    :param nocapture: Defines if should display the test standard output
+    :param bpytest_config: Configuration of the test session
+    :param session_info: Information of the test session
+    :param capture: Output capture of the session, None if the output is not captured
+    :param factory_reset: Reset Blender to the factory settings before the test,
+        disabled for the first test with fast_start
+    :param addons: Addons required by the test, the enable_addons setting if None
+    :param addon_state: Addons enabled by the previous tests of the session,
+        only the difference with the addons of the test is enabled or disabled
+    :param render_profile: Render profile of the session, applied after the
+        reset if it is active for the test
 
     """
 
@@ -96,6 +202,11 @@ class TestRunner:
         test_unit: TestUnit,
         bpytest_config: BpyTestConfig,
         session_info: SessionInfo,
+        capture: "OutputCapture | None" = None,
+        factory_reset: bool = True,
+        addons: list[str] | None = None,
+        addon_state: AddonState | None = None,
+        render_profile: "RenderProfile | None" = None,
     ):
 
         self._test_unit = test_unit
@@ -103,6 +214,16 @@ class TestRunner:
         self._session_info = session_info
         self._nocapture = bpytest_config.nocapture
         self._pythonpath = bpytest_config.pythonpath
+        self._capture = None if self._nocapture else capture
+        self._factory_reset = factory_reset
+        self._addons = (
+            list(bpytest_config.enable_addons) if addons is None else addons
+        )
+        self._addon_state = AddonState() if addon_state is None else addon_state
+        self._render_profile = render_profile
+        # Seconds spent restoring the Blender session and creating the
+        # fixture values, recorded to estimate the cost of the test order
+        self.setup_duration = 0.0
 
     def execute(self) -> bool:
         """Executes the test and returns the result"""
@@ -110,28 +231,63 @@ class TestRunner:
 
     def _restore_blender_session(self):
         """Restores the blender session to the default state"""
-
-        bpy.ops.wm.read_factory_settings()
-
-        enable_addons = self._bpytest_config.enable_addons
-        _enable_module_list(enable_addons)
+        import bpy
+
+        if self._factory_reset:
+            metrics.count("resets")
+            if any(addon in self._addons for addon in self._addon_state.enabled):
+                # Reloads the factory startup file keeping the preferences,
+                # with the enabled addons still needed by the test, whose
+                # preferences are restored. Other preference changes are kept
+                bpy.ops.wm.read_homefile(use_factory_startup=True)
+                _restore_addon_preferences(self._addon_state)
+            else:
+                # Also resets the preferences, disabling every addon
+                bpy.ops.wm.read_factory_settings()
+                self._addon_state.clear()
+
+        apply_addons(self._addon_state, self._addons)
+
+        # After the addons, the Cycles settings are only available with
+        # the Cycles addon enabled
+        if self._render_profile is not None and self._render_profile.active:
+            self._render_profile.apply()
 
     def _execute(self):
 
-        self._restore_blender_session()
+        if self._capture is not None:
+            self._capture.start()
 
-        execution_result = execute(
-            pythonpath=self._pythonpath,
-            module_filepath=self._test_unit.test_filepath,
-            function_name=self._test_unit.function_name,
-            session_info=self._session_info,
-            config=self._bpytest_config,
-        )
+        try:
+            restore_start = time.perf_counter()
+            # Tests running in the host lane have no blender session to restore
+            if self._session_info.lane != HOST_LANE:
+                with tracer.span("restore_session"), metrics.timer("reset"):
+                    self._restore_blender_session()
+            restore_duration = time.perf_counter() - restore_start
+
+            execution_result = execute(
+                pythonpath=self._pythonpath,
+                module_filepath=self._test_unit.test_filepath,
+                function_name=self._test_unit.function_name,
+                session_info=self._session_info,
+                config=self._bpytest_config,
+            )
+        finally:
+            captured_output = (
+                self._capture.stop() if self._capture is not None else ""
+            )
 
         print(execution_result)
+        self.setup_duration = restore_duration + execution_result.setup_duration
 
         if not execution_result.success:
             self._test_unit.result_lines = execution_result.result_lines
+            if captured_output.strip():
+                self._test_unit.result_lines += [
+                    "----------------------------- Captured output -----------------------------",
+                    captured_output.rstrip(),
+                ]
             return False
 
         return True
@@ -0,0 +1,117 @@
+"""Test session server used by the watch mode.
+
+The Blender process stays alive and runs the tests requested by the main
+process, one json request per line in the standard input:
+
+    {"command": "run", "changed": [<path>, ...], "lastfailed": [<nodeid>, ...]}
+    {"command": "exit"}
+
+Every run ends with a run_finished event. Before a run, the changed modules
+are removed from sys.modules and the changed linked addons are disabled, so
+they are imported again by the tests (test files and conftest files are
+executed again on every run).
+"""
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from typing import TextIO
+
+from bpyprint import bpyevent
+from bpytest_config import BpyTestConfig
+from bpytest_index import IGNORE_DIRS, find_test_files
+
+from .entity import CollectorString
+from .print_helper import bpyprint
+from .session import Session
+from .types import ExitCode
+
+
+def _unload_modules(changed: list[Path]) -> None:
+    """Remove the modules of the changed files from sys.modules, and their
+    cached bytecode, which can be stale if a file is saved twice in a second"""
+
+    for path in changed:
+        if path.suffix == ".py":
+            Path(importlib.util.cache_from_source(path.as_posix())).unlink(
+                missing_ok=True
+            )
+
+    for name, module in list(sys.modules.items()):
+        filepath = getattr(module, "__file__", None)
+        if filepath and Path(filepath).absolute() in changed:
+            bpyprint(f"Reloading module {name}")
+            del sys.modules[name]
+
+
+def _unload_addons(changed: list[Path], link_addons: list[str]) -> None:
+    """Disable the linked addons with changed files and remove their modules,
+    the addons are enabled again (and imported) before the next test."""
+    import bpy
+
+    for addon in link_addons:
+        addon_path = Path(addon).absolute()
+        if not any(path.is_relative_to(addon_path) for path in changed):
+            continue
+
+        bpyprint(f"Reloading addon {addon_path.name}")
+        bpy.ops.preferences.addon_disable(module=addon_path.name)
+        for name in list(sys.modules):
+            if name == addon_path.name or name.startswith(f"{addon_path.name}."):
+                del sys.modules[name]
+
+
+def _affected_nodeids(
+    config: BpyTestConfig, changed: list[Path], lastfailed: list[str]
+) -> list[str] | None:
+    """Node ids to run after a change: the tests of the changed test files
+    first, then the last failures. None (every test) if there are none."""
+
+    path = CollectorString(config.collector_string).path
+    test_filepaths = (
+        {path}
+        if path.is_file()
+        else {
+            filepath.absolute()
+            for filepath in find_test_files(
+                path, config.norecursedirs + IGNORE_DIRS
+            )
+        }
+    )
+
+    nodeids = [
+        filepath.as_posix() for filepath in changed if filepath in test_filepaths
+    ] + lastfailed
+    return nodeids or None
+
+
+def serve(
+    config: BpyTestConfig, instance_id: str, requests: TextIO = sys.stdin
+) -> ExitCode:
+    """Run the requests of the main process until the exit request"""
+
+    for line in requests:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+
+        if request["command"] == "exit":
+            break
+
+        if request["command"] == "run":
+            changed = [Path(path).absolute() for path in request.get("changed", [])]
+            _unload_modules(changed)
+            if config.link_addons:
+                _unload_addons(changed, config.link_addons)
+
+            nodeids = None
+            if changed:
+                nodeids = _affected_nodeids(
+                    config, changed, request.get("lastfailed", [])
+                )
+
+            exit_code = Session(config).execute(instance_id, nodeids)
+            bpyevent("run_finished", instance_id=instance_id, exit_code=exit_code)
+
+    return 0
@@ -1,11 +1,16 @@
 """Singleton class"""
 
-import random
+import uuid
+from pathlib import Path
 
 from bpytest_config import BpyTestConfig
+from bpytest_index import read_plan_nodeids, read_plan_skipped
+from bpytest_metrics import metrics
+from bpytrace import tracer
 
 from .collector import Collector
 from .entity import CollectorString, SessionInfo
+from .lane import BLENDER_LANE, LaneSelector
 from .manager import TestManager
 from .types import ExitCode
 
@@ -16,29 +21,58 @@ class Session:
     config: BpyTestConfig
     session_info: SessionInfo
 
-    def __init__(self, config: BpyTestConfig):
+    def __init__(self, config: BpyTestConfig, lane: str = BLENDER_LANE):
 
         self.config = config
-        self.session_info = SessionInfo(id=random.randint(0, 10000))
+        self.session_info = SessionInfo(id=uuid.uuid4().hex, lane=lane)
 
-    def execute(self, instance_id : str) -> ExitCode:
-        """Execute the test session"""
+    def execute(
+        self, instance_id : str, nodeids: list[str] | None = None
+    ) -> ExitCode:
+        """Execute the test session
 
-        collector = Collector(
-            collector_string=CollectorString(self.config.collector_string),
-            keyword=self.config.keyword,
-            norecursedirs=self.config.norecursedirs,
-        )
+        Args:
+            instance_id (str): Id of the Blender executable instance
+            nodeids (list[str] | None): Run only these tests, in this order,
+                by default the tests of the test plan if the config has one
+        """
+
+        with tracer.span("collection"), metrics.timer("collection"):
+            keyword, markexpr = self.config.keyword, self.config.markexpr
+            skipped_nodeids: list[str] = []
+            if nodeids is None and self.config.test_plan:
+                # The main process already applied the selection expressions
+                nodeids = read_plan_nodeids(Path(self.config.test_plan))
+                skipped_nodeids = read_plan_skipped(Path(self.config.test_plan))
+                keyword, markexpr = "", ""
+
+            lane_selector = None
+            if self.config.host_lane:
+                lane_selector = LaneSelector(self.config)
+
+            collector = Collector(
+                collector_string=CollectorString(self.config.collector_string),
+                keyword=keyword,
+                markexpr=markexpr,
+                norecursedirs=self.config.norecursedirs,
+                lane=self.session_info.lane,
+                lane_selector=lane_selector,
+                nodeids=nodeids,
+                skipped_nodeids=skipped_nodeids,
+            )
         test_manager = TestManager(
             bpytest_config=self.config,
             collector=collector,
             session_info=self.session_info,
+            lane_selector=lane_selector,
         )
         return test_manager.execute(instance_id)
 
 
-def wrap_session(config: BpyTestConfig, instance_id : str) -> ExitCode:
+def wrap_session(
+    config: BpyTestConfig, instance_id : str, lane: str = BLENDER_LANE
+) -> ExitCode:
     """Wrapper function for the test session"""
 
-    session = Session(config)
+    session = Session(config, lane)
     return session.execute(instance_id)
@@ -0,0 +1,299 @@
+"""Scene state snapshots, for fast "did anything change" assertions.
+
+The data-blocks of the selected bpy.data collections are walked through
+RNA introspection and their property values are digested into a hash tree
+(see bpytest_snapshot). Numeric properties of large collections (e.g. the
+vertices of a mesh) are read in bulk with foreach_get. Snapshots are stored
+as json in the "golden" directory next to the test file, one directory per
+Blender version, and written (or replaced) with --update-golden.
+
+Example:
+
+    def test_operator(assert_scene_matches):
+        bpy.ops.object.my_operator()
+        assert_scene_matches("my_operator", collections=["objects", "materials"])
+"""
+
+import inspect
+import json
+from pathlib import Path
+from typing import Any, Sequence
+
+from bpytest_snapshot import SnapshotNode, diff_snapshots
+
+from .fixtures import FixtureRequest, fixture
+from .image import GOLDEN_DIR
+
+# bpy.data collections of a snapshot by default
+DEFAULT_COLLECTIONS = (
+    "scenes",
+    "collections",
+    "objects",
+    "meshes",
+    "curves",
+    "materials",
+    "node_groups",
+    "cameras",
+    "lights",
+    "worlds",
+)
+
+# Properties that change without a change of the scene state
+IGNORED_PROPERTIES = frozenset(
+    {
+        "rna_type",
+        "bl_rna",
+        "id_data",
+        "original",
+        "users",
+        "session_uid",
+        "is_evaluated",
+        "is_runtime_data",
+        "is_missing",
+        "is_embedded_data",
+        "is_library_indirect",
+        "is_editmode",
+        "name_full",
+        "tag",
+        "preview",
+        "library",
+        "library_weak_reference",
+        "override_library",
+        "asset_data",
+        "select",
+        "select_head",
+        "select_tail",
+    }
+)
+
+# Collections with more items are digested with bulk reads of their numeric
+# properties, instead of a node per item
+BULK_MIN_ITEMS = 32
+
+# Depth of the nested structs walked inside a data-block
+MAX_DEPTH = 5
+
+# Decimals of the float values, so rounding noise is not a change
+DEFAULT_PRECISION = 5
+
+_NUMERIC_DTYPES = {"BOOLEAN": "bool", "INT": "int64", "FLOAT": "float64"}
+
+
+class SceneSnapshot:
+    """Builds the hash tree of the scene state"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, max_depth: int = MAX_DEPTH):
+        self._precision = precision
+        self._max_depth = max_depth
+        self._visited: set[int] = set()
+
+    def build(self, collections: Sequence[str] = DEFAULT_COLLECTIONS) -> SnapshotNode:
+        """Hash tree of the data-blocks of the bpy.data collections"""
+        import bpy
+
+        children = {}
+        for collection_name in collections:
+            collection = getattr(bpy.data, collection_name, None)
+            if collection is None:
+                continue
+            children[collection_name] = SnapshotNode.branch(
+                {id_block.name: self._id(id_block) for id_block in collection}
+            )
+        return SnapshotNode.branch(children)
+
+    def _id(self, id_block: Any) -> SnapshotNode:
+        self._visited = {id_block.as_pointer()}
+        return self._struct(id_block, 0)
+
+    def _round(self, value: Any) -> Any:
+        if isinstance(value, float):
+            return round(value, self._precision) + 0.0
+        return value
+
+    def _struct(self, struct: Any, depth: int) -> SnapshotNode:
+        """Node of the properties of a struct"""
+
+        children = {}
+        for prop in struct.bl_rna.properties:
+            identifier = prop.identifier
+            if identifier in IGNORED_PROPERTIES:
+                continue
+            try:
+                value = getattr(struct, identifier)
+            except (AttributeError, RuntimeError, TypeError):
+                continue
+            node = self._property(prop, value, depth)
+            if node is not None:
+                children[identifier] = node
+        return SnapshotNode.branch(children)
+
+    def _property(self, prop: Any, value: Any, depth: int) -> SnapshotNode | None:
+        """Node of the value of a property, None if it is not digested"""
+        import bpy
+
+        if prop.type == "POINTER":
+            if value is None:
+                return SnapshotNode.leaf(None)
+            if isinstance(value, bpy.types.ID) and not value.is_embedded_data:
+                # References to other data-blocks are digested by name
+                return SnapshotNode.leaf(f"<{type(value).__name__} {value.name!r}>")
+            if depth >= self._max_depth or value.as_pointer() in self._visited:
+                return None
+            self._visited.add(value.as_pointer())
+            return self._struct(value, depth + 1)
+
+        if prop.type == "COLLECTION":
+            if depth >= self._max_depth:
+                return None
+            return self._collection(prop, value, depth + 1)
+
+        if prop.type == "ENUM" and prop.is_enum_flag:
+            return SnapshotNode.leaf(sorted(value))
+        if getattr(prop, "is_array", False) or (
+            hasattr(value, "__len__") and not isinstance(value, str)
+        ):
+            return SnapshotNode.leaf(tuple(self._round(item) for item in _flatten(value)))
+        return SnapshotNode.leaf(self._round(value))
+
+    def _collection(self, prop: Any, collection: Any, depth: int) -> SnapshotNode:
+        """Node of the items of a collection property"""
+
+        if len(collection) >= BULK_MIN_ITEMS and hasattr(collection, "foreach_get"):
+            return self._bulk_collection(prop, collection)
+
+        children = {}
+        for index, item in enumerate(collection):
+            if item is None:
+                continue
+            name = getattr(item, "name", "") if hasattr(item, "bl_rna") else ""
+            key = f"{index}:{name}" if name else str(index)
+            if not hasattr(item, "bl_rna"):
+                children[key] = SnapshotNode.leaf(self._round(item))
+                continue
+            if item.as_pointer() in self._visited:
+                continue
+            self._visited.add(item.as_pointer())
+            children[key] = self._struct(item, depth)
+        return SnapshotNode.branch(children)
+
+    def _bulk_collection(self, prop: Any, collection: Any) -> SnapshotNode:
+        """Node of a large collection, with a leaf per numeric property of
+        its items, read with a single foreach_get"""
+        import numpy as np
+
+        count = len(collection)
+        children = {"len": SnapshotNode.leaf(count)}
+        for item_prop in prop.fixed_type.properties:
+            identifier = item_prop.identifier
+            if identifier in IGNORED_PROPERTIES:
+                continue
+            dtype = _NUMERIC_DTYPES.get(item_prop.type)
+            if dtype is None:
+                continue
+            components = 1
+            if getattr(item_prop, "is_array", False):
+                dimensions = [size for size in item_prop.array_dimensions if size]
+                components = int(np.prod(dimensions)) if dimensions else 0
+            if not components:
+                continue
+            values = np.empty(count * components, dtype=dtype)
+            try:
+                collection.foreach_get(identifier, values)
+            except (AttributeError, RuntimeError, TypeError):
+                continue
+            if dtype == "float64":
+                # Adding 0.0 turns -0.0 into 0.0, which have different bytes
+                values = np.round(values, self._precision) + 0.0
+            children[identifier] = SnapshotNode.leaf(
+                f"{count} x {identifier}", data=values.tobytes()
+            )
+        return SnapshotNode.branch(children)
+
+
+def _flatten(value: Any) -> list[Any]:
+    """Items of a (possibly multi dimensional) array property"""
+
+    items = []
+    for item in value:
+        if hasattr(item, "__len__") and not isinstance(item, str):
+            items.extend(_flatten(item))
+        else:
+            items.append(item)
+    return items
+
+
+def snapshot_scene(
+    collections: Sequence[str] = DEFAULT_COLLECTIONS,
+    precision: int = DEFAULT_PRECISION,
+) -> SnapshotNode:
+    """Hash tree of the data-blocks of the bpy.data collections"""
+    return SceneSnapshot(precision).build(collections)
+
+
+def version_dir() -> str:
+    """Directory of the snapshots of the running Blender version"""
+    import bpy
+
+    major, minor = bpy.app.version[:2]
+    return f"blender-{major}.{minor}"
+
+
+class SceneMatcher:
+    """Compares the scene state with the golden snapshots of a test, see assert_scene_matches"""
+
+    def __init__(self, golden_dir: Path, update_golden: bool):
+        self._golden_dir = golden_dir
+        self._update_golden = update_golden
+
+    def __call__(
+        self,
+        golden_name: str,
+        collections: Sequence[str] = DEFAULT_COLLECTIONS,
+        precision: int = DEFAULT_PRECISION,
+        max_report: int = 20,
+    ) -> None:
+        """Assert that the scene state matches its golden snapshot
+
+        Args:
+            golden_name (str): Name of the snapshot, stored as <golden_name>.json
+                in the directory of the running Blender version
+            collections (Sequence[str]): bpy.data collections of the snapshot
+            precision (int): Decimals of the compared float values
+            max_report (int): Maximum number of reported differences
+        """
+
+        actual = snapshot_scene(collections, precision)
+        golden_path = self._golden_dir / version_dir() / f"{golden_name}.json"
+
+        if self._update_golden:
+            golden_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(golden_path, "w", encoding="utf-8") as file:
+                json.dump(actual.to_dict(), file, indent=1)
+            return
+
+        if not golden_path.is_file():
+            raise AssertionError(
+                f"Golden snapshot {golden_path} does not exist, "
+                "run with --update-golden to create it"
+            )
+
+        with open(golden_path, "r", encoding="utf-8") as file:
+            expected = SnapshotNode.from_dict(json.load(file))
+
+        # Equal trees are found equal by their root digest
+        if expected.digest == actual.digest:
+            return
+        differences = diff_snapshots(expected, actual, max_report)
+        raise AssertionError(
+            f"Scene state does not match {golden_path.name}:\n"
+            + "\n".join(f"  {difference}" for difference in differences)
+        )
+
+
+@fixture
+def assert_scene_matches(request: FixtureRequest) -> SceneMatcher:
+    """Fixture comparing the scene state with the golden snapshots of the
+    test, stored in the golden directory next to the test file."""
+
+    golden_dir = Path(inspect.getfile(request.func)).parent / GOLDEN_DIR
+    return SceneMatcher(golden_dir, request.config.update_golden)
@@ -1,55 +1,163 @@
+import shutil
 import tempfile
+import threading
+import time
+import uuid
 from pathlib import Path
+from typing import Generator
 
 from .fixtures import FixtureRequest, fixture
 
-MAX_TEMP_FOLDERS = 3
+# Name of the directory, inside the temporary root, with the session directories
+BPYTEST_TEMP_DIR = "bpytest"
+SESSION_DIR_PREFIX = "session-"
+# Session directories being deleted are renamed with this prefix first, so
+# a deletion interrupted by the end of the process is resumed by the next session
+GARBAGE_DIR_PREFIX = "garbage-"
+# File marking a session directory as used by a running session
+LOCK_FILE = ".lock"
+# Locks older than this are considered left by a crashed session
+LOCK_TIMEOUT = 3 * 24 * 60 * 60
 
 
-def _get_default_bpytest_temp_dir() -> Path:
-    """Get the default pytest temporary directory."""
+def get_bpytest_temp_dir(root: str = "") -> Path:
+    """Get the directory containing the session directories.
 
-    path = Path(tempfile.gettempdir()) / "bpytest"
-    if not path.exists():
-        path.mkdir()
+    Args:
+        root (str): Root directory, the system temporary directory if empty
+    """
 
+    path = Path(root or tempfile.gettempdir()) / BPYTEST_TEMP_DIR
+    path.mkdir(parents=True, exist_ok=True)
     return path
 
 
-def _recursive_remove(path: Path):
-    """Recursively remove a directory."""
-    for child in path.iterdir():
-        if child.is_dir():
-            _recursive_remove(child)
-        else:
-            child.unlink()
-    path.rmdir()
+def _is_locked(session_dir: Path) -> bool:
+    """Check if a session directory is used by a running session"""
 
+    try:
+        return time.time() - (session_dir / LOCK_FILE).stat().st_mtime < LOCK_TIMEOUT
+    except OSError:
+        return False
 
-def _get_test_temp_directory(test_name: str, session_id: int) -> Path:
-    """Get the temporary directory for the tests."""
-    temp_directory = (
-        _get_default_bpytest_temp_dir() / str(session_id) / test_name
+
+def _delete_old_session_dirs(
+    temp_dir: Path, current: Path, retention_count: int
+) -> None:
+    """Delete the session directories except the newest retention_count ones,
+    the current one and the ones used by running sessions."""
+
+    session_dirs = sorted(
+        path
+        for path in temp_dir.iterdir()
+        if path.name.startswith(SESSION_DIR_PREFIX)
+        and path != current
+        and not _is_locked(path)
     )
-    temp_directory.mkdir(exist_ok=True, parents=True)
-    return temp_directory
+    old_dirs = session_dirs[: max(len(session_dirs) - retention_count, 0)]
+
+    for path in old_dirs:
+        try:
+            path.rename(temp_dir / f"{GARBAGE_DIR_PREFIX}{uuid.uuid4().hex}")
+        except OSError:
+            # Already being deleted by another session
+            continue
+
+    for path in temp_dir.iterdir():
+        if path.name.startswith(GARBAGE_DIR_PREFIX):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class TempPathFactory:
+    """Creates the temporary directories of a test session.
+
+    The session directory is created on first use, with a collision free
+    name sorted by creation time. The session directories of previous
+    sessions beyond the retention count are deleted once per session, in a
+    background thread, while the tests run.
+    """
+
+    def __init__(self, root: str = "", retention_count: int = 3):
+        """
+        Args:
+            root (str): Root of the temporary directories, the system
+                temporary directory if empty (e.g. /dev/shm for a tmpfs)
+            retention_count (int): Number of previous session directories kept
+        """
+
+        self._root = root
+        self._retention_count = max(retention_count, 0)
+        self._basetemp: Path | None = None
+        self._cleanup_thread: threading.Thread | None = None
+
+    def getbasetemp(self) -> Path:
+        """Get the directory of the session, creating it on first use"""
+
+        if self._basetemp is not None:
+            return self._basetemp
 
+        temp_dir = get_bpytest_temp_dir(self._root)
+        self._basetemp = Path(
+            tempfile.mkdtemp(
+                prefix=f"{SESSION_DIR_PREFIX}{time.strftime('%Y%m%d-%H%M%S')}-",
+                dir=temp_dir,
+            )
+        )
+        (self._basetemp / LOCK_FILE).touch()
 
-def _delete_old_temp_folders():
-    """Delete old temporary folders."""
-    temp_directory = _get_default_bpytest_temp_dir()
-    temp_folders = sorted(
-        temp_directory.iterdir(), key=lambda x: x.stat().st_ctime
+        self._cleanup_thread = threading.Thread(
+            target=_delete_old_session_dirs,
+            args=(temp_dir, self._basetemp, self._retention_count),
+            daemon=True,
+        )
+        self._cleanup_thread.start()
+        return self._basetemp
+
+    def mktemp(self, basename: str, numbered: bool = True) -> Path:
+        """Create a new directory in the session directory.
+
+        Args:
+            basename (str): Name of the directory
+            numbered (bool): Add a suffix to make the name unique, if False,
+                the existing directory is returned
+        """
+
+        if numbered:
+            return Path(
+                tempfile.mkdtemp(prefix=f"{basename}-", dir=self.getbasetemp())
+            )
+
+        path = self.getbasetemp() / basename
+        path.mkdir(exist_ok=True)
+        return path
+
+    def release(self) -> None:
+        """Mark the session directory as not used by a running session,
+        waiting for the deletion of the old session directories to end"""
+
+        if self._cleanup_thread is not None:
+            self._cleanup_thread.join()
+            self._cleanup_thread = None
+        if self._basetemp is not None:
+            (self._basetemp / LOCK_FILE).unlink(missing_ok=True)
+
+
+@fixture(scope="session")
+def tmp_path_factory(
+    request: FixtureRequest,
+) -> Generator[TempPathFactory, None, None]:
+    """Session fixture creating the temporary directories of the session."""
+
+    factory = TempPathFactory(
+        root=request.config.tmp_path_root,
+        retention_count=request.config.tmp_path_retention_count,
     )
-    for folder in temp_folders[:-MAX_TEMP_FOLDERS]:
-        _recursive_remove(folder)
+    yield factory
+    factory.release()
 
 
 @fixture
-def tmp_path(request: FixtureRequest) -> Path:
+def tmp_path(tmp_path_factory: TempPathFactory, request: FixtureRequest) -> Path:
     """Fixture to create a temporary path."""
 
-    _delete_old_temp_folders()
-    return _get_test_temp_directory(
-        test_name=request.name, session_id=request.session_info.id
-    )
+    return tmp_path_factory.mktemp(request.name, numbered=False)
@@ -0,0 +1,73 @@
+"""This module is the entry point for the host lane subprocess, that runs the
+tests that do not need bpy in the host python interpreter (see host_lane option)."""
+import time
+
+# Start of the entry point, for the startup trace
+_ENTRY_NS = time.time_ns()
+
+# pylint: disable=wrong-import-position
+import sys
+import traceback
+from pathlib import Path
+
+# pylint: enable=wrong-import-position
+
+# ===================================================================================
+# Add the bpytest and bpytest_config modules to the sys.path
+# ===================================================================================
+# The blender module directory is inserted first, so the bpytest test framework
+# is imported instead of the bpytest command line package installed in the host
+sys.path.insert(0, Path(Path(__file__).parent.parent / "common").as_posix())
+sys.path.insert(0, Path(__file__).parent.as_posix())
+from bpytest_config import BpyTestConfig  # pylint: disable=wrong-import-position
+from bpytest_metrics import metrics  # pylint: disable=wrong-import-position
+from bpytrace import now_ns, tracer  # pylint: disable=wrong-import-position
+
+from bpytest import wrap_session  # pylint: disable=wrong-import-position
+from bpytest.lane import HOST_LANE  # pylint: disable=wrong-import-position
+
+tracer.add("imports", _ENTRY_NS)
+metrics.entry_ns = _ENTRY_NS
+
+# ===================================================================================
+# End of imports and sys.path modifications
+# ===================================================================================
+def main(config: BpyTestConfig, instance_id: str) -> int:
+    """Main function"""
+
+    for path in config.include:
+        sys.path.append(path)
+
+    sys.exit(wrap_session(config, instance_id, lane=HOST_LANE))
+
+
+try:
+    config_start_ns = now_ns()
+    instance_id = ""
+    data_json: str = ""
+    for arg in sys.argv:
+        if arg.startswith("config="):
+            data_json = arg[7:]
+        if arg.startswith("instance_id"):
+            instance_id = arg.split("=")[1]
+
+    if not data_json:
+        raise ValueError("No config argument found")
+    if not instance_id:
+        raise ValueError("No instance_id argument found")
+
+    config = BpyTestConfig()
+    config.deserialize(data_json)
+
+    tracer.process = instance_id
+    tracer.add("config", config_start_ns)
+    metrics.add_time("config", (now_ns() - config_start_ns) / 1e9)
+    tracer.whole_session = config.trace_session
+    if not config.startup_trace and not config.trace_session:
+        tracer.disable()
+
+    main(config, instance_id)
+except Exception as e:
+    print(e)
+    print(traceback.format_exc())
+    raise e
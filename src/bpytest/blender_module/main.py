@@ -1,4 +1,10 @@
 """This module is the entry point for the session blender subprocess."""
+import time
+
+# Start of the entry point, for the startup trace
+_ENTRY_NS = time.time_ns()
+
+# pylint: disable=wrong-import-position
 import os
 import sys
 import traceback
@@ -6,6 +12,8 @@ from pathlib import Path
 
 import bpy
 
+# pylint: enable=wrong-import-position
+
 # ===================================================================================
 # Check to make sure that bpytest and bpytest_config modules are not already imported
 # ===================================================================================
@@ -36,22 +44,32 @@ except ImportError:
 # to the main entry point is also accessible inside the blender subprocess
 sys.path.append(Path(Path(__file__).parent.parent / "common").as_posix())
 from bpytest_config import BpyTestConfig  # pylint: disable=wrong-import-position
+from bpytest_metrics import metrics  # pylint: disable=wrong-import-position
+from bpytrace import now_ns, tracer  # pylint: disable=wrong-import-position
 
 # Append current work directory to sys.path so bpytest is accessible
 # inside the blender subprocess
 sys.path.append(Path(__file__).parent.as_posix())
 from bpytest import wrap_session  # pylint: disable=wrong-import-position
 
+tracer.add("imports", _ENTRY_NS)
+metrics.entry_ns = _ENTRY_NS
 
 # ===================================================================================
 # End of imports and sys.path modifications
 # ===================================================================================
-def main(config: BpyTestConfig, instance_id: str) -> int:
+def main(config: BpyTestConfig, instance_id: str, mode: str) -> int:
     """Main function"""
 
     for path in config.include:
         sys.path.append(path)
-    
+
+    # The serve mode keeps running the tests requested by the main process
+    if mode == "serve":
+        from bpytest.server import serve
+
+        sys.exit(serve(config, instance_id))
+
     sys.exit(wrap_session(config, instance_id))
     
 def _link_addons(link_addons: list[str]) -> list[str]:
@@ -80,13 +98,17 @@ def _link_addons(link_addons: list[str]) -> list[str]:
         
     return addons_to_enable
 try:
+    config_start_ns = now_ns()
     instance_id = ""
     data_json: str = ""
+    mode = ""
     for arg in sys.argv:
         if arg.startswith("config="):
             data_json = arg[7:]
         if arg.startswith("instance_id"):
             instance_id = arg.split("=")[1]
+        if arg.startswith("mode="):
+            mode = arg[5:]
 
     if not data_json:
         raise ValueError("No config argument found")
@@ -95,14 +117,22 @@ try:
 
     config = BpyTestConfig()
     config.deserialize(data_json)
-    
+
+    tracer.process = instance_id
+    tracer.add("config", config_start_ns)
+    metrics.add_time("config", (now_ns() - config_start_ns) / 1e9)
+    tracer.whole_session = config.trace_session
+    if not config.startup_trace and not config.trace_session:
+        tracer.disable()
+
     if config.link_addons:
-        new_addons_to_enable = _link_addons(config.link_addons)
+        with tracer.span("link_addons"), metrics.timer("link_addons"):
+            new_addons_to_enable = _link_addons(config.link_addons)
         # Add the linked addons to the enable_addons list
         config.enable_addons = config.enable_addons + new_addons_to_enable
         print(f"Linked addons added to enable list: {new_addons_to_enable}")
 
-    main(config, instance_id)
+    main(config, instance_id, mode)
 except Exception as e:
     print(e)
     print(traceback.format_exc())
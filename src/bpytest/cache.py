@@ -0,0 +1,77 @@
+"""
+bpytest.cache
+~~~~~~~~~~~~~
+
+Data persisted between test sessions in the .bpytest_cache directory of the
+project, e.g. the tests that failed in the last session, the test
+durations and the checkpoint of an interrupted session.
+
+Classes:
+    Cache
+        Json values stored by key, one file per key.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+CACHE_DIR = ".bpytest_cache"
+
+# Node ids of the tests that failed in the last session, with the
+# instance ids where they failed
+LASTFAILED_KEY = "lastfailed"
+
+# Durations of the last run of each test, by node id, with the time spent
+# setting it up, to estimate the cost of a test order
+DURATIONS_KEY = "durations"
+
+# Version, python version and build hash of the Blender executables, by
+# path, with the modification time and size of the probed executable
+BLENDER_VERSIONS_KEY = "blender_versions"
+
+# Results of the tests of the running session, removed when it ends
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+
+class Cache:
+    """Json values stored by key in the cache directory"""
+
+    def __init__(self, root: Path):
+        """
+        Args:
+            root (Path): Directory of the project, where the cache directory is created
+        """
+
+        self._directory = root / CACHE_DIR
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}.json"
+
+    def file(self, name: str) -> Path:
+        """Path of a file written directly in the cache directory (e.g. appended
+        to), the directory is created if needed"""
+
+        if not self._directory.exists():
+            self._directory.mkdir(parents=True, exist_ok=True)
+            # The cache is not meant to be committed
+            (self._directory / ".gitignore").write_text("*\n", encoding="utf-8")
+        return self._directory / name
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the value of a key, default if it is not stored or invalid"""
+
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return default
+
+    def set(self, key: str, value: Any) -> None:
+        """Store the value of a key, replacing the file atomically"""
+
+        path = self.file(f"{key}.json")
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(value, file, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
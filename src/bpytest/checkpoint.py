@@ -0,0 +1,219 @@
+"""
+bpytest.checkpoint
+~~~~~~~~~~~~~~~~~~
+
+Checkpoint of the running session: the result of every test is appended to
+a json lines file of the cache directory as soon as it arrives, so the results
+of an interrupted session (Ctrl+C, a preempted CI job) are not lost. The file
+is removed when the session ends.
+
+`bpytest --resume` reads the checkpoint, reports again the results of the
+tests already run with the same configuration and Blender executable, and
+only runs the remaining tests. The first line of the file has a key for each
+instance: a hash of the configuration of the test sessions and of the
+executable (path, modification time and size), the results of an instance
+are only reused if its key did not change.
+
+Classes:
+    SessionCheckpoint
+        Report appending the test results to the checkpoint file.
+
+Functions:
+    instance_keys
+        Key of the configuration and executable of each instance.
+    read_checkpoint
+        Results of the checkpoint that can be reused.
+    open_checkpoint
+        Checkpoint of a new session, with the results of the interrupted one.
+    resume_tests
+        Report the reused results, returns the tests still to run.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from .common.bpytest_index import TestEntry  # type: ignore[import]
+
+# Version of the checkpoint file format
+CHECKPOINT_VERSION = 1
+
+# Session config values that do not change the results of the tests
+_IGNORED_CONFIG = ("test_plan", "startup_trace", "trace_session", "metrics")
+
+
+def _executable_identity(executable: str) -> str:
+    """Path, modification time and size of an executable"""
+
+    path = Path(executable).absolute()
+    try:
+        stat = path.stat()
+    except OSError:
+        return path.as_posix()
+    return f"{path.as_posix()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def instance_keys(config_json: str, instances: dict[str, str]) -> dict[str, str]:
+    """Key of each instance, changed by any change of the configuration of the
+    test sessions or of the executable of the instance
+
+    Args:
+        config_json (str): Serialized configuration of the test sessions
+        instances (dict[str, str]): Executable of each instance id
+    """
+
+    config = json.loads(config_json)
+    for name in _IGNORED_CONFIG:
+        config.pop(name, None)
+    config_text = json.dumps(config, sort_keys=True)
+    return {
+        instance_id: hashlib.sha256(
+            f"{config_text}\n{_executable_identity(executable)}".encode("utf-8")
+        ).hexdigest()
+        for instance_id, executable in instances.items()
+    }
+
+
+def read_checkpoint(path: Path, keys: dict[str, str]) -> list[dict[str, Any]] | None:
+    """Test results and instance results of the checkpoint whose instance key
+    did not change, None if there is no checkpoint"""
+
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            lines = file.readlines()
+    except OSError:
+        return None
+
+    events = []
+    for line in lines:
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            # Last line of a session killed while writing it
+            continue
+    if not events or events[0].get("version") != CHECKPOINT_VERSION:
+        return None
+
+    stored_keys = events[0]["instances"]
+    return [
+        event
+        for event in events[1:]
+        if keys.get(event["instance_id"]) is not None
+        and keys.get(event["instance_id"]) == stored_keys.get(event["instance_id"])
+    ]
+
+
+class SessionCheckpoint:
+    """Report appending every test result to the checkpoint file, flushed
+    after every line, the file is removed when the session ends"""
+
+    def __init__(self, path: Path, keys: dict[str, str]):
+        """
+        Args:
+            path (Path): Path of the checkpoint file, replaced
+            keys (dict[str, str]): Key of each instance, see instance_keys
+        """
+
+        self._path = path
+        self._file = open(path, "w", encoding="utf-8")
+        self._write(
+            {"event": "checkpoint", "version": CHECKPOINT_VERSION, "instances": keys}
+        )
+
+    def _write(self, data: dict[str, Any]) -> None:
+        self._file.write(json.dumps(data) + "\n")
+        self._file.flush()
+
+    def add_result(self, event: dict[str, Any]) -> None:
+        """Add a test result event"""
+        self._write(event)
+
+    def add_instance_result(self, event: dict[str, Any]) -> None:
+        """Add the result of the session of a single instance"""
+        self._write(event)
+
+    def close(self) -> None:
+        """The session ended, remove the checkpoint"""
+
+        self._file.close()
+        self._path.unlink(missing_ok=True)
+
+
+def open_checkpoint(
+    path: Path, config_json: str, instances: dict[str, str], resume: bool
+) -> tuple[SessionCheckpoint, list[dict[str, Any]] | None]:
+    """Checkpoint of a session running the tests locally, with the results
+    of the interrupted session to reuse if resume is set
+
+    Args:
+        path (Path): Path of the checkpoint file
+        config_json (str): Serialized configuration of the test sessions
+        instances (dict[str, str]): Executable of each instance id
+        resume (bool): Read the results of the interrupted session first
+
+    Returns:
+        tuple[SessionCheckpoint, list[dict[str, Any]] | None]: The checkpoint
+            and the results to reuse, None without resume or checkpoint
+    """
+
+    keys = instance_keys(config_json, instances)
+    resumed = None
+    if resume:
+        resumed = read_checkpoint(path, keys)
+        if resumed is None:
+            print("No session checkpoint to resume, every selected test runs")
+    return SessionCheckpoint(path, keys), resumed
+
+
+def resume_tests(
+    instance_tests: "dict[str, list[TestEntry]]",
+    events: list[dict[str, Any]],
+    handle_event: Callable[[dict[str, Any]], Any],
+) -> "dict[str, list[TestEntry]]":
+    """Report the results of the interrupted session again, with the results
+    of the instances whose session ended before the interruption
+
+    Args:
+        instance_tests (dict[str, list[TestEntry]]): Selected tests of each instance
+        events (list[dict[str, Any]]): Results to reuse, see read_checkpoint
+        handle_event (Callable[[dict[str, Any]], Any]): Called with every
+            reused result
+
+    Returns:
+        dict[str, list[TestEntry]]: Tests still to run of each instance
+    """
+
+    nodeids = {
+        instance_id: {entry.nodeid for entry in entries}
+        for instance_id, entries in instance_tests.items()
+    }
+    finished: dict[str, set[str]] = {instance_id: set() for instance_id in nodeids}
+    for event in events:
+        if event["event"] != "test_result":
+            continue
+        if event["nodeid"] not in nodeids.get(event["instance_id"], ()):
+            continue
+        if event["nodeid"] in finished[event["instance_id"]]:
+            continue
+        finished[event["instance_id"]].add(event["nodeid"])
+        handle_event(event)
+
+    remaining = {
+        instance_id: [
+            entry for entry in entries if entry.nodeid not in finished[instance_id]
+        ]
+        for instance_id, entries in instance_tests.items()
+    }
+    for event in events:
+        if event["event"] == "instance_result" and not remaining.get(
+            event["instance_id"], True
+        ):
+            handle_event(event)
+
+    print(
+        "Resuming the interrupted session, "
+        f"{sum(len(done) for done in finished.values())} test results reused"
+    )
+    return remaining
@@ -1,12 +1,31 @@
+import json
 import sys
-from typing import Any
+from typing import Any, TextIO
+
+EVENT_PREFIX = "[bpytest-event]"
+
+# Stream where bpyprint and bpyevent write, sys.stdout if not set.
+# Set while the test output is captured, so the messages still reach the
+# main process instead of the capture.
+_output_stream: TextIO | None = None
+
+
+def set_output_stream(stream: TextIO | None):
+    """Set the stream used by bpyprint and bpyevent, None to use sys.stdout"""
+    global _output_stream  # pylint: disable=global-statement
+    _output_stream = stream
+
+
+def _get_output_stream() -> TextIO:
+    return _output_stream or sys.stdout
 
 
 def bpyprint(string: Any, flush: bool = True):
     """Prints a string to the console with a specific color and formatting."""
-    print("[bpytest]" + str(string))
+    stream = _get_output_stream()
+    print("[bpytest]" + str(string), file=stream)
     if flush:
-        sys.stdout.flush()
+        stream.flush()
 
 
 def is_bpyprint(string: str) -> bool:
@@ -17,3 +36,21 @@ def is_bpyprint(string: str) -> bool:
 def decode_bpyprint(string: str) -> str:
     """Decode the string from bpyprint"""
     return string.replace("[bpytest]", "")
+
+
+def bpyevent(event: str, **data: Any):
+    """Prints a machine readable event to the console, used by the test session
+    subprocesses to report structured data (e.g. test results) to the main process."""
+    stream = _get_output_stream()
+    print(EVENT_PREFIX + json.dumps({"event": event, **data}), file=stream)
+    stream.flush()
+
+
+def is_bpyevent(string: str) -> bool:
+    """Check if the string is from bpyevent"""
+    return string.startswith(EVENT_PREFIX)
+
+
+def decode_bpyevent(string: str) -> dict[str, Any]:
+    """Decode the event data from bpyevent"""
+    return json.loads(string[len(EVENT_PREFIX) :])
@@ -0,0 +1,132 @@
+"""
+bpytest.common.bpytest_addons
+~~~~~~~~~~~~~~
+
+Addons required by each test, so the test session only enables the addons a
+test needs. The addons of a test are, in order:
+
+- the enable_addons and link_addons settings, required by every test
+- the `addons` marks of the conftest files of the test directory and its
+  parent directories (module level `bpytestmark` variable of the conftest)
+- the `addons` marks of the test function and of its module
+
+Marks are read from the source (see bpytest_ast), the addon names must be
+literal strings.
+
+Classes:
+    AddonState
+        Addons enabled in the Blender session.
+
+Functions:
+    read_directory_marks
+        Marks of the conftest files, by directory.
+    required_addons
+        Addons required by a test.
+"""
+
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    from .bpytest_ast import SourceExpression, StaticMark, extract_module_marks
+except ImportError:
+    # Imported as a top level module inside Blender
+    from bpytest_ast import (  # type: ignore[no-redef]
+        SourceExpression,
+        StaticMark,
+        extract_module_marks,
+    )
+
+# Name of the mark listing the addons required by a test
+ADDONS_MARK = "addons"
+
+
+def read_directory_marks(conftest_files: Iterable[Path]) -> dict[Path, list[StaticMark]]:
+    """Marks of the module level bpytestmark variable of the conftest files,
+    by (absolute) directory. Files that can not be parsed are skipped"""
+
+    directory_marks: dict[Path, list[StaticMark]] = {}
+    for conftest_file in conftest_files:
+        try:
+            marks = extract_module_marks(conftest_file)
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            continue
+        if marks:
+            directory_marks[conftest_file.parent.absolute()] = marks
+    return directory_marks
+
+
+def _mark_addons(marks: Iterable[StaticMark]) -> list[str]:
+    """Addon names of the addons marks"""
+    return [
+        argument
+        for mark in marks
+        if mark.name == ADDONS_MARK
+        for argument in mark.args
+        if isinstance(argument, str) and not isinstance(argument, SourceExpression)
+    ]
+
+
+def required_addons(
+    filepath: Path,
+    marks: Iterable[StaticMark],
+    directory_marks: dict[Path, list[StaticMark]],
+    global_addons: Iterable[str] = (),
+) -> list[str]:
+    """Addons required by a test, without duplicates
+
+    Args:
+        filepath (Path): Test file
+        marks (Iterable[StaticMark]): Marks of the test, including its module marks
+        directory_marks (dict[Path, list[StaticMark]]): Marks of the conftest
+            files, by directory (see read_directory_marks)
+        global_addons (Iterable[str]): Addons required by every test
+    """
+
+    addons = list(global_addons)
+    # Outer directories first
+    for directory in reversed(filepath.absolute().parents):
+        addons += _mark_addons(directory_marks.get(directory, []))
+    addons += _mark_addons(marks)
+    return list(dict.fromkeys(addons))
+
+
+class AddonState:
+    """Addons enabled in the Blender session, to enable and disable only the
+    difference between the addons of consecutive tests"""
+
+    def __init__(self) -> None:
+        self.enabled: list[str] = []
+        # Preferences of each enabled addon right after it was enabled,
+        # restored by the resets keeping the addons enabled
+        self.preferences: dict[str, dict[str, Any]] = {}
+
+    def clear(self) -> None:
+        """Every addon was disabled, e.g. by a factory reset"""
+        self.enabled = []
+        self.preferences = {}
+
+    def difference(self, required: Iterable[str]) -> tuple[list[str], list[str]]:
+        """Addons to disable and addons to enable for the next test, without
+        changing the state"""
+
+        required = list(required)
+        to_disable = [addon for addon in self.enabled if addon not in required]
+        to_enable = [addon for addon in required if addon not in self.enabled]
+        return to_disable, to_enable
+
+    def update(self, required: Iterable[str]) -> tuple[list[str], list[str]]:
+        """Set the addons required by the next test, once they are enabled
+
+        Returns:
+            tuple[list[str], list[str]]: Addons to disable and addons to enable
+        """
+
+        required = list(required)
+        to_disable, to_enable = self.difference(required)
+        for addon in to_disable:
+            self.preferences.pop(addon, None)
+        self.enabled = [
+            addon for addon in self.enabled if addon in required
+        ] + to_enable
+        return to_disable, to_enable
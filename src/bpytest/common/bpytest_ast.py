@@ -0,0 +1,398 @@
+"""
+bpytest.common.bpytest_ast
+~~~~~~~~~~~~~~
+
+Static (AST based) inspection of test files, used to learn about a test
+module without importing it, which is not possible outside of Blender
+when the module imports bpy.
+
+Classes:
+    StaticMark
+        A mark applied to a test function or module, as written in the source.
+    StaticFixture
+        A fixture function defined in a file, as written in the source.
+    ImportGraph
+        Follows the imports of python files found in the search paths to
+        decide if a file needs the Blender python API to be imported.
+
+Functions:
+    extract_marks
+        Returns the marks of every test function of a file.
+    extract_module_marks
+        Returns the marks of the module level bpytestmark variable of a file.
+    extract_fixture_names
+        Returns the fixtures requested by every test function of a file.
+    extract_fixtures
+        Returns the fixture functions defined in a file.
+"""
+
+import ast
+import importlib.util
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Name of the module level variable used to mark every test of a module
+MODULE_MARK_VARIABLE = "bpytestmark"
+
+# Modules only available inside of the Blender python environment
+BLENDER_MODULES = frozenset(
+    {
+        "_bpy",
+        "addon_utils",
+        "aud",
+        "bgl",
+        "bl_app_override",
+        "bl_i18n_utils",
+        "bl_math",
+        "bl_operators",
+        "bl_ui",
+        "blf",
+        "bmesh",
+        "bpy",
+        "bpy_extras",
+        "bpy_types",
+        "freestyle",
+        "gpu",
+        "gpu_extras",
+        "idprop",
+        "imbuf",
+        "mathutils",
+        "rna_prop_ui",
+    }
+)
+
+# Modules that are importable by the test session in any interpreter
+FRAMEWORK_MODULES = frozenset({"bpytest", "bpytest_config", "bpyprint"})
+
+
+class SourceExpression(str):
+    """Source code of a mark argument that is not a literal value"""
+
+
+@dataclass
+class StaticMark:
+    """Mark applied to a test function or module, as written in the source"""
+
+    name: str
+    args: tuple[Any, ...] = ()
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class StaticFixture:
+    """Fixture function defined in a file, as written in the source"""
+
+    name: str
+    scope: str = "function"
+    # Names of the arguments, the fixtures requested by the fixture
+    arguments: list[str] = field(default_factory=list)
+
+
+def _argument_value(node: ast.expr) -> Any:
+    """Literal value of a mark argument, or its source if not a literal"""
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return SourceExpression(ast.unparse(node))
+
+
+def _parse_mark(node: ast.expr) -> StaticMark | None:
+    """Parse a `bpytest.mark.name` or `bpytest.mark.name(*args, **kwargs)` node"""
+
+    call: ast.Call | None = None
+    if isinstance(node, ast.Call):
+        call = node
+        node = node.func
+
+    if not isinstance(node, ast.Attribute):
+        return None
+    parent = node.value
+    parent_name = (
+        parent.attr
+        if isinstance(parent, ast.Attribute)
+        else parent.id if isinstance(parent, ast.Name) else ""
+    )
+    if parent_name != "mark":
+        return None
+
+    if call is None:
+        return StaticMark(node.attr)
+    return StaticMark(
+        node.attr,
+        args=tuple(_argument_value(arg) for arg in call.args),
+        kwargs={
+            keyword.arg: _argument_value(keyword.value)
+            for keyword in call.keywords
+            if keyword.arg is not None
+        },
+    )
+
+
+def _parse_marks(node: ast.expr) -> list[StaticMark]:
+    """Parse a single mark or a list/tuple of marks"""
+
+    nodes = node.elts if isinstance(node, (ast.List, ast.Tuple)) else [node]
+    marks = [_parse_mark(item) for item in nodes]
+    return [mark for mark in marks if mark is not None]
+
+
+def parse_file(filepath: Path) -> ast.Module:
+    """Parse a python file"""
+    return ast.parse(
+        filepath.read_text(encoding="utf-8"), filename=filepath.as_posix()
+    )
+
+
+def extract_module_marks(
+    filepath: Path, tree: ast.Module | None = None
+) -> list[StaticMark]:
+    """Return the marks of the module level `bpytestmark` variable of a file,
+    applied to every test of a module, or of a directory in a conftest file"""
+
+    if tree is None:
+        tree = parse_file(filepath)
+
+    module_marks: list[StaticMark] = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == MODULE_MARK_VARIABLE
+            for target in node.targets
+        ):
+            module_marks.extend(_parse_marks(node.value))
+    return module_marks
+
+
+def extract_marks(
+    filepath: Path, tree: ast.Module | None = None
+) -> dict[str, list[StaticMark]]:
+    """Return the marks of each test function of a file, including the marks
+    applied to the whole module with the module level `bpytestmark` variable"""
+
+    if tree is None:
+        tree = parse_file(filepath)
+
+    module_marks = extract_module_marks(filepath, tree)
+
+    marks: dict[str, list[StaticMark]] = {}
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if not node.name.startswith("test_"):
+            continue
+
+        function_marks: list[StaticMark] = []
+        # Decorators are applied bottom to top
+        for decorator in reversed(node.decorator_list):
+            mark = _parse_mark(decorator)
+            if mark is not None:
+                function_marks.append(mark)
+        marks[node.name] = function_marks + module_marks
+
+    return marks
+
+
+def extract_fixture_names(
+    filepath: Path, tree: ast.Module | None = None
+) -> dict[str, list[str]]:
+    """Return the fixtures requested by each test function of a file,
+    the names of its arguments"""
+
+    if tree is None:
+        tree = parse_file(filepath)
+
+    fixtures: dict[str, list[str]] = {}
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if not node.name.startswith("test_"):
+            continue
+        arguments = node.args.posonlyargs + node.args.args + node.args.kwonlyargs
+        fixtures[node.name] = [argument.arg for argument in arguments]
+
+    return fixtures
+
+
+def _parse_fixture_decorator(node: ast.expr) -> str | None:
+    """Scope of a `fixture`, `bpytest.fixture` or `fixture(scope=...)`
+    decorator node, None if the node is not a fixture decorator"""
+
+    call: ast.Call | None = None
+    if isinstance(node, ast.Call):
+        call = node
+        node = node.func
+
+    name = (
+        node.attr
+        if isinstance(node, ast.Attribute)
+        else node.id if isinstance(node, ast.Name) else ""
+    )
+    if name != "fixture":
+        return None
+
+    scope = "function"
+    if call is not None:
+        for keyword in call.keywords:
+            if keyword.arg == "scope":
+                value = _argument_value(keyword.value)
+                if isinstance(value, str) and not isinstance(value, SourceExpression):
+                    scope = value.lower()
+    return scope
+
+
+def extract_fixtures(
+    filepath: Path, tree: ast.Module | None = None
+) -> dict[str, StaticFixture]:
+    """Return the fixture functions defined in a file (e.g. a conftest file),
+    with their scope and the fixtures they request"""
+
+    if tree is None:
+        tree = parse_file(filepath)
+
+    fixtures: dict[str, StaticFixture] = {}
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            scope = _parse_fixture_decorator(decorator)
+            if scope is None:
+                continue
+            arguments = node.args.posonlyargs + node.args.args + node.args.kwonlyargs
+            fixtures[node.name] = StaticFixture(
+                node.name, scope, [argument.arg for argument in arguments]
+            )
+            break
+
+    return fixtures
+
+
+class ImportGraph:
+    """Follows the imports of the python files found in the search paths to
+    decide if a file needs the Blender python API.
+
+    A file needs Blender if it, or any local module it imports (recursively),
+    imports a Blender module or a module that can not be found in the search
+    paths, the standard library or the current interpreter environment.
+    """
+
+    def __init__(self, search_paths: list[Path]):
+        self._search_paths = [Path(path).absolute() for path in search_paths]
+        self._requires_blender: dict[Path, bool] = {}
+        self._files: dict[Path, tuple[bool, list[Path]]] = {}
+        self._external: dict[str, bool] = {}
+
+    def _find_local_module(self, name: str, base_dirs: list[Path]) -> list[Path]:
+        """Files executed when importing a dotted module name found in one of
+        the base directories (package __init__ files included)"""
+
+        parts = name.split(".")
+        for base_dir in base_dirs:
+            files: list[Path] = []
+            directory = base_dir
+            for index, part in enumerate(parts):
+                package_init = directory / part / "__init__.py"
+                module_file = directory / f"{part}.py"
+                if package_init.is_file():
+                    files.append(package_init)
+                    directory = directory / part
+                elif module_file.is_file() and index == len(parts) - 1:
+                    files.append(module_file)
+                else:
+                    break
+            if files:
+                return files
+        return []
+
+    def _external_requires_blender(self, name: str) -> bool:
+        """Check if a module that is not local can only be imported inside Blender"""
+
+        top_level = name.split(".")[0]
+        if top_level in BLENDER_MODULES:
+            return True
+        if top_level in FRAMEWORK_MODULES or top_level in sys.stdlib_module_names:
+            return False
+
+        if top_level not in self._external:
+            try:
+                found = importlib.util.find_spec(top_level) is not None
+            except (ImportError, ValueError):
+                found = False
+            self._external[top_level] = not found
+        return self._external[top_level]
+
+    def _imported_names(self, filepath: Path) -> list[tuple[str, list[Path]]]:
+        """Modules imported by a file, each with the directories where it is searched"""
+
+        tree = parse_file(filepath)
+        imports: list[tuple[str, list[Path]]] = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.append((alias.name, self._search_paths))
+            elif isinstance(node, ast.ImportFrom):
+                base_dirs = self._search_paths
+                if node.level:
+                    # Relative import, resolved from the package of the file
+                    package_dir = filepath.parent
+                    for _ in range(node.level - 1):
+                        package_dir = package_dir.parent
+                    base_dirs = [package_dir]
+
+                module = node.module or ""
+                if module:
+                    imports.append((module, base_dirs))
+                # "from package import name" may import a submodule
+                for alias in node.names:
+                    name = f"{module}.{alias.name}" if module else alias.name
+                    if self._find_local_module(name, base_dirs):
+                        imports.append((name, base_dirs))
+        return imports
+
+    def _inspect_file(self, filepath: Path) -> tuple[bool, list[Path]]:
+        """Check if the file itself imports a Blender (or unknown) module,
+        and return the local files it imports"""
+
+        if filepath in self._files:
+            return self._files[filepath]
+
+        direct = False
+        local_files: list[Path] = []
+        try:
+            imported_names = self._imported_names(filepath)
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            imported_names = []
+            direct = True
+
+        for name, base_dirs in imported_names:
+            files = self._find_local_module(name, base_dirs)
+            if files:
+                local_files.extend(files)
+            elif self._external_requires_blender(name):
+                direct = True
+
+        self._files[filepath] = (direct, local_files)
+        return direct, local_files
+
+    def requires_blender(self, filepath: Path) -> bool:
+        """Check if importing the file needs the Blender python API"""
+
+        filepath = Path(filepath).absolute()
+        if filepath in self._requires_blender:
+            return self._requires_blender[filepath]
+
+        result = False
+        visited: set[Path] = set()
+        pending = [filepath]
+        while pending and not result:
+            current = pending.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+
+            direct, local_files = self._inspect_file(current)
+            result = direct
+            pending.extend(local_files)
+
+        self._requires_blender[filepath] = result
+        return result
@@ -0,0 +1,323 @@
+"""
+bpytest.common.bpytest_compare
+~~~~~~~~~~~~~~
+
+Vectorized comparison of the arrays read from Blender data (image pixels,
+geometry attributes), with NumPy, which is bundled with Blender. Only uses
+NumPy, so it is tested in the host python interpreter.
+
+Classes:
+    ImageComparison
+        Difference metrics of two images.
+    ArrayComparison
+        Mismatching elements of two arrays.
+
+Functions:
+    compare_arrays
+        Compare two arrays element by element, optionally ignoring their order.
+    compare_images
+        Compare two images with a per channel tolerance.
+    structural_similarity
+        Mean SSIM of the luminance of two images.
+    difference_heatmap
+        Image showing where two images differ.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Luminance weights of the RGB channels (Rec. 709)
+LUMINANCE_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+# Side of the square windows of the structural similarity
+SSIM_WINDOW = 8
+# Stabilization constants of the structural similarity, for values in [0, 1]
+SSIM_C1 = 0.01**2
+SSIM_C2 = 0.03**2
+
+
+@dataclass
+class ArrayComparison:
+    """Mismatching elements (rows of the first axis) of two arrays"""
+
+    element_count: int
+    mismatch_count: int
+    # Indices of the first mismatching elements, with their values
+    mismatches: list[tuple[int, Any, Any]]
+    # Maximum absolute difference of all the values
+    max_difference: float
+
+    @property
+    def matches(self) -> bool:
+        """If every element is within the tolerance"""
+        return self.mismatch_count == 0
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.mismatch_count} of {self.element_count} elements differ, "
+            f"max difference {self.max_difference:.6g}"
+        ]
+        for index, actual, expected in self.mismatches:
+            lines.append(f"  [{index}] {actual} != {expected}")
+        if self.mismatch_count > len(self.mismatches):
+            lines.append(f"  ... {self.mismatch_count - len(self.mismatches)} more")
+        return "\n".join(lines)
+
+
+def _sort_elements(array: "np.ndarray") -> "np.ndarray":
+    """Elements of an array in a canonical order, sorted by their values"""
+    import numpy as np
+
+    rows = array.reshape(len(array), -1)
+    # lexsort sorts by the last key first
+    order = np.lexsort(rows.T[::-1]) if rows.shape[1] else np.arange(len(rows))
+    return array[order]
+
+
+def _unmatched_elements(
+    actual_rows: "np.ndarray",
+    expected_rows: "np.ndarray",
+    mismatched: "np.ndarray",
+    rtol: float,
+    atol: float,
+) -> "np.ndarray":
+    """Mismatching elements of two sorted arrays that are not within the
+    tolerance of another mismatching expected element. Values within the
+    tolerance can sort in a different order, e.g. the rows (0.10001, 1) and
+    (0.10002, 0) against (0.10001, 0) and (0.10003, 1), so the mismatching
+    elements are matched again, greedily, each expected element once"""
+    import numpy as np
+
+    floating = actual_rows.dtype.kind in "fc" or expected_rows.dtype.kind in "fc"
+    candidates = list(mismatched)
+    unmatched = []
+    for index in mismatched:
+        remaining = expected_rows[candidates]
+        if floating:
+            close = np.isclose(
+                actual_rows[index], remaining, rtol=rtol, atol=atol, equal_nan=True
+            )
+        else:
+            close = actual_rows[index] == remaining
+        found = np.flatnonzero(close.all(axis=1))
+        if len(found):
+            candidates.pop(int(found[0]))
+        else:
+            unmatched.append(index)
+    return np.array(unmatched, dtype=np.intp)
+
+
+def compare_arrays(
+    actual: "np.ndarray",
+    expected: "np.ndarray",
+    rtol: float = 1e-5,
+    atol: float = 1e-6,
+    ignore_order: bool = False,
+    max_report: int = 10,
+) -> ArrayComparison:
+    """Compare two arrays element by element (rows of the first axis), with
+    the tolerance of numpy.allclose: |actual - expected| <= atol + rtol * |expected|
+
+    Args:
+        actual (np.ndarray): Array to check
+        expected (np.ndarray): Expected array, with the same shape
+        rtol (float): Relative tolerance
+        atol (float): Absolute tolerance
+        ignore_order (bool): Sort the elements of both arrays before comparing
+            them, for data whose element order is not stable. The elements
+            that do not match after sorting are matched with any other
+            mismatching element within the tolerance
+        max_report (int): Number of mismatching elements reported
+    """
+    import numpy as np
+
+    if actual.shape != expected.shape:
+        raise ValueError(
+            f"Array shape {actual.shape} differs from the expected {expected.shape}"
+        )
+
+    if ignore_order and len(actual):
+        actual = _sort_elements(actual)
+        expected = _sort_elements(expected)
+
+    actual_rows = actual.reshape(len(actual), -1)
+    expected_rows = expected.reshape(len(expected), -1)
+    if actual_rows.dtype.kind in "fc" or expected_rows.dtype.kind in "fc":
+        close = np.isclose(actual_rows, expected_rows, rtol=rtol, atol=atol, equal_nan=True)
+        difference = np.abs(actual_rows.astype(np.float64) - expected_rows)
+        max_difference = float(np.nanmax(difference, initial=0.0))
+    else:
+        close = actual_rows == expected_rows
+        max_difference = float(
+            np.abs(actual_rows.astype(np.int64) - expected_rows.astype(np.int64)).max(
+                initial=0
+            )
+        )
+
+    mismatched = np.flatnonzero(~close.all(axis=1))
+    if ignore_order and len(mismatched):
+        mismatched = _unmatched_elements(
+            actual_rows, expected_rows, mismatched, rtol, atol
+        )
+    return ArrayComparison(
+        element_count=len(actual),
+        mismatch_count=len(mismatched),
+        mismatches=[
+            (int(index), actual[index].tolist(), expected[index].tolist())
+            for index in mismatched[:max_report]
+        ],
+        max_difference=max_difference,
+    )
+
+
+@dataclass
+class ImageComparison:
+    """Difference metrics of an image compared with its expected image"""
+
+    # Maximum absolute difference of each channel
+    max_difference: tuple[float, ...]
+    # Fraction of the pixels with a channel difference above the tolerance
+    mismatch_fraction: float
+    # Root mean square error of all the channels
+    rmse: float
+    # Peak signal to noise ratio in dB, for values in [0, 1] (inf if equal)
+    psnr: float
+    # Mean structural similarity of the luminance, 1.0 if equal
+    ssim: float
+
+    def failures(
+        self,
+        max_mismatch_fraction: float = 0.0,
+        min_psnr: float | None = None,
+        min_ssim: float | None = None,
+    ) -> list[str]:
+        """Reasons the comparison fails the thresholds, empty if it passes"""
+
+        failures = []
+        if self.mismatch_fraction > max_mismatch_fraction:
+            failures.append(
+                f"{self.mismatch_fraction:.4%} of the pixels differ more than the "
+                f"tolerance (allowed {max_mismatch_fraction:.4%}), max channel "
+                f"difference {', '.join(f'{value:.4f}' for value in self.max_difference)}"
+            )
+        if min_psnr is not None and self.psnr < min_psnr:
+            failures.append(f"PSNR {self.psnr:.2f} dB below {min_psnr:.2f} dB")
+        if min_ssim is not None and self.ssim < min_ssim:
+            failures.append(f"SSIM {self.ssim:.4f} below {min_ssim:.4f}")
+        return failures
+
+    def __str__(self) -> str:
+        return (
+            f"mismatch {self.mismatch_fraction:.4%}, RMSE {self.rmse:.6f}, "
+            f"PSNR {self.psnr:.2f} dB, SSIM {self.ssim:.4f}"
+        )
+
+
+def _luminance(image: "np.ndarray") -> "np.ndarray":
+    """Luminance of a (height, width, channels) image"""
+    import numpy as np
+
+    if image.shape[2] >= 3:
+        return image[..., :3] @ np.asarray(LUMINANCE_WEIGHTS, dtype=np.float32)
+    return image[..., 0]
+
+
+def _window_sums(values: "np.ndarray", window: int) -> "np.ndarray":
+    """Sum of every window x window block of a 2D array, with an integral image"""
+    import numpy as np
+
+    integral = np.zeros(
+        (values.shape[0] + 1, values.shape[1] + 1), dtype=np.float64
+    )
+    np.cumsum(np.cumsum(values, axis=0), axis=1, out=integral[1:, 1:])
+    return (
+        integral[window:, window:]
+        - integral[:-window, window:]
+        - integral[window:, :-window]
+        + integral[:-window, :-window]
+    )
+
+
+def structural_similarity(
+    actual: "np.ndarray", expected: "np.ndarray", window: int = SSIM_WINDOW
+) -> float:
+    """Mean structural similarity (SSIM) of the luminance of two images,
+    over every window x window block, with uniform weights"""
+
+    x = _luminance(actual).astype("float64")
+    y = _luminance(expected).astype("float64")
+    window = max(1, min(window, *x.shape))
+    count = window * window
+
+    mean_x = _window_sums(x, window) / count
+    mean_y = _window_sums(y, window) / count
+    var_x = _window_sums(x * x, window) / count - mean_x * mean_x
+    var_y = _window_sums(y * y, window) / count - mean_y * mean_y
+    covariance = _window_sums(x * y, window) / count - mean_x * mean_y
+
+    ssim = ((2 * mean_x * mean_y + SSIM_C1) * (2 * covariance + SSIM_C2)) / (
+        (mean_x**2 + mean_y**2 + SSIM_C1) * (var_x + var_y + SSIM_C2)
+    )
+    return float(ssim.mean())
+
+
+def compare_images(
+    actual: "np.ndarray",
+    expected: "np.ndarray",
+    tolerance: float | Sequence[float] = 1 / 255,
+) -> ImageComparison:
+    """Compare two (height, width, channels) images with values in [0, 1]
+
+    Args:
+        actual (np.ndarray): Image to check
+        expected (np.ndarray): Expected (golden) image, with the same shape
+        tolerance (float | Sequence[float]): Maximum absolute difference of a
+            channel, for all the channels or one per channel
+    """
+    import numpy as np
+
+    if actual.shape != expected.shape:
+        raise ValueError(
+            f"Image shape {actual.shape} differs from the expected {expected.shape}"
+        )
+
+    difference = np.abs(
+        actual.astype(np.float32, copy=False) - expected.astype(np.float32, copy=False)
+    )
+    tolerances = np.broadcast_to(
+        np.asarray(tolerance, dtype=np.float32), (actual.shape[2],)
+    )
+    mismatched = (difference > tolerances).any(axis=2)
+    mse = float(np.mean(np.square(difference, dtype=np.float64)))
+
+    return ImageComparison(
+        max_difference=tuple(
+            float(value) for value in difference.max(axis=(0, 1), initial=0.0)
+        ),
+        mismatch_fraction=float(mismatched.mean()) if mismatched.size else 0.0,
+        rmse=mse**0.5,
+        psnr=float("inf") if mse == 0 else float(-10 * np.log10(mse)),
+        ssim=structural_similarity(actual, expected),
+    )
+
+
+def difference_heatmap(actual: "np.ndarray", expected: "np.ndarray") -> "np.ndarray":
+    """RGBA image of the maximum channel difference of every pixel, from
+    black (equal) through red to yellow (largest difference)"""
+    import numpy as np
+
+    difference = np.abs(
+        actual.astype(np.float32, copy=False) - expected.astype(np.float32, copy=False)
+    ).max(axis=2)
+    peak = float(difference.max(initial=0.0))
+    if peak > 0:
+        difference /= peak
+
+    heatmap = np.ones((*difference.shape, 4), dtype=np.float32)
+    heatmap[..., 0] = np.clip(difference * 2, 0, 1)
+    heatmap[..., 1] = np.clip(difference * 2 - 1, 0, 1)
+    heatmap[..., 2] = 0
+    return heatmap
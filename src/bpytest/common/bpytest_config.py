@@ -132,6 +132,90 @@ class ConfigFilePackageLevel(_BaseConfigFile):
             )
         },
     )
+
+    junitxml: str = field(
+        default="",
+        metadata={
+            "help": (
+                "Path of a JUnit XML report written while the tests run. "
+                "Results of every blender executable are merged in the same report."
+            )
+        },
+    )
+
+    report_json: str = field(
+        default="",
+        metadata={
+            "help": (
+                "Path of a json lines report (one json object per test result) "
+                "written while the tests run. "
+                "Results of every blender executable are merged in the same report."
+            )
+        },
+    )
+
+    cov_report: list[str] = field(
+        default_factory=lambda: ["term"],
+        metadata={
+            "help": (
+                "Reports of the line coverage measured with cov: 'term' prints the "
+                "coverage of every file, 'lcov:PATH' and 'json:PATH' write the merged "
+                "lines of every test session as an lcov tracefile or as json."
+            )
+        },
+    )
+
+    trace_file: str = field(
+        default="",
+        metadata={
+            "help": (
+                "Path of a Chrome trace event file (viewable in Perfetto) with the "
+                "spans of the command line (isolation, dependency install, test "
+                "session subprocesses) and of every test session (collection, resets, "
+                "fixture setup and teardown, each test), a track by process."
+            )
+        },
+    )
+
+    metrics_file: str = field(
+        default="",
+        metadata={
+            "help": (
+                "Path of a file with the metrics of the session: duration and count of "
+                "each phase (Blender startup, config, addon linking, conftest import, "
+                "collection, resets, fixture setup and teardown, test bodies, "
+                "reporting), counters and peak memory of every test session. Written "
+                "in the Prometheus text format if the path ends with .prom, as json "
+                "otherwise."
+            )
+        },
+    )
+
+    reorder: bool = field(
+        default=True,
+        metadata={
+            "help": (
+                "Order the selected tests so the tests that need the same addons "
+                "run one after the other and each addon is enabled fewer times. "
+                "The tests of a file always run together. Disabled with "
+                "--no-reorder."
+            )
+        },
+    )
+
+    progress: bool = field(
+        default=True,
+        metadata={
+            "help": (
+                "Show the progress of the tests: completed and total tests, passed "
+                "and failed tests and current test of every blender executable (or "
+                "worker), and the remaining time estimated from the durations of the "
+                "last run of each test. Redrawn below the output on a terminal, "
+                "printed as a line from time to time otherwise. Disabled with "
+                "--no-progress."
+            )
+        },
+    )
     
 @dataclass
 class ConfigFileBlenderLevel(_BaseConfigFile):
@@ -151,6 +235,8 @@ class ConfigFileBlenderLevel(_BaseConfigFile):
         metadata={
             "help": (
                 "List of addon directories to be linked and enabled before running the tests. "
+                "Linked addons are enabled for every test, "
+                "use the @bpytest.mark.addons mark for the addons needed by some tests only. "
             )
         },
     )
@@ -161,6 +247,8 @@ class ConfigFileBlenderLevel(_BaseConfigFile):
                 "List of already installed add-ons to be enabled before running the tests. "
                 "If your add-on is already installed in the Blender installation that you will run the tests, "
                 "use this option to enable it. "
+                "These addons are enabled for every test, "
+                "use the @bpytest.mark.addons mark for the addons needed by some tests only. "
             )
         },
     )
@@ -186,6 +274,54 @@ class ConfigFileBlenderLevel(_BaseConfigFile):
         },
     )
 
+    capture_max_bytes: int = field(
+        default=64 * 1024,
+        metadata={
+            "help": (
+                "Maximum size in bytes of the captured output attached to the report "
+                "of a failed test (head and tail of the output are kept). "
+                "The output of each test is captured in a spool file and discarded "
+                "if the test passes. Not used with -s/--nocapture."
+            )
+        },
+    )
+
+    tmp_path_root: str = field(
+        default="",
+        metadata={
+            "help": (
+                "Root directory of the tmp_path and tmp_path_factory temporary "
+                "directories, the system temporary directory if empty. "
+                "e.g. '/dev/shm' to use a memory file system for tests that save "
+                "and reload .blend files."
+            )
+        },
+    )
+
+    tmp_path_retention_count: int = field(
+        default=3,
+        metadata={
+            "help": (
+                "Number of previous test session temporary directories kept, "
+                "older ones are deleted in the background while the tests run."
+            )
+        },
+    )
+
+    render: dict[str, Any] = field(
+        default_factory=dict,
+        metadata={
+            "help": (
+                "Render profile applied to every scene after each reset and after a "
+                ".blend file is loaded, the [tool.bpytest.render] table: 'samples' "
+                "(Cycles and EEVEE samples), 'resolution_percentage' and "
+                "'max_bounces' are capped, 'denoise = false' disables the Cycles "
+                "denoisers and 'threads' sets the render threads. Tests marked with "
+                "@bpytest.mark.render_profile('full') keep their production settings."
+            )
+        },
+    )
+
 
 @dataclass
 class SessionConfig(_BaseConfig):
@@ -197,7 +333,11 @@ class SessionConfig(_BaseConfig):
     keyword: str = field(
         default="",
         metadata={
-            "help": "Run only tests that match the given keyword expression"
+            "help": (
+                "Run only tests that match the given keyword expression, "
+                "e.g. 'cube and not slow'. A name matches if it is a case insensitive "
+                "substring of the test name, of its file path or of its mark names."
+            )
         },
     )
     nocapture: bool = field(
@@ -209,6 +349,108 @@ class SessionConfig(_BaseConfig):
             )
         },
     )
+    host_lane: bool = field(
+        default=False,
+        metadata={
+            "help": (
+                "Run the tests that do not need bpy in the host python interpreter, "
+                "in parallel with the Blender test sessions. A test runs in the host "
+                "if it is marked with @bpytest.mark.no_bpy, or if neither its module "
+                "nor the local modules it imports (recursively) import bpy or any "
+                "module that is only available inside Blender. Tests whose conftest.py "
+                "files need bpy always run in Blender."
+            )
+        },
+    )
+    startup_trace: bool = field(
+        default=False,
+        metadata={
+            "help": (
+                "Report the duration of each startup phase of the main process and "
+                "the test session subprocesses (imports, configuration, Blender start, "
+                "conftest registration, collection, first test) on a single timeline."
+            )
+        },
+    )
+    trace_session: bool = field(
+        default=False,
+        metadata={
+            "help": (
+                "Record the spans of the whole test session (collection, every "
+                "reset, fixture setup and teardown, each test) and send them to the "
+                "command line, set by trace_file."
+            )
+        },
+    )
+    fast_start: bool = field(
+        default=False,
+        metadata={
+            "help": (
+                "Skip the Blender factory reset before the first test, since Blender "
+                "was just started with --factory-startup. Do not use it if conftest "
+                "files or test modules change the Blender data when imported."
+            )
+        },
+    )
+    markexpr: str = field(
+        default="",
+        metadata={
+            "help": (
+                "Run only tests whose marks match the given mark expression, "
+                "e.g. 'slow and not gpu'. Marks are read from the test files source."
+            )
+        },
+    )
+    update_golden: bool = field(
+        default=False,
+        metadata={
+            "help": (
+                "Write the compared images as the new golden images instead of "
+                "comparing them (assert_image_matches fixture)"
+            )
+        },
+    )
+    test_plan: str = field(
+        default="",
+        metadata={
+            "help": (
+                "Json test plan written by the command line after collecting the tests. "
+                "The test session runs only the node ids of the plan, in its order."
+            )
+        },
+    )
+    cov: list[str] = field(
+        default_factory=list,
+        metadata={
+            "help": (
+                "Packages whose line coverage is measured inside the test sessions, "
+                "by module name (e.g. an installed or linked addon) or by directory. "
+                "The coverage of every test session is merged into a single report."
+            )
+        },
+    )
+    metrics: bool = field(
+        default=False,
+        metadata={
+            "help": (
+                "Send the metrics of the test sessions to the command line, "
+                "set by metrics_file."
+            )
+        },
+    )
+    isolate: str = field(
+        default="none",
+        metadata={
+            "help": (
+                "Process isolation of the tests (Linux only). 'fork' runs each test in "
+                "a child process forked from the test session once Blender is started, "
+                "the enable_addons addons are enabled and the conftest files are "
+                "imported, so a test never changes the Blender state of the next tests "
+                "and a crash only fails its test. 'fork-module' forks a child process "
+                "by test file. 'none' runs the tests in the test session process."
+            )
+        },
+    )
 
 
 # ====================================================================
@@ -0,0 +1,370 @@
+"""
+bpytest.common.bpytest_coverage
+~~~~~~~~~~~~~~
+
+Line coverage of python packages, collected inside the Blender test session
+without the coverage package, which is not installed in the python bundled
+with Blender.
+
+Lines are recorded with sys.monitoring on python 3.12+: every line event is
+disabled once it is recorded, and the code objects outside of the measured
+packages are disabled at their first start, so the tests run at almost full
+speed. Older versions, or every sys.monitoring tool id being in use, fall
+back to sys.settrace, tracing only the frames of the measured packages. The
+events disabled by the collector are enabled again with
+sys.monitoring.restart_events() when it stops, which also enables again the
+events disabled by the other tools in use.
+
+Every test session sends its lines in a compact format (line ranges by file
+path relative to the package parent directory, so the data of different
+machines and Blender versions can be merged) and the command line merges the
+data of every session into a single report.
+
+Classes:
+    CoverageData
+        Executable and executed lines by file.
+    LineCollector
+        Records the executed lines of the measured packages.
+
+Functions:
+    executable_lines
+        Lines of a python source file that can be executed.
+    to_ranges, from_ranges
+        Compact representation of a set of line numbers.
+    format_report, format_lcov
+        Text report and lcov export of the coverage data.
+"""
+
+import importlib.util
+import sys
+import threading
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Callable, Iterable
+
+# Version of the coverage data format
+COVERAGE_DATA_VERSION = 1
+
+# Tool name used with sys.monitoring (python 3.12+)
+_MONITORING_TOOL_NAME = "bpytest"
+
+# Number of sys.monitoring tool ids
+_MONITORING_TOOL_IDS = 6
+
+
+def to_ranges(lines: Iterable[int]) -> list[list[int]]:
+    """Sorted line numbers as [first, last] ranges of consecutive lines"""
+
+    ranges: list[list[int]] = []
+    for line in sorted(set(lines)):
+        if ranges and ranges[-1][1] == line - 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ranges
+
+
+def from_ranges(ranges: Iterable[Iterable[int]]) -> set[int]:
+    """Line numbers of [first, last] ranges"""
+
+    lines: set[int] = set()
+    for first, last in ranges:
+        lines.update(range(first, last + 1))
+    return lines
+
+
+def executable_lines(filepath: Path) -> set[int]:
+    """Lines with code of a python source file (the lines of the bytecode
+    instructions of every code object), empty if it can not be compiled"""
+
+    try:
+        source = filepath.read_text(encoding="utf-8")
+        code = compile(source, filepath.as_posix(), "exec", dont_inherit=True)
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError):
+        return set()
+
+    lines: set[int] = set()
+    pending = [code]
+    while pending:
+        code = pending.pop()
+        lines.update(line for _, _, line in code.co_lines() if line)
+        pending.extend(const for const in code.co_consts if isinstance(const, CodeType))
+    return lines
+
+
+class CoverageData:
+    """Executable and executed lines by file path, relative to the parent
+    directory of the measured packages (e.g. "my_addon/operators.py")"""
+
+    def __init__(self) -> None:
+        self.executable: dict[str, set[int]] = {}
+        self.executed: dict[str, set[int]] = {}
+
+    def add_file(self, name: str, executable: set[int], executed: set[int]) -> None:
+        """Add the lines of a file, merged with the lines already stored"""
+
+        self.executable.setdefault(name, set()).update(executable)
+        # Lines can be recorded outside of the compiled lines (e.g. decorators
+        # in older python versions)
+        self.executable[name].update(executed)
+        self.executed.setdefault(name, set()).update(executed)
+
+    def merge(self, other: "CoverageData") -> None:
+        """Add the lines of another coverage data, e.g. of another worker"""
+
+        for name, executable in other.executable.items():
+            self.add_file(name, executable, other.executed.get(name, set()))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Compact json representation, sent by the test sessions"""
+        return {
+            "version": COVERAGE_DATA_VERSION,
+            "files": {
+                name: {
+                    "executable": to_ranges(self.executable[name]),
+                    "executed": to_ranges(self.executed.get(name, set())),
+                }
+                for name in sorted(self.executable)
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CoverageData":
+        """Coverage data of its json representation"""
+
+        coverage = cls()
+        for name, lines in data.get("files", {}).items():
+            coverage.add_file(
+                name, from_ranges(lines["executable"]), from_ranges(lines["executed"])
+            )
+        return coverage
+
+    def totals(self) -> tuple[int, int]:
+        """Number of executable lines and of executed lines of every file"""
+        return (
+            sum(len(lines) for lines in self.executable.values()),
+            sum(len(lines) for lines in self.executed.values()),
+        )
+
+
+def format_report(data: CoverageData) -> str:
+    """Text report with the executable lines, missed lines and coverage of
+    every file, and their total"""
+
+    rows = []
+    for name in sorted(data.executable):
+        statements = len(data.executable[name])
+        executed = len(data.executed.get(name, set()))
+        rows.append((name, statements, statements - executed))
+    total_statements, total_executed = data.totals()
+    rows.append(("TOTAL", total_statements, total_statements - total_executed))
+
+    width = max([len("Name")] + [len(row[0]) for row in rows])
+    lines = [f"{'Name':<{width}}  Stmts   Miss  Cover"]
+    for name, statements, missed in rows:
+        cover = 100.0 * (statements - missed) / statements if statements else 100.0
+        if name == "TOTAL":
+            lines.append("-" * len(lines[0]))
+        lines.append(f"{name:<{width}}  {statements:>5}  {missed:>5}  {cover:>4.0f}%")
+    return "\n".join(lines)
+
+
+def format_lcov(data: CoverageData, root: Path | None = None) -> str:
+    """lcov tracefile of the coverage data, with the file paths relative to
+    root (the current directory by default)"""
+
+    root = root or Path.cwd()
+    records = []
+    for name in sorted(data.executable):
+        executed = data.executed.get(name, set())
+        lines = [f"SF:{(root / name).as_posix()}"]
+        lines += [
+            f"DA:{line},{1 if line in executed else 0}"
+            for line in sorted(data.executable[name])
+        ]
+        lines += [
+            f"LF:{len(data.executable[name])}",
+            f"LH:{len(executed)}",
+            "end_of_record",
+        ]
+        records.append("\n".join(lines))
+    return "\n".join(records) + "\n"
+
+
+def _package_root(package: str) -> Path | None:
+    """Directory of a package (or file of a module) given by name or by path,
+    without importing it"""
+
+    path = Path(package)
+    if path.exists():
+        return path.absolute()
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or spec.origin is None:
+        return None
+    origin = Path(spec.origin)
+    return origin.parent if origin.name == "__init__.py" else origin
+
+
+class LineCollector:
+    """Records the executed lines of the python files of the measured packages
+
+    Args:
+        packages (list[str]): Package names (e.g. installed or linked addons)
+            or paths of package directories
+    """
+
+    def __init__(self, packages: list[str]):
+        self._packages = packages
+        self._roots: list[Path] = []
+        self._lines: dict[str, set[int]] = {}
+        # Decision of every code file name, measured or not
+        self._measured: dict[str, str | None] = {}
+        self._monitored_codes: list[CodeType] = []
+        self._tool_id: int | None = None
+
+    @property
+    def uses_monitoring(self) -> bool:
+        """If the lines are recorded with sys.monitoring, available and with a
+        free tool id"""
+        return self._free_tool_id() is not None
+
+    def _resolve_roots(self) -> None:
+        roots = [_package_root(package) for package in self._packages]
+        self._roots = [root for root in roots if root is not None]
+
+    def _measured_name(self, filename: str) -> str | None:
+        """Name of a measured file (relative to the parent directory of its
+        package), None if the file is not measured"""
+
+        if filename in self._measured:
+            return self._measured[filename]
+
+        name = None
+        path = Path(filename)
+        if path.suffix == ".py":
+            path = path.absolute()
+            for root in self._roots:
+                if path == root or path.is_relative_to(root):
+                    name = path.relative_to(root.parent).as_posix()
+                    break
+        self._measured[filename] = name
+        return name
+
+    def start(self) -> None:
+        """Start recording the executed lines"""
+
+        self._resolve_roots()
+        tool_id = self._free_tool_id()
+        if tool_id is not None:
+            self._start_monitoring(tool_id)
+        else:
+            sys.settrace(self._trace)
+            threading.settrace(self._trace)
+
+    def stop(self) -> None:
+        """Stop recording the executed lines"""
+
+        if self._tool_id is not None:
+            self._stop_monitoring()
+        else:
+            sys.settrace(None)
+            threading.settrace(None)  # type: ignore[arg-type]
+
+    # sys.monitoring (python 3.12+)
+
+    @staticmethod
+    def _free_tool_id() -> int | None:
+        """sys.monitoring tool id not used by another tool, the coverage id
+        first, None without sys.monitoring or if every id is in use"""
+
+        monitoring = getattr(sys, "monitoring", None)
+        if monitoring is None:
+            return None
+        # The coverage id may be used by another tool, e.g. the coverage package
+        for tool_id in (monitoring.COVERAGE_ID, *range(_MONITORING_TOOL_IDS)):
+            if monitoring.get_tool(tool_id) is None:
+                return tool_id
+        return None
+
+    def _start_monitoring(self, tool_id: int) -> None:
+        monitoring = sys.monitoring  # type: ignore[attr-defined]
+        monitoring.use_tool_id(tool_id, _MONITORING_TOOL_NAME)
+        self._tool_id = tool_id
+        monitoring.register_callback(tool_id, monitoring.events.PY_START, self._py_start)
+        monitoring.register_callback(tool_id, monitoring.events.LINE, self._line)
+        monitoring.set_events(tool_id, monitoring.events.PY_START)
+
+    def _py_start(self, code: CodeType, _offset: int) -> Any:
+        """Enable the line events of the code objects of the measured files,
+        called once by code object"""
+        monitoring = sys.monitoring  # type: ignore[attr-defined]
+
+        name = self._measured_name(code.co_filename)
+        if name is not None:
+            self._lines.setdefault(name, set())
+            monitoring.set_local_events(self._tool_id, code, monitoring.events.LINE)
+            self._monitored_codes.append(code)
+        return monitoring.DISABLE
+
+    def _line(self, code: CodeType, line_number: int) -> Any:
+        """Record a line, called once by line"""
+        monitoring = sys.monitoring  # type: ignore[attr-defined]
+
+        name = self._measured[code.co_filename]
+        if name is not None:
+            self._lines[name].add(line_number)
+        return monitoring.DISABLE
+
+    def _stop_monitoring(self) -> None:
+        monitoring = sys.monitoring  # type: ignore[attr-defined]
+        if self._tool_id is None:
+            return
+        monitoring.set_events(self._tool_id, 0)
+        for code in self._monitored_codes:
+            monitoring.set_local_events(self._tool_id, code, 0)
+        monitoring.register_callback(self._tool_id, monitoring.events.PY_START, None)
+        monitoring.register_callback(self._tool_id, monitoring.events.LINE, None)
+        monitoring.free_tool_id(self._tool_id)
+        # Events disabled by the callbacks are enabled again for the next
+        # session, for every tool: the events disabled by the other tools in use
+        # are enabled again too
+        monitoring.restart_events()
+        self._monitored_codes = []
+        self._tool_id = None
+
+    # sys.settrace fallback
+
+    def _trace(self, frame: FrameType, event: str, _arg: Any) -> Callable[..., Any] | None:
+        """Global trace function, only the frames of measured files are traced"""
+
+        if event != "call":
+            return None
+        name = self._measured_name(frame.f_code.co_filename)
+        if name is None:
+            return None
+        # The definition line of a function is executed by the enclosing code
+        lines = self._lines.setdefault(name, set())
+
+        def trace_lines(frame: FrameType, event: str, _arg: Any) -> Any:
+            if event == "line":
+                lines.add(frame.f_lineno)
+            return trace_lines
+
+        return trace_lines
+
+    def data(self) -> CoverageData:
+        """Coverage data of every python file of the measured packages,
+        including the files that were not imported"""
+
+        coverage = CoverageData()
+        for root in self._roots:
+            files = [root] if root.is_file() else sorted(root.rglob("*.py"))
+            for filepath in files:
+                name = filepath.relative_to(root.parent).as_posix()
+                coverage.add_file(
+                    name, executable_lines(filepath), self._lines.get(name, set())
+                )
+        return coverage
@@ -0,0 +1,186 @@
+"""
+bpytest.common.bpytest_expression
+~~~~~~~~~~~~~~
+
+Selection expressions of the -k (keyword) and -m (mark) options, with the
+pytest syntax:
+
+    expression: expr? EOF
+    expr:       and_expr ('or' and_expr)*
+    and_expr:   not_expr ('and' not_expr)*
+    not_expr:   'not' not_expr | '(' expr ')' | ident
+    ident:      (\\w|:|\\+|-|\\.|\\[|\\]|\\\\|/)+
+
+The expression is parsed once and compiled to python bytecode, which is
+evaluated for every test with a function telling if an identifier matches.
+
+Classes:
+    Expression
+        A compiled selection expression.
+    ExpressionError
+        Raised for an invalid expression.
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+from types import CodeType
+from collections.abc import Mapping
+from typing import Callable, Iterator
+
+_IDENT = re.compile(r"[\w:+\-.\[\]\\/]+")
+_KEYWORDS = {"and", "or", "not"}
+
+# Prefix of the identifier names in the compiled code, so they can not
+# collide with python names
+_IDENT_PREFIX = "$"
+
+
+class ExpressionError(ValueError):
+    """Invalid selection expression"""
+
+    def __init__(self, expression: str, column: int, message: str):
+        self.expression = expression
+        self.column = column
+        self.message = message
+        super().__init__(f"{expression!r} at column {column + 1}: {message}")
+
+
+@dataclass
+class _Token:
+    kind: str
+    value: str
+    column: int
+
+
+def _tokenize(expression: str) -> Iterator[_Token]:
+    position = 0
+    while True:
+        while position < len(expression) and expression[position].isspace():
+            position += 1
+        if position == len(expression):
+            yield _Token("eof", "", position)
+            return
+
+        if expression[position] in "()":
+            yield _Token(expression[position], expression[position], position)
+            position += 1
+            continue
+
+        match = _IDENT.match(expression, position)
+        if match is None:
+            raise ExpressionError(
+                expression,
+                position,
+                f"unexpected character {expression[position]!r}",
+            )
+        value = match.group()
+        yield _Token(value if value in _KEYWORDS else "ident", value, position)
+        position = match.end()
+
+
+class _Parser:
+    """Recursive descent parser building a python ast of the expression"""
+
+    def __init__(self, expression: str):
+        self._expression = expression
+        self._tokens = list(_tokenize(expression))
+        self._index = 0
+
+    @property
+    def _current(self) -> _Token:
+        return self._tokens[self._index]
+
+    def _accept(self, kind: str) -> _Token | None:
+        token = self._current
+        if token.kind != kind:
+            return None
+        self._index += 1
+        return token
+
+    def _reject(self, expected: str) -> ExpressionError:
+        token = self._current
+        found = "end of input" if token.kind == "eof" else repr(token.value)
+        return ExpressionError(
+            self._expression, token.column, f"expected {expected}; got {found}"
+        )
+
+    def parse(self) -> ast.expr:
+        """Syntax tree of the whole expression, an empty expression matches
+        nothing"""
+
+        if self._accept("eof"):
+            return ast.Constant(False)
+        node = self._expr()
+        if not self._accept("eof"):
+            raise self._reject("end of input")
+        return node
+
+    def _expr(self) -> ast.expr:
+        values = [self._and_expr()]
+        while self._accept("or"):
+            values.append(self._and_expr())
+        return values[0] if len(values) == 1 else ast.BoolOp(ast.Or(), values)
+
+    def _and_expr(self) -> ast.expr:
+        values = [self._not_expr()]
+        while self._accept("and"):
+            values.append(self._not_expr())
+        return values[0] if len(values) == 1 else ast.BoolOp(ast.And(), values)
+
+    def _not_expr(self) -> ast.expr:
+        if self._accept("not"):
+            return ast.UnaryOp(ast.Not(), self._not_expr())
+        if self._accept("("):
+            node = self._expr()
+            if not self._accept(")"):
+                raise self._reject("')'")
+            return node
+        token = self._accept("ident")
+        if token is not None:
+            return ast.Name(_IDENT_PREFIX + token.value, ast.Load())
+        raise self._reject("'not', '(' or an identifier")
+
+
+class _Matcher(Mapping[str, bool]):
+    """Namespace of the compiled expression, every name is an identifier
+    of the expression resolved by the matcher function
+
+    Args:
+        matcher (Callable[[str], bool]): Tells if an identifier matches
+        names (tuple[str, ...]): Names of the compiled expression
+    """
+
+    def __init__(self, matcher: Callable[[str], bool], names: tuple[str, ...]):
+        self._matcher = matcher
+        self._names = names
+
+    def __getitem__(self, key: str) -> bool:
+        return self._matcher(key[len(_IDENT_PREFIX) :])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class Expression:
+    """A selection expression compiled to python bytecode"""
+
+    def __init__(self, text: str, code: CodeType):
+        self.text = text
+        self._code = code
+
+    @classmethod
+    def compile(cls, text: str) -> "Expression":
+        """Parse and compile an expression, raises ExpressionError if invalid"""
+
+        node = ast.fix_missing_locations(ast.Expression(_Parser(text).parse()))
+        return cls(text, compile(node, filename="<bpytest expression>", mode="eval"))
+
+    def evaluate(self, matcher: Callable[[str], bool]) -> bool:
+        """Evaluate the expression, matcher tells if an identifier matches"""
+        namespace = _Matcher(matcher, self._code.co_names)
+        # pylint: disable-next=eval-used
+        return bool(eval(self._code, {"__builtins__": {}}, namespace))
@@ -0,0 +1,336 @@
+"""
+bpytest.common.bpytest_index
+~~~~~~~~~~~~~~
+
+Discovery of the test files and test functions, shared by the collector of
+the test session and the main process, so both apply the same rules, and
+selection of the tests with the -k and -m expressions.
+
+Classes:
+    TestEntry
+        A discovered test function.
+    TestSelector
+        The compiled -k and -m expressions.
+    TestIndex
+        The tests of a collector string, with their marks.
+
+Functions:
+    find_test_files
+        Test files of a directory.
+    find_test_functions
+        Test functions of a test file.
+    find_conftest_files
+        Conftest files of a directory.
+    make_nodeid
+        Identifier of a test function.
+    read_static_info
+        Marks and fixtures of the test functions of a file.
+    make_plan, write_plan, read_plan_nodeids, read_plan_skipped
+        Json test plan of the selected tests, run by the test sessions.
+"""
+
+import fnmatch
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    from .bpytest_ast import (
+        StaticMark,
+        extract_fixture_names,
+        extract_marks,
+        parse_file,
+    )
+    from .bpytest_expression import Expression
+except ImportError:
+    # Imported as a top level module inside Blender
+    from bpytest_ast import (  # type: ignore[no-redef]
+        StaticMark,
+        extract_fixture_names,
+        extract_marks,
+        parse_file,
+    )
+    from bpytest_expression import Expression  # type: ignore[no-redef]
+
+# Version of the json test plan format
+PLAN_VERSION = 1
+
+IGNORE_DIRS: list[str] = [
+    "__pycache__",
+    ".git/*",
+    ".vscode/*",
+    ".idea/*",
+    ".pytest_cache/*",
+    "venv/*",
+    "build/*",
+    "dist/*",
+    ".venv/*",
+]
+
+
+def find_test_files(path: Path, norecursedirs: list[str]) -> list[Path]:
+    """Collect all test files in the given path."""
+
+    py_files = []
+
+    for file_path in path.glob("**/*.py"):
+        file_name = file_path.name
+
+        # Check if the file path matches any pattern in norecursedirs
+        skip_file = False
+        for pattern in norecursedirs:
+            if fnmatch.fnmatch(
+                file_path.relative_to(path).as_posix(), pattern
+            ):
+                skip_file = True
+                break
+
+        if skip_file:
+            continue
+
+        if not "_test.py" in file_name or "test_" in file_name:
+            continue
+        if not file_path.is_file():
+            continue
+        if not file_name.endswith(".py"):
+            continue
+
+        py_files.append(file_path)
+
+    return py_files
+
+
+def find_conftest_files(path: Path, norecursedirs: list[str]) -> list[Path]:
+    """Collect all conftest.py files in the given path."""
+
+    conftest_files = []
+    for file_path in path.glob("**/conftest.py"):
+        relative_path = file_path.relative_to(path).as_posix()
+        if any(fnmatch.fnmatch(relative_path, pattern) for pattern in norecursedirs):
+            continue
+        if file_path.is_file():
+            conftest_files.append(file_path)
+    return conftest_files
+
+
+def find_test_functions(filepath: Path) -> list[str]:
+    """Names of the test functions of a test file"""
+
+    function_names = []
+    with open(filepath, "r", encoding="utf-8") as file:
+        for line in file:
+            if not "def test_" in line:
+                continue
+            function_names.append(line.split("def ")[1].split("(")[0])
+    return function_names
+
+
+def display_path(filepath: Path) -> str:
+    """File path relative to the current directory, absolute if outside of it"""
+
+    filepath = filepath.absolute()
+    if filepath.is_relative_to(Path.cwd()):
+        filepath = filepath.relative_to(Path.cwd())
+    return filepath.as_posix()
+
+
+def make_nodeid(filepath: Path, function_name: str) -> str:
+    """Test identifier, with the file path relative to the current directory"""
+    return f"{display_path(filepath)}::{function_name}"
+
+
+def read_mark_names(filepath: Path) -> dict[str, list[str]]:
+    """Names of the marks of each test function of a file, empty if the
+    file can not be parsed"""
+
+    try:
+        marks = extract_marks(filepath)
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return {}
+    return {
+        function_name: [mark.name for mark in function_marks]
+        for function_name, function_marks in marks.items()
+    }
+
+
+def read_static_info(
+    filepath: Path,
+) -> tuple[dict[str, list[StaticMark]], dict[str, list[str]]]:
+    """Marks and names of the requested fixtures of each test function of a
+    file, parsing it once. Both are empty if the file can not be parsed"""
+
+    try:
+        tree = parse_file(filepath)
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return {}, {}
+    return extract_marks(filepath, tree), extract_fixture_names(filepath, tree)
+
+
+@dataclass
+class TestEntry:
+    """A discovered test function"""
+
+    nodeid: str
+    filepath: Path
+    function_name: str
+    marks: list[str] = field(default_factory=list)
+    fixtures: list[str] = field(default_factory=list)
+    # Marks with their arguments, as written in the source
+    static_marks: list[StaticMark] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Json representation, in the test plan"""
+        return {
+            "nodeid": self.nodeid,
+            "file": display_path(self.filepath),
+            "function": self.function_name,
+            "marks": self.marks,
+            "fixtures": self.fixtures,
+        }
+
+
+class TestSelector:
+    """Selects tests with the -k keyword expression and the -m mark expression.
+
+    A -k identifier matches a test if it is a case insensitive substring of
+    the test name, of a part of its file path or of one of its mark names.
+    A -m identifier matches a test if the test has a mark with that name.
+    Both expressions are compiled once, raising ExpressionError if invalid.
+    """
+
+    def __init__(self, keyword: str = "", markexpr: str = ""):
+
+        self._keyword = Expression.compile(keyword) if keyword.strip() else None
+        self._markexpr = Expression.compile(markexpr) if markexpr.strip() else None
+
+    @property
+    def active(self) -> bool:
+        """If any expression is set, otherwise every test matches"""
+        return self._keyword is not None or self._markexpr is not None
+
+    def matches(self, nodeid: str, marks: Iterable[str] = ()) -> bool:
+        """Check if a test matches the expressions"""
+
+        marks = set(marks)
+        if self._markexpr is not None and not self._markexpr.evaluate(
+            lambda name: name in marks
+        ):
+            return False
+
+        if self._keyword is not None:
+            path, _, function_name = nodeid.partition("::")
+            names = [
+                name.lower()
+                for name in [function_name, *path.split("/"), *marks]
+                if name
+            ]
+            if not self._keyword.evaluate(
+                lambda ident: any(ident.lower() in name for name in names)
+            ):
+                return False
+
+        return True
+
+
+class TestIndex:
+    """Tests of a collector string (a file or directory path, optionally
+    followed by ::test_name), discovered with the rules of the collector"""
+
+    def __init__(self, entries: list[TestEntry]):
+        self.entries = entries
+
+    @classmethod
+    def build(
+        cls, collector_string: str, norecursedirs: list[str], with_marks: bool = False
+    ) -> "TestIndex":
+        """Discover the tests
+
+        Args:
+            collector_string (str): Test file or directory, with an optional ::test_name
+            norecursedirs (list[str]): Patterns of the paths excluded from the discovery
+            with_marks (bool): Read the marks and fixtures of the tests (parsing
+                the test files)
+        """
+
+        path_string, _, unit = collector_string.partition("::")
+        path = Path(path_string).absolute()
+
+        filepaths: list[Path] = []
+        if path.is_file():
+            filepaths = [path]
+        elif path.is_dir():
+            filepaths = find_test_files(path, norecursedirs + IGNORE_DIRS)
+
+        entries = []
+        for filepath in filepaths:
+            marks, fixtures = read_static_info(filepath) if with_marks else ({}, {})
+            for function_name in find_test_functions(filepath):
+                if unit and function_name != unit:
+                    continue
+                static_marks = marks.get(function_name, [])
+                entries.append(
+                    TestEntry(
+                        nodeid=make_nodeid(filepath, function_name),
+                        filepath=filepath,
+                        function_name=function_name,
+                        marks=[mark.name for mark in static_marks],
+                        fixtures=fixtures.get(function_name, []),
+                        static_marks=static_marks,
+                    )
+                )
+        return cls(entries)
+
+    def select(self, selector: TestSelector) -> list[TestEntry]:
+        """Tests matching the selector"""
+        return [
+            entry
+            for entry in self.entries
+            if selector.matches(entry.nodeid, entry.marks)
+        ]
+
+
+def write_plan(
+    path: Path, entries: list[TestEntry], skipped: list[str] | None = None
+) -> None:
+    """Write the json test plan of the selected tests, see make_plan"""
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(make_plan(entries, skipped), file, indent=2)
+
+
+def make_plan(
+    entries: list[TestEntry], skipped: list[str] | None = None
+) -> dict[str, Any]:
+    """Json test plan of the selected tests, in run order
+
+    Args:
+        entries (list[TestEntry]): Tests to run
+        skipped (list[str] | None): Node ids of the selected tests already
+            reported as skipped by the command line, not run
+    """
+
+    plan: dict[str, Any] = {
+        "version": PLAN_VERSION,
+        "tests": [entry.to_dict() for entry in entries],
+    }
+    if skipped:
+        plan["skipped"] = skipped
+    return plan
+
+
+def read_plan_nodeids(path: Path) -> list[str]:
+    """Node ids of a json test plan, in run order"""
+
+    with open(path, "r", encoding="utf-8") as file:
+        plan = json.load(file)
+    return [test["nodeid"] for test in plan["tests"]]
+
+
+def read_plan_skipped(path: Path) -> list[str]:
+    """Node ids of the selected tests of a json test plan skipped by the
+    command line"""
+
+    with open(path, "r", encoding="utf-8") as file:
+        plan = json.load(file)
+    return plan.get("skipped", [])
@@ -0,0 +1,218 @@
+"""
+bpytest.common.bpytest_metrics
+~~~~~~~~~~~~~~
+
+Metrics of a test session, to follow the cost of the test sessions over
+time: the total duration and count of each phase (Blender startup, config,
+addon linking, conftest import, collection, resets, the setup and teardown
+of each fixture, test bodies, reporting), counters (tests, resets, module
+imports, addon enables) and the peak resident memory of each process.
+
+Every process records its phases in the `metrics` recorder, the test
+sessions send them to the command line at the end of the session, which
+writes them as json or in the Prometheus text format (e.g. for the
+textfile collector of the node exporter).
+
+Classes:
+    MetricsRecorder
+        Durations and counters of the phases of a process.
+    SessionMetrics
+        Metrics of the command line and of every test session.
+
+Functions:
+    peak_rss_bytes
+        Peak resident memory of the current process.
+    format_openmetrics
+        Prometheus text format of the session metrics.
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# Version of the metrics json format
+METRICS_VERSION = 1
+
+# Prefix of the Prometheus metric names
+METRIC_PREFIX = "bpytest"
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident memory of the current process, None if it can not be
+    read (the resource module is not available on Windows)"""
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+class MetricsRecorder:
+    """Total duration and count of each phase and counters of a process.
+    Recording is cheap (a dictionary update by phase), so it is always
+    enabled and the metrics are only sent when requested"""
+
+    def __init__(self) -> None:
+        # Seconds and count of each phase
+        self.timings: dict[str, list[float]] = {}
+        self.counters: dict[str, int] = {}
+        # Start of the process python entry point, in ns since the epoch
+        self.entry_ns: int | None = None
+
+    def reset(self) -> None:
+        """Forget the recorded metrics, e.g. in a forked test process"""
+        self.timings = {}
+        self.counters = {}
+        self.entry_ns = None
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Record a run of a phase"""
+
+        timing = self.timings.setdefault(name, [0.0, 0])
+        timing[0] += seconds
+        timing[1] += 1
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Record the duration of the with block as a run of a phase"""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increase a counter"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict[str, Any]:
+        """Json representation, with the peak resident memory"""
+        return {
+            "timings": {
+                name: {"seconds": seconds, "count": int(count)}
+                for name, (seconds, count) in sorted(self.timings.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "entry_ns": self.entry_ns,
+        }
+
+
+# Metrics of the current process
+metrics = MetricsRecorder()
+
+
+def _merge(target: dict[str, Any], data: dict[str, Any]) -> None:
+    """Add the metrics of a process to the metrics of an instance"""
+
+    for name, timing in data.get("timings", {}).items():
+        merged = target["timings"].setdefault(name, {"seconds": 0.0, "count": 0})
+        merged["seconds"] += timing["seconds"]
+        merged["count"] += timing["count"]
+    for name, value in data.get("counters", {}).items():
+        target["counters"][name] = target["counters"].get(name, 0) + value
+    peak = data.get("peak_rss_bytes")
+    if peak is not None:
+        target["peak_rss_bytes"] = max(target["peak_rss_bytes"] or 0, peak)
+
+
+class SessionMetrics:
+    """Metrics of the command line and of the test sessions of every
+    instance id (Blender executable or host lane)"""
+
+    def __init__(self) -> None:
+        self.instances: dict[str, dict[str, Any]] = {}
+
+    def add(
+        self, instance_id: str, data: dict[str, Any], launch_ns: int | None = None
+    ) -> None:
+        """Add the metrics sent by a test session process (several for a
+        forked or distributed session)
+
+        Args:
+            instance_id (str): Instance id of the test session
+            data (dict[str, Any]): Metrics of the process (see MetricsRecorder)
+            launch_ns (int | None): Launch time of the process, to record the
+                time to its python entry point as the startup phase
+        """
+
+        instance = self.instances.setdefault(
+            instance_id, {"timings": {}, "counters": {}, "peak_rss_bytes": None}
+        )
+        entry_ns = data.get("entry_ns")
+        if launch_ns is not None and entry_ns is not None:
+            startup = {"seconds": max(0, entry_ns - launch_ns) / 1e9, "count": 1}
+            _merge(instance, {"timings": {"startup": startup}})
+        _merge(instance, data)
+
+    def to_dict(self, host: MetricsRecorder, duration: float) -> dict[str, Any]:
+        """Json representation of the session metrics
+
+        Args:
+            host (MetricsRecorder): Metrics of the command line process
+            duration (float): Total seconds of the session
+        """
+
+        host_data = host.to_dict()
+        del host_data["entry_ns"]
+        return {
+            "version": METRICS_VERSION,
+            "duration_seconds": duration,
+            "host": host_data,
+            "instances": self.instances,
+        }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_openmetrics(data: dict[str, Any]) -> str:
+    """Prometheus text format of the session metrics (see SessionMetrics.to_dict),
+    the host process is reported with the "bpytest" instance label"""
+
+    processes = {"bpytest": data["host"], **data["instances"]}
+    samples: dict[str, list[str]] = {
+        "session_duration_seconds": [f"{data['duration_seconds']:.6f}"],
+        "phase_seconds": [],
+        "phase_count": [],
+        "counter": [],
+        "peak_rss_bytes": [],
+    }
+    for instance, process in processes.items():
+        instance_label = f'instance="{_label(instance)}"'
+        for name, timing in process["timings"].items():
+            labels = f'{{{instance_label},phase="{_label(name)}"}}'
+            samples["phase_seconds"].append(f"{labels} {timing['seconds']:.6f}")
+            samples["phase_count"].append(f"{labels} {timing['count']}")
+        for name, value in process["counters"].items():
+            labels = f'{{{instance_label},name="{_label(name)}"}}'
+            samples["counter"].append(f"{labels} {value}")
+        if process.get("peak_rss_bytes") is not None:
+            samples["peak_rss_bytes"].append(
+                f"{{{instance_label}}} {process['peak_rss_bytes']}"
+            )
+
+    descriptions = {
+        "session_duration_seconds": "Total duration of the test session",
+        "phase_seconds": "Total duration of each phase of a process",
+        "phase_count": "Number of runs of each phase of a process",
+        "counter": "Counters of a process (tests, resets, module imports, addon enables)",
+        "peak_rss_bytes": "Peak resident memory of a process",
+    }
+    lines = []
+    for metric, values in samples.items():
+        if not values:
+            continue
+        name = f"{METRIC_PREFIX}_{metric}"
+        lines += [f"# HELP {name} {descriptions[metric]}", f"# TYPE {name} gauge"]
+        lines += [
+            f"{name}{value}" if value.startswith("{") else f"{name} {value}"
+            for value in values
+        ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,343 @@
+"""
+bpytest.common.bpytest_order
+~~~~~~~~~~~~~~
+
+Ordering of the selected tests before they run, so the tests that need the
+same resources run one after the other and each resource is set up fewer
+times.
+
+The resources of a test are read from the source, without importing it: the
+module scoped fixtures of its fixture closure (the fixtures it requests and
+the fixtures they request, recursively) and the addons enabled for the test
+(see bpytest_addons).
+
+The costs follow the test session: the session keeps the enabled addons and
+only enables or disables the difference between consecutive tests, a module
+scoped fixture is set up once for each file needing it and torn down after
+the last test of the file, whatever the order, and a session scoped fixture
+is set up once per session, so it is not a resource.
+
+The tests of a file always run together. Inside a file the tests with the
+same addons are grouped, then the groups, and the files, are chained starting
+from the tests with the fewest addons, so that consecutive tests share as
+many addons as possible, keeping the original order on ties. Tests are only
+moved if the new order sets up fewer resources.
+
+Classes:
+    OrderReport
+        Resource setups of the original and the new order.
+
+Functions:
+    read_fixture_definitions
+        Fixture functions defined in a list of files.
+    entry_resources
+        Resources needed by a test.
+    order_tests
+        Order the tests by their resources.
+    count_setups
+        Number of setups of each resource in a test order.
+    estimate_setup_costs
+        Setup duration of each resource, from the recorded test durations.
+    reorder_tests
+        Order the tests and report the estimated time saved.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    from .bpytest_addons import required_addons
+    from .bpytest_ast import StaticFixture, StaticMark, extract_fixtures
+    from .bpytest_index import TestEntry
+except ImportError:
+    # Imported as a top level module inside Blender
+    from bpytest_addons import required_addons  # type: ignore[no-redef]
+    from bpytest_ast import (  # type: ignore[no-redef]
+        StaticFixture,
+        StaticMark,
+        extract_fixtures,
+    )
+    from bpytest_index import TestEntry  # type: ignore[no-redef]
+
+# Prefixes of the resource names
+FIXTURE_RESOURCE = "fixture:"
+ADDON_RESOURCE = "addons:"
+
+
+def read_fixture_definitions(filepaths: Iterable[Path]) -> dict[str, StaticFixture]:
+    """Fixture functions defined in the files (conftest and test files), by
+    name. Files that can not be parsed are skipped"""
+
+    definitions: dict[str, StaticFixture] = {}
+    for filepath in filepaths:
+        try:
+            definitions.update(extract_fixtures(filepath))
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            continue
+    return definitions
+
+
+def fixture_closure(
+    names: Iterable[str], definitions: dict[str, StaticFixture]
+) -> set[str]:
+    """Names of the requested fixtures and of the fixtures they request,
+    recursively. Fixtures without a definition (e.g. the bpytest fixtures)
+    are kept, but not followed"""
+
+    closure: set[str] = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in closure:
+            continue
+        closure.add(name)
+        if name in definitions:
+            pending.extend(definitions[name].arguments)
+    return closure
+
+
+def entry_resources(
+    entry: TestEntry,
+    definitions: dict[str, StaticFixture],
+    directory_marks: dict[Path, list[StaticMark]] | None = None,
+) -> frozenset[str]:
+    """Resources needed by a test, as "fixture:<name>" for the module scoped
+    fixtures and "addons:<name>" """
+
+    resources = {
+        f"{FIXTURE_RESOURCE}{name}"
+        for name in fixture_closure(entry.fixtures, definitions)
+        if name in definitions and definitions[name].scope == "module"
+    }
+    resources.update(
+        f"{ADDON_RESOURCE}{addon}"
+        for addon in required_addons(
+            entry.filepath, entry.static_marks, directory_marks or {}
+        )
+    )
+    return frozenset(resources)
+
+
+@dataclass
+class _Group:
+    """Tests run one after the other, with the resources of the first and
+    the last one"""
+
+    entries: list[TestEntry]
+    first: frozenset[str]
+    last: frozenset[str]
+
+
+def _addons(resources: frozenset[str]) -> frozenset[str]:
+    """Resources depending on the previous test, the addons"""
+    return frozenset(
+        resource for resource in resources if resource.startswith(ADDON_RESOURCE)
+    )
+
+
+def _distance(before: frozenset[str], after: frozenset[str]) -> int:
+    """Addons enabled or disabled between two tests"""
+    return len(before ^ after)
+
+
+def _chain(groups: list[_Group]) -> list[_Group]:
+    """Greedy chain of the groups, starting from no resources, each next group
+    is the one closest to the last, the first in the original order on ties.
+    The groups are bucketed by their first resources, each step compares the
+    distinct resources instead of every remaining group"""
+
+    buckets: dict[frozenset[str], deque[tuple[int, _Group]]] = {}
+    for index, group in enumerate(groups):
+        buckets.setdefault(group.first, deque()).append((index, group))
+    chained: list[_Group] = []
+    last: frozenset[str] = frozenset()
+    while buckets:
+        first = min(
+            buckets, key=lambda key: (_distance(last, key), buckets[key][0][0])
+        )
+        chained.append(buckets[first].popleft()[1])
+        if not buckets[first]:
+            del buckets[first]
+        last = chained[-1].last
+    return chained
+
+
+def order_tests(
+    entries: list[TestEntry], resources: dict[str, frozenset[str]]
+) -> list[TestEntry]:
+    """Order the tests to reduce the addon setups, keeping the tests of a
+    file together
+
+    Args:
+        entries (list[TestEntry]): Tests in their original order
+        resources (dict[str, frozenset[str]]): Resources of each test, by node id
+    """
+
+    if not any(_addons(resources[entry.nodeid]) for entry in entries):
+        # Only the addons depend on the order
+        return list(entries)
+
+    files: dict[Path, list[TestEntry]] = {}
+    for entry in entries:
+        files.setdefault(entry.filepath, []).append(entry)
+
+    file_groups = []
+    for file_entries in files.values():
+        by_resources: dict[frozenset[str], list[TestEntry]] = {}
+        for entry in file_entries:
+            by_resources.setdefault(_addons(resources[entry.nodeid]), []).append(
+                entry
+            )
+        chained = _chain(
+            [
+                _Group(group_entries, key, key)
+                for key, group_entries in by_resources.items()
+            ]
+        )
+        file_groups.append(
+            _Group(
+                [entry for group in chained for entry in group.entries],
+                chained[0].first,
+                chained[-1].last,
+            )
+        )
+
+    return [entry for group in _chain(file_groups) for entry in group.entries]
+
+
+def count_setups(
+    entries: list[TestEntry], resources: dict[str, frozenset[str]]
+) -> dict[str, int]:
+    """Number of times each resource is set up running the tests in order, an
+    addon is enabled when a test needs it and the previous one does not, a
+    module scoped fixture once for each file needing it"""
+
+    setups: dict[str, int] = {}
+    previous: frozenset[str] = frozenset()
+    file_fixtures: set[tuple[Path, str]] = set()
+    for entry in entries:
+        current = resources[entry.nodeid]
+        for resource in _addons(current) - previous:
+            setups[resource] = setups.get(resource, 0) + 1
+        for resource in current - _addons(current):
+            if (entry.filepath, resource) not in file_fixtures:
+                file_fixtures.add((entry.filepath, resource))
+                setups[resource] = setups.get(resource, 0) + 1
+        previous = _addons(current)
+    return setups
+
+
+def estimate_setup_costs(
+    entries: list[TestEntry],
+    resources: dict[str, frozenset[str]],
+    durations: dict[str, Any],
+) -> dict[str, float]:
+    """Setup duration of each resource, the mean setup duration of the tests
+    that need it minus the mean of the tests that do not. Resources without
+    recorded tests on both sides are not estimated
+
+    Args:
+        entries (list[TestEntry]): Tests
+        resources (dict[str, frozenset[str]]): Resources of each test, by node id
+        durations (dict[str, Any]): Recorded durations of the last run of each
+            test, by node id, as {"duration": seconds, "setup": seconds}
+    """
+
+    setups = {}
+    for entry in entries:
+        recorded = durations.get(entry.nodeid)
+        if isinstance(recorded, dict) and isinstance(
+            recorded.get("setup"), (int, float)
+        ):
+            setups[entry.nodeid] = float(recorded["setup"])
+
+    costs: dict[str, float] = {}
+    for resource in {resource for key in resources.values() for resource in key}:
+        with_resource = [
+            setup for nodeid, setup in setups.items() if resource in resources[nodeid]
+        ]
+        without_resource = [
+            setup
+            for nodeid, setup in setups.items()
+            if resource not in resources[nodeid]
+        ]
+        if with_resource and without_resource:
+            costs[resource] = max(
+                0.0,
+                sum(with_resource) / len(with_resource)
+                - sum(without_resource) / len(without_resource),
+            )
+    return costs
+
+
+@dataclass
+class OrderReport:
+    """Resource setups of the original and the new test order"""
+
+    test_count: int
+    setups_before: dict[str, int]
+    setups_after: dict[str, int]
+    # Estimated seconds saved, None without recorded durations
+    time_saved: float | None
+
+    @property
+    def changed(self) -> bool:
+        """If the new order sets up fewer resources"""
+        return sum(self.setups_after.values()) < sum(self.setups_before.values())
+
+    def __str__(self) -> str:
+        text = (
+            f"Reordered {self.test_count} tests by their resources: "
+            f"{sum(self.setups_after.values())} resource setups instead of "
+            f"{sum(self.setups_before.values())}"
+        )
+        if self.time_saved is None:
+            return f"{text} (no recorded durations to estimate the time saved)"
+        return f"{text}, estimated time saved {self.time_saved:.2f} s"
+
+
+def reorder_tests(
+    entries: list[TestEntry],
+    definitions: dict[str, StaticFixture],
+    durations: dict[str, Any] | None = None,
+    directory_marks: dict[Path, list[StaticMark]] | None = None,
+) -> tuple[list[TestEntry], OrderReport]:
+    """Order the tests by their resources (see order_tests)
+
+    Args:
+        entries (list[TestEntry]): Tests in their original order, with their
+            marks and fixtures read
+        definitions (dict[str, StaticFixture]): Fixture functions, by name
+        durations (dict[str, Any] | None): Recorded durations of each test,
+            to estimate the time saved
+        directory_marks (dict[Path, list[StaticMark]] | None): Marks of the
+            conftest files, by directory (see bpytest_addons)
+
+    Returns:
+        tuple[list[TestEntry], OrderReport]: Ordered tests and the report
+    """
+
+    resources = {
+        entry.nodeid: entry_resources(entry, definitions, directory_marks)
+        for entry in entries
+    }
+    ordered = order_tests(entries, resources)
+
+    setups_before = count_setups(entries, resources)
+    if ordered == entries:
+        return ordered, OrderReport(len(entries), setups_before, setups_before, None)
+    setups_after = count_setups(ordered, resources)
+    # Tests are moved only if it saves setups
+    if sum(setups_after.values()) >= sum(setups_before.values()):
+        ordered, setups_after = list(entries), setups_before
+    costs = estimate_setup_costs(entries, resources, durations or {})
+    time_saved = None
+    if costs:
+        time_saved = sum(
+            (setups_before.get(resource, 0) - setups_after.get(resource, 0)) * cost
+            for resource, cost in costs.items()
+        )
+
+    return ordered, OrderReport(len(entries), setups_before, setups_after, time_saved)
@@ -0,0 +1,170 @@
+"""
+bpytest.common.bpytest_render
+~~~~~~~~~~~~~~
+
+Render profile of the test sessions, the `[tool.bpytest.render]` table of
+pyproject.toml, overriding the production render settings of the scenes so
+the render based tests stay cheap on CPU only machines:
+
+    [tool.bpytest.render]
+    samples = 16                # Cycles and EEVEE render samples, at most
+    resolution_percentage = 25  # Render resolution scale, at most
+    denoise = false             # Cycles denoisers
+    threads = 2                 # Render threads
+    max_bounces = 4             # Cycles light bounces, at most
+
+The profile is applied to every scene after each reset of the test session
+and after a .blend file is loaded. A test uses the production settings with
+the `render_profile("full")` mark, on the test function, its module or a
+conftest file (see bpytest_addons for the directory marks).
+
+Settings are only lowered, a test file that already renders with fewer
+samples keeps them. The render time saved is estimated from the ratio of
+the render samples and of the number of pixels before and after the profile.
+
+Functions:
+    validate_render_profile
+        Check the settings of a render profile.
+    uses_render_profile
+        If a test renders with the render profile.
+    apply_render_profile
+        Apply the render profile to a scene.
+"""
+
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    from .bpytest_ast import SourceExpression, StaticMark
+except ImportError:
+    # Imported as a top level module inside Blender
+    from bpytest_ast import SourceExpression, StaticMark  # type: ignore[no-redef]
+
+# Name of the mark selecting the render settings of a test
+RENDER_PROFILE_MARK = "render_profile"
+
+# Argument of the mark keeping the production render settings
+FULL_PROFILE = "full"
+
+# Settings of the render profile and their types
+RENDER_PROFILE_SETTINGS: dict[str, type] = {
+    "samples": int,
+    "resolution_percentage": int,
+    "denoise": bool,
+    "threads": int,
+    "max_bounces": int,
+}
+
+
+def validate_render_profile(profile: dict[str, Any]) -> None:
+    """Raise a ValueError if a setting of the render profile is unknown or
+    has an invalid value"""
+
+    for name, value in profile.items():
+        if name not in RENDER_PROFILE_SETTINGS:
+            raise ValueError(
+                f"Unknown render setting {name!r}, "
+                f"expected one of {', '.join(RENDER_PROFILE_SETTINGS)}"
+            )
+        expected = RENDER_PROFILE_SETTINGS[name]
+        # bool is a subclass of int
+        if not isinstance(value, expected) or (
+            expected is int and isinstance(value, bool)
+        ):
+            raise ValueError(f"Render setting {name} must be {expected.__name__}")
+        if expected is int and value < 1:
+            raise ValueError(f"Render setting {name} must be at least 1")
+
+
+def _profile_names(marks: Iterable[StaticMark]) -> list[str]:
+    """Profile names of the render_profile marks"""
+    return [
+        mark.args[0]
+        for mark in marks
+        if mark.name == RENDER_PROFILE_MARK
+        and mark.args
+        and isinstance(mark.args[0], str)
+        and not isinstance(mark.args[0], SourceExpression)
+    ]
+
+
+def uses_render_profile(
+    filepath: Path,
+    marks: Iterable[StaticMark],
+    directory_marks: dict[Path, list[StaticMark]],
+) -> bool:
+    """If a test renders with the render profile, the closest render_profile
+    mark wins (test function, module, then the conftest files of the inner
+    directories first)
+
+    Args:
+        filepath (Path): Test file
+        marks (Iterable[StaticMark]): Marks of the test, including its module marks
+        directory_marks (dict[Path, list[StaticMark]]): Marks of the conftest
+            files, by directory (see bpytest_addons.read_directory_marks)
+    """
+
+    names = _profile_names(marks)
+    for directory in filepath.absolute().parents:
+        names += _profile_names(directory_marks.get(directory, []))
+    return not names or names[0] != FULL_PROFILE
+
+
+def _lower(settings: Any, attr: str, value: int) -> float:
+    """Lower an integer setting to value, returns the ratio of the old value
+    to the new one"""
+
+    current = getattr(settings, attr, None)
+    if not isinstance(current, int) or current <= value:
+        return 1.0
+    setattr(settings, attr, value)
+    return current / value
+
+
+def apply_render_profile(scene: Any, profile: dict[str, Any]) -> float:
+    """Apply the render profile to a scene, the settings missing from the
+    scene (e.g. scene.cycles if the Cycles addon is disabled) are skipped
+
+    Returns:
+        float: Estimated ratio of the render cost of the scene before and
+            after the profile, for its render engine
+    """
+
+    render = scene.render
+    cycles = getattr(scene, "cycles", None)
+    eevee = getattr(scene, "eevee", None)
+    engine = getattr(render, "engine", "")
+    ratio = 1.0
+
+    samples = profile.get("samples")
+    if samples is not None:
+        if cycles is not None:
+            cycles_ratio = _lower(cycles, "samples", samples)
+            _lower(cycles, "preview_samples", samples)
+            if engine == "CYCLES":
+                ratio *= cycles_ratio
+        if eevee is not None:
+            eevee_ratio = _lower(eevee, "taa_render_samples", samples)
+            if engine.startswith("BLENDER_EEVEE"):
+                ratio *= eevee_ratio
+
+    percentage = profile.get("resolution_percentage")
+    if percentage is not None:
+        # Both dimensions are scaled
+        ratio *= _lower(render, "resolution_percentage", percentage) ** 2
+
+    if profile.get("denoise") is False and cycles is not None:
+        for attr in ("use_denoising", "use_preview_denoising"):
+            if hasattr(cycles, attr):
+                setattr(cycles, attr, False)
+
+    threads = profile.get("threads")
+    if threads is not None and hasattr(render, "threads"):
+        render.threads_mode = "FIXED"
+        render.threads = threads
+
+    max_bounces = profile.get("max_bounces")
+    if max_bounces is not None and cycles is not None:
+        _lower(cycles, "max_bounces", max_bounces)
+
+    return ratio
@@ -0,0 +1,223 @@
+"""
+bpytest.common.bpytest_skip
+~~~~~~~~~~~~~~
+
+skip, skipif and xfail marks, read from the source like the other marks:
+
+    @bpytest.mark.skip(reason="Not implemented yet")
+    def test_export():
+        ...
+
+    @bpytest.mark.skipif(sys.platform == "win32", reason="No fork on Windows")
+    def test_fork():
+        ...
+
+    @bpytest.mark.skipif(bpy.app.version < (4, 2), reason="Needs extensions")
+    def test_extension():
+        ...
+
+    @bpytest.mark.xfail(reason="Known precision issue", strict=True)
+    def test_bake():
+        ...
+
+Conditions are python expressions (in the source or as strings) evaluated
+without importing the test module. The command line decides the conditions
+using only literals, `os`, `sys.platform`, `platform.system()` and
+`platform.machine()`, which have the same value in the test sessions, and
+the skipped tests are never sent to Blender. The other conditions (e.g.
+using `bpy` or `sys.version_info`, Blender has its own python) are
+evaluated once per test session, before the reset of the skipped tests.
+Like pytest, a condition using the globals of the test module (e.g.
+`not HAS_NUMPY`) is evaluated with them, the module is imported once per
+test session for its conditions.
+
+A failing xfail test is reported as xfailed, a passing one as xpassed, or as
+failed with strict=True. With run=False the test is reported as xfailed
+without running it.
+
+Classes:
+    ConditionEvaluator
+        Evaluates the conditions of the marks, once per expression.
+    XFail
+        Expected failure of a test.
+
+Functions:
+    skip_reason
+        Reason of the skip of a test, None if it runs.
+    expected_failure
+        Expected failure of a test, None if it is expected to pass.
+    apply_xfail
+        Outcome of a test with an expected failure.
+"""
+
+import ast
+import builtins
+import os
+import platform
+import sys
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Iterable
+
+try:
+    from .bpytest_ast import SourceExpression, StaticMark
+except ImportError:
+    # Imported as a top level module inside Blender
+    from bpytest_ast import SourceExpression, StaticMark  # type: ignore[no-redef]
+
+SKIP_MARK = "skip"
+SKIPIF_MARK = "skipif"
+XFAIL_MARK = "xfail"
+
+# Outcomes of a test, in the test_result events
+OUTCOME_PASSED = "passed"
+OUTCOME_FAILED = "failed"
+OUTCOME_SKIPPED = "skipped"
+OUTCOME_XFAILED = "xfailed"
+OUTCOME_XPASSED = "xpassed"
+
+
+class UndecidedCondition(Exception):
+    """The condition uses names that are not available where it is evaluated"""
+
+
+def static_namespace() -> dict[str, Any]:
+    """Names of the conditions decided by the command line, only the values
+    that are the same in the test sessions"""
+    return {
+        "os": os,
+        "sys": SimpleNamespace(platform=sys.platform),
+        "platform": SimpleNamespace(system=platform.system, machine=platform.machine),
+    }
+
+
+class ConditionEvaluator:
+    """Evaluates the conditions of the skipif and xfail marks with the names of
+    a namespace, each expression once
+
+    Args:
+        namespace (dict[str, Any]): Names available to the conditions, e.g.
+            os, sys and bpy in a test session
+    """
+
+    def __init__(self, namespace: dict[str, Any]):
+        self._namespace = namespace
+        self._results: dict[str, bool] = {}
+
+    @property
+    def namespace(self) -> dict[str, Any]:
+        """Names available to the conditions"""
+        return self._namespace
+
+    def evaluate(self, condition: Any) -> bool:
+        """Value of a condition, a python expression if it is a string
+
+        Raises:
+            UndecidedCondition: If the expression uses names missing from the
+                namespace
+            Exception: Raised by the evaluation of the expression
+        """
+
+        if not isinstance(condition, str):
+            return bool(condition)
+        if condition not in self._results:
+            expression = ast.parse(condition.strip(), mode="eval")
+            names = {
+                node.id for node in ast.walk(expression) if isinstance(node, ast.Name)
+            }
+            missing = sorted(names - set(self._namespace) - set(dir(builtins)))
+            if missing:
+                raise UndecidedCondition(
+                    f"Condition {condition!r} uses unknown names: {', '.join(missing)}"
+                )
+            code = compile(expression, "<condition>", "eval")
+            # pylint: disable-next=eval-used
+            self._results[condition] = bool(eval(code, dict(self._namespace)))
+        return self._results[condition]
+
+
+def _conditions(mark: StaticMark) -> list[Any]:
+    """Condition of a skipif or xfail mark, the first positional argument or
+    the condition keyword, empty without condition"""
+
+    if "condition" in mark.kwargs:
+        return [mark.kwargs["condition"]]
+    return list(mark.args[:1])
+
+
+def _reason(mark: StaticMark) -> str:
+    """Reason of a skipif or xfail mark, the reason keyword or the second
+    positional argument"""
+    return str(mark.kwargs.get("reason", mark.args[1] if len(mark.args) > 1 else ""))
+
+
+def _option(value: Any, evaluator: ConditionEvaluator) -> Any:
+    """Value of a keyword argument, evaluated if it is not a literal"""
+    return evaluator.evaluate(value) if isinstance(value, SourceExpression) else value
+
+
+def skip_reason(marks: Iterable[StaticMark], evaluator: ConditionEvaluator) -> str | None:
+    """Reason of the first skip mark, or skipif mark with a true condition,
+    None if the test runs
+
+    Raises:
+        UndecidedCondition: If a condition can not be evaluated with the
+            names of the evaluator
+    """
+
+    for mark in marks:
+        if mark.name == SKIP_MARK:
+            reason = mark.kwargs.get("reason", mark.args[0] if mark.args else "")
+            return str(reason) or "unconditional skip"
+        if mark.name == SKIPIF_MARK:
+            conditions = _conditions(mark)
+            if any(evaluator.evaluate(condition) for condition in conditions):
+                return _reason(mark) or f"condition: {conditions[0]}"
+    return None
+
+
+@dataclass
+class XFail:
+    """Expected failure of a test, see the xfail mark"""
+
+    reason: str = ""
+    strict: bool = False
+    run: bool = True
+
+
+def expected_failure(
+    marks: Iterable[StaticMark], evaluator: ConditionEvaluator
+) -> XFail | None:
+    """Expected failure of the first xfail mark without condition or with a
+    true condition, None if the test is expected to pass"""
+
+    for mark in marks:
+        if mark.name != XFAIL_MARK:
+            continue
+        conditions = _conditions(mark)
+        if conditions and not any(
+            evaluator.evaluate(condition) for condition in conditions
+        ):
+            continue
+        return XFail(
+            reason=_reason(mark),
+            strict=bool(_option(mark.kwargs.get("strict", False), evaluator)),
+            run=bool(_option(mark.kwargs.get("run", True), evaluator)),
+        )
+    return None
+
+
+def apply_xfail(
+    xfail: XFail, success: bool, result_lines: list[str]
+) -> tuple[str, bool, list[str]]:
+    """Outcome of a test with an expected failure
+
+    Returns:
+        tuple[str, bool, list[str]]: Outcome, success and result lines of the test
+    """
+
+    if not success:
+        return OUTCOME_XFAILED, True, [xfail.reason] if xfail.reason else []
+    if xfail.strict:
+        return OUTCOME_FAILED, False, [f"[XPASS(strict)] {xfail.reason}".rstrip()]
+    return OUTCOME_XPASSED, True, result_lines
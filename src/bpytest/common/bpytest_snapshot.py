@@ -0,0 +1,137 @@
+"""
+bpytest.common.bpytest_snapshot
+~~~~~~~~~~~~~~
+
+Hash trees of the scene state, built by the Blender test session from the
+RNA properties of bpy.data (see blender_module/bpytest/snapshot.py).
+
+Every node has a digest of its content: leaves digest a property value,
+branches digest the names and digests of their children. Two equal trees
+are found equal comparing their root digests, and the differences of two
+trees are found descending only into the children with different digests.
+
+Classes:
+    SnapshotNode
+        A node of a hash tree.
+
+Functions:
+    diff_snapshots
+        Differences of two hash trees.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any
+
+# Bytes of the digests, 128 bits
+DIGEST_SIZE = 16
+
+# Longest value representation stored in a leaf, longer ones are truncated
+MAX_VALUE_LENGTH = 200
+
+
+def _digest(*parts: bytes) -> str:
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for part in parts:
+        hasher.update(len(part).to_bytes(8, "little"))
+        hasher.update(part)
+    return hasher.hexdigest()
+
+
+@dataclass
+class SnapshotNode:
+    """Node of a hash tree: a leaf with a value, or a branch with children"""
+
+    digest: str
+    # Representation of the value of a leaf, shown in the differences
+    value: str | None = None
+    children: dict[str, "SnapshotNode"] = field(default_factory=dict)
+
+    @classmethod
+    def leaf(cls, value: Any, data: bytes | None = None) -> "SnapshotNode":
+        """Leaf of a value. The digest is computed from data if given (e.g. the
+        bytes of an array read in bulk), from the representation otherwise"""
+
+        text = repr(value)
+        if len(text) > MAX_VALUE_LENGTH:
+            text = text[: MAX_VALUE_LENGTH - 3] + "..."
+        if data is None:
+            data = repr(value).encode("utf-8")
+        return cls(_digest(b"leaf", data), value=text)
+
+    @classmethod
+    def branch(cls, children: dict[str, "SnapshotNode"]) -> "SnapshotNode":
+        """Branch of children nodes, by name"""
+
+        parts = [b"branch"]
+        for name in sorted(children):
+            parts.append(name.encode("utf-8"))
+            parts.append(children[name].digest.encode("ascii"))
+        return cls(_digest(*parts), children=dict(sorted(children.items())))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Json representation"""
+
+        data: dict[str, Any] = {"digest": self.digest}
+        if self.value is not None:
+            data["value"] = self.value
+        if self.children:
+            data["children"] = {
+                name: child.to_dict() for name, child in self.children.items()
+            }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SnapshotNode":
+        """Node of a json representation"""
+        return cls(
+            digest=data["digest"],
+            value=data.get("value"),
+            children={
+                name: cls.from_dict(child)
+                for name, child in data.get("children", {}).items()
+            },
+        )
+
+
+def diff_snapshots(
+    expected: SnapshotNode,
+    actual: SnapshotNode,
+    max_report: int = 20,
+    path: str = "",
+) -> list[str]:
+    """Differences of two hash trees, as "path: expected -> actual" lines.
+    Only the children with different digests are compared.
+
+    Args:
+        expected (SnapshotNode): Stored tree
+        actual (SnapshotNode): Current tree
+        max_report (int): Maximum number of differences
+        path (str): Path of the compared nodes
+    """
+
+    if expected.digest == actual.digest or max_report <= 0:
+        return []
+
+    if not expected.children or not actual.children:
+        return [f"{path or '/'}: {expected.value} -> {actual.value}"]
+
+    differences: list[str] = []
+    for name in sorted(expected.children.keys() | actual.children.keys()):
+        if len(differences) >= max_report:
+            break
+        child_path = f"{path}/{name}"
+        if name not in actual.children:
+            differences.append(f"{child_path}: removed")
+        elif name not in expected.children:
+            differences.append(f"{child_path}: added")
+        else:
+            differences.extend(
+                diff_snapshots(
+                    expected.children[name],
+                    actual.children[name],
+                    max_report - len(differences),
+                    child_path,
+                )
+            )
+    return differences
@@ -0,0 +1,116 @@
+"""
+bpytest.common.bpytest_version
+~~~~~~~~~~~~~~
+
+Blender version requirements of the tests, the `blender` marks:
+
+    @bpytest.mark.blender(">=4.2")
+    def test_extension_platform():
+        ...
+
+    # Every test of the module
+    bpytestmark = [bpytest.mark.blender(">=3.6,<4.2")]
+
+A requirement is a comma separated list of clauses, each one an operator
+(>=, <=, >, <, ==, !=) followed by a version. A version without operator,
+or with ==, matches every release of the version prefix ("4.2" matches
+4.2.0 and 4.2.3). Every clause of every blender mark must match.
+
+The command line reads the marks from the source and runs a test only with
+the Blender executables whose version matches, see bpytest.probe.
+
+Functions:
+    parse_version
+        Version tuple of a version string.
+    version_matches
+        If a version matches a requirement.
+    version_requirements
+        Requirements of the blender marks of a test.
+    runs_on_version
+        If the blender marks of a test match a version.
+"""
+
+import operator
+from typing import Callable, Iterable
+
+try:
+    from .bpytest_ast import SourceExpression, StaticMark
+except ImportError:
+    # Imported as a top level module inside Blender
+    from bpytest_ast import SourceExpression, StaticMark  # type: ignore[no-redef]
+
+# Name of the mark with the Blender versions of a test
+BLENDER_MARK = "blender"
+
+# Operators of the clauses, the two characters ones first
+_OPERATORS: dict[str, Callable[[tuple[int, ...], tuple[int, ...]], bool]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+
+def parse_version(text: str) -> tuple[int, ...]:
+    """Version tuple of a version string, e.g. (4, 2) for "4.2", raises a
+    ValueError if it is not a dot separated list of numbers"""
+
+    try:
+        version = tuple(int(part) for part in text.strip().split("."))
+    except ValueError:
+        raise ValueError(f"Invalid Blender version {text.strip()!r}") from None
+    if any(part < 0 for part in version):
+        raise ValueError(f"Invalid Blender version {text.strip()!r}")
+    return version
+
+
+def version_matches(requirement: str, version: tuple[int, ...]) -> bool:
+    """If a Blender version matches every clause of a requirement, e.g.
+    ">=3.6,<4.2". Raises a ValueError if the requirement is invalid"""
+
+    for clause in requirement.split(","):
+        clause = clause.strip()
+        name = next((name for name in _OPERATORS if clause.startswith(name)), "")
+        expected = parse_version(clause[len(name) :])
+        if name in ("", "==", "!="):
+            # Prefix match, "4.2" is every 4.2.x release
+            matches = version[: len(expected)] == expected
+            if matches == (name == "!="):
+                return False
+            continue
+        # Missing parts are zeros, "4.2" is 4.2.0
+        size = max(len(version), len(expected))
+        padded = version + (0,) * (size - len(version))
+        expected += (0,) * (size - len(expected))
+        if not _OPERATORS[name](padded, expected):
+            return False
+    return True
+
+
+def version_requirements(marks: Iterable[StaticMark]) -> list[str]:
+    """Requirements of the blender marks, raises a ValueError if an argument
+    is not a literal string"""
+
+    requirements = []
+    for mark in marks:
+        if mark.name != BLENDER_MARK:
+            continue
+        for argument in mark.args:
+            if not isinstance(argument, str) or isinstance(argument, SourceExpression):
+                raise ValueError(
+                    f"The arguments of the {BLENDER_MARK} mark must be literal "
+                    f"strings, got {argument}"
+                )
+            requirements.append(argument)
+    return requirements
+
+
+def runs_on_version(marks: Iterable[StaticMark], version: tuple[int, ...]) -> bool:
+    """If a test with these marks (including its module marks) runs with a
+    Blender version"""
+    return all(
+        version_matches(requirement, version)
+        for requirement in version_requirements(marks)
+    )
@@ -0,0 +1,201 @@
+"""Startup trace and session trace of the test session.
+
+Spans are recorded by the main process and by the test session subprocesses
+with high resolution timestamps aligned to the wall clock, so the spans of
+every process can be shown on a single timeline. The subprocesses send their
+spans to the main process with a bpyevent.
+
+The startup trace stops recording after the first test, the session trace
+records the whole session (every reset, fixture and test) and is written in
+the Chrome trace event format, viewable in Perfetto or chrome://tracing.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Iterator
+
+# Offset between the wall clock and the performance counter, the timestamps
+# have the resolution of the performance counter and can be compared
+# between processes of the same machine
+_CLOCK_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+def now_ns() -> int:
+    """Current timestamp in nanoseconds"""
+    return _CLOCK_OFFSET_NS + time.perf_counter_ns()
+
+
+@dataclass
+class Span:
+    """A phase of the test session in a process"""
+
+    name: str
+    process: str
+    start_ns: int
+    end_ns: int
+
+    @property
+    def duration_ns(self) -> int:
+        """Duration of the span in nanoseconds"""
+        return self.end_ns - self.start_ns
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializable fields of the span, sent in the trace event"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Span":
+        """Span of the fields returned by to_dict"""
+        return cls(**data)
+
+
+class Tracer:
+    """Records the spans of a process.
+
+    The tracer is enabled when created, so the phases running before the
+    configuration is loaded are recorded, and is disabled once the spans
+    are no longer needed, or at the end of the process for a session trace.
+    """
+
+    def __init__(self, process: str = ""):
+        self.process = process
+        self.enabled = True
+        # Keep recording after the spans are popped
+        self.whole_session = False
+        self.spans: list[Span] = []
+
+    def add(self, name: str, start_ns: int, end_ns: int | None = None) -> None:
+        """Record a span, ending now if end_ns is not given"""
+
+        if not self.enabled:
+            return
+        self.spans.append(
+            Span(
+                name,
+                self.process,
+                start_ns,
+                now_ns() if end_ns is None else end_ns,
+            )
+        )
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Record the span of the with block"""
+
+        start_ns = now_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start_ns)
+
+    def disable(self) -> None:
+        """Stop recording and drop the recorded spans"""
+
+        self.enabled = False
+        self.spans = []
+
+    def pop_spans(self) -> list[Span]:
+        """Return the recorded spans and stop recording, unless the whole
+        session is traced. Spans recorded before the process name was known
+        get the current process name."""
+
+        spans = self.spans
+        if self.whole_session:
+            self.spans = []
+        else:
+            self.disable()
+        for span in spans:
+            span.process = span.process or self.process
+        return spans
+
+    def fork(self, process: str) -> None:
+        """Drop the spans of the parent process in a forked process, and
+        record the next spans with the process name of the fork"""
+
+        self.spans = []
+        self.process = process
+
+
+tracer = Tracer()
+
+
+def format_timeline(spans: list[Span]) -> list[str]:
+    """Format the spans as a timeline table, relative to the first span"""
+
+    if not spans:
+        return []
+
+    spans = sorted(spans, key=lambda span: (span.start_ns, -span.end_ns))
+    origin = spans[0].start_ns
+    process_width = max(len("process"), *(len(span.process) for span in spans))
+
+    lines = [
+        f"{'start ms':>10} {'duration ms':>12}  {'process':<{process_width}}  phase"
+    ]
+    for span in spans:
+        lines.append(
+            f"{(span.start_ns - origin) / 1e6:>10.2f} "
+            f"{span.duration_ns / 1e6:>12.2f}  "
+            f"{span.process:<{process_width}}  {span.name}"
+        )
+    return lines
+
+
+def _track_ids(spans: list[Span]) -> list[int]:
+    """Track of each span of a process, the spans of a track are nested or
+    sequential, as required by the trace viewers (e.g. the spans of threads
+    running in parallel go on different tracks)"""
+
+    # End times of the open spans of each track
+    tracks: list[list[int]] = []
+    track_ids = []
+    for span in spans:
+        for track_id, open_ends in enumerate(tracks):
+            while open_ends and open_ends[-1] <= span.start_ns:
+                open_ends.pop()
+            if not open_ends or span.end_ns <= open_ends[-1]:
+                break
+        else:
+            tracks.append([])
+            track_id = len(tracks) - 1
+        tracks[track_id].append(span.end_ns)
+        track_ids.append(track_id)
+    return track_ids
+
+
+def format_chrome_trace(spans: list[Span]) -> dict[str, Any]:
+    """Spans in the Chrome trace event format, with a track (pid) by
+    process, timestamps in microseconds relative to the first span"""
+
+    spans = sorted(spans, key=lambda span: (span.start_ns, -span.end_ns))
+    origin = spans[0].start_ns if spans else 0
+    processes = list(dict.fromkeys(span.process for span in spans))
+
+    events: list[dict[str, Any]] = []
+    for pid, process in enumerate(processes, start=1):
+        events.append(
+            {"ph": "M", "name": "process_name", "pid": pid, "args": {"name": process}}
+        )
+        # Keep the order of the processes in the viewer
+        events.append(
+            {
+                "ph": "M",
+                "name": "process_sort_index",
+                "pid": pid,
+                "args": {"sort_index": pid},
+            }
+        )
+        process_spans = [span for span in spans if span.process == process]
+        for span, tid in zip(process_spans, _track_ids(process_spans)):
+            events.append(
+                {
+                    "ph": "X",
+                    "name": span.name,
+                    "pid": pid,
+                    "tid": tid,
+                    "ts": (span.start_ns - origin) / 1e3,
+                    "dur": span.duration_ns / 1e3,
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,552 @@
+"""
+bpytest.distributed
+~~~~~~~~~~~~~~~~~~~
+
+Distributed execution: a coordinator serves the queue of the selected tests
+over TCP, and workers (on any machine with a checkout of the project) pull
+batches of tests, run them in their local Blender executables and stream the
+results back. Workers can join and leave at any time, the tests of a lost
+worker are queued again.
+
+Every message is a json object on a single line:
+
+    worker      -> coordinator  {"type": "hello", "worker": <name>, "instance_ids": [...]}
+    coordinator -> worker       {"type": "welcome", "collector_string": <str>}
+    worker      -> coordinator  {"type": "next"}
+    coordinator -> worker       {"type": "run", "instance_id": <id>, "tests": [<plan test>, ...]}
+                                {"type": "done"}
+    worker      -> coordinator  {"type": "event", "event": <test session event>}
+                                (test results, coverage, metrics, spans and progress
+                                are forwarded)
+    worker      -> coordinator  {"type": "finished", "exit_code": <int>}
+
+Classes:
+    TestQueue
+        Tests waiting to run on every instance id, and the tests running on
+        each worker.
+    Coordinator
+        TCP server distributing the test queue to the workers.
+    Worker
+        Client running the batches of the coordinator in Blender.
+
+Functions:
+    coordinate
+        Serve the selected tests of the command line until every test has run.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, cast
+
+from .common.bpyprint import (  # type: ignore[import]
+    decode_bpyevent,
+    decode_bpyprint,
+    is_bpyevent,
+    is_bpyprint,
+)
+from .common.bpytest_index import PLAN_VERSION  # type: ignore[import]
+
+if TYPE_CHECKING:
+    from .progress import Progress
+
+DEFAULT_PORT = 8765
+
+# Tests sent to a worker at once, each batch is a Blender launch
+DEFAULT_BATCH_SIZE = 8
+
+# Runs of a test whose Blender session ended without its result
+# (e.g. a crash), before it is reported as not run
+MAX_ATTEMPTS = 2
+
+# Seconds a worker retries to connect to a coordinator not started yet
+CONNECT_TIMEOUT = 30.0
+
+
+def parse_address(address: str, default_host: str = "127.0.0.1") -> tuple[str, int]:
+    """Parse a HOST:PORT address, the host and port are optional"""
+
+    host, separator, port = address.rpartition(":")
+    if not separator:
+        host, port = address, ""
+    return host or default_host, int(port) if port else DEFAULT_PORT
+
+
+@dataclass
+class WorkItem:
+    """A test to run on an instance id, None if any instance can run it"""
+
+    test: dict[str, Any]
+    instance_id: str | None
+    attempts: int = 0
+
+    @property
+    def nodeid(self) -> str:
+        """Node id of the test"""
+        return self.test["nodeid"]
+
+
+class TestQueue:
+    """Tests waiting to run and tests running on each worker. Thread safe,
+    workers block in take() until a batch is available or the queue is done."""
+
+    def __init__(
+        self,
+        tests: list[dict[str, Any]],
+        instance_ids: list[str | None],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Args:
+            tests (list[dict[str, Any]]): Tests of the json test plan, in run order
+            instance_ids (list[str | None]): Instance ids running every test,
+                [None] to run every test once on any instance
+            batch_size (int): Maximum number of tests of a batch
+        """
+
+        self._condition = threading.Condition()
+        self._batch_size = batch_size
+        self._pending = [
+            WorkItem(test, instance_id)
+            for instance_id in instance_ids
+            for test in tests
+        ]
+        self._running: dict[str, list[WorkItem]] = {}
+        # Tests not run after MAX_ATTEMPTS
+        self.lost: list[WorkItem] = []
+
+    @property
+    def done(self) -> bool:
+        """If every test has a result or was lost"""
+        with self._condition:
+            return not self._pending and not any(self._running.values())
+
+    def take(
+        self, worker: str, instance_ids: list[str]
+    ) -> tuple[str, list[WorkItem]] | None:
+        """Block until there is a batch for the worker, returning its instance
+        id and tests, or None once every test has run"""
+
+        with self._condition:
+            while True:
+                batch = self._next_batch(instance_ids)
+                if batch is not None:
+                    self._running.setdefault(worker, []).extend(batch[1])
+                    return batch
+                if not self._pending and not any(self._running.values()):
+                    return None
+                # Running tests can be queued again if their worker is lost
+                self._condition.wait()
+
+    def _next_batch(
+        self, instance_ids: list[str]
+    ) -> tuple[str, list[WorkItem]] | None:
+        for item in self._pending:
+            if item.instance_id is None or item.instance_id in instance_ids:
+                break
+        else:
+            return None
+
+        instance_id = item.instance_id
+        batch = [
+            pending
+            for pending in self._pending
+            if pending.instance_id == instance_id
+        ][: self._batch_size]
+        for pending in batch:
+            self._pending.remove(pending)
+            pending.attempts += 1
+        return instance_id or instance_ids[0], batch
+
+    def complete(self, worker: str, nodeid: str) -> None:
+        """Remove a running test of the worker once its result arrives"""
+
+        with self._condition:
+            running = self._running.get(worker, [])
+            for item in running:
+                if item.nodeid == nodeid:
+                    running.remove(item)
+                    break
+            self._condition.notify_all()
+
+    def release(self, worker: str, lost: bool) -> list[WorkItem]:
+        """Queue again the running tests of a worker without a result.
+
+        Args:
+            worker (str): Name of the worker
+            lost (bool): The worker left, its tests are always queued again.
+                Otherwise its Blender session ended without their results, and
+                they are queued again only if they did not run MAX_ATTEMPTS times.
+
+        Returns:
+            list[WorkItem]: Tests queued again
+        """
+
+        with self._condition:
+            requeued = []
+            for item in self._running.pop(worker, []):
+                if lost or item.attempts < MAX_ATTEMPTS:
+                    if lost:
+                        item.attempts -= 1
+                    requeued.append(item)
+                else:
+                    self.lost.append(item)
+            # First in the queue, they were taken before the pending tests
+            self._pending[:0] = requeued
+            self._condition.notify_all()
+            return requeued
+
+    def wait_done(self) -> None:
+        """Block until every test has a result or was lost"""
+
+        with self._condition:
+            while self._pending or any(self._running.values()):
+                self._condition.wait()
+
+
+def _send(stream: Any, message: dict[str, Any]) -> None:
+    stream.write((json.dumps(message) + "\n").encode("utf-8"))
+    stream.flush()
+
+
+def _receive(stream: Any) -> Iterator[dict[str, Any]]:
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    """Connection of a worker"""
+
+    def handle(self) -> None:
+        coordinator = cast(_CoordinatorServer, self.server).coordinator
+        worker = ""
+        instance_ids: list[str] = []
+        lost = True
+        batch_running = False
+        try:
+            for message in _receive(self.rfile):
+                if message["type"] == "hello":
+                    worker = message["worker"]
+                    instance_ids = message["instance_ids"]
+                    coordinator.log(f"Worker {worker} joined {instance_ids}")
+                    _send(
+                        self.wfile,
+                        {
+                            "type": "welcome",
+                            "collector_string": coordinator.collector_string,
+                        },
+                    )
+
+                elif message["type"] == "next":
+                    batch = coordinator.queue.take(worker, instance_ids)
+                    if batch is None:
+                        _send(self.wfile, {"type": "done"})
+                        lost = False
+                        break
+                    instance_id, items = batch
+                    coordinator.batch_started()
+                    batch_running = True
+                    _send(
+                        self.wfile,
+                        {
+                            "type": "run",
+                            "instance_id": instance_id,
+                            "tests": [item.test for item in items],
+                        },
+                    )
+
+                elif message["type"] == "event":
+                    coordinator.handle_event(worker, message["event"])
+
+                elif message["type"] == "finished":
+                    coordinator.batch_finished()
+                    batch_running = False
+                    requeued = coordinator.queue.release(worker, lost=False)
+                    if requeued:
+                        coordinator.log(
+                            f"Worker {worker} session ended without the result "
+                            f"of {len(requeued)} tests, queued again"
+                        )
+        except (OSError, ValueError):
+            pass
+        finally:
+            if batch_running:
+                coordinator.batch_finished()
+            if lost and worker:
+                requeued = coordinator.queue.release(worker, lost=True)
+                coordinator.log(
+                    f"Worker {worker} lost, {len(requeued)} tests queued again"
+                )
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], coordinator: "Coordinator"):
+        self.coordinator = coordinator
+        super().__init__(address, _CoordinatorHandler)
+
+
+class Coordinator:
+    """Serves the test queue to the workers over TCP and forwards the
+    results they stream back"""
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        queue: TestQueue,
+        collector_string: str,
+        handle_event: Callable[[dict[str, Any]], Any],
+    ):
+        """
+        Args:
+            address (tuple[str, int]): Host and port to listen on, port 0 for any
+            queue (TestQueue): Tests to distribute
+            collector_string (str): Collector string of the workers test sessions
+            handle_event (Callable[[dict[str, Any]], Any]): Called with the
+                result of every test and the coverage, metrics and spans of
+                every batch
+        """
+
+        self.queue = queue
+        self.collector_string = collector_string
+        self._handle_event = handle_event
+        self._lock = threading.Lock()
+        # Batches whose Blender session has not finished, their last events
+        # (e.g. the coverage) are sent after the results of their tests
+        self._running_batches = 0
+        self._batches_condition = threading.Condition()
+        self._server = _CoordinatorServer(address, self)
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Host and port the coordinator listens on"""
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def log(self, message: str) -> None:
+        """Print a message of the coordinator"""
+        with self._lock:
+            print(f"[coordinator] {message}", flush=True)
+
+    def batch_started(self) -> None:
+        """A batch was sent to a worker"""
+        with self._batches_condition:
+            self._running_batches += 1
+
+    def batch_finished(self) -> None:
+        """The Blender session of a batch ended, or its worker was lost"""
+        with self._batches_condition:
+            self._running_batches -= 1
+            self._batches_condition.notify_all()
+
+    def handle_event(self, worker: str, event: dict[str, Any]) -> None:
+        """Forward the result of a test or the coverage, metrics, render time,
+        spans and progress of a batch sent by a worker, with the worker name"""
+
+        event = {**event, "worker": worker}
+        if event["event"] in (
+            "coverage",
+            "metrics",
+            "render_profile",
+            "startup_trace",
+            "instance_start",
+            "test_start",
+        ):
+            self._handle_event(event)
+            return
+        if event["event"] != "test_result":
+            return
+        self.queue.complete(worker, event["nodeid"])
+        self._handle_event(event)
+        outcome = event.get("outcome") or ("passed" if event["success"] else "failed")
+        status = outcome.upper()
+        self.log(f"{event['nodeid']} [{event['instance_id']}] {status} ({worker})")
+        if not event["success"] and event.get("longrepr"):
+            with self._lock:
+                print(event["longrepr"], flush=True)
+
+    def serve(self) -> None:
+        """Serve the workers until every test has run"""
+
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        host, port = self.address
+        self.log(f"Listening on {host}:{port}")
+        try:
+            self.queue.wait_done()
+            with self._batches_condition:
+                while self._running_batches > 0:
+                    self._batches_condition.wait()
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class Worker:
+    """Pulls batches of tests from the coordinator and runs them in the
+    local Blender executables"""
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        instance_ids: list[str],
+        command: Callable[[str, str, str], list[str]],
+        nocapture: bool = False,
+    ):
+        """
+        Args:
+            address (tuple[str, int]): Host and port of the coordinator
+            instance_ids (list[str]): Instance ids of the local Blender executables
+            command (Callable[[str, str, str], list[str]]): Command running a test
+                session, from the instance id, collector string and test plan path
+            nocapture (bool): Print all the output of the test sessions
+        """
+
+        self._address = address
+        self._instance_ids = instance_ids
+        self._command = command
+        self._nocapture = nocapture
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+
+    def _connect(self) -> socket.socket:
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            try:
+                return socket.create_connection(self._address)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+    def run(self) -> int:
+        """Run batches until the coordinator has no more tests. Returns 1 if
+        any test failed on this worker"""
+
+        failed = False
+        with self._connect() as connection:
+            stream = connection.makefile("rwb")
+            try:
+                _send(
+                    stream,
+                    {
+                        "type": "hello",
+                        "worker": self.name,
+                        "instance_ids": self._instance_ids,
+                    },
+                )
+                messages = _receive(stream)
+                collector_string = next(messages)["collector_string"]
+
+                while True:
+                    _send(stream, {"type": "next"})
+                    # The coordinator exits once every test has a result
+                    message: dict[str, Any] = next(messages, {"type": "done"})
+                    if message["type"] == "done":
+                        break
+
+                    exit_code = self._run_batch(
+                        stream,
+                        message["instance_id"],
+                        collector_string,
+                        message["tests"],
+                    )
+                    failed = failed or exit_code != 0
+                    _send(stream, {"type": "finished", "exit_code": exit_code})
+            except (OSError, StopIteration):
+                print(f"[worker {self.name}] Connection to the coordinator closed")
+
+        return 1 if failed else 0
+
+    def _run_batch(
+        self,
+        stream: Any,
+        instance_id: str,
+        collector_string: str,
+        tests: list[dict[str, Any]],
+    ) -> int:
+        """Run a batch in a Blender test session, forwarding its events"""
+
+        with tempfile.NamedTemporaryFile(
+            "w", prefix="bpytest_plan_", suffix=".json", delete=False
+        ) as plan_file:
+            json.dump({"version": PLAN_VERSION, "tests": tests}, plan_file)
+        plan_path = Path(plan_file.name)
+
+        try:
+            process = subprocess.Popen(
+                self._command(instance_id, collector_string, plan_path.as_posix()),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+            assert process.stdout is not None
+            for line in process.stdout:
+                if is_bpyevent(line):
+                    _send(stream, {"type": "event", "event": decode_bpyevent(line)})
+                elif self._nocapture or is_bpyprint(line):
+                    print(decode_bpyprint(line), end="")
+            return process.wait()
+        finally:
+            plan_path.unlink(missing_ok=True)
+
+
+def coordinate(
+    address: str,
+    tests: list[dict[str, Any]],
+    instance_ids: list[str],
+    collector_string: str,
+    handle_event: Callable[[dict[str, Any]], Any],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: "Progress | None" = None,
+) -> int:
+    """Serve the tests to the workers until every test has run
+
+    Args:
+        address (str): HOST:PORT address to listen on
+        tests (list[dict[str, Any]]): Tests of the json test plan, in run order
+        instance_ids (list[str]): Instance ids running every test, every test
+            runs once on any instance if empty
+        collector_string (str): Collector string of the workers test sessions
+        handle_event (Callable[[dict[str, Any]], Any]): Called with every
+            event of the workers
+        batch_size (int): Maximum number of tests of a batch
+        progress (Progress | None): Progress of the tests, None to hide it
+
+    Returns:
+        int: 1 if the coordinator was interrupted or a test was not run, else 0
+    """
+
+    queue = TestQueue(tests, list(instance_ids) or [None], batch_size)
+    coordinator = Coordinator(
+        parse_address(address, default_host="0.0.0.0"),
+        queue,
+        collector_string,
+        handle_event,
+    )
+    if progress is not None:
+        from .progress import ANY_INSTANCE
+
+        for instance_id in instance_ids or [ANY_INSTANCE]:
+            progress.expect(instance_id, [test["nodeid"] for test in tests])
+        progress.start()
+    try:
+        coordinator.serve()
+    except KeyboardInterrupt:
+        return 1
+    finally:
+        if progress is not None:
+            progress.stop()
+
+    for item in queue.lost:
+        print(f"Not run, its test sessions ended without a result: {item.nodeid}")
+    return 1 if queue.lost else 0
@@ -1,3 +1,9 @@
+import time
+
+# Start of the command line import, for the startup trace
+_IMPORT_START_NS = time.time_ns()
+
+# pylint: disable=wrong-import-position
 import argparse
 import os
 import platform
@@ -5,14 +11,16 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 from pathlib import Path
-from pprint import pprint
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import toml
-from dotenv import load_dotenv
-
-from .common.bpyprint import decode_bpyprint, is_bpyprint  # type: ignore[import]
+from .common.bpyprint import (  # type: ignore[import]
+    decode_bpyevent,
+    decode_bpyprint,
+    is_bpyevent,
+    is_bpyprint,
+)
 from .common.bpytest_config import (  # type: ignore[import]
     BpyTestConfig,
     ConfigFileBlenderLevel,
@@ -20,7 +28,302 @@ from .common.bpytest_config import (  # type: ignore[import]
     SessionConfig,
 )
 
+# pylint: enable=wrong-import-position
+
+# toml, dotenv, the reports and the modules of the optional features (test
+# selection, order, versions, skips, coverage, metrics and trace) are
+# imported only when used, to reduce the startup time of the command line
+if TYPE_CHECKING:
+    from .cache import Cache
+    from .common.bpytest_coverage import CoverageData  # type: ignore[import]
+    from .common.bpytest_index import TestEntry  # type: ignore[import]
+    from .common.bpytest_order import OrderReport  # type: ignore[import]
+    from .common.bpytrace import Span  # type: ignore[import]
+    from .progress import Progress
+    from .report import Report
+
 BLENDER_MODULE_PATH = Path(__file__).parent / "blender_module"
+HOST_LANE_INSTANCE_ID = "host"
+# Process name of the command line in the startup trace
+MAIN_PROCESS_NAME = "bpytest"
+# Command line arguments overriding the session config value of the same name
+CONFIG_ARGUMENTS = (
+    "nocapture",
+    "keyword",
+    "markexpr",
+    "collector_string",
+    "norecursedirs",
+    "tmp_path_root",
+    "host_lane",
+    "startup_trace",
+    "fast_start",
+    "update_golden",
+    "cov",
+    "isolate",
+)
+
+
+class SessionSummary:
+    """Results reported by all the test session subprocesses, which
+    can be running in parallel (e.g. the host lane), forwarded to the reports"""
+
+    def __init__(
+        self,
+        reports: "list[Report] | None" = None,
+        cache: "Cache | None" = None,
+    ):
+        self._lock = threading.Lock()
+        self._reports = reports or []
+        self._cache = cache
+        self.passed = 0
+        self.failed = 0
+        # Tests skipped, xfailed or xpassed
+        self.outcomes: dict[str, int] = {}
+        self.instance_ids: list[str] = []
+        # Instance ids where each test failed in its last run
+        self.lastfailed: dict[str, list[str]] = {}
+        # Durations of the last run of each test
+        self.durations: dict[str, dict[str, float]] = {}
+        if cache is not None:
+            from .cache import DURATIONS_KEY, LASTFAILED_KEY
+
+            self.lastfailed = cache.get(LASTFAILED_KEY, {})
+            self.durations = cache.get(DURATIONS_KEY, {})
+        self.startup_spans: "list[Span]" = []
+        self._launch_ns: dict[str, int] = {}
+        self._traced_launches: set[str] = set()
+        # Lines executed by every test session, None without --cov
+        self.coverage: "CoverageData | None" = None
+        from .common.bpytest_metrics import SessionMetrics  # type: ignore[import]
+
+        self.metrics = SessionMetrics()
+        # Renders of the tests and render time saved by the render profile
+        self.render = {"renders": 0, "render_seconds": 0.0, "saved_seconds": 0.0}
+        # Progress shown while the tests run, None with --no-progress
+        self.progress: "Progress | None" = None
+
+    def launched(self, instance_id: str) -> None:
+        """Record the launch time of a test session subprocess"""
+
+        from .common.bpytrace import now_ns  # type: ignore[import]
+
+        with self._lock:
+            self._launch_ns[instance_id] = now_ns()
+
+    def handle_event(self, event: dict[str, Any]) -> None:
+        """Update the summary with an event sent by a test session subprocess"""
+
+        with self._lock:
+            if self.progress is not None:
+                self.progress.handle_event(event)
+
+            if event["event"] == "test_result":
+                from .common.bpytest_metrics import metrics  # type: ignore[import]
+                from .common.bpytest_skip import (  # type: ignore[import]
+                    OUTCOME_PASSED,
+                    OUTCOME_SKIPPED,
+                    OUTCOME_XPASSED,
+                )
+
+                outcome = event.get("outcome", OUTCOME_PASSED)
+                if not event["success"]:
+                    self.failed += 1
+                elif outcome in (OUTCOME_PASSED, OUTCOME_XPASSED):
+                    self.passed += 1
+                if event["success"] and outcome != OUTCOME_PASSED:
+                    self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+                self._update_lastfailed(event)
+                # Skipped tests did not run
+                if outcome != OUTCOME_SKIPPED:
+                    self.durations[event["nodeid"]] = {
+                        "duration": event.get("duration", 0.0),
+                        "setup": event.get("setup_duration", 0.0),
+                    }
+                if event["instance_id"] not in self.instance_ids:
+                    self.instance_ids.append(event["instance_id"])
+                with metrics.timer("reporting"):
+                    for report in self._reports:
+                        report.add_result(event)
+
+            elif event["event"] == "instance_result":
+                for report in self._reports:
+                    report.add_instance_result(event)
+
+            elif event["event"] == "startup_trace":
+                from .common.bpytrace import Span  # type: ignore[import]
+
+                spans = [Span.from_dict(span) for span in event["spans"]]
+                launch_ns = self._launch_ns.get(event["instance_id"])
+                # Spans of the subprocess itself, not of its forked processes
+                process_spans = [
+                    span for span in spans if span.process == event["instance_id"]
+                ]
+                # The spans of a session trace arrive in several events
+                if (
+                    process_spans
+                    and launch_ns is not None
+                    and event["instance_id"] not in self._traced_launches
+                ):
+                    self._traced_launches.add(event["instance_id"])
+                    # Time from the subprocess launch to its python entry point
+                    spans.append(
+                        Span(
+                            "process_start",
+                            event["instance_id"],
+                            launch_ns,
+                            min(span.start_ns for span in process_spans),
+                        )
+                    )
+                self.startup_spans.extend(spans)
+
+            elif event["event"] == "coverage":
+                from .common.bpytest_coverage import CoverageData  # type: ignore[import]
+
+                if self.coverage is None:
+                    self.coverage = CoverageData()
+                self.coverage.merge(CoverageData.from_dict(event["data"]))
+
+            elif event["event"] == "render_profile":
+                for key in self.render:
+                    self.render[key] += event[key]
+
+            elif event["event"] == "metrics":
+                self.metrics.add(
+                    event["instance_id"],
+                    event["data"],
+                    self._launch_ns.get(event["instance_id"]),
+                )
+
+    def _update_lastfailed(self, event: dict[str, Any]) -> None:
+        instance_ids = self.lastfailed.setdefault(event["nodeid"], [])
+        if event["instance_id"] in instance_ids:
+            instance_ids.remove(event["instance_id"])
+        if not event["success"]:
+            instance_ids.append(event["instance_id"])
+        if not instance_ids:
+            del self.lastfailed[event["nodeid"]]
+
+    def save_cache(self) -> None:
+        """Store the last failed tests and the test durations in the cache"""
+
+        if self._cache is None:
+            return
+        from .cache import DURATIONS_KEY, LASTFAILED_KEY
+
+        with self._lock:
+            self._cache.set(LASTFAILED_KEY, self.lastfailed)
+            self._cache.set(DURATIONS_KEY, self.durations)
+
+    def close(self) -> None:
+        """Finish the reports and store the cache"""
+
+        self.save_cache()
+        with self._lock:
+            for report in self._reports:
+                report.close()
+
+
+def _print_session_summary(summary: SessionSummary) -> None:
+    """Print the results of all the test session subprocesses"""
+
+    columns = shutil.get_terminal_size((80, 24)).columns
+    outcomes = "".join(
+        f"{outcome.capitalize()}: {count} "
+        for outcome, count in summary.outcomes.items()
+    )
+    text = (
+        f" [{', '.join(summary.instance_ids)}] "
+        f"Failed: {summary.failed} Success: {summary.passed} {outcomes}"
+    )
+    print("{s:{c}^{n}}".format(s=text, n=columns, c="="))
+
+
+def _print_render_profile(summary: SessionSummary) -> None:
+    """Print the render time of the tests and the render time saved by the
+    render profile"""
+
+    render = summary.render
+    if render["renders"]:
+        print(
+            f"Render profile: {render['renders']} renders in "
+            f"{render['render_seconds']:.2f} seconds, about "
+            f"{render['saved_seconds']:.2f} seconds of render time saved"
+        )
+
+
+def _write_coverage_reports(coverage: "CoverageData", cov_reports: list[str]) -> None:
+    """Print the coverage report or write its lcov and json exports
+
+    Args:
+        coverage (CoverageData): Lines executed by every test session
+        cov_reports (list[str]): "term", "lcov:PATH" or "json:PATH"
+    """
+    import json
+
+    from .common.bpytest_coverage import format_lcov, format_report  # type: ignore[import]
+
+    for cov_report in cov_reports:
+        kind, _, path = cov_report.partition(":")
+        if kind == "term":
+            columns = shutil.get_terminal_size((80, 24)).columns
+            print("{s:{c}^{n}}".format(s=" Coverage ", n=columns, c="="))
+            print(format_report(coverage))
+        elif kind == "lcov":
+            Path(path or "coverage.lcov").write_text(
+                format_lcov(coverage), encoding="utf-8"
+            )
+        elif kind == "json":
+            Path(path or "coverage.json").write_text(
+                json.dumps(coverage.to_dict()), encoding="utf-8"
+            )
+        else:
+            print(f"Unknown coverage report {cov_report!r}, use term, lcov or json")
+
+
+def _add_phase(name: str, start_ns: int) -> None:
+    """Record a phase of the command line, ending now, in the startup trace
+    and in the metrics"""
+    from .common.bpytest_metrics import metrics  # type: ignore[import]
+    from .common.bpytrace import now_ns, tracer  # type: ignore[import]
+
+    tracer.add(name, start_ns)
+    metrics.add_time(name, (now_ns() - start_ns) / 1e9)
+
+
+def _write_metrics(summary: SessionSummary, metrics_file: Path) -> None:
+    """Write the metrics of the command line and of every test session,
+    in the Prometheus text format for .prom files, as json otherwise"""
+    import json
+
+    from .common.bpytest_metrics import format_openmetrics, metrics  # type: ignore[import]
+
+    data = summary.metrics.to_dict(
+        metrics, (time.time_ns() - _IMPORT_START_NS) / 1e9
+    )
+    if metrics_file.suffix == ".prom":
+        metrics_file.write_text(format_openmetrics(data), encoding="utf-8")
+    else:
+        metrics_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def _write_chrome_trace(spans: "list[Span]", trace_file: Path) -> None:
+    """Write the spans of every process in the Chrome trace event format"""
+    import json
+
+    from .common.bpytrace import format_chrome_trace  # type: ignore[import]
+
+    trace_file.write_text(json.dumps(format_chrome_trace(spans)), encoding="utf-8")
+
+
+def _print_startup_trace(spans: "list[Span]") -> None:
+    """Print the startup phases of every process on a single timeline"""
+    from .common.bpytrace import format_timeline  # type: ignore[import]
+
+    columns = shutil.get_terminal_size((80, 24)).columns
+    print("{s:{c}^{n}}".format(s=" Startup trace ", n=columns, c="="))
+    for line in format_timeline(spans):
+        print(line)
+
 
 def _print_config_file_help() -> None:
     """Print the help for the config file"""
@@ -97,6 +400,7 @@ def _get_blender_exe_list(
 
 def _load_pyproject_toml(pyproject_path: Path) -> dict[str, Any]:
     """Load the pyproject.toml file and return the bpytest section"""
+    import toml
 
     try:
         return toml.load(pyproject_path)["tool"]["bpytest"]
@@ -205,14 +509,66 @@ def _install_python_dependencies(
             raise e
 
 
-def _call_subprocess(
-    blender_exe: Path, config: BpyTestConfig, instance_id: str
+def _stream_subprocess(
+    cmd: list[str],
+    config: BpyTestConfig,
+    instance_id: str,
+    summary: SessionSummary,
 ) -> int:
-    """Call the subprocess to execute the test session, streaming its output."""
+    """Run a test session subprocess, streaming its output and
+    forwarding its events to the session summary."""
+
+    summary.launched(instance_id)
+
+    # Launch the process, merging stderr into stdout, text mode for easy printing
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+
+    # Print each line as it arrives
+    assert process.stdout is not None
+    try:
+        for line in process.stdout:
+            _handle_output_line(line, config, summary)
+    except KeyboardInterrupt:
+        # Blender does not outlive an interrupted command line, the results
+        # it already sent are kept
+        process.terminate()
+        for line in process.stdout:
+            _handle_output_line(line, config, summary)
+        process.wait()
+        raise
+
+    # Wait for the process to exit, then return its code
+    return process.wait()
+
+
+def _handle_output_line(
+    line: str, config: BpyTestConfig, summary: SessionSummary
+) -> dict[str, Any] | None:
+    """Print an output line of a test session subprocess, or forward it to
+    the session summary if it is an event. Returns the event, if any."""
+
+    if is_bpyevent(line):
+        event = decode_bpyevent(line)
+        summary.handle_event(event)
+        return event
+    if config.nocapture or is_bpyprint(line):
+        print(decode_bpyprint(line), end="")
+    return None
+
+
+def _blender_command(
+    blender_exe: Path, config: BpyTestConfig, instance_id: str, *args: str
+) -> list[str]:
+    """Command running the test session in Blender"""
 
     generator_filepath = BLENDER_MODULE_PATH / "main.py"
 
-    cmd = [
+    return [
         blender_exe.as_posix(),
         "--background",
         "--factory-startup",
@@ -221,30 +577,252 @@ def _call_subprocess(
         "--",
         f"instance_id={instance_id}",
         f"config={config.serialize()}",
+        *args,
     ]
 
-    # Launch Blender, merging stderr into stdout, text mode for easy printing
-    process = subprocess.Popen(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
+
+def _call_subprocess(
+    blender_exe: Path,
+    config: BpyTestConfig,
+    instance_id: str,
+    summary: SessionSummary,
+) -> int:
+    """Call the subprocess to execute the test session, streaming its output."""
+
+    cmd = _blender_command(blender_exe, config, instance_id)
+    return _stream_subprocess(cmd, config, instance_id, summary)
+
+
+def _watch(
+    blender_exe_list: dict[str, Path], config: BpyTestConfig, summary: SessionSummary
+) -> None:
+    """Keep a Blender test session of the first Blender executable alive,
+    running the tests affected by every change of the watched files"""
+    from .watch import watch_roots, watch_tests
+
+    instance_id, blender_exe = next(iter(blender_exe_list.items()))
+
+    watch_tests(
+        _blender_command(blender_exe, config, instance_id, "mode=serve"),
+        lambda line: _handle_output_line(line, config, summary),
+        watch_roots([config.pythonpath, *config.include, *config.link_addons]),
+        summary.lastfailed,
+        summary.save_cache,
     )
 
-    # Print each line as it arrives
-    assert process.stdout is not None
-    for line in process.stdout:
-        if config.nocapture:
-            print(decode_bpyprint(line), end="")
-        else:
-            if is_bpyprint(line):
-                print(decode_bpyprint(line), end="")
 
-    # Wait for Blender to exit, then return its code
-    return process.wait()
+def _work(
+    address: str, config: BpyTestConfig, blender_exe_list: dict[str, Path]
+) -> int:
+    """Run the tests served by the coordinator, returns the exit code"""
+    from .distributed import Worker, parse_address
+
+    def command(instance_id: str, collector_string: str, test_plan: str) -> list[str]:
+        config.collector_string = collector_string
+        config.test_plan = test_plan
+        return _blender_command(blender_exe_list[instance_id], config, instance_id)
+
+    worker = Worker(
+        parse_address(address), list(blender_exe_list), command, config.nocapture
+    )
+    return worker.run()
+
+
+def _print_collected_tests(selected: "list[TestEntry]", as_json: bool) -> None:
+    """Print the node ids of the collected tests, or the json test plan"""
+
+    if as_json:
+        import json
+
+        from .common.bpytest_index import make_plan  # type: ignore[import]
+
+        print(json.dumps(make_plan(selected), indent=2))
+        return
+
+    for entry in selected:
+        print(entry.nodeid)
+    print(f"{len(selected)} tests collected")
+
+
+def _reorder_tests(
+    selected: "list[TestEntry]", config: BpyTestConfig, cache: "Cache"
+) -> "tuple[list[TestEntry], OrderReport]":
+    """Order the selected tests by the resources they need"""
+
+    from .cache import DURATIONS_KEY
+    from .common.bpytest_addons import read_directory_marks  # type: ignore[import]
+    from .common.bpytest_index import IGNORE_DIRS, find_conftest_files  # type: ignore[import]
+    from .common.bpytest_order import read_fixture_definitions, reorder_tests  # type: ignore[import]
+
+    conftest_files = find_conftest_files(
+        Path(config.pythonpath), config.norecursedirs + IGNORE_DIRS
+    )
+    test_files = list(dict.fromkeys(entry.filepath for entry in selected))
+    return reorder_tests(
+        selected,
+        read_fixture_definitions(conftest_files + test_files),
+        cache.get(DURATIONS_KEY, {}),
+        read_directory_marks(conftest_files),
+    )
+
+
+def _select_by_version(
+    selected: "list[TestEntry]", blender_exe_list: dict[str, Path], cache: "Cache"
+) -> "dict[str, list[TestEntry]]":
+    """Selected tests of each Blender executable, without the tests whose
+    blender marks do not match its version. The executables are only probed
+    (once, then read from the cache) if a selected test has blender marks.
+
+    Raises:
+        ValueError: If a blender mark is invalid
+        RuntimeError: If the version of an executable can not be read
+    """
+
+    from .common.bpytest_version import runs_on_version, version_requirements  # type: ignore[import]
+    from .probe import BlenderProbe
+
+    instance_tests = {instance_id: selected for instance_id in blender_exe_list}
+    if not any(version_requirements(entry.static_marks) for entry in selected):
+        return instance_tests
+
+    probe = BlenderProbe(cache)
+    for instance_id, blender_exe in blender_exe_list.items():
+        info = probe.get(blender_exe)
+        print(
+            f"[{instance_id}] Blender {info.version_string}, "
+            f"Python {info.python_version}"
+        )
+        instance_tests[instance_id] = [
+            entry
+            for entry in selected
+            if runs_on_version(entry.static_marks, info.version)
+        ]
+    return instance_tests
+
+
+def _skip_static(
+    instance_tests: "dict[str, list[TestEntry]]", summary: SessionSummary
+) -> "tuple[dict[str, list[TestEntry]], dict[str, list[str]]]":
+    """Report the tests skipped by the skip marks and the skipif conditions
+    decided by the command line, without sending them to the test sessions
+
+    Returns:
+        tuple[dict[str, list[TestEntry]], dict[str, list[str]]]: Tests to run
+            and node ids of the skipped tests of each Blender executable
+    """
+    from .common.bpytest_skip import (  # type: ignore[import]
+        OUTCOME_SKIPPED,
+        ConditionEvaluator,
+        skip_reason,
+        static_namespace,
+    )
+
+    evaluator = ConditionEvaluator(static_namespace())
+    reasons: dict[str, str | None] = {}
+    for entries in instance_tests.values():
+        for entry in entries:
+            if entry.nodeid in reasons:
+                continue
+            try:
+                reasons[entry.nodeid] = skip_reason(entry.static_marks, evaluator)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # Decided by the test sessions, e.g. a condition using bpy
+                reasons[entry.nodeid] = None
+    if not any(reasons.values()):
+        return instance_tests, {}
+
+    for nodeid, reason in reasons.items():
+        if reason is not None:
+            print(f"{nodeid} SKIPPED ({reason})")
+    for instance_id, entries in instance_tests.items():
+        for entry in entries:
+            if reasons[entry.nodeid] is not None:
+                summary.handle_event(
+                    {
+                        "event": "test_result",
+                        "instance_id": instance_id,
+                        "lane": "blender",
+                        "nodeid": entry.nodeid,
+                        "success": True,
+                        "outcome": OUTCOME_SKIPPED,
+                        "duration": 0.0,
+                        "setup_duration": 0.0,
+                        "longrepr": reasons[entry.nodeid],
+                    }
+                )
+    skipped = {
+        instance_id: [
+            entry.nodeid for entry in entries if reasons[entry.nodeid] is not None
+        ]
+        for instance_id, entries in instance_tests.items()
+    }
+    return {
+        instance_id: [entry for entry in entries if reasons[entry.nodeid] is None]
+        for instance_id, entries in instance_tests.items()
+    }, skipped
 
-def main() -> None:
-    """Main function"""
+
+def _write_temp_plan(
+    entries: "list[TestEntry]", skipped: list[str] | None = None
+) -> Path:
+    """Write the test plan read by a test session to a temporary file, with
+    the node ids of its tests skipped by the command line"""
+    from .common.bpytest_index import write_plan  # type: ignore[import]
+
+    with tempfile.NamedTemporaryFile(
+        "w", prefix="bpytest_plan_", suffix=".json", delete=False
+    ) as plan_file:
+        plan_path = Path(plan_file.name)
+    write_plan(plan_path, entries, skipped)
+    return plan_path
+
+
+def _use_test_plan(
+    config: BpyTestConfig,
+    tests: "list[TestEntry]",
+    selected: "list[TestEntry]",
+    plan_paths: list[Path],
+    skipped: list[str] | None = None,
+) -> None:
+    """Set the test plan of a test session running the tests: the plan of the
+    selected tests (the first plan path), or a new plan added to plan_paths"""
+
+    config.test_plan = plan_paths[0].as_posix()
+    if tests is not selected:
+        plan_paths.append(_write_temp_plan(tests, skipped))
+        config.test_plan = plan_paths[-1].as_posix()
+
+
+def _start_host_lane(
+    config: BpyTestConfig, summary: SessionSummary, return_codes: list[int]
+) -> threading.Thread:
+    """Start the host lane test session in a thread, running the tests that
+    do not need bpy in the host python interpreter. The return code is
+    appended to return_codes when the session ends."""
+
+    cmd = [
+        sys.executable,
+        (BLENDER_MODULE_PATH / "host_main.py").as_posix(),
+        "--",
+        f"instance_id={HOST_LANE_INSTANCE_ID}",
+        f"config={config.serialize()}",
+    ]
+
+    from .common.bpytrace import tracer  # type: ignore[import]
+
+    def run() -> None:
+        with tracer.span(f"test_session [{HOST_LANE_INSTANCE_ID}]"):
+            return_codes.append(
+                _stream_subprocess(cmd, config, HOST_LANE_INSTANCE_ID, summary)
+            )
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments"""
 
     parser = argparse.ArgumentParser(description="Simple test runner")
     
@@ -283,6 +861,147 @@ def main() -> None:
         help=SessionConfig.get_attr_help("keyword"),
     )
 
+    parser.add_argument(
+        "-m",
+        "--markexpr",
+        help=SessionConfig.get_attr_help("markexpr"),
+    )
+
+    parser.add_argument(
+        "--host-lane",
+        action="store_true",
+        default=None,
+        help=SessionConfig.get_attr_help("host_lane"),
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep a Blender test session alive and run the affected tests on "
+            "every change of the test files, conftest files, include paths and "
+            "linked addons (the tests of the changed files first, then the last "
+            "failures). Uses the first Blender executable."
+        ),
+    )
+
+    parser.add_argument(
+        "--update-golden",
+        action="store_true",
+        default=None,
+        help=SessionConfig.get_attr_help("update_golden"),
+    )
+
+    parser.add_argument(
+        "--no-reorder",
+        dest="reorder",
+        action="store_false",
+        default=None,
+        help=(
+            "Run the tests in the collection order, instead of ordering them "
+            "by the resources they need"
+        ),
+    )
+
+    parser.add_argument(
+        "--no-progress",
+        dest="progress",
+        action="store_false",
+        default=None,
+        help=ConfigFilePackageLevel.get_attr_help("progress"),
+    )
+
+    parser.add_argument(
+        "--isolate",
+        choices=("none", "fork", "fork-module"),
+        help=SessionConfig.get_attr_help("isolate"),
+    )
+
+    parser.add_argument(
+        "--cov",
+        action="append",
+        metavar="PACKAGE",
+        help=SessionConfig.get_attr_help("cov"),
+    )
+
+    parser.add_argument(
+        "--cov-report",
+        action="append",
+        help=ConfigFilePackageLevel.get_attr_help("cov_report"),
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Resume an interrupted session: the tests of its checkpoint that "
+            "already ran with the same configuration and Blender executable are "
+            "not run again, their results are reported with the results of the "
+            "remaining tests"
+        ),
+    )
+
+    parser.add_argument(
+        "--collect-only",
+        action="store_true",
+        help=(
+            "Only collect the tests, without starting Blender, and print "
+            "their node ids"
+        ),
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help=(
+            "With --collect-only, print the json test plan instead: the node id, "
+            "file, function, marks and fixtures of every selected test"
+        ),
+    )
+
+    parser.add_argument(
+        "--coordinator",
+        nargs="?",
+        const="0.0.0.0",
+        metavar="HOST:PORT",
+        help=(
+            "Serve the selected tests over TCP to the --worker processes, and "
+            "report their results, instead of running the tests. Every test runs "
+            "once for each id of blender_exe_id_list, or once on any worker "
+            "instance if it is not set. Default address: 0.0.0.0:8765"
+        ),
+    )
+
+    parser.add_argument(
+        "--worker",
+        metavar="HOST:PORT",
+        help=(
+            "Run the tests served by the coordinator at the given address in the "
+            "local Blender executables, until the coordinator has no more tests"
+        ),
+    )
+
+    parser.add_argument(
+        "--dist-batch-size",
+        type=int,
+        default=8,
+        help="Tests sent at once to a worker, each batch runs in a new Blender session",
+    )
+
+    parser.add_argument(
+        "--startup-trace",
+        action="store_true",
+        default=None,
+        help=SessionConfig.get_attr_help("startup_trace"),
+    )
+
+    parser.add_argument(
+        "--fast-start",
+        action="store_true",
+        default=None,
+        help=SessionConfig.get_attr_help("fast_start"),
+    )
+
     parser.add_argument(
         "-bel",
         "--blender-exe-id-list",
@@ -295,6 +1014,31 @@ def main() -> None:
         help=ConfigFilePackageLevel.get_attr_help("envfile"),
     )
 
+    parser.add_argument(
+        "--junitxml",
+        help=ConfigFilePackageLevel.get_attr_help("junitxml"),
+    )
+
+    parser.add_argument(
+        "--report-json",
+        help=ConfigFilePackageLevel.get_attr_help("report_json"),
+    )
+
+    parser.add_argument(
+        "--trace-file",
+        help=ConfigFilePackageLevel.get_attr_help("trace_file"),
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        help=ConfigFilePackageLevel.get_attr_help("metrics_file"),
+    )
+
+    parser.add_argument(
+        "--tmp-path-root",
+        help=ConfigFileBlenderLevel.get_attr_help("tmp_path_root"),
+    )
+
     parser.add_argument(
         "-nrd",
         "--norecursedirs",
@@ -302,36 +1046,34 @@ def main() -> None:
         help=ConfigFileBlenderLevel.get_attr_help("norecursedirs"),
     )
 
-    args = parser.parse_args()
-    
-    if args.config_file:
-        _print_config_file_help()
-        sys.exit(0)
+    return parser.parse_args()
+
+
+def _load_envfile(envfile_arg: str | None) -> None:
+    """Load the environment variables of the .env file of the working
+    directory, or of the specified file"""
 
-    # ==============================================================
-    # Load Environment Variables from .env file if it exists
-    # ==============================================================
     envfile = Path.cwd() / ".env"
-    if args.envfile is not None:
-        specified_envfile = Path(args.envfile)
+    if envfile_arg is not None:
+        specified_envfile = Path(envfile_arg)
         if not specified_envfile.exists():
             print("Specified environment file does not exist")
             sys.exit(1)
         envfile = specified_envfile
     if envfile.exists():
+        from dotenv import load_dotenv
+
         load_dotenv(envfile.as_posix())
 
-    # ==============================================================
-    # Handle PyProject.toml
-    # ==============================================================
-    pyproject_path = Path.cwd() / "pyproject.toml"
-    pyproject_data = {}
-    if pyproject_path.exists():
-        pyproject_data = _load_pyproject_toml(pyproject_path)
 
-    # ==============================================================
-    # Create the BpyTestConfig object
-    # ==============================================================
+def _create_config(
+    args: argparse.Namespace, pyproject_data: dict[str, Any], trace_file: str
+) -> BpyTestConfig:
+    """Config of the test sessions, from the pyproject.toml data and the
+    command line arguments. The whole session is traced with a trace file,
+    only the startup with --startup-trace."""
+    from .common.bpytrace import tracer  # type: ignore[import]
+
     bpytest_config: BpyTestConfig = BpyTestConfig()
 
     # Populate the config with the data from the pyproject.toml file
@@ -340,76 +1082,538 @@ def main() -> None:
 
     # Populate the config with the data from the command line arguments
     # (Can override the data from the pyproject.toml file)
-    if args.nocapture is not None:
-        bpytest_config.nocapture = args.nocapture
-    if args.keyword is not None:
-        bpytest_config.keyword = args.keyword
-    if args.collector_string is not None:
-        bpytest_config.collector_string = args.collector_string
-    if args.norecursedirs is not None:
-        bpytest_config.norecursedirs = args.norecursedirs
-    # if args.show_config:
-    #     print("Current configuration:")
-    #     pprint(bpytest_config.__dict__)
-    #     sys.exit(0)
+    for name in CONFIG_ARGUMENTS:
+        if getattr(args, name) is not None:
+            setattr(bpytest_config, name, getattr(args, name))
+    if bpytest_config.render:
+        from .common.bpytest_render import validate_render_profile  # type: ignore[import]
 
-    # ==============================================================
-    # Get blender executable instances to run the tests
-    # ==============================================================
-    blender_exe_id_list = []
-    if pyproject_data.get("blender_exe_id_list", []):
-        blender_exe_id_list = pyproject_data.get("blender_exe_id_list", [])
-    if args.blender_exe_id_list is not None:
-        blender_exe_id_list = args.blender_exe_id_list.split(",")
-    blender_exe_list = _get_blender_exe_list(
-        blender_exr_arg=args.blender_exe,
-        blender_exe_id_list=blender_exe_id_list,
-    )
+        try:
+            validate_render_profile(bpytest_config.render)
+        except ValueError as error:
+            print(f"Invalid render profile: {error}")
+            sys.exit(1)
+    bpytest_config.trace_session = bool(trace_file)
+    tracer.whole_session = bpytest_config.trace_session
+    if not bpytest_config.startup_trace and not bpytest_config.trace_session:
+        tracer.disable()
+    return bpytest_config
 
-    return_codes = []
-    for instance_id, blender_exe in blender_exe_list.items():
 
-        # ===========================================================
-        # Create isolated installation if needed
-        # ===========================================================
-        _installation_temp_dir: Path | None = None
-        if pyproject_data.get("isolate_installation", False):
+def _collect_tests(
+    args: argparse.Namespace,
+    config: BpyTestConfig,
+    pyproject_data: dict[str, Any],
+    cache: "Cache",
+) -> "list[TestEntry]":
+    """Collect and select the tests before starting Blender, the test
+    sessions run the node ids of the test plan. Exits after printing the
+    tests with --collect-only, or if no test is selected."""
+
+    from .common.bpytest_expression import ExpressionError  # type: ignore[import]
+    from .common.bpytest_index import TestIndex, TestSelector  # type: ignore[import]
+    from .common.bpytest_metrics import metrics  # type: ignore[import]
+    from .common.bpytrace import now_ns, tracer  # type: ignore[import]
+
+    phase_start_ns = now_ns()
+    try:
+        selector = TestSelector(config.keyword, config.markexpr)
+    except ExpressionError as error:
+        print(f"Invalid selection expression {error}")
+        sys.exit(1)
+    selected: "list[TestEntry]" = []
+    # Workers run the tests collected by the coordinator
+    host_collection = not args.watch and args.worker is None
+    reorder = pyproject_data.get("reorder", True)
+    if args.reorder is not None:
+        reorder = args.reorder
+    if host_collection:
+        selected = TestIndex.build(
+            config.collector_string,
+            config.norecursedirs,
+            # The blender marks select the tests of each Blender executable
+            with_marks=True,
+        ).select(selector)
+    _add_phase("collection", phase_start_ns)
+
+    if reorder and len(selected) > 1:
+        with tracer.span("reorder"), metrics.timer("reorder"):
+            selected, order_report = _reorder_tests(selected, config, cache)
+        # The json test plan is the only output with --json
+        if order_report.changed and not args.json:
+            print(order_report)
+
+    if args.collect_only:
+        _print_collected_tests(selected, args.json)
+        sys.exit(0)
+    if host_collection and not selected:
+        print("No tests collected, no test session is started")
+        sys.exit(0)
+    return selected
+
+
+def _plan_instances(
+    selected: "list[TestEntry]",
+    blender_exe_list: dict[str, Path],
+    config: BpyTestConfig,
+    cache: "Cache",
+    resumed: list[dict[str, Any]] | None,
+    summary: SessionSummary,
+) -> "tuple[dict[str, list[TestEntry]], dict[str, list[str]], dict[str, str]]":
+    """Tests run by each instance: the selected tests of its Blender version,
+    without the tests of the interrupted session reused with --resume and
+    without the tests skipped by the command line
+
+    Returns:
+        dict[str, list[TestEntry]]: Tests to run of each instance
+        dict[str, list[str]]: Node ids skipped by the command line of each instance
+        dict[str, str]: Why the test session of an instance without tests to
+            run is skipped
+    """
+
+    from .common.bpytest_metrics import metrics  # type: ignore[import]
+    from .common.bpytrace import tracer  # type: ignore[import]
+
+    try:
+        with tracer.span("probe_versions"), metrics.timer("probe_versions"):
+            instance_tests = _select_by_version(selected, blender_exe_list, cache)
+    except (ValueError, RuntimeError) as error:
+        print(error)
+        sys.exit(1)
+    if config.host_lane:
+        # The host lane session runs the selected tests of the host lane
+        instance_tests[HOST_LANE_INSTANCE_ID] = selected
+    # Instances with selected tests, before the resumed and skipped ones are
+    # removed
+    versioned_instances = {
+        instance_id for instance_id, tests in instance_tests.items() if tests
+    }
+    resumed_instances: set[str] = set()
+    if resumed is not None:
+        from .checkpoint import resume_tests
+
+        remaining = resume_tests(instance_tests, resumed, summary.handle_event)
+        resumed_instances = {
+            instance_id
+            for instance_id, tests in remaining.items()
+            if instance_tests[instance_id] and not tests
+        }
+        instance_tests = remaining
+    # The lane of a test is only known by the test sessions, they skip the
+    # tests of the host lane
+    static_skips: dict[str, list[str]] = {}
+    if not config.host_lane:
+        instance_tests, static_skips = _skip_static(instance_tests, summary)
+
+    skip_reasons: dict[str, str] = {}
+    for instance_id, tests in instance_tests.items():
+        if tests:
+            continue
+        if instance_id not in versioned_instances:
+            reason = "No selected test runs with this Blender executable"
+        elif instance_id in resumed_instances:
+            reason = "Every selected test ran before the interruption"
+        else:
+            reason = "Every selected test is skipped"
+        skip_reasons[instance_id] = f"{reason}, the test session is skipped"
+    return instance_tests, static_skips, skip_reasons
+
+
+def _run_instance(
+    blender_exe: Path,
+    config: BpyTestConfig,
+    instance_id: str,
+    summary: SessionSummary,
+    pyproject_data: dict[str, Any],
+) -> int:
+    """Run the test session of a Blender executable, returns its exit code"""
+
+    from .common.bpytest_metrics import metrics  # type: ignore[import]
+    from .common.bpytrace import tracer  # type: ignore[import]
+
+    # ===========================================================
+    # Create isolated installation if needed
+    # ===========================================================
+    _installation_temp_dir: Path | None = None
+    if pyproject_data.get("isolate_installation", False):
+        with tracer.span(
+            f"isolate_installation [{instance_id}]"
+        ), metrics.timer("isolate_installation"):
             _installation_temp_dir, blender_exe = (
                 _isolate_blender_installation(blender_exe)
             )
 
-        # ===========================================================
-        # Install python dependencies if needed
-        # ===========================================================
-        python_dependencies = pyproject_data.get("python_dependencies", [])
-        if python_dependencies:
+    # ===========================================================
+    # Install python dependencies if needed
+    # ===========================================================
+    python_dependencies = pyproject_data.get("python_dependencies", [])
+    if python_dependencies:
+        with tracer.span(
+            f"python_dependencies [{instance_id}]"
+        ), metrics.timer("python_dependencies"):
             _install_python_dependencies(
                 blender_exe=blender_exe,
                 python_dependencies=python_dependencies,
             )
 
-        # ===========================================================
-        # Execute the test session
-        # ===========================================================
-        return_code = _call_subprocess(
-            blender_exe, bpytest_config, instance_id
+    # ===========================================================
+    # Execute the test session
+    # ===========================================================
+    with tracer.span(f"test_session [{instance_id}]"), metrics.timer(
+        "test_session"
+    ):
+        return_code = _call_subprocess(blender_exe, config, instance_id, summary)
+
+    # ===========================================================
+    # Clean up isolated installation if needed
+    # ===========================================================
+    if _installation_temp_dir is not None:
+        print(
+            f"Cleaning up isolated installation at {_installation_temp_dir} "
+            f"for blender executable {blender_exe}"
         )
-        return_codes.append(return_code)
+        shutil.rmtree(_installation_temp_dir)
 
-        # ===========================================================
-        # Clean up isolated installation if needed
-        # ===========================================================
-        if _installation_temp_dir is not None:
-            print(
-                f"Cleaning up isolated installation at {_installation_temp_dir} "
-                f"for blender executable {blender_exe}"
+    return return_code
+
+def _get_blender_exe_id_list(
+    args: argparse.Namespace, pyproject_data: dict[str, Any]
+) -> list[str]:
+    """Ids of the Blender executables running the tests, the command line
+    list overrides the pyproject.toml list"""
+
+    if args.blender_exe_id_list is not None:
+        return args.blender_exe_id_list.split(",")
+    return pyproject_data.get("blender_exe_id_list", [])
+
+
+def _session_instances(
+    args: argparse.Namespace,
+    config: BpyTestConfig,
+    blender_exe_id_list: list[str],
+    blender_exe_list: dict[str, Path],
+) -> dict[str, str]:
+    """Executable of each instance of the session, in the reports"""
+
+    if args.coordinator is not None:
+        # Executables of the workers are not known
+        return {instance_id: "" for instance_id in blender_exe_id_list}
+    instances = {
+        instance_id: blender_exe.as_posix()
+        for instance_id, blender_exe in blender_exe_list.items()
+    }
+    if config.host_lane:
+        instances[HOST_LANE_INSTANCE_ID] = sys.executable
+    return instances
+
+
+def _create_reports(
+    args: argparse.Namespace,
+    config: BpyTestConfig,
+    pyproject_data: dict[str, Any],
+    cache: "Cache",
+    instances: dict[str, str],
+) -> "tuple[list[Report], list[dict[str, Any]] | None]":
+    """Reports written while the tests run, and the results of the
+    interrupted session to reuse with --resume"""
+
+    from .report import create_reports
+
+    reports = create_reports(
+        args.junitxml or pyproject_data.get("junitxml", ""),
+        args.report_json or pyproject_data.get("report_json", ""),
+        instances,
+    )
+
+    # The results of a session running the tests locally are kept in a
+    # checkpoint until it ends, the results of an interrupted session
+    # are reused with --resume
+    resumed: list[dict[str, Any]] | None = None
+    if args.coordinator is None and args.worker is None and not args.watch:
+        from .cache import CHECKPOINT_FILE
+        from .checkpoint import open_checkpoint
+
+        checkpoint, resumed = open_checkpoint(
+            cache.file(CHECKPOINT_FILE), config.serialize(), instances, args.resume
+        )
+        reports.append(checkpoint)
+    return reports, resumed
+
+
+def _create_progress(
+    args: argparse.Namespace,
+    config: BpyTestConfig,
+    pyproject_data: dict[str, Any],
+    summary: SessionSummary,
+) -> "Progress | None":
+    """Progress shown while the tests run, None if it is hidden"""
+
+    show_progress = pyproject_data.get("progress", True)
+    if args.progress is not None:
+        show_progress = args.progress
+    if not show_progress or args.watch or args.worker is not None:
+        return None
+
+    from .progress import Progress
+
+    return Progress(
+        summary.durations,
+        parallel=(HOST_LANE_INSTANCE_ID,) if config.host_lane else (),
+    )
+
+
+def _coordinate(
+    args: argparse.Namespace,
+    config: BpyTestConfig,
+    selected: "list[TestEntry]",
+    instance_ids: list[str],
+    summary: SessionSummary,
+) -> int:
+    """Serve the selected tests to the workers until every test has run,
+    returns the exit code of the session"""
+    from .distributed import coordinate
+
+    return_code = coordinate(
+        args.coordinator,
+        [entry.to_dict() for entry in selected],
+        instance_ids,
+        config.collector_string,
+        summary.handle_event,
+        args.dist_batch_size,
+        summary.progress,
+    )
+    summary.close()
+    _print_session_summary(summary)
+    return 1 if return_code or summary.failed else 0
+
+
+def _run_tests(
+    selected: "list[TestEntry]",
+    blender_exe_list: dict[str, Path],
+    config: BpyTestConfig,
+    pyproject_data: dict[str, Any],
+    cache: "Cache",
+    resumed: list[dict[str, Any]] | None,
+    summary: SessionSummary,
+) -> int:
+    """Run the selected tests in the test sessions of the Blender executables,
+    and of the host lane, returns the exit code of the session. Exits if the
+    session is interrupted."""
+
+    # ===========================================================
+    # Select the tests of each Blender version
+    # ===========================================================
+    instance_tests, static_skips, skip_reasons = _plan_instances(
+        selected, blender_exe_list, config, cache, resumed, summary
+    )
+    # Results reported by the command line, summarized with the results of
+    # the test sessions
+    host_results = summary.passed + summary.failed + sum(summary.outcomes.values())
+    if summary.progress is not None:
+        for instance_id, tests in instance_tests.items():
+            summary.progress.expect(instance_id, [entry.nodeid for entry in tests])
+        summary.progress.start()
+
+    # ===========================================================
+    # Write the test plans read by the test sessions
+    # ===========================================================
+    plan_paths = [_write_temp_plan(selected)]
+
+    # ===========================================================
+    # Run the tests that do not need bpy in the host interpreter,
+    # in parallel with the Blender test sessions
+    # ===========================================================
+    return_codes: list[int] = []
+    host_lane_thread: threading.Thread | None = None
+    if config.host_lane:
+        _use_test_plan(
+            config, instance_tests[HOST_LANE_INSTANCE_ID], selected, plan_paths
+        )
+        host_lane_thread = _start_host_lane(config, summary, return_codes)
+
+    interrupted = False
+    try:
+        for instance_id, blender_exe in blender_exe_list.items():
+
+            tests = instance_tests[instance_id]
+            if not tests:
+                print(f"[{instance_id}] {skip_reasons[instance_id]}")
+                continue
+            _use_test_plan(
+                config, tests, selected, plan_paths, static_skips.get(instance_id)
+            )
+            return_codes.append(
+                _run_instance(
+                    blender_exe, config, instance_id, summary, pyproject_data
+                )
             )
-            shutil.rmtree(_installation_temp_dir)
 
-    if any(code != 0 for code in return_codes):
+        if host_lane_thread is not None:
+            host_lane_thread.join()
+    except KeyboardInterrupt:
+        # The results of the interrupted session stay in the checkpoint
+        interrupted = True
+    finally:
+        if summary.progress is not None:
+            summary.progress.stop()
+        for path in plan_paths:
+            path.unlink(missing_ok=True)
+    if interrupted:
+        summary.save_cache()
+        print(
+            "Session interrupted, run it again with --resume to run the "
+            "remaining tests"
+        )
         sys.exit(1)
+    summary.close()
+
+    # Results from multiple subprocesses, or with the results of the
+    # interrupted session or of the command line, are summarized together
+    if len(blender_exe_list) + (host_lane_thread is not None) > 1 or host_results:
+        _print_session_summary(summary)
+
+    # Failures of the interrupted session are not in the return codes
+    return 1 if summary.failed or any(code != 0 for code in return_codes) else 0
+
+
+def _finish_session(
+    summary: SessionSummary,
+    cov_reports: list[str],
+    metrics_file: str,
+    trace_file: str,
+    startup_trace: bool,
+) -> None:
+    """Print the render profile and the startup trace of the finished session,
+    and write its coverage reports, metrics and trace"""
+    from .common.bpytrace import tracer  # type: ignore[import]
+
+    _print_render_profile(summary)
+
+    if summary.coverage is not None:
+        _write_coverage_reports(summary.coverage, cov_reports)
+
+    if metrics_file:
+        _write_metrics(summary, Path(metrics_file))
+
+    spans = tracer.pop_spans() + summary.startup_spans
+    if startup_trace:
+        _print_startup_trace(spans)
+    if trace_file:
+        _write_chrome_trace(spans, Path(trace_file))
+
+
+def main() -> None:
+    """Main function"""
+    from .common.bpytrace import now_ns, tracer  # type: ignore[import]
+
+    tracer.process = MAIN_PROCESS_NAME
+    tracer.add("imports", _IMPORT_START_NS)
+    phase_start_ns = now_ns()
+
+    args = _parse_arguments()
+    _add_phase("arguments", phase_start_ns)
+
+    if args.config_file:
+        _print_config_file_help()
+        sys.exit(0)
+
+    # ==============================================================
+    # Load Environment Variables from .env file if it exists
+    # ==============================================================
+    phase_start_ns = now_ns()
+    _load_envfile(args.envfile)
+    _add_phase("envfile", phase_start_ns)
+
+    # ==============================================================
+    # Handle PyProject.toml
+    # ==============================================================
+    phase_start_ns = now_ns()
+    pyproject_path = Path.cwd() / "pyproject.toml"
+    pyproject_data = (
+        _load_pyproject_toml(pyproject_path) if pyproject_path.exists() else {}
+    )
 
-    sys.exit(0)
+    # ==============================================================
+    # Create the BpyTestConfig object
+    # ==============================================================
+    trace_file = args.trace_file or pyproject_data.get("trace_file", "")
+    bpytest_config = _create_config(args, pyproject_data, trace_file)
+    _add_phase("config", phase_start_ns)
+    # if args.show_config:
+    #     from pprint import pprint
+    #     print("Current configuration:")
+    #     pprint(bpytest_config.__dict__)
+    #     sys.exit(0)
+
+    from .cache import Cache
+
+    cache = Cache(Path.cwd())
+    selected = _collect_tests(args, bpytest_config, pyproject_data, cache)
+
+    # ==============================================================
+    # Get blender executable instances to run the tests
+    # ==============================================================
+    phase_start_ns = now_ns()
+    blender_exe_id_list = _get_blender_exe_id_list(args, pyproject_data)
+    # The coordinator does not run Blender, the workers do
+    blender_exe_list: dict[str, Path] = {}
+    if args.coordinator is None:
+        blender_exe_list = _get_blender_exe_list(
+            blender_exr_arg=args.blender_exe,
+            blender_exe_id_list=blender_exe_id_list,
+        )
+    _add_phase("blender_exe", phase_start_ns)
+
+    # ===========================================================
+    # Create the reports, written while the tests run
+    # ===========================================================
+    phase_start_ns = now_ns()
+    cov_reports = args.cov_report or pyproject_data.get("cov_report", ["term"])
+    metrics_file = args.metrics_file or pyproject_data.get("metrics_file", "")
+    bpytest_config.metrics = bool(metrics_file)
+    reports, resumed = _create_reports(
+        args,
+        bpytest_config,
+        pyproject_data,
+        cache,
+        _session_instances(args, bpytest_config, blender_exe_id_list, blender_exe_list),
+    )
+    _add_phase("reports", phase_start_ns)
+
+    summary = SessionSummary(reports, cache)
+    summary.progress = _create_progress(args, bpytest_config, pyproject_data, summary)
+
+    if args.watch:
+        _watch(blender_exe_list, bpytest_config, summary)
+        summary.close()
+        sys.exit(0)
+
+    if args.worker is not None:
+        sys.exit(_work(args.worker, bpytest_config, blender_exe_list))
+
+    if args.coordinator is not None:
+        return_code = _coordinate(
+            args, bpytest_config, selected, blender_exe_id_list, summary
+        )
+    else:
+        return_code = _run_tests(
+            selected,
+            blender_exe_list,
+            bpytest_config,
+            pyproject_data,
+            cache,
+            resumed,
+            summary,
+        )
+    _finish_session(
+        summary,
+        cov_reports,
+        metrics_file,
+        trace_file,
+        # The coordinator does not run a test session
+        bpytest_config.startup_trace and args.coordinator is None,
+    )
+    sys.exit(return_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+"""
+bpytest.probe
+~~~~~~~~~~~~~
+
+Version of the Blender executables, read by running a python expression in
+Blender once per executable. The result is stored in the cache, keyed by the
+executable path, its modification time and size, so Blender is only started
+again when the executable is replaced.
+
+Classes:
+    BlenderInfo
+        Version, python version and build hash of a Blender executable.
+    BlenderProbe
+        Probes the Blender executables, with the cache.
+
+Functions:
+    probe_blender
+        Run a Blender executable to read its version.
+"""
+
+import json
+import subprocess
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from .cache import BLENDER_VERSIONS_KEY, Cache
+
+# Prefix of the output line with the probed information
+PROBE_PREFIX = "bpytest-probe:"
+
+# Seconds to wait for Blender to print its version
+PROBE_TIMEOUT = 120
+
+PROBE_EXPRESSION = f"""
+import json, sys, bpy
+print("{PROBE_PREFIX}" + json.dumps({{
+    "version": list(bpy.app.version),
+    "version_string": bpy.app.version_string,
+    "python_version": ".".join(str(part) for part in sys.version_info[:3]),
+    "build_hash": bpy.app.build_hash.decode("utf-8", "replace"),
+}}), flush=True)
+"""
+
+
+@dataclass
+class BlenderInfo:
+    """Version, python version and build hash of a Blender executable"""
+
+    version: tuple[int, ...]
+    version_string: str
+    python_version: str
+    build_hash: str
+
+    def to_dict(self) -> dict[str, Any]:
+        """Json representation, stored in the cache"""
+        return {**asdict(self), "version": list(self.version)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BlenderInfo":
+        """Blender information of its json representation"""
+        return cls(
+            version=tuple(data["version"]),
+            version_string=data["version_string"],
+            python_version=data["python_version"],
+            build_hash=data["build_hash"],
+        )
+
+
+def probe_blender(blender_exe: Path) -> BlenderInfo:
+    """Run a Blender executable in background to read its version, raises a
+    RuntimeError if Blender does not print it"""
+
+    cmd = [
+        blender_exe.as_posix(),
+        "--background",
+        "--factory-startup",
+        "--python-expr",
+        PROBE_EXPRESSION,
+    ]
+    try:
+        process = subprocess.run(
+            cmd,
+            check=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            timeout=PROBE_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        raise RuntimeError(f"Can not run {blender_exe}: {exc}") from exc
+
+    for line in process.stdout.splitlines():
+        if line.startswith(PROBE_PREFIX):
+            return BlenderInfo.from_dict(json.loads(line[len(PROBE_PREFIX) :]))
+    raise RuntimeError(
+        f"Can not read the version of {blender_exe}, output:\n{process.stdout}"
+    )
+
+
+class BlenderProbe:
+    """Probes the Blender executables, reading the cached information of the
+    executables that did not change
+
+    Args:
+        cache (Cache): Cache of the project
+    """
+
+    def __init__(self, cache: Cache):
+        self._cache = cache
+        # Probed executables, by absolute path
+        self._entries: dict[str, dict[str, Any]] = cache.get(BLENDER_VERSIONS_KEY, {})
+
+    def get(self, blender_exe: Path) -> BlenderInfo:
+        """Information of a Blender executable, probed if the executable is
+        not in the cache or changed since it was probed"""
+
+        path = blender_exe.absolute()
+        stat = path.stat()
+        key = path.as_posix()
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+            and entry.get("size") == stat.st_size
+        ):
+            return BlenderInfo.from_dict(entry)
+
+        info = probe_blender(path)
+        self._entries[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            **info.to_dict(),
+        }
+        self._cache.set(BLENDER_VERSIONS_KEY, self._entries)
+        return info
@@ -0,0 +1,395 @@
+"""
+bpytest.progress
+~~~~~~~~~~~~~~~~
+
+Progress of the test sessions, shown by the command line while the tests run:
+the completed and total tests, passed and failed tests and current test of
+every instance (or worker, with --coordinator) and the remaining time.
+
+The remaining time is the sum of the durations recorded by the last run of
+each remaining test (see bpytest.cache), a test without a recorded duration
+counts as the median recorded duration. The Blender executables run one after
+the other and in parallel with the host lane, the workers of a coordinator
+share the remaining tests.
+
+On a terminal the progress is redrawn below the output a few times per second,
+the output of the test sessions is written above it. Otherwise a plain
+progress line is printed from time to time.
+
+Classes:
+    Progress
+        Progress of the tests of every instance and worker.
+"""
+
+import shutil
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, TextIO
+
+from .common.bpytest_skip import (  # type: ignore[import]
+    OUTCOME_PASSED,
+    OUTCOME_SKIPPED,
+    OUTCOME_XPASSED,
+)
+
+# Seconds between two redraws of the live progress
+REFRESH_INTERVAL = 0.25
+
+# Seconds between two plain progress lines, when the output is not a terminal
+PLAIN_INTERVAL = 30.0
+
+# Instance id of the tests run once on any instance, with --coordinator
+ANY_INSTANCE = "*"
+
+# Separator of the worker name and the instance id in the keys of the rows
+_WORKER_SEPARATOR = "\0"
+
+# Start of the line above the cursor, and erase to the end of the screen
+_ERASE_LINE_ABOVE = "\x1b[1A\r\x1b[J"
+
+
+def format_seconds(seconds: float) -> str:
+    """Short duration, e.g. 45s, 3m05s or 1h02m"""
+
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+@dataclass
+class _Row:
+    """Tests of an instance, or of the batches of a worker"""
+
+    label: str
+    total: int = 0
+    done: int = 0
+    passed: int = 0
+    failed: int = 0
+    current: str = ""
+    current_start: float = 0.0
+    finished: bool = False
+    # Node ids still to run, in run order, only known for the instances
+    pending: dict[str, None] = field(default_factory=dict)
+
+
+class Progress:
+    """Progress of the tests of every instance and worker, updated with the
+    events of the test sessions
+
+    Args:
+        durations (dict[str, dict[str, float]]): Durations recorded by the last
+            run of each test, by node id
+        stream (TextIO | None): Output of the command line, stdout by default
+        live (bool | None): Redraw the progress below the output, by default if
+            the output is a terminal
+        interval (float | None): Seconds between two redraws, or between two
+            plain progress lines
+        parallel (tuple[str, ...]): Instance ids running in parallel with the
+            others, e.g. the host lane
+    """
+
+    def __init__(
+        self,
+        durations: dict[str, dict[str, float]],
+        stream: TextIO | None = None,
+        live: bool | None = None,
+        interval: float | None = None,
+        parallel: tuple[str, ...] = (),
+    ):
+        self._stream = stream or sys.stdout
+        self.live = self._stream.isatty() if live is None else live
+        if interval is None:
+            interval = REFRESH_INTERVAL if self.live else PLAIN_INTERVAL
+        self._interval = interval
+        self._parallel = parallel
+        self._durations = {
+            nodeid: entry.get("duration", 0.0) for nodeid, entry in durations.items()
+        }
+        # Duration of the tests never run before
+        self._default_duration = (
+            statistics.median(self._durations.values()) if self._durations else None
+        )
+        self._measured: list[float] = []
+        self._rows: dict[str, _Row] = {}
+        self._lock = threading.RLock()
+        self._last_plain = time.monotonic()
+        # Live display
+        self._block: list[str] = []
+        self._drawn = 0
+        self._line_start = True
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._original_stdout: TextIO | None = None
+
+    def expect(self, instance_id: str, nodeids: list[str]) -> None:
+        """Tests an instance will run, before its test session starts.
+        ANY_INSTANCE for the tests run once on any instance"""
+
+        with self._lock:
+            row = self._row(instance_id, f"[{instance_id}]")
+            row.pending = dict.fromkeys(nodeids)
+            row.total = row.done + len(row.pending)
+
+    def _row(self, key: str, label: str) -> _Row:
+        if key not in self._rows:
+            self._rows[key] = _Row(label)
+        return self._rows[key]
+
+    def _rows_of(self, event: dict[str, Any]) -> list[_Row]:
+        """Row of the instance of an event, and of its worker"""
+
+        instance_id = event["instance_id"]
+        key = instance_id
+        if key not in self._rows and ANY_INSTANCE in self._rows:
+            key = ANY_INSTANCE
+        rows = [self._row(key, f"[{instance_id}]")]
+        if event.get("worker"):
+            rows.append(
+                self._row(
+                    f"{event['worker']}{_WORKER_SEPARATOR}{instance_id}",
+                    f"[{event['worker']}] ({instance_id})",
+                )
+            )
+        return rows
+
+    def handle_event(self, event: dict[str, Any]) -> None:
+        """Update the progress with an event of a test session"""
+
+        if event["event"] not in (
+            "instance_start",
+            "test_start",
+            "test_result",
+            "instance_result",
+        ):
+            return
+        with self._lock:
+            rows = self._rows_of(event)
+            if event["event"] == "instance_start":
+                row = rows[-1]
+                row.finished = False
+                if event.get("worker"):
+                    # The batches of a worker run one after the other
+                    row.total = row.done + len(event["nodeids"])
+                else:
+                    row.pending = dict.fromkeys(event["nodeids"])
+                    row.total = row.done + len(row.pending)
+
+            elif event["event"] == "test_start":
+                for row in rows:
+                    row.current = event["nodeid"]
+                    row.current_start = time.monotonic()
+
+            elif event["event"] == "test_result":
+                for row in rows:
+                    self._add_result(row, event)
+                if event.get("outcome") != OUTCOME_SKIPPED:
+                    self._measured.append(event.get("duration", 0.0))
+                self._print_plain(rows[-1])
+
+            elif event["event"] == "instance_result":
+                rows[-1].finished = True
+                rows[-1].current = ""
+
+    def _add_result(self, row: _Row, event: dict[str, Any]) -> None:
+        row.done += 1
+        if not event["success"]:
+            row.failed += 1
+        elif event.get("outcome", OUTCOME_PASSED) in (OUTCOME_PASSED, OUTCOME_XPASSED):
+            row.passed += 1
+        row.pending.pop(event["nodeid"], None)
+        row.total = max(row.total, row.done + len(row.pending))
+        if row.current == event["nodeid"]:
+            row.current = ""
+
+    def _estimate(self, nodeid: str) -> float | None:
+        """Expected duration of a test, None if no test has a duration yet"""
+
+        if nodeid in self._durations:
+            return self._durations[nodeid]
+        if self._default_duration is not None:
+            return self._default_duration
+        if self._measured:
+            return statistics.median(self._measured)
+        return None
+
+    def _remaining(self, row: _Row, now: float) -> float | None:
+        """Seconds until the last pending test of an instance ends"""
+
+        remaining = 0.0
+        for nodeid in row.pending:
+            estimate = self._estimate(nodeid)
+            if estimate is None:
+                return None
+            if nodeid == row.current:
+                estimate = max(estimate - (now - row.current_start), 0.0)
+            remaining += estimate
+        return remaining
+
+    def eta(self, now: float | None = None) -> float | None:
+        """Seconds until every expected test ends, None if unknown"""
+
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            remaining: dict[str, float] = {}
+            for key, row in self._rows.items():
+                if _WORKER_SEPARATOR in key:
+                    continue
+                seconds = self._remaining(row, now)
+                if seconds is None:
+                    return None
+                remaining[key] = seconds
+            workers = [
+                row for key, row in self._rows.items() if _WORKER_SEPARATOR in key
+            ]
+            if workers:
+                # Every busy worker runs a share of the remaining tests
+                busy = sum(1 for row in workers if row.done < row.total)
+                return sum(remaining.values()) / max(busy, 1)
+            sequential = sum(
+                seconds for key, seconds in remaining.items() if key not in self._parallel
+            )
+            parallel = max(
+                (seconds for key, seconds in remaining.items() if key in self._parallel),
+                default=0.0,
+            )
+            return max(sequential, parallel)
+
+    def _format_row(self, row: _Row, now: float) -> str:
+        text = f"{row.label} {row.done}/{row.total} passed {row.passed}"
+        if row.failed:
+            text += f" failed {row.failed}"
+        if row.finished:
+            return text + " done"
+        if row.current:
+            text += f" {row.current} ({format_seconds(now - row.current_start)})"
+        return text
+
+    def lines(self, now: float | None = None) -> list[str]:
+        """Lines of the progress, one per instance and worker and the total"""
+
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            rows = [row for row in self._rows.values() if row.total]
+            # Worker rows already show the tests of their instance
+            workers = [
+                row for key, row in self._rows.items() if _WORKER_SEPARATOR in key
+            ]
+            if workers:
+                rows = [row for row in workers if row.total]
+            lines = [self._format_row(row, now) for row in rows]
+            instances = [
+                row for key, row in self._rows.items() if _WORKER_SEPARATOR not in key
+            ]
+            done = sum(row.done for row in instances)
+            total = sum(row.total for row in instances)
+            eta = self.eta(now)
+            lines.append(
+                f"Progress: {done}/{total} tests"
+                + (f", {format_seconds(eta)} left" if eta is not None else "")
+            )
+        return lines
+
+    def _print_plain(self, row: _Row) -> None:
+        """Print a progress line from time to time, without live display"""
+
+        if self.live:
+            return
+        now = time.monotonic()
+        if now - self._last_plain < self._interval:
+            return
+        self._last_plain = now
+        eta = self.eta(now)
+        line = f"{row.label} {row.done}/{row.total} tests"
+        if eta is not None:
+            line += f", {format_seconds(eta)} left"
+        self._stream.write(line + "\n")
+        self._stream.flush()
+
+    # Live display
+
+    def start(self) -> None:
+        """Start redrawing the progress below the output, writing the output
+        printed meanwhile above it"""
+
+        if not self.live or self._thread is not None:
+            return
+        self._original_stdout = sys.stdout
+        sys.stdout = _LiveOutput(self, self._stream)  # type: ignore[assignment]
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the live display and erase it"""
+
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        with self._lock:
+            self._erase()
+            self._stream.flush()
+        if self._original_stdout is not None:
+            sys.stdout = self._original_stdout
+            self._original_stdout = None
+
+    def _refresh(self) -> None:
+        while not self._stop.wait(self._interval):
+            columns = shutil.get_terminal_size((80, 24)).columns
+            block = [line[: columns - 1] for line in self.lines()]
+            with self._lock:
+                self._block = block
+                if self._line_start:
+                    self._erase()
+                    self._draw()
+                    self._stream.flush()
+
+    def _erase(self) -> None:
+        self._stream.write(_ERASE_LINE_ABOVE * self._drawn)
+        self._drawn = 0
+
+    def _draw(self) -> None:
+        for line in self._block:
+            self._stream.write(line + "\n")
+        self._drawn = len(self._block)
+
+    def write(self, text: str) -> None:
+        """Write the output above the live progress"""
+
+        with self._lock:
+            self._erase()
+            self._stream.write(text)
+            if text:
+                self._line_start = text.endswith("\n")
+            # The progress is drawn again on a new line
+            if self._line_start:
+                self._draw()
+
+
+class _LiveOutput:
+    """Standard output while the live progress is drawn"""
+
+    def __init__(self, progress: Progress, stream: TextIO):
+        self._progress = progress
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        """Write the text above the live progress"""
+        self._progress.write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        """Flush the output of the command line"""
+        self._stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
@@ -0,0 +1,290 @@
+"""
+bpytest.report
+~~~~~~~~~~~~~~
+
+Machine readable reports of a test session, written incrementally as the
+results are reported by the test session subprocesses, so memory use does not
+grow with the number of tests and a partial report survives a crash.
+
+Classes:
+    JUnitXmlReport
+        JUnit XML report. The file is kept well-formed after every test, the
+        session totals and the per instance properties are added on close.
+    JsonLinesReport
+        One json object per line: session start, every test result and
+        session finish.
+
+Functions:
+    create_reports
+        Reports of the session configured by the report paths.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Protocol
+from xml.sax.saxutils import escape, quoteattr
+
+# Characters not allowed in XML 1.0 documents
+_ILLEGAL_XML_CHARS = re.compile(
+    "[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]"
+)
+
+# Terminal color codes, used by the test session output
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+# Name of the testsuite element in the JUnit report
+JUNIT_SUITE_NAME = "bpytest"
+
+
+class Report(Protocol):
+    """Report written while the test session runs"""
+
+    def add_result(self, event: dict[str, Any]) -> None:
+        """Add a test result event"""
+
+    def add_instance_result(self, event: dict[str, Any]) -> None:
+        """Add the result of the session of a single instance"""
+
+    def close(self) -> None:
+        """Finish the report"""
+
+
+def _clean(text: str) -> str:
+    """Remove the color codes and the characters not allowed in XML"""
+    return _ILLEGAL_XML_CHARS.sub("", _ANSI_ESCAPE.sub("", text))
+
+
+def _xml_text(text: str) -> str:
+    """Escape a text to be written in a XML document"""
+    return escape(_clean(text))
+
+
+def _xml_attr(text: str) -> str:
+    """Escape and quote a text to be written as a XML attribute value"""
+    return quoteattr(_clean(text))
+
+
+def _split_nodeid(nodeid: str) -> tuple[str, str]:
+    """Split a node id into a JUnit classname and test name"""
+
+    path, _, name = nodeid.partition("::")
+    classname = path[:-3] if path.endswith(".py") else path
+    return classname.replace("/", ".").replace("\\", "."), name
+
+
+class JUnitXmlReport:
+    """JUnit XML report written incrementally.
+
+    Every test case is written and flushed as soon as its result arrives,
+    followed by the closing tags which are overwritten by the next test case,
+    so the file is always a well-formed XML document. On close, the file is
+    rewritten (streaming its content) with the session totals and the
+    properties of each instance in the testsuite element.
+    """
+
+    _FOOTER = "</testsuite>\n</testsuites>\n"
+
+    def __init__(self, path: Path, instances: dict[str, str]):
+        """
+        Args:
+            path (Path): Path of the report file
+            instances (dict[str, str]): Executable of each instance id of the session
+        """
+
+        self._path = path
+        self._instances = instances
+        self._instance_results: dict[str, dict[str, Any]] = {}
+        self._start_time = time.time()
+
+        self._tests = 0
+        self._failures = 0
+        self._skipped = 0
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._path, "w+b")
+        self._write(
+            '<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n'
+            f"<testsuite name={_xml_attr(JUNIT_SUITE_NAME)}>\n"
+        )
+        self._body_start = self._file.tell()
+        self._write_footer()
+
+    def _write(self, text: str) -> None:
+        self._file.write(text.encode("utf-8"))
+
+    def _write_footer(self) -> None:
+        position = self._file.tell()
+        self._write(self._FOOTER)
+        self._file.truncate()
+        self._file.flush()
+        self._file.seek(position)
+
+    def add_result(self, event: dict[str, Any]) -> None:
+        """Add a test result event"""
+
+        classname, name = _split_nodeid(event["nodeid"])
+        instance_id = event["instance_id"]
+        if len(self._instances) > 1:
+            name = f"{name}[{instance_id}]"
+
+        duration = float(event.get("duration", 0.0))
+        self._tests += 1
+
+        lines = [
+            f"<testcase classname={_xml_attr(classname)} "
+            f"name={_xml_attr(name)} time=\"{duration:.3f}\">",
+            "<properties>"
+            f"<property name=\"instance_id\" value={_xml_attr(instance_id)} />"
+            f"<property name=\"lane\" value={_xml_attr(event.get('lane', ''))} />"
+            "</properties>",
+        ]
+        outcome = event.get("outcome", "")
+        if outcome in ("skipped", "xfailed"):
+            # Like pytest, expected failures are reported as skipped
+            self._skipped += 1
+            reason = event.get("longrepr", "")
+            kind = ' type="pytest.xfail"' if outcome == "xfailed" else ""
+            lines.append(f"<skipped{kind} message={_xml_attr(reason)} />")
+        elif not event["success"]:
+            self._failures += 1
+            longrepr = event.get("longrepr", "")
+            message = longrepr.strip().splitlines()[-1] if longrepr.strip() else ""
+            lines.append(
+                f"<failure message={_xml_attr(message)}>"
+                f"{_xml_text(longrepr)}</failure>"
+            )
+        lines.append("</testcase>\n")
+
+        self._write("\n".join(lines))
+        self._write_footer()
+
+    def add_instance_result(self, event: dict[str, Any]) -> None:
+        """Add the result of the session of a single instance"""
+        self._instance_results[event["instance_id"]] = event
+
+    def _properties(self) -> str:
+        lines = ["<properties>"]
+        for instance_id, executable in self._instances.items():
+            result = self._instance_results.get(instance_id, {})
+            values = {
+                "executable": executable,
+                "duration": f"{result.get('duration', 0.0):.3f}",
+                "passed": str(result.get("passed", 0)),
+                "failed": str(result.get("failed", 0)),
+            }
+            for key, value in values.items():
+                lines.append(
+                    f"<property name={_xml_attr(f'{instance_id}.{key}')} "
+                    f"value={_xml_attr(value)} />"
+                )
+        lines.append("</properties>\n")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """Rewrite the report with the session totals and instance properties"""
+
+        body_end = self._file.tell()
+        temp_path = self._path.with_name(self._path.name + ".tmp")
+        with open(temp_path, "wb") as output:
+            output.write(
+                (
+                    '<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n'
+                    f"<testsuite name={_xml_attr(JUNIT_SUITE_NAME)} "
+                    f'tests="{self._tests}" failures="{self._failures}" '
+                    f'errors="0" skipped="{self._skipped}" '
+                    f'time="{time.time() - self._start_time:.3f}">\n'
+                    + self._properties()
+                ).encode("utf-8")
+            )
+
+            self._file.seek(self._body_start)
+            remaining = body_end - self._body_start
+            while remaining > 0:
+                chunk = self._file.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                output.write(chunk)
+                remaining -= len(chunk)
+            output.write(self._FOOTER.encode("utf-8"))
+
+        self._file.close()
+        os.replace(temp_path, self._path)
+
+
+class JsonLinesReport:
+    """Report with one json object per line, flushed after every line"""
+
+    def __init__(self, path: Path, instances: dict[str, str]):
+        """
+        Args:
+            path (Path): Path of the report file
+            instances (dict[str, str]): Executable of each instance id of the session
+        """
+
+        self._start_time = time.time()
+        self._totals = {
+            "passed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "xfailed": 0,
+            "xpassed": 0,
+        }
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._write(
+            {
+                "event": "session_start",
+                "start": self._start_time,
+                "instances": instances,
+            }
+        )
+
+    def _write(self, data: dict[str, Any]) -> None:
+        self._file.write(json.dumps(data) + "\n")
+        self._file.flush()
+
+    def add_result(self, event: dict[str, Any]) -> None:
+        """Add a test result event"""
+
+        outcome = event.get("outcome") or ("passed" if event["success"] else "failed")
+        self._totals[outcome] += 1
+        self._write(event)
+
+    def add_instance_result(self, event: dict[str, Any]) -> None:
+        """Add the result of the session of a single instance"""
+        self._write(event)
+
+    def close(self) -> None:
+        """Write the session totals and close the file"""
+
+        self._write(
+            {
+                "event": "session_finish",
+                "duration": time.time() - self._start_time,
+                **self._totals,
+            }
+        )
+        self._file.close()
+
+
+def create_reports(
+    junitxml: str, report_json: str, instances: dict[str, str]
+) -> list[Report]:
+    """Reports of the session, no report for an empty path
+
+    Args:
+        junitxml (str): Path of the JUnit XML report
+        report_json (str): Path of the json lines report
+        instances (dict[str, str]): Executable of each instance id
+    """
+
+    reports: list[Report] = []
+    if junitxml:
+        reports.append(JUnitXmlReport(Path(junitxml), instances))
+    if report_json:
+        reports.append(JsonLinesReport(Path(report_json), instances))
+    return reports
@@ -0,0 +1,348 @@
+"""
+bpytest.watch
+~~~~~~~~~~~~~
+
+Watch mode: a Blender test session server (see blender_module/bpytest/server.py)
+stays alive and runs the tests affected by every change of the watched files.
+
+Classes:
+    InotifyWatcher
+        Linux inotify file watcher, through ctypes.
+    PollingWatcher
+        Portable file watcher comparing the modification time of the files.
+    BlenderServer
+        Blender process running the tests requested through its standard input.
+
+Functions:
+    watch_roots
+        Directories watched for the paths of the project.
+    watch_tests
+        Run the tests affected by every change until Ctrl+C.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Protocol
+
+# Directories never watched
+IGNORE_DIRS = {
+    "__pycache__",
+    ".git",
+    ".bpytest_cache",
+    ".pytest_cache",
+    ".mypy_cache",
+    ".venv",
+    "venv",
+    ".vscode",
+    ".idea",
+    "build",
+    "dist",
+}
+
+# Extensions of the watched files
+WATCHED_SUFFIXES = {".py"}
+
+# Changes closer than this are reported together (e.g. a save of many files)
+DEBOUNCE_SECONDS = 0.05
+
+
+class FileWatcher(Protocol):
+    """Reports the changed files of the watched directories"""
+
+    def wait_for_changes(self) -> set[Path]:
+        """Block until files change and return them"""
+        ...
+
+    def close(self) -> None:
+        """Stop watching"""
+        ...
+
+
+def _is_watched_file(path: Path) -> bool:
+    return path.suffix in WATCHED_SUFFIXES
+
+
+def _walk_dirs(roots: list[Path]) -> Iterator[Path]:
+    """Directories of the roots, recursively, without the ignored ones"""
+
+    for root in roots:
+        for directory, dirnames, _ in os.walk(root):
+            dirnames[:] = [
+                name
+                for name in dirnames
+                if name not in IGNORE_DIRS and not name.startswith(".")
+            ]
+            yield Path(directory)
+
+
+class InotifyWatcher:
+    """Linux file watcher using inotify through ctypes, without polling"""
+
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_ISDIR = 0x40000000
+    _IN_NONBLOCK = 0o4000
+    _IN_CLOEXEC = 0o2000000
+
+    _MASK = (
+        _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    )
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, roots: list[Path]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories: dict[int, Path] = {}
+        for directory in _walk_dirs(roots):
+            self._add_watch(directory)
+
+    def _add_watch(self, directory: Path) -> None:
+        descriptor = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), self._MASK
+        )
+        if descriptor >= 0:
+            self._directories[descriptor] = directory
+
+    def _read_events(self) -> set[Path]:
+        changed: set[Path] = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = self._EVENT_HEADER.unpack_from(
+                data, offset
+            )
+            offset += self._EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            directory = self._directories.get(descriptor)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+
+            if mask & self._IN_ISDIR:
+                # Watch the new directories, and report their files
+                if mask & (self._IN_CREATE | self._IN_MOVED_TO):
+                    for new_directory in _walk_dirs([path]):
+                        self._add_watch(new_directory)
+                        changed.update(
+                            file for file in new_directory.iterdir()
+                            if _is_watched_file(file)
+                        )
+                continue
+
+            if _is_watched_file(path):
+                changed.add(path)
+
+        return changed
+
+    def wait_for_changes(self) -> set[Path]:
+        """Block until files change and return them"""
+
+        changed: set[Path] = set()
+        while not changed:
+            select.select([self._fd], [], [])
+            changed |= self._read_events()
+
+        # Wait until no more changes arrive
+        while select.select([self._fd], [], [], DEBOUNCE_SECONDS)[0]:
+            changed |= self._read_events()
+        return changed
+
+    def close(self) -> None:
+        """Stop watching"""
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable file watcher comparing the modification time of the files"""
+
+    def __init__(self, roots: list[Path], interval: float = 0.2):
+        self._roots = roots
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for directory in _walk_dirs(self._roots):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                path = Path(entry.path)
+                if not _is_watched_file(path) or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _changes(self) -> set[Path]:
+        snapshot = self._take_snapshot()
+        changed = {
+            path
+            for path in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(path) != self._snapshot.get(path)
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def wait_for_changes(self) -> set[Path]:
+        """Block until files change and return them"""
+
+        changed: set[Path] = set()
+        while not changed:
+            time.sleep(self._interval)
+            changed = self._changes()
+        return changed
+
+    def close(self) -> None:
+        """Stop watching"""
+
+
+def create_watcher(roots: list[Path]) -> FileWatcher:
+    """inotify watcher on Linux, polling watcher if it is not available"""
+
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots)
+
+
+class BlenderServer:
+    """Blender test session server process, running the tests requested
+    through its standard input (one json request per line)."""
+
+    def __init__(self, cmd: list[str], handle_line: Callable[[str], Any]):
+        """
+        Args:
+            cmd (list[str]): Command launching Blender in serve mode
+            handle_line (Callable[[str], Any]): Called with every output line, returns
+                the decoded event if the line is an event
+        """
+
+        self._handle_line = handle_line
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+
+    def _send(self, request: dict[str, Any]) -> None:
+        assert self._process.stdin is not None
+        self._process.stdin.write(json.dumps(request) + "\n")
+        self._process.stdin.flush()
+
+    def run(self, changed: list[Path], lastfailed: list[str]) -> int | None:
+        """Run the tests affected by the changed files, every test if there
+        are no changed files. Returns the exit code of the run, None if
+        the server process ended."""
+
+        self._send(
+            {
+                "command": "run",
+                "changed": [path.as_posix() for path in changed],
+                "lastfailed": lastfailed,
+            }
+        )
+
+        assert self._process.stdout is not None
+        for line in self._process.stdout:
+            event = self._handle_line(line)
+            if event is not None and event["event"] == "run_finished":
+                return event["exit_code"] or 0
+        return None
+
+    def close(self) -> None:
+        """Ask the server to exit, killing it if it does not"""
+
+        try:
+            self._send({"command": "exit"})
+            self._process.wait(timeout=10)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+
+
+def watch_roots(paths: list[str | Path]) -> list[Path]:
+    """Directories watched for the given paths (the project, the include paths
+    and the linked addons sources), without the directories inside another one"""
+
+    roots: list[Path] = []
+    for path in paths:
+        path = Path(path).absolute()
+        if not path.is_dir():
+            continue
+        if any(path.is_relative_to(root) for root in roots):
+            continue
+        roots = [root for root in roots if not root.is_relative_to(path)]
+        roots.append(path)
+    return roots
+
+
+def watch_tests(
+    cmd: list[str],
+    handle_line: Callable[[str], Any],
+    roots: list[Path],
+    lastfailed: dict[str, list[str]],
+    after_run: Callable[[], Any],
+) -> None:
+    """Run every test in a Blender test session server, then the tests
+    affected by every change of the watched files, until Ctrl+C or the end
+    of the server
+
+    Args:
+        cmd (list[str]): Command launching Blender in serve mode
+        handle_line (Callable[[str], Any]): See BlenderServer
+        roots (list[Path]): Watched directories
+        lastfailed (dict[str, list[str]]): Instance ids where each test failed
+            in its last run, updated by handle_line
+        after_run (Callable[[], Any]): Called after every run
+    """
+
+    watcher = create_watcher(roots)
+    server = BlenderServer(cmd, handle_line)
+
+    changed: list[Path] = []
+    try:
+        while True:
+            if server.run(changed, list(lastfailed)) is None:
+                print("Blender test session server stopped")
+                break
+            after_run()
+
+            print(
+                f"Watching {len(roots)} directories for changes "
+                f"({type(watcher).__name__}), press Ctrl+C to stop"
+            )
+            changed = sorted(watcher.wait_for_changes())
+            print(f"Changed: {', '.join(path.name for path in changed)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        watcher.close()
@@ -0,0 +1,29 @@
+import bpy
+
+import bpytest
+
+
+def _print_addons():
+    print(f"[addons][{','.join(sorted(bpy.context.preferences.addons.keys()))}]")
+
+
+@bpytest.mark.addons("first_addon", "second_addon")
+def test_addons_marked():
+    """Marked addons and the addons of the directory are enabled"""
+    _print_addons()
+    assert "first_addon" in bpy.context.preferences.addons
+    # Changed preferences are restored for the next test
+    bpy.context.preferences.addons["second_addon"].preferences.value = 42
+
+
+@bpytest.mark.addons("second_addon")
+def test_addons_difference():
+    """Addons not needed anymore are disabled"""
+    _print_addons()
+    assert "first_addon" not in bpy.context.preferences.addons
+    assert bpy.context.preferences.addons["second_addon"].preferences.value == 0
+
+
+def test_addons_directory():
+    """Only the addons of the directory are enabled"""
+    _print_addons()
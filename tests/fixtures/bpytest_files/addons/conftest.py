@@ -0,0 +1,4 @@
+import bpytest
+
+# Addons enabled for every test of this directory
+bpytestmark = bpytest.mark.addons("directory_addon")
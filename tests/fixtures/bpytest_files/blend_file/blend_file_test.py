@@ -0,0 +1,50 @@
+import bpy
+
+
+def test_blend_file_append(blend_file, asset_file, blend_library_cache):
+    """Appended objects are local copies linked to the scene, should pass"""
+    cube = blend_file.append(asset_file, objects=["Cube"])["objects"][0]
+    assert cube.name == "Cube"
+    assert cube.library is None
+    assert cube in bpy.context.scene.collection.objects
+    print(f"[blend_file][misses][{blend_library_cache.misses}]")
+
+
+def test_blend_file_append_copies(blend_file, asset_file, blend_library_cache):
+    """Every append is a new copy, the asset is read once, should pass"""
+    first = blend_file.append(asset_file, objects=["Cube"])["objects"][0]
+    second = blend_file.append(asset_file, objects=["Cube"])["objects"][0]
+    assert first is not second
+    assert second.name == "Cube.001"
+    print(f"[blend_file][misses][{blend_library_cache.misses}]")
+
+
+def test_blend_file_link(blend_file, asset_file):
+    """Linked objects have a library, should pass"""
+    cube = blend_file.link(asset_file, objects=["Cube"])["objects"][0]
+    assert cube.library is not None
+
+
+def test_blend_file_missing(blend_file, asset_file):
+    """Missing data-blocks are reported, should pass"""
+    try:
+        blend_file.append(asset_file, objects=["Sphere"])
+    except KeyError as error:
+        assert "objects['Sphere']" in str(error)
+    else:
+        assert False, "KeyError not raised"
+
+
+def test_blend_file_link_miss(blend_file, shapes_asset_file, blend_library_cache):
+    """A link read from the asset file leaves no local copy, any subset of
+    the linked data-blocks is read from the partial file, should pass"""
+    misses = blend_library_cache.misses
+    shapes = blend_file.link(shapes_asset_file, objects=["Cone", "Torus"])["objects"]
+    assert all(shape.library is not None for shape in shapes)
+    assert all(shape.data.library is not None for shape in shapes)
+    assert not [obj for obj in bpy.data.objects if obj.library is None]
+    assert not [mesh for mesh in bpy.data.meshes if mesh.library is None]
+
+    cone = blend_file.append(shapes_asset_file, objects=["Cone"])["objects"][0]
+    assert cone.library is None
+    assert blend_library_cache.misses == misses + 1
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import bpy
+
+import bpytest
+
+
+@bpytest.fixture(scope="session")
+def asset_file(tmp_path_factory: bpytest.TempPathFactory) -> Path:
+    """Asset .blend file with a cube, written once per session"""
+
+    path = tmp_path_factory.mktemp("assets") / "asset.blend"
+    bpy.ops.mesh.primitive_cube_add()
+    cube = bpy.context.object
+    bpy.data.libraries.write(path.as_posix(), {cube})
+    bpy.data.objects.remove(cube)
+    return path
+
+
+@bpytest.fixture(scope="session")
+def shapes_asset_file(tmp_path_factory: bpytest.TempPathFactory) -> Path:
+    """Asset .blend file with a cone and a torus, each with its mesh"""
+
+    path = tmp_path_factory.mktemp("assets") / "shapes.blend"
+    shapes = set()
+    for name in ("Cone", "Torus"):
+        bpy.ops.mesh.primitive_cube_add()
+        shape = bpy.context.object
+        shape.name = name
+        shape.data.name = name
+        shapes.add(shape)
+    bpy.data.libraries.write(path.as_posix(), shapes)
+    bpy.data.batch_remove([data_block for shape in shapes for data_block in (shape, shape.data)])
+    return path
@@ -0,0 +1,15 @@
+"""Bpy test file with tests writing to the standard output"""
+
+import os
+
+
+def test_capture_passed():
+    """Test printing and passing, the output should be discarded"""
+    print("[capture][passed]")
+
+
+def test_capture_failed():
+    """Test printing and failing, the output should be reported"""
+    print("[capture][failed]")
+    os.write(1, b"[capture][fd]\n")
+    assert False
@@ -0,0 +1,8 @@
+import bpy
+
+from covered_package import scale
+
+
+def test_scale():
+    assert scale(2, 3) == 6
+    assert bpy.context.scene is not None
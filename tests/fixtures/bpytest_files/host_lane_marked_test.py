@@ -0,0 +1,23 @@
+"""Bpy test file marked to run in the host lane with --host-lane"""
+
+import sys
+
+import bpytest
+
+try:
+    # Unknown modules could only exist inside Blender, a module importing one
+    # runs in Blender unless it is marked with no_bpy
+    import unknown_blender_only_module  # type: ignore
+except ImportError:
+    unknown_blender_only_module = None
+
+
+@bpytest.mark.no_bpy
+def test_host_lane_marked():
+    """Test marked with no_bpy, should pass in any lane"""
+    print(f"[lane][{'blender' if 'bpy' in sys.modules else 'host'}]")
+
+
+def test_host_lane_not_marked():
+    """Test not marked, should pass in any lane"""
+    print(f"[lane][{'blender' if 'bpy' in sys.modules else 'host'}]")
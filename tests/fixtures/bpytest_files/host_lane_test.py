@@ -0,0 +1,28 @@
+"""Bpy test file without bpy imports, runs in the host lane with --host-lane"""
+
+import json
+import sys
+
+from helpers import helper_function
+
+
+def _lane() -> str:
+    return "blender" if "bpy" in sys.modules else "host"
+
+
+def test_host_lane():
+    """Test without bpy, should pass in any lane"""
+    print(f"[lane][{_lane()}]")
+    assert json.loads('{"value": 1}')["value"] == 1
+
+
+def test_host_lane_include():
+    """Test importing a module from the include dir, should pass in any lane"""
+    print(f"[lane][{_lane()}]")
+    assert helper_function() == "helper_function"
+
+
+def test_host_lane_blender_fixture(assert_scene_matches):
+    """Test without bpy requesting a fixture using bpy, runs in blender"""
+    print(f"[lane][{_lane()}]")
+    assert assert_scene_matches is not None
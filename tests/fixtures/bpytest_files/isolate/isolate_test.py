@@ -0,0 +1,27 @@
+import os
+import signal
+
+import bpy
+
+LEAK_VARIABLE = "BPYTEST_ISOLATE_LEAK"
+# Set by the isolation unit tests, a crash ends a test session that is not isolated
+CRASH_VARIABLE = "BPYTEST_ISOLATE_CRASH"
+
+
+def test_change_state():
+    """Changes the state of the process"""
+    os.environ[LEAK_VARIABLE] = "1"
+    assert bpy.context.scene is not None
+
+
+def test_pristine_state():
+    """Passes only if the change of the previous test did not leak"""
+    assert LEAK_VARIABLE not in os.environ
+
+
+def test_crash():
+    """Crashes the process running the test"""
+    if CRASH_VARIABLE not in os.environ:
+        return
+    print("[isolate] before the crash")
+    os.kill(os.getpid(), signal.SIGSEGV)
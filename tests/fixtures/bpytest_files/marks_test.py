@@ -0,0 +1,21 @@
+"""Bpy test file with marks, selected with the -m and -k expressions"""
+
+import bpytest
+
+
+@bpytest.mark.slow
+def test_marks_slow():
+    """Test marked as slow, should pass"""
+    print("[selected][test_marks_slow]")
+
+
+@bpytest.mark.slow
+@bpytest.mark.gpu
+def test_marks_slow_gpu():
+    """Test marked as slow and gpu, should pass"""
+    print("[selected][test_marks_slow_gpu]")
+
+
+def test_marks_none():
+    """Test without marks, should pass"""
+    print("[selected][test_marks_none]")
@@ -0,0 +1,74 @@
+"""Bpy test file with skip, skipif and xfail marks"""
+
+import sys
+
+import bpy
+import bpytest
+
+# Module global used by the conditions, like an optional dependency check
+HAS_FEATURE = False
+
+
+@bpytest.mark.skip(reason="Decided by the command line")
+def test_skip():
+    """Skipped without starting its test session"""
+    raise AssertionError("A skipped test ran")
+
+
+@bpytest.mark.skipif(sys.platform != "never", reason="Static condition")
+def test_skipif_static():
+    """Skipped by a condition decided by the command line"""
+    raise AssertionError("A skipped test ran")
+
+
+@bpytest.mark.skipif(True, "Reason argument")
+def test_skipif_reason_argument():
+    """Skipped, the second positional argument is the reason"""
+    raise AssertionError("A skipped test ran")
+
+
+@bpytest.mark.skipif(False, "not on this platform")
+def test_skipif_false_reason_argument():
+    """Runs, the reason argument is not a condition"""
+    print("[skip][test_skipif_false_reason_argument]")
+
+
+@bpytest.mark.skipif(bpy.app.version >= (2, 80), reason="Blender condition")
+def test_skipif_blender():
+    """Skipped by a condition decided by the test session"""
+    raise AssertionError("A skipped test ran")
+
+
+@bpytest.mark.skipif(bpy.app.version < (2, 80), reason="Old Blender")
+def test_skipif_false():
+    """Runs, its condition is false"""
+    print("[skip][test_skipif_false]")
+
+
+@bpytest.mark.skipif(not HAS_FEATURE, reason="Needs the feature")
+def test_skipif_module_global():
+    """Skipped by a condition using a global of the test module"""
+    raise AssertionError("A skipped test ran")
+
+
+@bpytest.mark.xfail(HAS_FEATURE is False, reason="Feature missing")
+def test_xfail_module_global():
+    """Expected to fail by a condition using a global of the test module"""
+    assert HAS_FEATURE
+
+
+@bpytest.mark.xfail(reason="Known bug", strict=True)
+def test_xfail():
+    """Fails as expected"""
+    assert False
+
+
+@bpytest.mark.xfail(reason="Fixed bug")
+def test_xpass():
+    """Passes unexpectedly, not strict"""
+
+
+@bpytest.mark.xfail(reason="Crashes Blender", run=False)
+def test_xfail_not_run():
+    """Reported as xfailed without running"""
+    raise AssertionError("A not run xfail test ran")
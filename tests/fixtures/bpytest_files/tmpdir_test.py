@@ -38,3 +38,20 @@ def test_save_file(tmp_path: Path):
     blend_path = tmp_path / "test.blend"
     bpy.ops.wm.save_as_mainfile(filepath=blend_path.as_posix())
     assert blend_path.exists()
+
+
+def test_tmp_path_factory(tmp_path_factory: bpytest.TempPathFactory):
+    """Test the session temporary directory factory, should pass"""
+    basetemp = tmp_path_factory.getbasetemp()
+    first = tmp_path_factory.mktemp("data")
+    second = tmp_path_factory.mktemp("data")
+    assert basetemp.name.startswith("session-")
+    assert first != second
+    assert first.parent == second.parent == basetemp
+
+
+def test_tmp_path_in_session_dir(
+    tmp_path: Path, tmp_path_factory: bpytest.TempPathFactory
+):
+    """Test tmp_path is created in the session directory, should pass"""
+    assert tmp_path.parent == tmp_path_factory.getbasetemp()
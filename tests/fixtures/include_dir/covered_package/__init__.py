@@ -0,0 +1,10 @@
+def scale(value, factor):
+    """Scale a value, used by the coverage tests"""
+    if factor < 0:
+        raise ValueError("Negative factor")
+    return value * factor
+
+
+def clamp(value, low, high):
+    """Clamp a value, not called by the coverage tests"""
+    return max(low, min(value, high))
@@ -0,0 +1,3 @@
+def never_imported():
+    """Module not imported by the coverage tests"""
+    return None
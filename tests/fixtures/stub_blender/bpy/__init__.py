@@ -0,0 +1,397 @@
+"""Minimal stand-in for Blender's ``bpy`` module.
+
+Only the small surface used by the bpytest runner and by the synthetic
+benchmark projects is implemented. Any operator that is not explicitly
+defined resolves to a no-op returning ``{"FINISHED"}`` so that test files
+calling arbitrary operators can still be executed outside of Blender.
+"""
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable
+
+# ===================================================================================
+# bpy.app
+# ===================================================================================
+# Version of the stub, e.g. to test the tests of a Blender version
+_VERSION = os.environ.get("BPY_STUB_VERSION", "4.2.0")
+
+app = SimpleNamespace(
+    version=tuple(int(part) for part in _VERSION.split(".")),
+    version_string=f"{_VERSION} (stub)",
+    build_hash=b"stub",
+    binary_path=os.environ.get("BPY_STUB_BINARY_PATH", ""),
+    background=True,
+    handlers=SimpleNamespace(
+        load_pre=[],
+        load_post=[],
+        render_pre=[],
+        render_post=[],
+        persistent=lambda func: func,
+    ),
+)
+
+
+def _run_handlers(name: str, *args: Any) -> None:
+    for handler in list(getattr(app.handlers, name)):
+        handler(*args)
+
+
+# ===================================================================================
+# bpy.types
+# ===================================================================================
+class _ID:
+    """Base class of the stub data-blocks"""
+
+    def __init__(self, name: str):
+        self.name = name
+        # Library of a linked data-block, None if local
+        self.library: Any = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name!r}>"
+
+
+class Object(_ID):
+    """Stub of bpy.types.Object"""
+
+
+class Mesh(_ID):
+    """Stub of bpy.types.Mesh"""
+
+
+class _SceneObjects(list):
+    """Objects of a collection, like bpy.types.CollectionObjects"""
+
+    def link(self, obj: Any) -> None:
+        self.append(obj)
+
+
+class Scene(_ID):
+    """Stub of bpy.types.Scene"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.collection = SimpleNamespace(
+            objects=_SceneObjects(), children=_SceneObjects()
+        )
+        # Production render settings
+        self.render = SimpleNamespace(
+            engine="CYCLES",
+            resolution_x=1920,
+            resolution_y=1080,
+            resolution_percentage=100,
+            threads_mode="AUTO",
+            threads=8,
+        )
+        self.cycles = SimpleNamespace(
+            samples=4096,
+            preview_samples=1024,
+            use_denoising=True,
+            use_preview_denoising=False,
+            max_bounces=12,
+        )
+        self.eevee = SimpleNamespace(taa_render_samples=64)
+
+
+types = SimpleNamespace(ID=_ID, Object=Object, Mesh=Mesh, Scene=Scene)
+
+
+# ===================================================================================
+# bpy.data
+# ===================================================================================
+class _Collection(list):
+    """List of data-blocks accessible by name, like bpy_prop_collection"""
+
+    def __init__(self, id_type: type):
+        super().__init__()
+        self._id_type = id_type
+
+    def new(self, name: str, *args: Any) -> Any:
+        """Create a new data-block and add it to the collection, with a
+        unique name (e.g. "Cube.001")"""
+        unique_name = name
+        number = 0
+        while self.get(unique_name) is not None:
+            number += 1
+            unique_name = f"{name}.{number:03d}"
+        data_block = self._id_type(unique_name)
+        self.append(data_block)
+        return data_block
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Get a data-block by name"""
+        for data_block in self:
+            if data_block.name == name:
+                return data_block
+        return default
+
+    def remove(self, data_block: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        super().remove(data_block)
+
+
+class _Libraries:
+    """Stub of bpy.data.libraries, the "blend" files are json files with the
+    names of their data-blocks, by collection, and the mesh of each object"""
+
+    @contextmanager
+    def load(self, filepath: str, link: bool = False, **kwargs: Any) -> Any:
+        """Load the data-blocks whose names are assigned to data_to, with the
+        meshes of the objects as dependencies"""
+        with open(filepath, "r", encoding="utf-8") as file:
+            contents: dict[str, Any] = json.load(file)
+        object_data: dict[str, str] = contents.pop("object_data", {})
+        data_from = SimpleNamespace(**contents)
+        data_to = SimpleNamespace(**{attr: [] for attr in contents})
+        yield data_from, data_to
+
+        def new(attr: str, name: str) -> Any:
+            data_block = getattr(data, attr).new(name)
+            if link:
+                data_block.library = SimpleNamespace(filepath=filepath)
+            return data_block
+
+        for attr in contents:
+            names = getattr(data_to, attr)
+            data_blocks = [new(attr, name) for name in names]
+            if attr == "objects":
+                for name, obj in zip(names, data_blocks):
+                    if name in object_data:
+                        obj.data = new("meshes", object_data[name])
+            setattr(data_to, attr, data_blocks)
+
+    def write(self, filepath: str, datablocks: set[Any], **kwargs: Any) -> None:
+        """Write the data-blocks, and the meshes of the objects, to a "blend"
+        file"""
+        contents: dict[str, Any] = {
+            "objects": [],
+            "meshes": [],
+            "scenes": [],
+            "object_data": {},
+        }
+        attrs = {Object: "objects", Mesh: "meshes", Scene: "scenes"}
+        for data_block in datablocks:
+            contents[attrs[type(data_block)]].append(data_block.name)
+            mesh = getattr(data_block, "data", None)
+            if isinstance(data_block, Object) and mesh is not None:
+                contents["object_data"][data_block.name] = mesh.name
+                if mesh.name not in contents["meshes"]:
+                    contents["meshes"].append(mesh.name)
+        with open(filepath, "w", encoding="utf-8") as file:
+            json.dump(contents, file)
+
+
+def _user_map(**kwargs: Any) -> dict[Any, set[Any]]:
+    """Every data-block, without its users"""
+    return {
+        data_block: set()
+        for collection in (data.objects, data.meshes, data.scenes)
+        for data_block in collection
+    }
+
+
+def _batch_remove(ids: Any) -> None:
+    for data_block in list(ids):
+        for collection in (data.objects, data.meshes, data.scenes):
+            if data_block in collection:
+                collection.remove(data_block)
+
+
+data = SimpleNamespace(
+    filepath="",
+    objects=_Collection(Object),
+    meshes=_Collection(Mesh),
+    scenes=_Collection(Scene),
+    libraries=_Libraries(),
+    batch_remove=_batch_remove,
+    user_map=_user_map,
+)
+
+
+class _AddonPreferences:
+    """Preferences of an addon, with a single integer property"""
+
+    bl_rna = SimpleNamespace(
+        properties=[
+            SimpleNamespace(
+                identifier="rna_type", type="POINTER", is_readonly=True, is_array=False
+            ),
+            SimpleNamespace(
+                identifier="value", type="INT", is_readonly=False, is_array=False
+            ),
+        ]
+    )
+
+    def __init__(self) -> None:
+        self.rna_type = self.bl_rna
+        self.value = 0
+
+
+class _Addon:
+    """Enabled addon, like bpy.types.Addon"""
+
+    def __init__(self, module: str):
+        self.module = module
+        self.preferences = _AddonPreferences()
+
+
+class _Addons:
+    """Enabled addons by module name, like bpy.context.preferences.addons"""
+
+    def keys(self) -> list[str]:
+        return sorted(_enabled_addons)
+
+    def get(self, module: str) -> _Addon | None:
+        return _enabled_addons.get(module)
+
+    def __getitem__(self, module: str) -> _Addon:
+        return _enabled_addons[module]
+
+    def __contains__(self, module: str) -> bool:
+        return module in _enabled_addons
+
+
+context = SimpleNamespace(
+    object=None, scene=None, preferences=SimpleNamespace(addons=_Addons())
+)
+
+
+def _reset_data() -> None:
+    """Bring bpy.data and bpy.context back to the factory startup state"""
+
+    data.filepath = ""
+    data.objects.clear()
+    data.meshes.clear()
+    data.scenes.clear()
+    context.scene = data.scenes.new("Scene")
+    context.object = None
+
+
+_reset_data()
+
+
+# ===================================================================================
+# bpy.ops
+# ===================================================================================
+# Enabled addons, their preferences are kept by read_homefile
+_enabled_addons: dict[str, _Addon] = {}
+
+
+def _finished(*args: Any, **kwargs: Any) -> set[str]:
+    return {"FINISHED"}
+
+
+def _read_factory_settings(**kwargs: Any) -> set[str]:
+    _reset_data()
+    _enabled_addons.clear()
+    _run_handlers("load_post", None)
+    return {"FINISHED"}
+
+
+def _read_homefile(**kwargs: Any) -> set[str]:
+    _reset_data()
+    _run_handlers("load_post", None)
+    return {"FINISHED"}
+
+
+def _open_mainfile(filepath: str = "", **kwargs: Any) -> set[str]:
+    _reset_data()
+    data.filepath = filepath
+    _run_handlers("load_post", filepath)
+    return {"FINISHED"}
+
+
+def _render(**kwargs: Any) -> set[str]:
+    """Render the scene, the render time depends on the samples and on the
+    resolution of the scene"""
+    scene = context.scene
+    _run_handlers("render_pre", scene)
+    pixels = (scene.render.resolution_percentage / 100) ** 2
+    time.sleep(scene.cycles.samples * pixels * 5e-5)
+    _run_handlers("render_post", scene)
+    return {"FINISHED"}
+
+
+def _save_as_mainfile(filepath: str = "", **kwargs: Any) -> set[str]:
+    Path(filepath).write_bytes(b"BLENDER-stub")
+    data.filepath = filepath
+    return {"FINISHED"}
+
+
+def _addon_enable(module: str = "", **kwargs: Any) -> set[str]:
+    _enabled_addons.setdefault(module, _Addon(module))
+    return {"FINISHED"}
+
+
+def _addon_disable(module: str = "", **kwargs: Any) -> set[str]:
+    _enabled_addons.pop(module, None)
+    return {"FINISHED"}
+
+
+def _primitive_cube_add(**kwargs: Any) -> set[str]:
+    mesh = data.meshes.new("Cube")
+    obj = data.objects.new("Cube")
+    obj.data = mesh
+    context.object = obj
+    return {"FINISHED"}
+
+
+class _OpsModule:
+    """Operator category, e.g. bpy.ops.wm"""
+
+    def __init__(self, operators: dict[str, Callable[..., set[str]]]):
+        self._operators = operators
+
+    def __getattr__(self, name: str) -> Callable[..., set[str]]:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self._operators.get(name, _finished)
+
+
+class _Ops:
+    """Operator namespace, unknown categories resolve to no-op operators"""
+
+    _categories = {
+        "wm": _OpsModule(
+            {
+                "read_factory_settings": _read_factory_settings,
+                "read_homefile": _read_homefile,
+                "save_as_mainfile": _save_as_mainfile,
+                "open_mainfile": _open_mainfile,
+            }
+        ),
+        "preferences": _OpsModule(
+            {
+                "addon_enable": _addon_enable,
+                "addon_disable": _addon_disable,
+            }
+        ),
+        "mesh": _OpsModule({"primitive_cube_add": _primitive_cube_add}),
+        "render": _OpsModule({"render": _render}),
+    }
+
+    def __getattr__(self, name: str) -> _OpsModule:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self._categories.setdefault(name, _OpsModule({}))
+
+
+ops = _Ops()
+
+
+# ===================================================================================
+# bpy.utils
+# ===================================================================================
+def _resource_path(resource_type: str, **kwargs: Any) -> str:
+    user_dir = os.environ.get(
+        "BPY_STUB_USER_DIR", Path(tempfile.gettempdir()) / "bpy_stub_user"
+    )
+    return Path(user_dir, resource_type.lower()).as_posix()
+
+
+utils = SimpleNamespace(resource_path=_resource_path)
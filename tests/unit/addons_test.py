@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import bpytest_addons
+from bpytest_ast import extract_marks
+from conftest import BPY_TEST_FILES, _blender_exe, _execute_pytest_command
+
+ADDONS_DIR = BPY_TEST_FILES / "addons"
+
+
+def test_addon_state():
+    """Only the difference between consecutive tests is enabled or disabled"""
+    state = bpytest_addons.AddonState()
+    # The difference does not change the state, until the addons are enabled
+    assert state.difference(["a", "b"]) == ([], ["a", "b"])
+    assert state.enabled == []
+    assert state.update(["a", "b"]) == ([], ["a", "b"])
+    assert state.update(["b", "c"]) == (["a"], ["c"])
+    assert state.update(["b", "c"]) == ([], [])
+    assert state.update([]) == (["b", "c"], [])
+    state.update(["a"])
+    state.clear()
+    assert state.update(["a"]) == ([], ["a"])
+
+
+def test_required_addons(tmp_path: Path):
+    """Addons of the settings, of the conftest files of the parent directories
+    and of the marks are required, without duplicates"""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "conftest.py").write_text(
+        "import bpytest\nbpytestmark = bpytest.mark.addons('outer')\n", encoding="utf-8"
+    )
+    (tmp_path / "sub" / "conftest.py").write_text(
+        "import bpytest\nbpytestmark = [bpytest.mark.addons('inner', 'outer')]\n",
+        encoding="utf-8",
+    )
+    test_file = tmp_path / "sub" / "a_test.py"
+    test_file.write_text(
+        "import bpytest\n\n"
+        "@bpytest.mark.addons('marked', ADDON_NAME)\n"
+        "def test_a():\n    pass\n",
+        encoding="utf-8",
+    )
+    directory_marks = bpytest_addons.read_directory_marks(
+        [tmp_path / "conftest.py", tmp_path / "sub" / "conftest.py"]
+    )
+
+    addons = bpytest_addons.required_addons(
+        test_file, extract_marks(test_file)["test_a"], directory_marks, ["global"]
+    )
+
+    # Non literal names can not be read from the source
+    assert addons == ["global", "outer", "inner", "marked"]
+
+
+def test_addons_enabled_by_test():
+    """Each test runs with its addons and the addons of its directory only"""
+    _, stdout = _execute_pytest_command(
+        [
+            "bpytest",
+            f"--blender-exe={_blender_exe()}",
+            "-s",
+            (ADDONS_DIR / "addons_test.py").as_posix(),
+        ],
+        True,
+    )
+    assert [line for line in stdout if line.startswith("[addons]")] == [
+        "[addons][directory_addon,first_addon,second_addon]",
+        "[addons][directory_addon,second_addon]",
+        "[addons][directory_addon]",
+    ]
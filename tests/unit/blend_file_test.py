@@ -0,0 +1,21 @@
+from conftest import BPY_TEST_FILES, _blender_exe, _execute_pytest_command
+
+BLEND_FILE_TEST_FILE = BPY_TEST_FILES / "blend_file" / "blend_file_test.py"
+
+
+def test_blend_file():
+    """Data-blocks are appended and linked from an asset file, read once per session"""
+    _, stdout = _execute_pytest_command(
+        [
+            "bpytest",
+            f"--blender-exe={_blender_exe()}",
+            "-s",
+            BLEND_FILE_TEST_FILE.as_posix(),
+        ],
+        True,
+    )
+    assert [line for line in stdout if line.startswith("[blend_file]")] == [
+        "[blend_file][misses][1]",
+        "[blend_file][misses][1]",
+    ]
+    assert any("Failed: 0 Success: 5" in line for line in stdout)
@@ -24,9 +24,23 @@ def test_serialize():
         "enable_addons": ["test_module"],
         "norecursedirs": ["dir1", "dir2"],
         "include": ["test1", "test2"],
+        "capture_max_bytes": 65536,
+        "tmp_path_root": "",
+        "tmp_path_retention_count": 3,
+        "render": {},
         "collector_string": "test_file_or_directory",
         "keyword": "test_keyword",
         "nocapture": True,
+        "host_lane": False,
+        "startup_trace": False,
+        "trace_session": False,
+        "fast_start": False,
+        "markexpr": "",
+        "update_golden": False,
+        "test_plan": "",
+        "cov": [],
+        "metrics": False,
+        "isolate": "none",
     }, "JSON string does not match expected dictionary"
     assert json_string == (
         '{"pythonpath": "/path/to/python",'
@@ -34,9 +48,23 @@ def test_serialize():
         ' "enable_addons": ["test_module"],'
         ' "norecursedirs": ["dir1", "dir2"],'
         ' "include": ["test1", "test2"],'
+        ' "capture_max_bytes": 65536,'
+        ' "tmp_path_root": "",'
+        ' "tmp_path_retention_count": 3,'
+        ' "render": {},'
         ' "collector_string": "test_file_or_directory",'
         ' "keyword": "test_keyword",'
-        ' "nocapture": true}'
+        ' "nocapture": true,'
+        ' "host_lane": false,'
+        ' "startup_trace": false,'
+        ' "trace_session": false,'
+        ' "fast_start": false,'
+        ' "markexpr": "",'
+        ' "update_golden": false,'
+        ' "test_plan": "",'
+        ' "cov": [],'
+        ' "metrics": false,'
+        ' "isolate": "none"}'
     ), "JSON string does not match expected string"
 
 
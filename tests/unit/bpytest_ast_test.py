@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from bpytest_ast import ImportGraph, SourceExpression, extract_marks
+
+
+def _write(path: Path, source: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(source, encoding="utf-8")
+    return path
+
+
+def test_extract_marks(tmp_path: Path):
+    """Test marks are extracted from decorators and the module variable"""
+
+    test_file = _write(
+        tmp_path / "marks_test.py",
+        (
+            "import bpytest\n"
+            "bpytestmark = [bpytest.mark.slow]\n"
+            "@bpytest.mark.no_bpy\n"
+            "@bpytest.mark.addons('a', version=2)\n"
+            "def test_marked(): ...\n"
+            "@bpytest.mark.skipif(sys.platform == 'win32')\n"
+            "def test_expression(): ...\n"
+            "def helper(): ...\n"
+        ),
+    )
+
+    marks = extract_marks(test_file)
+
+    assert list(marks) == ["test_marked", "test_expression"]
+    assert [mark.name for mark in marks["test_marked"]] == [
+        "addons",
+        "no_bpy",
+        "slow",
+    ]
+    assert marks["test_marked"][0].args == ("a",)
+    assert marks["test_marked"][0].kwargs == {"version": 2}
+
+    condition = marks["test_expression"][0].args[0]
+    assert isinstance(condition, SourceExpression)
+    assert condition == "sys.platform == 'win32'"
+
+
+def test_import_graph(tmp_path: Path):
+    """Test files importing bpy directly or through local modules need Blender"""
+
+    _write(tmp_path / "pure.py", "import json\n")
+    _write(tmp_path / "uses_bpy.py", "import bpy\n")
+    _write(tmp_path / "package" / "__init__.py", "")
+    _write(tmp_path / "package" / "ops.py", "from . import helpers\n")
+    _write(tmp_path / "package" / "helpers.py", "from mathutils import Vector\n")
+    _write(tmp_path / "cycle_a.py", "import cycle_b\n")
+    _write(tmp_path / "cycle_b.py", "import cycle_a\nimport bmesh\n")
+
+    graph = ImportGraph([tmp_path])
+
+    def requires_blender(source: str) -> bool:
+        test_file = _write(tmp_path / "tests" / f"t{abs(hash(source))}_test.py", source)
+        return graph.requires_blender(test_file)
+
+    assert not requires_blender("import os\nimport pure\n")
+    assert not requires_blender("import bpytest\nfrom pure import json\n")
+    assert requires_blender("import pure\nimport uses_bpy\n")
+    assert requires_blender("from package import ops\n")
+    assert requires_blender("import package.helpers\n")
+    assert not requires_blender("import package\n")
+    assert requires_blender("import cycle_a\n")
+    assert requires_blender("import module_that_does_not_exist\n")
@@ -0,0 +1,23 @@
+from conftest import BPY_TEST_FILES, assert_execute_test_unit
+
+
+def _captured(stdout: list[str]) -> list[str]:
+    return [string for string in stdout if "[capture]" in string]
+
+
+def test_capture_passed():
+    """Output of a passing test is not reported, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True, BPY_TEST_FILES / "capture_test.py", "test_capture_passed"
+    )
+    assert not _captured(stdout)
+
+
+def test_capture_failed():
+    """Output of a failing test, including fd writes, is reported, should fail"""
+    _, stdout = assert_execute_test_unit(
+        False, BPY_TEST_FILES / "capture_test.py", "test_capture_failed"
+    )
+    captured = _captured(stdout)
+    assert any("[capture][failed]" in string for string in captured)
+    assert any("[capture][fd]" in string for string in captured)
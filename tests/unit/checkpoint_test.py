@@ -0,0 +1,123 @@
+import json
+import subprocess
+from pathlib import Path
+
+from conftest import _blender_exe
+
+from bpytest.checkpoint import SessionCheckpoint, instance_keys, read_checkpoint
+
+CONFIG = json.dumps({"keyword": "", "test_plan": "/tmp/plan.json"})
+
+INTERRUPTED_TEST_FILE = """
+import os
+import signal
+import time
+from pathlib import Path
+
+
+def test_first():
+    pass
+
+
+def test_interrupt():
+    # The first session is interrupted during this test
+    if not Path("interrupted").exists():
+        Path("interrupted").touch()
+        # The command line receives the result of test_first first
+        time.sleep(0.5)
+        os.kill(os.getppid(), signal.SIGINT)
+        time.sleep(30)
+
+
+def test_last():
+    pass
+"""
+
+
+def _result(nodeid: str, instance_id: str = "main") -> dict:
+    return {
+        "event": "test_result",
+        "instance_id": instance_id,
+        "nodeid": nodeid,
+        "success": True,
+    }
+
+
+def test_instance_keys(tmp_path: Path):
+    """Keys change with the session config and the executable"""
+
+    blender_exe = tmp_path / "blender"
+    blender_exe.write_text("", encoding="utf-8")
+    keys = instance_keys(CONFIG, {"main": blender_exe.as_posix()})
+    other_plan = json.dumps({"keyword": "", "test_plan": "/tmp/other.json"})
+    assert instance_keys(other_plan, {"main": blender_exe.as_posix()}) == keys
+    other_keyword = json.dumps({"keyword": "a"})
+    assert instance_keys(other_keyword, {"main": blender_exe.as_posix()}) != keys
+
+    blender_exe.write_text("updated", encoding="utf-8")
+    assert instance_keys(CONFIG, {"main": blender_exe.as_posix()}) != keys
+
+
+def test_read_checkpoint(tmp_path: Path):
+    """Results of the instances whose key did not change, the file is removed
+    when the session ends"""
+
+    path = tmp_path / "checkpoint.jsonl"
+    assert read_checkpoint(path, {"main": "a"}) is None
+
+    checkpoint = SessionCheckpoint(path, {"main": "a", "old": "b"})
+    checkpoint.add_result(_result("a_test.py::test_a"))
+    checkpoint.add_result(_result("a_test.py::test_a", "old"))
+    # A session killed while writing a result
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"event": "test_res')
+
+    events = read_checkpoint(path, {"main": "a", "old": "changed"})
+    assert events == [_result("a_test.py::test_a")]
+
+    checkpoint.close()
+    assert not path.exists()
+
+
+def test_resume(tmp_path: Path):
+    """An interrupted session keeps its results, --resume only runs the
+    remaining tests and reports every result"""
+
+    (tmp_path / "pyproject.toml").write_text("[tool.bpytest]\n", encoding="utf-8")
+    test_file = tmp_path / "interrupted_test.py"
+    test_file.write_text(INTERRUPTED_TEST_FILE, encoding="utf-8")
+
+    def run(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [
+                "bpytest",
+                f"--blender-exe={Path(_blender_exe()).absolute()}",
+                "--report-json=report.jsonl",
+                *args,
+            ],
+            cwd=tmp_path,
+            check=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+
+    process = run()
+    assert process.returncode == 1, process.stdout
+    assert "Session interrupted, run it again with --resume" in process.stdout
+    assert (tmp_path / ".bpytest_cache" / "checkpoint.jsonl").exists()
+
+    process = run("--resume")
+    assert process.returncode == 0, process.stdout
+    assert "Resuming the interrupted session, 1 test results reused" in process.stdout
+    assert "test_first" not in process.stdout.split("Test session starts")[1]
+    assert not (tmp_path / ".bpytest_cache" / "checkpoint.jsonl").exists()
+
+    lines = (tmp_path / "report.jsonl").read_text(encoding="utf-8").splitlines()
+    results = [json.loads(line) for line in lines if '"test_result"' in line]
+    assert [result["nodeid"].split("::")[1] for result in results] == [
+        "test_first",
+        "test_interrupt",
+        "test_last",
+    ]
+    assert json.loads(lines[-1])["passed"] == 3
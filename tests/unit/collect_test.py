@@ -0,0 +1,55 @@
+import json
+
+import bpytest_index
+from conftest import BPY_TEST_FILES, _execute_pytest_command
+
+MARKS_TEST_FILE = BPY_TEST_FILES / "marks_test.py"
+
+
+def _collect_only(*args: str) -> list[str]:
+    """Collect the tests of marks_test.py, Blender must not be started"""
+    _, stdout = _execute_pytest_command(
+        ["bpytest", "--blender-exe=/nonexistent/blender", "--collect-only", MARKS_TEST_FILE.as_posix(), *args],
+        True,
+    )
+    return stdout
+
+
+def test_collect_only():
+    """Node ids of the selected tests are printed without starting Blender"""
+    stdout = _collect_only("-m", "slow")
+    assert stdout == [
+        f"{MARKS_TEST_FILE.as_posix()}::test_marks_slow",
+        f"{MARKS_TEST_FILE.as_posix()}::test_marks_slow_gpu",
+        "2 tests collected",
+    ]
+
+
+def test_collect_only_json():
+    """The json test plan has the file, marks and fixtures of every test"""
+    plan = json.loads("\n".join(_collect_only("--json", "-k", "gpu")))
+    assert plan["version"] == bpytest_index.PLAN_VERSION
+    assert plan["tests"] == [
+        {
+            "nodeid": f"{MARKS_TEST_FILE.as_posix()}::test_marks_slow_gpu",
+            "file": MARKS_TEST_FILE.as_posix(),
+            "function": "test_marks_slow_gpu",
+            "marks": ["gpu", "slow"],
+            "fixtures": [],
+        }
+    ]
+
+
+def test_plan_round_trip(tmp_path):
+    """Test sessions read the node ids of the plan in its order"""
+    entries = bpytest_index.TestIndex.build(
+        (BPY_TEST_FILES / "fixture_test.py").as_posix(), [], with_marks=True
+    ).entries
+    plan_path = tmp_path / "plan.json"
+    bpytest_index.write_plan(plan_path, entries[::-1])
+    assert bpytest_index.read_plan_nodeids(plan_path) == [
+        entry.nodeid for entry in entries[::-1]
+    ]
+    assert "tmp_path" in {
+        fixture for entry in entries for fixture in entry.fixtures
+    }
@@ -0,0 +1,126 @@
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    import numpy
+
+np = pytest.importorskip("numpy")
+
+from bpytest_compare import (
+    compare_arrays,
+    compare_images,
+    difference_heatmap,
+    structural_similarity,
+)
+
+
+def _gradient(height: int = 64, width: int = 48) -> "numpy.ndarray":
+    """RGBA test image with a gradient in every channel"""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    return np.stack(
+        [x / width, y / height, (x + y) / (width + height), np.ones_like(x)], axis=2
+    )
+
+
+def test_equal_images():
+    """Equal images have no difference"""
+    image = _gradient()
+    comparison = compare_images(image, image.copy())
+    assert comparison.mismatch_fraction == 0
+    assert comparison.psnr == float("inf")
+    assert comparison.ssim == pytest.approx(1.0)
+    assert not comparison.failures()
+
+
+def test_per_channel_tolerance():
+    """Differences within the tolerance of their channel are not mismatches"""
+    expected = _gradient()
+    actual = expected.copy()
+    actual[..., 2] += 0.05
+    assert compare_images(actual, expected).mismatch_fraction == 1.0
+    assert compare_images(actual, expected, (0.01, 0.01, 0.06, 0.01)).mismatch_fraction == 0.0
+    assert compare_images(actual, expected).max_difference[2] == pytest.approx(0.05)
+
+
+def test_thresholds():
+    """A few mismatching pixels pass with a mismatch fraction and PSNR threshold"""
+    expected = _gradient()
+    actual = expected.copy()
+    actual[10, 10] = 1.0
+    comparison = compare_images(actual, expected)
+    assert comparison.mismatch_fraction == pytest.approx(1 / (64 * 48))
+    assert comparison.failures()
+    assert not comparison.failures(max_mismatch_fraction=0.001, min_psnr=30, min_ssim=0.9)
+    assert comparison.failures(max_mismatch_fraction=0.001, min_ssim=0.99999)
+
+
+def test_structural_similarity():
+    """Noise lowers the structural similarity more than a small brightness shift"""
+    expected = _gradient()
+    noise = np.random.default_rng(0).normal(0, 0.1, expected.shape).astype(np.float32)
+    assert structural_similarity(expected + 0.01, expected) > 0.99
+    assert structural_similarity(expected + noise, expected) < 0.9
+
+
+def test_shape_mismatch():
+    """Images with different shapes can not be compared"""
+    with pytest.raises(ValueError):
+        compare_images(_gradient(64, 48), _gradient(48, 64))
+
+
+def test_difference_heatmap():
+    """The largest difference is yellow, equal pixels are black"""
+    expected = _gradient()
+    actual = expected.copy()
+    actual[5, 5, 0] += 0.5
+    heatmap = difference_heatmap(actual, expected)
+    assert heatmap.shape == (64, 48, 4)
+    assert heatmap[5, 5].tolist() == [1.0, 1.0, 0.0, 1.0]
+    assert heatmap[0, 0].tolist() == [0.0, 0.0, 0.0, 1.0]
+
+
+def test_compare_arrays():
+    """Elements outside of the tolerance are reported, the first ones first"""
+    expected = np.arange(30, dtype=np.float32).reshape(10, 3)
+    actual = expected.copy()
+    actual[[2, 5, 7]] += [0.0, 0.0, 1e-3]
+    assert compare_arrays(actual, expected, atol=1e-2).matches
+    comparison = compare_arrays(actual, expected, max_report=2)
+    assert comparison.mismatch_count == 3
+    assert [index for index, _, _ in comparison.mismatches] == [2, 5]
+    assert comparison.max_difference == pytest.approx(1e-3, rel=1e-3)
+    assert "... 1 more" in str(comparison)
+
+
+def test_compare_arrays_ignore_order():
+    """Shuffled elements match when the order is ignored"""
+    rng = np.random.default_rng(0)
+    expected = rng.random((1000, 3)).astype(np.float32)
+    actual = expected[rng.permutation(1000)] + 1e-8
+    assert not compare_arrays(actual, expected).matches
+    assert compare_arrays(actual, expected, ignore_order=True).matches
+
+
+def test_compare_arrays_ignore_order_tolerance():
+    """Elements within the tolerance match whatever their sorted order, also
+    across a rounding boundary of the tolerance"""
+    expected = np.array([[0.12346, 1.0], [0.12349, 0.0]])
+    actual = np.array([[0.12344, 1.0], [0.1235, 0.0]])
+    assert compare_arrays(actual, expected, atol=1e-4, ignore_order=True).matches
+
+    expected = np.array([[0.10001, 0.0], [0.10003, 1.0]])
+    actual = np.array([[0.10002, 0.0], [0.10001, 1.0]])
+    assert compare_arrays(actual, expected, atol=1e-4, ignore_order=True).matches
+    actual[0, 1] = 2.0
+    comparison = compare_arrays(actual, expected, atol=1e-4, ignore_order=True)
+    assert comparison.mismatch_count == 1
+
+
+def test_compare_arrays_integer():
+    """Integer and boolean attributes are compared exactly"""
+    expected = np.array([1, 2, 3], dtype=np.int32)
+    assert compare_arrays(expected.copy(), expected).matches
+    assert compare_arrays(expected + [0, 0, 1], expected).mismatch_count == 1
+    flags = np.array([True, False])
+    assert not compare_arrays(~flags, flags).matches
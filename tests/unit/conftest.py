@@ -14,9 +14,12 @@ load_dotenv()  # Load variables from .env
 def _blender_exe() -> str:
     """Fixture to get the Blender executable path."""
     path = os.getenv("TESTS_BLENDER_EXE", "blender")
-    if not shutil.which(path):
+    executable = shutil.which(path)
+    if not executable:
         pytest.fail(f"Blender executable not found: {path}")
-    return path
+    # The tests run in a temporary directory, a relative path is resolved
+    # against the directory pytest was started from
+    return os.path.abspath(executable)
 
 
 def assert_execute_test_unit(
@@ -24,12 +27,15 @@ def assert_execute_test_unit(
     test_file: Path,
     test_name: str,
     nocapture: bool = False,
+    args: list[str] | None = None,
 ) -> tuple[int, list[str]]:
     """Execute a test unit and assert the result"""
 
     cmd = ["bpytest",  f"--blender-exe={_blender_exe()}", f"{test_file}::{test_name}"]
     if nocapture:
         cmd.append("-s")
+    if args:
+        cmd.extend(args)
 
     return _execute_pytest_command(cmd, expect_success)
 
@@ -0,0 +1,104 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import bpytest_coverage
+import pytest
+from conftest import BPY_TEST_FILES, _blender_exe, _execute_pytest_command
+
+COVERAGE_TEST_FILE = BPY_TEST_FILES / "coverage" / "coverage_test.py"
+
+PACKAGE_SOURCE = """
+def scale(value, factor):
+    if factor < 0:
+        raise ValueError("Negative factor")
+    return value * factor
+"""
+
+
+def test_ranges():
+    """Line numbers round trip through their compact ranges"""
+    lines = {1, 2, 3, 7, 9, 10}
+    assert bpytest_coverage.to_ranges(lines) == [[1, 3], [7, 7], [9, 10]]
+    assert bpytest_coverage.from_ranges([[1, 3], [7, 7], [9, 10]]) == lines
+
+
+def test_monitoring_tool_id(monkeypatch: pytest.MonkeyPatch):
+    """A free sys.monitoring tool id is used, the coverage id first, and the
+    lines are traced if every id is in use"""
+    tools = {1: "debugger", 3: "coverage"}
+    monitoring = SimpleNamespace(COVERAGE_ID=3, get_tool=tools.get)
+    monkeypatch.setattr(sys, "monitoring", monitoring, raising=False)
+
+    collector = bpytest_coverage.LineCollector([])
+    assert collector._free_tool_id() == 0  # pylint: disable=protected-access
+    tools.update({tool_id: "other" for tool_id in range(6)})
+    assert not collector.uses_monitoring
+
+
+def test_line_collector(tmp_path: Path):
+    """Only the lines of the measured package are recorded, the files not
+    imported are reported with no executed lines"""
+    package = tmp_path / "measured"
+    package.mkdir()
+    (package / "__init__.py").write_text(PACKAGE_SOURCE, encoding="utf-8")
+    (package / "unused.py").write_text("VALUE = 1\n", encoding="utf-8")
+    namespace: dict = {}
+    code = compile(PACKAGE_SOURCE, (package / "__init__.py").as_posix(), "exec")
+
+    collector = bpytest_coverage.LineCollector([package.as_posix()])
+    collector.start()
+    try:
+        exec(code, namespace)  # pylint: disable=exec-used
+        assert namespace["scale"](2, 3) == 6
+    finally:
+        collector.stop()
+    data = collector.data()
+
+    assert data.executable["measured/__init__.py"] == {2, 3, 4, 5}
+    assert data.executed["measured/__init__.py"] == {2, 3, 5}
+    assert data.executed["measured/unused.py"] == set()
+    assert "coverage_test.py" not in " ".join(data.executable)
+
+
+def test_merge_and_lcov():
+    """Lines executed by different test sessions are merged"""
+    first = bpytest_coverage.CoverageData()
+    first.add_file("pkg/a.py", {1, 2, 3}, {1})
+    second = bpytest_coverage.CoverageData.from_dict(
+        {"files": {"pkg/a.py": {"executable": [[1, 3]], "executed": [[3, 3]]}}}
+    )
+    first.merge(second)
+
+    assert first.totals() == (3, 2)
+    assert bpytest_coverage.format_lcov(first, Path("/src")).splitlines() == [
+        "SF:/src/pkg/a.py",
+        "DA:1,1",
+        "DA:2,0",
+        "DA:3,1",
+        "LF:3",
+        "LH:2",
+        "end_of_record",
+    ]
+    assert "67%" in bpytest_coverage.format_report(first).splitlines()[-1]
+
+
+def test_cov(tmp_path: Path):
+    """Coverage of a package imported by the tests is reported at the end of
+    the session and exported as lcov"""
+    lcov_path = tmp_path / "coverage.lcov"
+    _, stdout = _execute_pytest_command(
+        [
+            "bpytest",
+            f"--blender-exe={_blender_exe()}",
+            "--cov=covered_package",
+            "--cov-report=term",
+            f"--cov-report=lcov:{lcov_path.as_posix()}",
+            COVERAGE_TEST_FILE.as_posix(),
+        ],
+        True,
+    )
+    report = {line.split()[0]: line.split()[1:] for line in stdout if line.strip()}
+    assert report["covered_package/__init__.py"] == ["6", "2", "67%"]
+    assert report["covered_package/unused.py"] == ["2", "2", "0%"]
+    assert "SF:" in lcov_path.read_text(encoding="utf-8")
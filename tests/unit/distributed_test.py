@@ -0,0 +1,121 @@
+import json
+import socket
+import subprocess
+
+from bpytest import distributed
+from conftest import BPY_TEST_FILES, _blender_exe
+
+MARKS_TEST_FILE = BPY_TEST_FILES / "marks_test.py"
+
+
+def _tests(*names: str) -> list[dict]:
+    """Tests of a json test plan"""
+    return [{"nodeid": f"a_test.py::{name}"} for name in names]
+
+
+def test_queue_batches():
+    """Batches have tests of a single instance id run by the worker"""
+    queue = distributed.TestQueue(_tests("test_a", "test_b", "test_c"), ["3_6", "4_2"], 2)
+    batch = queue.take("worker", ["4_2"])
+    assert batch is not None
+    instance_id, items = batch
+    assert instance_id == "4_2"
+    assert [item.nodeid for item in items] == ["a_test.py::test_a", "a_test.py::test_b"]
+    batch = queue.take("worker", ["3_6", "4_2"])
+    assert batch is not None
+    instance_id, items = batch
+    assert instance_id == "3_6"
+    assert len(items) == 2
+
+
+def test_queue_lost_worker():
+    """Running tests of a lost worker are queued again, first"""
+    queue = distributed.TestQueue(_tests("test_a", "test_b"), [None], 1)
+    batch = queue.take("lost", ["main"])
+    assert batch is not None
+    _, items = batch
+    assert [item.nodeid for item in queue.release("lost", lost=True)] == [items[0].nodeid]
+    batch = queue.take("worker", ["main"])
+    assert batch is not None
+    instance_id, requeued = batch
+    assert instance_id == "main"
+    assert requeued[0].nodeid == items[0].nodeid
+    queue.complete("worker", requeued[0].nodeid)
+    batch = queue.take("worker", ["main"])
+    assert batch is not None
+    _, items = batch
+    queue.complete("worker", items[0].nodeid)
+    assert queue.done
+    assert queue.take("worker", ["main"]) is None
+
+
+def test_queue_session_without_result():
+    """Tests whose session ends without a result run at most MAX_ATTEMPTS times"""
+    queue = distributed.TestQueue(_tests("test_crash"), [None])
+    for _ in range(distributed.MAX_ATTEMPTS):
+        assert not queue.done
+        queue.take("worker", ["main"])
+        queue.release("worker", lost=False)
+    assert queue.done
+    assert [item.nodeid for item in queue.lost] == ["a_test.py::test_crash"]
+
+
+def test_parse_address():
+    """Host and port are optional"""
+    assert distributed.parse_address("10.0.0.2:9000") == ("10.0.0.2", 9000)
+    assert distributed.parse_address("10.0.0.2") == ("10.0.0.2", distributed.DEFAULT_PORT)
+    assert distributed.parse_address(":9000", "0.0.0.0") == ("0.0.0.0", 9000)
+
+
+def test_coordinator_and_workers():
+    """Workers on localhost run every test once, the tests of a lost worker
+    are queued again, should pass"""
+    coordinator = subprocess.Popen(
+        ["bpytest", "--coordinator", "127.0.0.1:0", "--dist-batch-size", "1", MARKS_TEST_FILE.as_posix()],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        assert coordinator.stdout is not None
+        lines = []
+        for line in coordinator.stdout:
+            lines.append(line)
+            if "Listening on" in line:
+                break
+        port = int(lines[-1].rsplit(":", 1)[1])
+
+        # A worker leaving with a running test
+        with socket.create_connection(("127.0.0.1", port)) as connection:
+            stream = connection.makefile("rw")
+            stream.write(json.dumps({"type": "hello", "worker": "lost", "instance_ids": ["main"]}) + "\n")
+            stream.write(json.dumps({"type": "next"}) + "\n")
+            stream.flush()
+            assert json.loads(stream.readline())["type"] == "welcome"
+            assert json.loads(stream.readline())["type"] == "run"
+            stream.close()
+
+        workers = [
+            subprocess.Popen(
+                ["bpytest", "--worker", f"127.0.0.1:{port}", f"--blender-exe={_blender_exe()}"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            for _ in range(2)
+        ]
+        for worker in workers:
+            assert worker.wait(timeout=120) == 0
+        lines.extend(coordinator.stdout)
+        assert coordinator.wait(timeout=30) == 0
+    finally:
+        coordinator.kill()
+        coordinator.wait()
+
+    assert any("Worker lost lost, 1 tests queued again" in line for line in lines)
+    passed = sorted(
+        line.split("]", 1)[1].split()[0] for line in lines if " PASSED (" in line
+    )
+    assert passed == [
+        f"{MARKS_TEST_FILE.as_posix()}::{name}"
+        for name in ["test_marks_none", "test_marks_slow", "test_marks_slow_gpu"]
+    ]
@@ -0,0 +1,92 @@
+from bpyprint import decode_bpyprint
+from conftest import BPY_TEST_FILES, assert_execute_test_unit
+
+
+def _lanes(stdout: list[str]) -> list[str]:
+    return [
+        decode_bpyprint(string)
+        for string in stdout
+        if string.startswith("[lane]")
+    ]
+
+
+def test_host_lane():
+    """Test without bpy imports runs in the host, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "host_lane_test.py",
+        "test_host_lane",
+        nocapture=True,
+        args=["--host-lane"],
+    )
+    assert _lanes(stdout) == ["[lane][host]"]
+
+
+def test_host_lane_include():
+    """Test importing a bpy free module from the include dir runs in the host, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "host_lane_test.py",
+        "test_host_lane_include",
+        nocapture=True,
+        args=["--host-lane"],
+    )
+    assert _lanes(stdout) == ["[lane][host]"]
+
+
+def test_host_lane_disabled():
+    """Test without bpy imports runs in blender by default, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "host_lane_test.py",
+        "test_host_lane",
+        nocapture=True,
+    )
+    assert _lanes(stdout) == ["[lane][blender]"]
+
+
+def test_host_lane_marked():
+    """Test marked with no_bpy runs in the host, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "host_lane_marked_test.py",
+        "test_host_lane_marked",
+        nocapture=True,
+        args=["--host-lane"],
+    )
+    assert _lanes(stdout) == ["[lane][host]"]
+
+
+def test_host_lane_unknown_import():
+    """Test importing an unknown module runs in blender, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "host_lane_marked_test.py",
+        "test_host_lane_not_marked",
+        nocapture=True,
+        args=["--host-lane"],
+    )
+    assert _lanes(stdout) == ["[lane][blender]"]
+
+
+def test_host_lane_bpy_import():
+    """Test importing bpy runs in blender, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "assertion_test.py",
+        "test_cube_creation",
+        args=["--host-lane"],
+    )
+    assert any("Failed: 0 Success: 1" in line for line in stdout[-1:])
+
+
+def test_host_lane_blender_fixture():
+    """Test requesting a fixture using bpy runs in blender, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "host_lane_test.py",
+        "test_host_lane_blender_fixture",
+        nocapture=True,
+        args=["--host-lane"],
+    )
+    assert _lanes(stdout) == ["[lane][blender]"]
@@ -0,0 +1,34 @@
+import pytest
+from conftest import BPY_TEST_FILES, _blender_exe, _execute_pytest_command
+
+ISOLATE_TEST_FILE = BPY_TEST_FILES / "isolate" / "isolate_test.py"
+
+
+def _run_isolated(isolate: str, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    monkeypatch.setenv("BPYTEST_ISOLATE_CRASH", "1")
+    _, stdout = _execute_pytest_command(
+        [
+            "bpytest",
+            f"--blender-exe={_blender_exe()}",
+            f"--isolate={isolate}",
+            ISOLATE_TEST_FILE.as_posix(),
+        ],
+        False,
+    )
+    return stdout
+
+
+def test_isolate_fork(monkeypatch: pytest.MonkeyPatch):
+    """Each test runs in a forked process, a test does not change the state
+    of the next one and a crash only fails its test"""
+    stdout = _run_isolated("fork", monkeypatch)
+    assert any("Failed: 1 Success: 2" in line for line in stdout)
+    assert any("was killed by signal SIGSEGV" in line for line in stdout)
+    assert any("[isolate] before the crash" in line for line in stdout)
+
+
+def test_isolate_fork_module(monkeypatch: pytest.MonkeyPatch):
+    """The tests of a file share a forked process"""
+    stdout = _run_isolated("fork-module", monkeypatch)
+    assert any("Failed: 2 Success: 1" in line for line in stdout)
+    assert any("was killed by signal SIGSEGV" in line for line in stdout)
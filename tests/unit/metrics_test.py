@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+import bpytest_metrics
+from conftest import BPY_TEST_FILES, _blender_exe, _execute_pytest_command
+
+FIXTURE_TEST_FILE = BPY_TEST_FILES / "fixture_test.py"
+
+
+def test_session_metrics():
+    """Metrics of the processes of an instance are merged, with the startup
+    from the launch time"""
+    recorder = bpytest_metrics.MetricsRecorder()
+    recorder.entry_ns = 3_000_000_000
+    recorder.add_time("reset", 0.5)
+    recorder.add_time("reset", 0.25)
+    recorder.count("tests", 2)
+
+    session = bpytest_metrics.SessionMetrics()
+    session.add("main", recorder.to_dict(), launch_ns=1_000_000_000)
+    recorder.reset()
+    recorder.count("tests")
+    session.add("main", recorder.to_dict(), launch_ns=1_000_000_000)
+
+    main = session.instances["main"]
+    assert main["timings"]["reset"] == {"seconds": 0.75, "count": 2}
+    assert main["timings"]["startup"] == {"seconds": 2.0, "count": 1}
+    assert main["counters"] == {"tests": 3}
+
+
+def test_format_openmetrics():
+    """Prometheus text format with a sample by process and phase"""
+    host = bpytest_metrics.MetricsRecorder()
+    host.add_time("collection", 0.125)
+    session = bpytest_metrics.SessionMetrics()
+    session.add(
+        "blender_4_2",
+        {"timings": {}, "counters": {"resets": 4}, "peak_rss_bytes": 1024},
+    )
+
+    text = bpytest_metrics.format_openmetrics(session.to_dict(host, 1.5))
+
+    assert "# TYPE bpytest_phase_seconds gauge" in text
+    assert 'bpytest_phase_seconds{instance="bpytest",phase="collection"} 0.125000' in text
+    assert 'bpytest_counter{instance="blender_4_2",name="resets"} 4' in text
+    assert 'bpytest_peak_rss_bytes{instance="blender_4_2"} 1024' in text
+    assert "bpytest_session_duration_seconds 1.500000" in text
+
+
+def test_metrics_file(tmp_path: Path):
+    """The metrics of the test session are written as json"""
+    metrics_file = tmp_path / "metrics.json"
+    _execute_pytest_command(
+        [
+            "bpytest",
+            f"--blender-exe={_blender_exe()}",
+            f"--metrics-file={metrics_file.as_posix()}",
+            "-k",
+            "test_yield_fixture",
+            FIXTURE_TEST_FILE.as_posix(),
+        ],
+        True,
+    )
+
+    data = json.loads(metrics_file.read_text(encoding="utf-8"))
+    main = data["instances"]["main"]
+    assert main["counters"]["tests"] >= 1
+    assert main["counters"]["module_imports"] == main["counters"]["tests"]
+    for phase in ("startup", "config", "collection", "conftest", "reset", "test_body"):
+        assert phase in main["timings"]
+    assert "fixture_setup:yield_fixture" in main["timings"]
+    assert "fixture_teardown:yield_fixture" in main["timings"]
+    assert main["peak_rss_bytes"] > 0
+    assert "collection" in data["host"]["timings"]
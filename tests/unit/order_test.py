@@ -0,0 +1,192 @@
+from pathlib import Path
+
+import bpytest_index
+import bpytest_order
+from conftest import _execute_pytest_command
+
+CONFTEST = """
+import bpytest
+
+@bpytest.fixture(scope="session")
+def heavy_scene():
+    return "scene"
+
+@bpytest.fixture(scope="module")
+def module_data():
+    return "data"
+
+@bpytest.fixture
+def scene_object(heavy_scene, module_data):
+    return heavy_scene
+"""
+
+
+def _write_tests(directory: Path, files: dict[str, str]) -> list[bpytest_index.TestEntry]:
+    """Write the test files and return their tests, in file name order"""
+
+    for name, source in files.items():
+        (directory / name).write_text(source, encoding="utf-8")
+    index = bpytest_index.TestIndex.build(directory.as_posix(), [], with_marks=True)
+    return sorted(index.entries, key=lambda entry: entry.nodeid)
+
+
+def test_extract_fixtures(tmp_path: Path):
+    """Fixture definitions are read with their scope and requested fixtures"""
+    conftest = tmp_path / "conftest.py"
+    conftest.write_text(CONFTEST, encoding="utf-8")
+    definitions = bpytest_order.read_fixture_definitions([conftest])
+    assert definitions["heavy_scene"].scope == "session"
+    assert definitions["scene_object"].scope == "function"
+    assert definitions["scene_object"].arguments == ["heavy_scene", "module_data"]
+
+
+def test_fixture_setups(tmp_path: Path):
+    """Module fixtures, needed directly or through another fixture, are set up
+    once per file and session fixtures once per session, so they never move
+    the tests"""
+    (tmp_path / "conftest.py").write_text(CONFTEST, encoding="utf-8")
+    entries = _write_tests(
+        tmp_path,
+        {
+            "a_test.py": (
+                "def test_a1(module_data):\n    pass\n\n"
+                "def test_a2():\n    pass\n\n"
+                "def test_a3(module_data):\n    pass\n"
+            ),
+            "b_test.py": "def test_b(heavy_scene):\n    pass\n",
+            "c_test.py": "def test_c(scene_object):\n    pass\n",
+        },
+    )
+    definitions = bpytest_order.read_fixture_definitions([tmp_path / "conftest.py"])
+
+    ordered, report = bpytest_order.reorder_tests(entries, definitions)
+
+    assert ordered == entries
+    assert report.setups_before == {"fixture:module_data": 2}
+    assert report.setups_after == {"fixture:module_data": 2}
+    assert not report.changed
+
+
+def test_reorder_keeps_files_together(tmp_path: Path):
+    """Tests of a file are grouped by their addons, without mixing files"""
+    entries = _write_tests(
+        tmp_path,
+        {
+            "a_test.py": (
+                "import bpytest\n\n"
+                "@bpytest.mark.addons('node_wrangler')\n"
+                "def test_a1():\n    pass\n\n"
+                "def test_a2():\n    pass\n\n"
+                "@bpytest.mark.addons('node_wrangler')\n"
+                "def test_a3():\n    pass\n"
+            ),
+            "b_test.py": (
+                "import bpytest\n\n"
+                "@bpytest.mark.addons('node_wrangler')\n"
+                "def test_b1():\n    pass\n"
+            ),
+        },
+    )
+
+    ordered, report = bpytest_order.reorder_tests(entries, {})
+
+    assert [entry.function_name for entry in ordered] == [
+        "test_a2",
+        "test_a1",
+        "test_a3",
+        "test_b1",
+    ]
+    assert report.setups_after == {"addons:node_wrangler": 1}
+
+
+def test_reorder_estimates_time_saved(tmp_path: Path):
+    """Time saved is estimated from the recorded setup durations"""
+    entries = _write_tests(
+        tmp_path,
+        {
+            "a_test.py": "import bpytest\n\n@bpytest.mark.addons('x')\ndef test_a():\n    pass\n",
+            "b_test.py": "def test_b():\n    pass\n",
+            "c_test.py": "import bpytest\n\n@bpytest.mark.addons('x')\ndef test_c():\n    pass\n",
+        },
+    )
+    durations = {
+        entry.nodeid: {"duration": 1.0, "setup": setup}
+        for entry, setup in zip(entries, [0.6, 0.1, 0.4])
+    }
+
+    _, report = bpytest_order.reorder_tests(entries, {}, durations)
+
+    assert report.time_saved is not None
+    assert abs(report.time_saved - 0.4) < 1e-9
+
+
+def test_no_reorder(tmp_path: Path):
+    """Tests run in the collection order with --no-reorder, reordering
+    prints the resource setups saved"""
+    _write_tests(
+        tmp_path,
+        {
+            "a_test.py": (
+                "import bpytest\n\n"
+                "@bpytest.mark.addons('x')\ndef test_a1():\n    pass\n\n"
+                "def test_a2():\n    pass\n\n"
+                "@bpytest.mark.addons('x')\ndef test_a3():\n    pass\n"
+            ),
+        },
+    )
+    command = [
+        "bpytest",
+        "--blender-exe=/nonexistent/blender",
+        "--collect-only",
+        (tmp_path / "a_test.py").as_posix(),
+    ]
+
+    _, stdout = _execute_pytest_command(command, True)
+    assert "1 resource setups instead of 2" in stdout[0]
+    assert [line.split("::")[-1] for line in stdout[1:4]] == [
+        "test_a2",
+        "test_a1",
+        "test_a3",
+    ]
+
+    _, stdout = _execute_pytest_command([*command, "--no-reorder"], True)
+    assert [line.split("::")[-1] for line in stdout[0:3]] == [
+        "test_a1",
+        "test_a2",
+        "test_a3",
+    ]
+
+
+def test_order_many_files():
+    """The bucketed chain orders like a scan of every remaining file, and the
+    tests without addons keep their order"""
+    entries = [
+        bpytest_index.TestEntry(
+            f"{index}_test.py::test", Path(f"{index}_test.py"), "test"
+        )
+        for index in range(1000)
+    ]
+    addon_sets = [
+        frozenset(),
+        frozenset({"addons:x"}),
+        frozenset({"addons:x", "addons:y"}),
+    ]
+    resources = {
+        entry.nodeid: addon_sets[index * 7 % 5 % 3]
+        for index, entry in enumerate(entries)
+    }
+
+    remaining = list(entries)
+    expected = []
+    last: frozenset[str] = frozenset()
+    while remaining:
+        index = min(
+            range(len(remaining)),
+            key=lambda i: (len(last ^ resources[remaining[i].nodeid]), i),
+        )
+        expected.append(remaining.pop(index))
+        last = resources[expected[-1].nodeid]
+    assert bpytest_order.order_tests(entries, resources) == expected
+
+    no_addons = {entry.nodeid: frozenset({"fixture:data"}) for entry in entries}
+    assert bpytest_order.order_tests(entries[::-1], no_addons) == entries[::-1]
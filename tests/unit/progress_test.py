@@ -0,0 +1,114 @@
+import io
+import time
+
+import pytest
+
+from bpytest.progress import ANY_INSTANCE, Progress, format_seconds
+
+DURATIONS = {
+    "a_test.py::test_a": {"duration": 10.0, "setup": 1.0},
+    "a_test.py::test_b": {"duration": 20.0, "setup": 0.0},
+    "a_test.py::test_c": {"duration": 5.0, "setup": 0.0},
+}
+
+
+def _event(event: str, instance_id: str = "main", **data) -> dict:
+    return {"event": event, "instance_id": instance_id, **data}
+
+
+def _result(nodeid: str, success: bool = True, **data) -> dict:
+    return _event("test_result", nodeid=nodeid, success=success, duration=1.0, **data)
+
+
+def test_format_seconds():
+    assert format_seconds(45.2) == "45s"
+    assert format_seconds(185) == "3m05s"
+    assert format_seconds(3720) == "1h02m"
+
+
+def test_eta_from_durations():
+    """The remaining time is the recorded duration of each remaining test, a new
+    test counts as the median duration"""
+
+    progress = Progress(DURATIONS, stream=io.StringIO(), live=False)
+    progress.expect("main", [*DURATIONS, "a_test.py::test_new"])
+    now = time.monotonic()
+    assert progress.eta(now) == 10.0 + 20.0 + 5.0 + 10.0
+
+    progress.handle_event(_event("test_start", nodeid="a_test.py::test_a"))
+    progress.handle_event(_result("a_test.py::test_a"))
+    progress.handle_event(_event("test_start", nodeid="a_test.py::test_b"))
+    # The elapsed time of the current test is not remaining
+    assert progress.eta(time.monotonic() + 5.0) == pytest.approx(30.0, abs=0.1)
+
+    # The host lane runs in parallel with the Blender sessions
+    progress = Progress(DURATIONS, stream=io.StringIO(), live=False, parallel=("host",))
+    progress.expect("main", ["a_test.py::test_a"])
+    progress.handle_event(
+        _event("instance_start", "host", nodeids=["a_test.py::test_b", "a_test.py::test_c"])
+    )
+    assert progress.eta(now) == 25.0
+
+
+def test_lines():
+    """One line per instance, with the current test, and the total"""
+
+    progress = Progress(DURATIONS, stream=io.StringIO(), live=False)
+    progress.expect("main", list(DURATIONS))
+    progress.expect("old", list(DURATIONS))
+    progress.handle_event(_result("a_test.py::test_a", success=False))
+    progress.handle_event(_event("test_start", nodeid="a_test.py::test_b"))
+
+    now = time.monotonic()
+    assert progress.lines(now) == [
+        "[main] 1/3 passed 0 failed 1 a_test.py::test_b (0s)",
+        "[old] 0/3 passed 0",
+        "Progress: 1/6 tests, 1m00s left",
+    ]
+
+    progress.handle_event(_event("instance_result", nodeid="", passed=0, failed=1))
+    assert progress.lines(now)[0] == "[main] 1/3 passed 0 failed 1 done"
+
+
+def test_workers():
+    """With a coordinator, the workers share the remaining tests"""
+
+    progress = Progress(DURATIONS, stream=io.StringIO(), live=False)
+    progress.expect(ANY_INSTANCE, list(DURATIONS))
+    for worker, nodeid in (("w1", "a_test.py::test_a"), ("w2", "a_test.py::test_b")):
+        progress.handle_event(_event("instance_start", worker=worker, nodeids=[nodeid]))
+        progress.handle_event(_event("test_start", worker=worker, nodeid=nodeid))
+
+    now = time.monotonic()
+    assert progress.eta(now) == pytest.approx((10.0 + 20.0 + 5.0) / 2, abs=0.1)
+    progress.handle_event(_result("a_test.py::test_a", worker="w1"))
+    lines = progress.lines(now)
+    assert lines[0] == "[w1] (main) 1/1 passed 1"
+    assert lines[1].startswith("[w2] (main) 0/1 passed 0 a_test.py::test_b")
+    assert lines[2] == "Progress: 1/3 tests, 25s left"
+
+
+def test_plain_and_live_output():
+    """Plain progress lines without a terminal, the live progress is redrawn
+    below the output"""
+
+    stream = io.StringIO()
+    progress = Progress(DURATIONS, stream=stream, live=False, interval=0.0)
+    progress.expect("main", list(DURATIONS))
+    progress.handle_event(_result("a_test.py::test_a"))
+    assert stream.getvalue() == "[main] 1/3 tests, 25s left\n"
+
+    stream = io.StringIO()
+    progress = Progress(DURATIONS, stream=stream, live=True, interval=0.01)
+    progress.expect("main", list(DURATIONS))
+    progress.start()
+    try:
+        time.sleep(0.1)
+        print("test output")
+    finally:
+        progress.stop()
+    output = stream.getvalue()
+    assert "Progress: 0/3 tests, 35s left\n" in output
+    assert "\x1b[1A\r\x1b[Jtest output\n" in output
+    # The progress is erased at the end
+    assert output.endswith("\x1b[1A\r\x1b[J" * 2)
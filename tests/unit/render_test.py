@@ -0,0 +1,123 @@
+import subprocess
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from bpytest_ast import StaticMark
+from bpytest_render import (
+    apply_render_profile,
+    uses_render_profile,
+    validate_render_profile,
+)
+from conftest import _blender_exe
+
+PYPROJECT = """
+[tool.bpytest.render]
+samples = 16
+resolution_percentage = 25
+denoise = false
+threads = 2
+"""
+
+RENDER_TEST_FILE = """
+import bpy
+import bpytest
+
+
+def test_profile():
+    scene = bpy.context.scene
+    assert scene.cycles.samples == 16
+    assert scene.render.resolution_percentage == 25
+    assert not scene.cycles.use_denoising
+    assert scene.render.threads == 2
+    bpy.ops.render.render()
+
+
+def test_opened_file():
+    bpy.ops.wm.open_mainfile(filepath="production.blend")
+    assert bpy.context.scene.cycles.samples == 16
+
+
+@bpytest.mark.render_profile("full")
+def test_full():
+    assert bpy.context.scene.cycles.samples == 4096
+"""
+
+
+def _scene() -> SimpleNamespace:
+    return SimpleNamespace(
+        render=SimpleNamespace(
+            engine="CYCLES", resolution_percentage=100, threads_mode="AUTO", threads=8
+        ),
+        cycles=SimpleNamespace(
+            samples=1024, preview_samples=64, use_denoising=True, max_bounces=12
+        ),
+        eevee=SimpleNamespace(taa_render_samples=8),
+    )
+
+
+def test_apply_render_profile():
+    """Settings are only lowered, the cost ratio is estimated from the
+    samples and the number of pixels of the render engine"""
+    scene = _scene()
+    ratio = apply_render_profile(
+        scene, {"samples": 16, "resolution_percentage": 50, "denoise": False}
+    )
+    assert ratio == 64 * 4
+    assert (scene.cycles.samples, scene.cycles.preview_samples) == (16, 16)
+    assert scene.eevee.taa_render_samples == 8
+    assert scene.cycles.use_denoising is False
+    assert scene.render.threads_mode == "AUTO"
+
+    # Already applied
+    assert apply_render_profile(scene, {"samples": 16}) == 1.0
+
+
+def test_apply_render_profile_without_cycles():
+    """Cycles settings are skipped if the Cycles addon is disabled"""
+    scene = SimpleNamespace(
+        render=SimpleNamespace(engine="BLENDER_EEVEE_NEXT", threads_mode="AUTO", threads=8),
+        eevee=SimpleNamespace(taa_render_samples=64),
+    )
+    assert apply_render_profile(scene, {"samples": 16, "threads": 2}) == 4
+    assert (scene.render.threads_mode, scene.render.threads) == ("FIXED", 2)
+
+
+def test_uses_render_profile(tmp_path: Path):
+    """The closest render_profile mark wins"""
+    test_file = tmp_path / "renders" / "render_test.py"
+    full = StaticMark("render_profile", ("full",))
+    directory_marks = {test_file.parent: [full]}
+
+    assert uses_render_profile(test_file, [], {})
+    assert not uses_render_profile(test_file, [], directory_marks)
+    assert uses_render_profile(
+        test_file, [StaticMark("render_profile", ("ci",))], directory_marks
+    )
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [{"sample": 16}, {"samples": "16"}, {"samples": 0}, {"denoise": 0}],
+)
+def test_validate_render_profile(profile: dict):
+    with pytest.raises(ValueError):
+        validate_render_profile(profile)
+
+
+def test_render_profile(tmp_path: Path):
+    """The profile is applied after every reset and to the opened files,
+    the saved render time is reported"""
+    (tmp_path / "pyproject.toml").write_text(PYPROJECT, encoding="utf-8")
+    (tmp_path / "render_test.py").write_text(RENDER_TEST_FILE, encoding="utf-8")
+
+    process = subprocess.run(
+        ["bpytest", f"--blender-exe={_blender_exe()}"],
+        cwd=tmp_path,
+        check=False,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    assert process.returncode == 0, process.stdout
+    assert "Render profile: 1 renders in" in process.stdout
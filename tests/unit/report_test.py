@@ -0,0 +1,125 @@
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from bpytest.report import JsonLinesReport, JUnitXmlReport
+from conftest import BPY_TEST_FILES, assert_execute_test_unit
+
+INSTANCES = {"main": "/path/to/blender", "host": "/path/to/python"}
+
+
+def _result(nodeid: str, success: bool, instance_id: str = "main") -> dict:
+    return {
+        "event": "test_result",
+        "instance_id": instance_id,
+        "lane": "blender",
+        "nodeid": nodeid,
+        "success": success,
+        "duration": 0.5,
+        "longrepr": "" if success else "Traceback\nAssertionError: \x1b[91mboom",
+    }
+
+
+def test_junitxml_report_partial(tmp_path: Path):
+    """Test the JUnit report is well-formed before being closed"""
+
+    path = tmp_path / "report.xml"
+    report = JUnitXmlReport(path, INSTANCES)
+    report.add_result(_result("tests/a_test.py::test_a", True))
+    report.add_result(_result("tests/a_test.py::test_b", False))
+
+    cases = ET.parse(path).getroot().findall("./testsuite/testcase")
+    assert [case.get("name") for case in cases] == ["test_a[main]", "test_b[main]"]
+    failure = cases[1].find("failure")
+    assert failure is not None
+    assert failure.get("message") == "AssertionError: boom"
+
+
+def test_junitxml_report_close(tmp_path: Path):
+    """Test the JUnit report totals and instance properties are written on close"""
+
+    path = tmp_path / "report.xml"
+    report = JUnitXmlReport(path, INSTANCES)
+    report.add_result(_result("tests/a_test.py::test_a", True))
+    report.add_result(_result("tests/a_test.py::test_a", False, "host"))
+    report.add_instance_result(
+        {"instance_id": "main", "passed": 1, "failed": 0, "duration": 1.0}
+    )
+    report.close()
+
+    suite = ET.parse(path).getroot().find("testsuite")
+    assert suite is not None
+    assert suite.get("tests") == "2"
+    assert suite.get("failures") == "1"
+    properties = {
+        prop.get("name"): prop.get("value")
+        for prop in suite.findall("./properties/property")
+    }
+    assert properties["main.executable"] == "/path/to/blender"
+    assert properties["main.passed"] == "1"
+    assert properties["host.executable"] == "/path/to/python"
+    assert [case.get("classname") for case in suite.findall("testcase")] == [
+        "tests.a_test",
+        "tests.a_test",
+    ]
+
+
+def test_json_lines_report(tmp_path: Path):
+    """Test every result is written as a json line"""
+
+    path = tmp_path / "report.jsonl"
+    report = JsonLinesReport(path, INSTANCES)
+    report.add_result(_result("tests/a_test.py::test_a", True))
+    report.add_result(_result("tests/a_test.py::test_b", False))
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["event"] for line in lines] == [
+        "session_start",
+        "test_result",
+        "test_result",
+    ]
+
+    report.close()
+    finish = json.loads(path.read_text().splitlines()[-1])
+    assert finish["event"] == "session_finish"
+    assert (finish["passed"], finish["failed"]) == (1, 1)
+
+
+def test_junitxml_option(tmp_path: Path):
+    """Test the --junitxml option writes the session results"""
+
+    path = tmp_path / "report.xml"
+    assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "assertion_test.py",
+        "test_assert_true",
+        args=[f"--junitxml={path}"],
+    )
+
+    suite = ET.parse(path).getroot().find("testsuite")
+    assert suite is not None
+    assert suite.get("tests") == "1"
+    case = suite.find("testcase")
+    assert case is not None
+    assert case.get("name") == "test_assert_true"
+
+
+def test_report_json_option(tmp_path: Path):
+    """Test the --report-json option writes the failures with their traceback"""
+
+    path = tmp_path / "report.jsonl"
+    assert_execute_test_unit(
+        False,
+        BPY_TEST_FILES / "assertion_test.py",
+        "test_failed_with_exception",
+        args=[f"--report-json={path}"],
+    )
+
+    results = [
+        json.loads(line)
+        for line in path.read_text().splitlines()
+        if json.loads(line)["event"] == "test_result"
+    ]
+    assert len(results) == 1
+    assert not results[0]["success"]
+    assert "NotImplementedError: Test exception" in results[0]["longrepr"]
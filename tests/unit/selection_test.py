@@ -0,0 +1,116 @@
+import bpytest_index
+import pytest
+from bpytest_expression import Expression, ExpressionError
+from conftest import BPY_TEST_FILES, _blender_exe, _execute_pytest_command
+
+MARKS_TEST_FILE = BPY_TEST_FILES / "marks_test.py"
+
+
+def _selected_tests(stdout: list[str]) -> list[str]:
+    """Names printed by the tests of marks_test.py, in run order"""
+    return [
+        line.split("[selected][")[1].split("]")[0]
+        for line in stdout
+        if "[selected][" in line
+    ]
+
+
+def _execute_selection(expect_success: bool, *args: str) -> list[str]:
+    """Run marks_test.py with the selection arguments, without capture"""
+    _, stdout = _execute_pytest_command(
+        ["bpytest", f"--blender-exe={_blender_exe()}", MARKS_TEST_FILE.as_posix(), "-s", *args],
+        expect_success,
+    )
+    return stdout
+
+
+@pytest.mark.parametrize(
+    "text, names, expected",
+    [
+        ("slow", {"slow"}, True),
+        ("not slow", {"slow"}, False),
+        ("slow and not gpu", {"slow"}, True),
+        ("slow and not gpu", {"slow", "gpu"}, False),
+        ("gpu or (slow and cpu)", {"slow", "cpu"}, True),
+        ("not not slow", {"slow"}, True),
+        ("test_a.py::test_b[1]", {"test_a.py::test_b[1]"}, True),
+        ("", {"slow"}, False),
+    ],
+)
+def test_expression_evaluate(text, names, expected):
+    """Expressions are evaluated with the identifiers matching"""
+    assert Expression.compile(text).evaluate(lambda name: name in names) is expected
+
+
+@pytest.mark.parametrize(
+    "text, column",
+    [("slow and", 8), ("(slow", 5), ("slow gpu", 5), ("slow & gpu", 5), ("and", 0)],
+)
+def test_expression_error(text, column):
+    """Invalid expressions raise ExpressionError with the column of the error"""
+    with pytest.raises(ExpressionError) as error:
+        Expression.compile(text)
+    assert error.value.column == column
+
+
+def test_expression_names_are_not_python():
+    """Identifiers never resolve to python names or builtins"""
+    expression = Expression.compile("print or __import__ or True")
+    assert expression.evaluate(lambda name: False) is False
+
+
+def test_selector_keyword():
+    """-k matches case insensitive substrings of the name, path and marks"""
+    selector = bpytest_index.TestSelector(keyword="CUBE and not slow")
+    assert selector.matches("tests/cube_test.py::test_create", [])
+    assert not selector.matches("tests/cube_test.py::test_create", ["slow"])
+    assert not selector.matches("tests/sphere_test.py::test_create", [])
+
+
+def test_selector_markexpr():
+    """-m matches exact mark names"""
+    selector = bpytest_index.TestSelector(markexpr="slow and not gpu")
+    assert selector.matches("a_test.py::test_a", ["slow"])
+    assert not selector.matches("a_test.py::test_a", ["slower"])
+    assert not selector.matches("a_test.py::test_a", ["slow", "gpu"])
+    assert not bpytest_index.TestSelector().active
+
+
+def test_index_select():
+    """The index reads the marks of the test files without importing them"""
+    index = bpytest_index.TestIndex.build(MARKS_TEST_FILE.as_posix(), [], with_marks=True)
+    selected = index.select(bpytest_index.TestSelector(markexpr="slow and not gpu"))
+    assert [entry.function_name for entry in selected] == ["test_marks_slow"]
+    assert selected[0].nodeid == f"{MARKS_TEST_FILE.as_posix()}::test_marks_slow"
+
+
+def test_markexpr():
+    """Only the tests with matching marks run, should pass"""
+    stdout = _execute_selection(True, "-m", "slow and not gpu")
+    assert _selected_tests(stdout) == ["test_marks_slow"]
+
+
+def test_keyword_expression():
+    """Only the tests matching the keyword expression run, should pass"""
+    stdout = _execute_selection(True, "-k", "marks and not none and not gpu")
+    assert _selected_tests(stdout) == ["test_marks_slow"]
+    stdout = _execute_selection(True, "-k", "gpu or none")
+    assert _selected_tests(stdout) == ["test_marks_slow_gpu", "test_marks_none"]
+
+
+def test_no_selected_tests():
+    """Blender is not started when no test matches the selection"""
+    _, stdout = _execute_pytest_command(
+        ["bpytest", "--blender-exe=/nonexistent/blender", MARKS_TEST_FILE.as_posix(), "-m", "missing"],
+        True,
+    )
+    assert any("No tests collected" in line for line in stdout)
+
+
+def test_invalid_expression():
+    """An invalid expression is reported before starting Blender, should fail"""
+    _, stdout = _execute_pytest_command(
+        ["bpytest", "--blender-exe=/nonexistent/blender", MARKS_TEST_FILE.as_posix(), "-k", "slow and"],
+        False,
+    )
+    assert any("column 9" in line for line in stdout)
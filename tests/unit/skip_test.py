@@ -0,0 +1,141 @@
+import json
+from pathlib import Path
+
+import pytest
+from bpytest_ast import SourceExpression, StaticMark
+from bpytest_skip import (
+    OUTCOME_FAILED,
+    OUTCOME_XFAILED,
+    OUTCOME_XPASSED,
+    ConditionEvaluator,
+    UndecidedCondition,
+    apply_xfail,
+    expected_failure,
+    skip_reason,
+    static_namespace,
+)
+from conftest import BPY_TEST_FILES, _blender_exe, _execute_pytest_command
+
+SKIP_TEST_FILE = BPY_TEST_FILES / "skip" / "skip_test.py"
+
+
+def test_skip_reason():
+    """skip marks always skip, skipif marks if a condition is true"""
+    evaluator = ConditionEvaluator(static_namespace())
+    assert skip_reason([StaticMark("skip", ("Not ready",))], evaluator) == "Not ready"
+    assert skip_reason([StaticMark("skipif", (False,))], evaluator) is None
+    marks = [
+        StaticMark(
+            "skipif",
+            (SourceExpression("sys.platform != 'never'"),),
+            {"reason": "Always"},
+        )
+    ]
+    assert skip_reason(marks, evaluator) == "Always"
+    # skipif(condition, reason), the reason is not a condition
+    assert skip_reason([StaticMark("skipif", (False, "Not here"))], evaluator) is None
+    assert skip_reason([StaticMark("skipif", (True, "Always"))], evaluator) == "Always"
+    assert skip_reason([StaticMark("skipif", (True,))], evaluator) == "condition: True"
+
+
+def test_undecided_condition():
+    """Conditions using names missing from the namespace, or values that
+    differ in the test sessions, are not decided by the command line"""
+    evaluator = ConditionEvaluator(static_namespace())
+    with pytest.raises(UndecidedCondition):
+        evaluator.evaluate(SourceExpression("bpy.app.version < (4, 2)"))
+    with pytest.raises(AttributeError):
+        evaluator.evaluate(SourceExpression("sys.version_info < (3, 11)"))
+
+
+def test_xfail():
+    evaluator = ConditionEvaluator({})
+    xfail = expected_failure(
+        [StaticMark("xfail", (), {"reason": "Bug", "strict": True})], evaluator
+    )
+    assert xfail is not None
+    assert apply_xfail(xfail, False, ["Traceback"]) == (OUTCOME_XFAILED, True, ["Bug"])
+    assert apply_xfail(xfail, True, [])[:2] == (OUTCOME_FAILED, False)
+    xfail.strict = False
+    assert apply_xfail(xfail, True, [])[:2] == (OUTCOME_XPASSED, True)
+    assert expected_failure([StaticMark("xfail", (False,))], evaluator) is None
+    xfail = expected_failure([StaticMark("xfail", (True, "Bug"))], evaluator)
+    assert xfail is not None and xfail.reason == "Bug"
+
+
+def test_skip_marks(tmp_path: Path):
+    """Static skips are reported by the command line, the other ones by the
+    test session without running the tests, xfail outcomes are reported"""
+    report_path = tmp_path / "report.jsonl"
+    _, stdout = _execute_pytest_command(
+        [
+            "bpytest",
+            f"--blender-exe={_blender_exe()}",
+            "-s",
+            f"--report-json={report_path}",
+            SKIP_TEST_FILE.as_posix(),
+        ],
+        True,
+    )
+    assert any(
+        "test_skip SKIPPED (Decided by the command line)" in line for line in stdout
+    )
+    assert not any("A skipped test ran" in line for line in stdout)
+    assert not any("A not run xfail test ran" in line for line in stdout)
+    assert any("[skip][test_skipif_false]" in line for line in stdout)
+    assert any(
+        "test_skipif_reason_argument SKIPPED (Reason argument)" in line
+        for line in stdout
+    )
+    assert any("[skip][test_skipif_false_reason_argument]" in line for line in stdout)
+    # The tests skipped by the command line are selected, not deselected
+    assert any(
+        "collected 11 items / 0 deselected / 11 selected / 3 skipped" in line
+        for line in stdout
+    )
+
+    outcomes = {
+        line["nodeid"].split("::")[1]: line["outcome"]
+        for line in map(json.loads, report_path.read_text().splitlines())
+        if line["event"] == "test_result"
+    }
+    assert outcomes == {
+        "test_skip": "skipped",
+        "test_skipif_static": "skipped",
+        "test_skipif_reason_argument": "skipped",
+        "test_skipif_false_reason_argument": "passed",
+        "test_skipif_blender": "skipped",
+        "test_skipif_false": "passed",
+        "test_skipif_module_global": "skipped",
+        "test_xfail_module_global": "xfailed",
+        "test_xfail": "xfailed",
+        "test_xpass": "xpassed",
+        "test_xfail_not_run": "xfailed",
+    }
+    assert any(
+        "Failed: 0 Success: 3 Skipped: 2 Xfailed: 3 Xpassed: 1" in line
+        for line in stdout
+    )
+    # The command line summarizes its skipped tests with the test session
+    assert any(
+        "Failed: 0 Success: 3 Skipped: 5 Xfailed: 3 Xpassed: 1" in line
+        for line in stdout
+    )
+
+
+def test_only_static_skips():
+    """A selection of statically skipped tests starts no test session and is
+    summarized by the command line"""
+    _, stdout = _execute_pytest_command(
+        [
+            "bpytest",
+            f"--blender-exe={_blender_exe()}",
+            "-k",
+            "test_skip and not blender and not false and not global",
+            SKIP_TEST_FILE.as_posix(),
+        ],
+        True,
+    )
+    assert any("Every selected test is skipped" in line for line in stdout)
+    assert not any("Test session starts" in line for line in stdout)
+    assert any("Failed: 0 Success: 0 Skipped: 3" in line for line in stdout)
@@ -0,0 +1,56 @@
+from bpytest_snapshot import SnapshotNode, diff_snapshots
+
+
+def _scene(location: tuple, material: str = "Red", extra: bool = False) -> SnapshotNode:
+    """Hash tree of a small scene"""
+    objects = {
+        "Cube": SnapshotNode.branch(
+            {
+                "location": SnapshotNode.leaf(location),
+                "material": SnapshotNode.leaf(material),
+            }
+        ),
+        "Camera": SnapshotNode.branch({"lens": SnapshotNode.leaf(50.0)}),
+    }
+    if extra:
+        objects["Light"] = SnapshotNode.branch({})
+    return SnapshotNode.branch({"objects": SnapshotNode.branch(objects)})
+
+
+def test_equal_trees():
+    """Equal trees have the same root digest, independent of the children order"""
+    assert _scene((0, 0, 0)).digest == _scene((0, 0, 0)).digest
+    a = SnapshotNode.branch({"a": SnapshotNode.leaf(1), "b": SnapshotNode.leaf(2)})
+    b = SnapshotNode.branch({"b": SnapshotNode.leaf(2), "a": SnapshotNode.leaf(1)})
+    assert a.digest == b.digest
+    assert not diff_snapshots(_scene((0, 0, 0)), _scene((0, 0, 0)))
+
+
+def test_diff():
+    """Only the changed leaves, added and removed children are reported"""
+    expected = _scene((0, 0, 0))
+    actual = _scene((1, 0, 0), material="Blue", extra=True)
+    assert expected.children["objects"].children["Camera"].digest == (
+        actual.children["objects"].children["Camera"].digest
+    )
+    assert diff_snapshots(expected, actual) == [
+        "/objects/Cube/location: (0, 0, 0) -> (1, 0, 0)",
+        "/objects/Cube/material: 'Red' -> 'Blue'",
+        "/objects/Light: added",
+    ]
+    assert diff_snapshots(actual, expected, max_report=1) == [
+        "/objects/Cube/location: (1, 0, 0) -> (0, 0, 0)"
+    ]
+
+
+def test_leaf_data_digest():
+    """Leaves read in bulk are digested from their data, not their summary"""
+    assert SnapshotNode.leaf("8 x co", data=b"1").digest != SnapshotNode.leaf("8 x co", data=b"2").digest
+
+
+def test_json_round_trip():
+    """Trees are stored as json and loaded with the same digests"""
+    tree = _scene((0, 0, 0), extra=True)
+    loaded = SnapshotNode.from_dict(tree.to_dict())
+    assert loaded == tree
+    assert not diff_snapshots(loaded, tree)
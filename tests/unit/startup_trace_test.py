@@ -0,0 +1,141 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from bpytrace import Span, format_chrome_trace, format_timeline
+from conftest import BPY_TEST_FILES, assert_execute_test_unit
+
+
+def _trace_phases(stdout: list[str]) -> list[tuple[str, ...]]:
+    """(process, phase) of every line of the startup trace table"""
+
+    start = next(
+        index for index, line in enumerate(stdout) if "Startup trace" in line
+    )
+    return [tuple(line.split()[2:4]) for line in stdout[start + 2 :]]
+
+
+def test_startup_trace():
+    """Startup phases of the command line and Blender are reported, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "assertion_test.py",
+        "test_assert_true",
+        args=["--startup-trace"],
+    )
+    phases = _trace_phases(stdout)
+    for phase in ["imports", "arguments", "config"]:
+        assert ("bpytest", phase) in phases
+    for phase in ["process_start", "imports", "config", "collection", "conftest", "first_test"]:
+        assert ("main", phase) in phases
+
+
+def test_startup_trace_disabled():
+    """Startup trace is not reported by default, should pass"""
+    _, stdout = assert_execute_test_unit(
+        True, BPY_TEST_FILES / "assertion_test.py", "test_assert_true"
+    )
+    assert not any("Startup trace" in line for line in stdout)
+
+
+def test_fast_start():
+    """Tests run with the first factory reset skipped, should pass"""
+    assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "assertion_test.py",
+        "test_cube_creation",
+        args=["--fast-start"],
+    )
+
+
+def test_lazy_imports():
+    """The modules of the optional features are not imported with the command
+    line, should pass"""
+    modules = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, bpytest.main; print(' '.join(sorted(sys.modules)))",
+        ],
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout.split()
+    for name in [
+        "bpytest_addons",
+        "bpytest_coverage",
+        "bpytest_index",
+        "bpytest_metrics",
+        "bpytest_order",
+        "bpytest_render",
+        "bpytest_skip",
+        "bpytest_version",
+        "bpytrace",
+    ]:
+        assert f"bpytest.common.{name}" not in modules
+
+
+def test_format_timeline():
+    """Spans are sorted and relative to the first span"""
+    lines = format_timeline(
+        [
+            Span("collection", "main", 3_000_000, 4_500_000),
+            Span("imports", "bpytest", 1_000_000, 2_000_000),
+        ]
+    )
+    assert [line.split() for line in lines[1:]] == [
+        ["0.00", "1.00", "bpytest", "imports"],
+        ["2.00", "1.50", "main", "collection"],
+    ]
+
+
+def test_format_chrome_trace():
+    """A track by process, overlapping spans of a process on separate tracks"""
+    trace = format_chrome_trace(
+        [
+            Span("test_session [main]", "bpytest", 1_000, 9_000),
+            Span("test_session [host]", "bpytest", 2_000, 10_000),
+            Span("reset", "main", 3_000, 4_000),
+        ]
+    )
+    names = {
+        event["pid"]: event["args"]["name"]
+        for event in trace["traceEvents"]
+        if event["name"] == "process_name"
+    }
+    spans = {
+        event["name"]: (names[event["pid"]], event["tid"], event["ts"], event["dur"])
+        for event in trace["traceEvents"]
+        if event["ph"] == "X"
+    }
+    assert spans == {
+        "test_session [main]": ("bpytest", 0, 0.0, 8.0),
+        "test_session [host]": ("bpytest", 1, 1.0, 8.0),
+        "reset": ("main", 0, 2.0, 1.0),
+    }
+
+
+def test_trace_file(tmp_path: Path):
+    """Every test, reset and fixture of the session is in the trace file"""
+    trace_file = tmp_path / "trace.json"
+    assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "fixture_test.py",
+        "test_custom_fixture",
+        args=[f"--trace-file={trace_file.as_posix()}"],
+    )
+    events = json.loads(trace_file.read_text(encoding="utf-8"))["traceEvents"]
+    processes = {
+        event["args"]["name"] for event in events if event["name"] == "process_name"
+    }
+    names = {event["name"] for event in events if event["ph"] == "X"}
+    assert processes == {"bpytest", "main"}
+    for name in [
+        "test_session [main]",
+        "collection",
+        "restore_session",
+        "fixture_setup:custom_fixture",
+        "tests/fixtures/bpytest_files/fixture_test.py::test_custom_fixture",
+    ]:
+        assert name in names
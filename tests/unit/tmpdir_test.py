@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from conftest import BPY_TEST_FILES, assert_execute_test_unit
 
 
@@ -27,5 +29,48 @@ def test_multiple_tmp_path_fixtures():
 def test_save_file():
     """Test the save file in tmp_path, should pass"""
     assert_execute_test_unit(
-        True, BPY_TEST_FILES / "assertion_test.py", "test_save_file"
+        True, BPY_TEST_FILES / "tmpdir_test.py", "test_save_file"
+    )
+
+
+def test_tmp_path_factory():
+    """Test the session temporary directory factory, should pass"""
+    assert_execute_test_unit(
+        True, BPY_TEST_FILES / "tmpdir_test.py", "test_tmp_path_factory"
+    )
+
+
+def test_tmp_path_in_session_dir():
+    """Test tmp_path is created in the session directory, should pass"""
+    assert_execute_test_unit(
+        True, BPY_TEST_FILES / "tmpdir_test.py", "test_tmp_path_in_session_dir"
+    )
+
+
+def test_tmp_path_root_and_retention(tmp_path: Path):
+    """Test the configurable root and the deletion of old sessions, should pass"""
+    temp_dir = tmp_path / "bpytest"
+    old_sessions = [temp_dir / f"session-20000101-00000{i}-old" for i in range(5)]
+    for session_dir in old_sessions:
+        (session_dir / "test").mkdir(parents=True)
+    # A locked session is used by a running session and never deleted
+    (old_sessions[0] / ".lock").touch()
+
+    assert_execute_test_unit(
+        True,
+        BPY_TEST_FILES / "tmpdir_test.py",
+        "test_tmp_path",
+        args=[f"--tmp-path-root={tmp_path}"],
+    )
+
+    # The locked session and the 3 newest previous sessions are kept
+    remaining = sorted(path.name for path in temp_dir.iterdir())
+    assert len(remaining) == 5
+    assert old_sessions[1].name not in remaining
+    assert all(
+        session_dir.name in remaining
+        for session_dir in (old_sessions[0], *old_sessions[2:])
     )
+    new_sessions = [name for name in remaining if not name.endswith("-old")]
+    assert len(new_sessions) == 1
+    assert not (temp_dir / new_sessions[0] / ".lock").exists()
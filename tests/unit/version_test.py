@@ -0,0 +1,118 @@
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+from bpytest_ast import StaticMark
+from bpytest_version import runs_on_version, version_matches
+from conftest import _blender_exe
+
+from bpytest import probe
+from bpytest.cache import Cache
+
+VERSION_TEST_FILE = """
+import bpytest
+
+
+@bpytest.mark.blender(">=4.2")
+def test_new():
+    pass
+
+
+@bpytest.mark.blender("<4.0")
+def test_old():
+    pass
+
+
+def test_any():
+    pass
+"""
+
+
+@pytest.mark.parametrize(
+    "requirement,version,expected",
+    [
+        (">=4.2", (4, 2, 0), True),
+        (">=4.2", (4, 1, 1), False),
+        (">4.2", (4, 2, 0), False),
+        ("<4.2", (4, 1, 1), True),
+        ("4.2", (4, 2, 3), True),
+        ("==4.2", (4, 3, 0), False),
+        ("!=4.2", (4, 2, 3), False),
+        (">=3.6,<4.2", (3, 6, 5), True),
+        (">=3.6,<4.2", (4, 2, 0), False),
+    ],
+)
+def test_version_matches(requirement: str, version: tuple, expected: bool):
+    assert version_matches(requirement, version) == expected
+
+
+def test_runs_on_version():
+    """Every blender mark must match, invalid requirements raise"""
+    marks = [StaticMark("blender", (">=3.6",)), StaticMark("blender", ("<4.2",))]
+    assert runs_on_version(marks, (4, 1, 0))
+    assert not runs_on_version(marks, (4, 2, 0))
+    assert runs_on_version([StaticMark("slow")], (2, 93, 0))
+    with pytest.raises(ValueError):
+        runs_on_version([StaticMark("blender", (">=four",))], (4, 2, 0))
+
+
+def test_probe_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Executables are probed once, until they change"""
+    blender_exe = Path(_blender_exe()).absolute()
+    cache = Cache(tmp_path)
+    info = probe.BlenderProbe(cache).get(blender_exe)
+    assert info.version == (4, 2, 0)
+    assert info.python_version
+
+    def probe_blender(path: Path) -> probe.BlenderInfo:
+        raise AssertionError(f"{path} probed again")
+
+    monkeypatch.setattr(probe, "probe_blender", probe_blender)
+    assert probe.BlenderProbe(Cache(tmp_path)).get(blender_exe) == info
+
+
+def _stub_version(tmp_path: Path, version: str) -> Path:
+    """Stub Blender executable of another version"""
+    blender_exe = tmp_path / f"blender-{version}"
+    blender_exe.write_text(
+        f'#!/bin/sh\nBPY_STUB_VERSION={version} exec "{Path(_blender_exe()).absolute()}" "$@"\n',
+        encoding="utf-8",
+    )
+    blender_exe.chmod(0o755)
+    return blender_exe
+
+
+def test_blender_mark(tmp_path: Path):
+    """Tests only run with the Blender versions of their blender marks, an
+    executable without tests to run is not started"""
+    (tmp_path / "pyproject.toml").write_text("[tool.bpytest]\n", encoding="utf-8")
+    (tmp_path / "version_test.py").write_text(VERSION_TEST_FILE, encoding="utf-8")
+    env = {
+        **os.environ,
+        "BLENDER_NEW_EXE": _stub_version(tmp_path, "4.2.0").as_posix(),
+        "BLENDER_OLD_EXE": _stub_version(tmp_path, "3.6.0").as_posix(),
+    }
+
+    def run(*args: str) -> str:
+        process = subprocess.run(
+            ["bpytest", "--blender-exe-id-list=new,old", *args],
+            cwd=tmp_path,
+            env=env,
+            check=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        assert process.returncode == 0, process.stdout
+        return process.stdout
+
+    stdout = run()
+    assert "[new] Blender 4.2.0 (stub)" in stdout
+    assert "test_new" in stdout.split("[new] Test session starts")[1]
+    old_session = stdout.split("[old] Test session starts")[1]
+    assert "test_old" in old_session and "test_new" not in old_session
+
+    stdout = run("-k", "new")
+    assert "[old] No selected test runs with this Blender executable" in stdout
+    assert "[old] Test session starts" not in stdout
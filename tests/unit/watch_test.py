@@ -0,0 +1,97 @@
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from conftest import _blender_exe
+
+from bpytest.watch import InotifyWatcher, PollingWatcher
+
+
+def _watcher_classes() -> list[type]:
+    classes: list[type] = [PollingWatcher]
+    if sys.platform.startswith("linux"):
+        classes.append(InotifyWatcher)
+    return classes
+
+
+@pytest.mark.parametrize("watcher_class", _watcher_classes())
+def test_watcher_changes(tmp_path: Path, watcher_class: type):
+    """Changed and created python files are reported, other files are ignored"""
+    (tmp_path / "module.py").write_text("A = 1\n")
+    (tmp_path / "package").mkdir()
+    (tmp_path / "__pycache__").mkdir()
+
+    watcher = watcher_class([tmp_path])
+    try:
+        time.sleep(0.05)
+        (tmp_path / "module.py").write_text("A = 22\n")
+        (tmp_path / "package" / "new_test.py").write_text("")
+        (tmp_path / "notes.txt").write_text("")
+        (tmp_path / "__pycache__" / "cached.py").write_text("")
+
+        changed = watcher.wait_for_changes()
+        deadline = time.time() + 2
+        while len(changed) < 2 and time.time() < deadline:
+            changed |= watcher.wait_for_changes()
+    finally:
+        watcher.close()
+
+    assert changed == {
+        tmp_path / "module.py",
+        tmp_path / "package" / "new_test.py",
+    }
+
+
+def _read_until(lines: "queue.Queue[str]", text: str, timeout: float = 20) -> list[str]:
+    """Read the output lines until a line containing text"""
+
+    output = []
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            line = lines.get(timeout=deadline - time.time())
+        except queue.Empty:
+            break
+        output.append(line)
+        if text in line:
+            return output
+    raise AssertionError(f"{text!r} not found in output:\n{''.join(output)}")
+
+
+def test_watch(tmp_path: Path):
+    """Tests of the changed file run again in the same Blender session"""
+    (tmp_path / "pyproject.toml").write_text("[tool.bpytest]\n")
+    test_file = tmp_path / "watch_test.py"
+    test_file.write_text("def test_watch():\n    assert True\n")
+    (tmp_path / "other_test.py").write_text("def test_other():\n    assert True\n")
+
+    process = subprocess.Popen(
+        ["bpytest", f"--blender-exe={_blender_exe()}", "--watch"],
+        cwd=tmp_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    lines: "queue.Queue[str]" = queue.Queue()
+    assert process.stdout is not None
+    threading.Thread(
+        target=lambda: [lines.put(line) for line in process.stdout],  # type: ignore[union-attr]
+        daemon=True,
+    ).start()
+
+    try:
+        output = _read_until(lines, "Watching")
+        assert any("test_watch" in line and "PASSED" in line for line in output)
+        assert any("test_other" in line and "PASSED" in line for line in output)
+
+        test_file.write_text("def test_watch():\n    assert False\n")
+        output = _read_until(lines, "Watching")
+        assert any("test_watch" in line and "FAILED" in line for line in output)
+        assert not any("test_other" in line for line in output)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)